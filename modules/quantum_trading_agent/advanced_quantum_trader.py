@@ -15,6 +15,10 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 import traceback
 
+from .indicator_engine import StreamingIndicatorEngine
+from .divergence_detector import align_tail, latest_divergence, scan_divergence
+from .portfolio_ledger import PortfolioLedger
+
 # Technical Analysis Libraries
 try:
     import pandas_ta as ta
@@ -24,6 +28,116 @@ except ImportError:
     HAS_TA_LIBS = False
     print("Warning: pandas_ta and/or TA-Lib not available. Install with: pip install pandas_ta TA-Lib")
 
+logger = logging.getLogger(__name__)
+
+
+def compute_technical_indicators(df: pd.DataFrame) -> Dict[str, Any]:
+    """Calculate comprehensive technical indicators using pandas_ta and TA-Lib"""
+    if not HAS_TA_LIBS:
+        # Fallback basic calculations
+        return compute_basic_indicators(df)
+
+    indicators = {}
+
+    try:
+        # VWAP (Volume Weighted Average Price)
+        if 'volume' in df.columns:
+            indicators['vwap'] = ta.vwap(df['high'], df['low'], df['close'], df['volume'])
+
+        # RSI
+        indicators['rsi'] = ta.rsi(df['close'], length=14)
+
+        # Bollinger Bands
+        bb = ta.bbands(df['close'], length=20, std=2)
+        if bb is not None:
+            indicators['bb_upper'] = bb[f'BBU_20_2.0']
+            indicators['bb_middle'] = bb[f'BBM_20_2.0']
+            indicators['bb_lower'] = bb[f'BBL_20_2.0']
+
+        # MACD
+        macd = ta.macd(df['close'])
+        if macd is not None:
+            indicators['macd'] = macd['MACD_12_26_9']
+            indicators['macd_signal'] = macd['MACDs_12_26_9']
+            indicators['macd_histogram'] = macd['MACDh_12_26_9']
+
+        # Stochastic Oscillator
+        stoch = ta.stoch(df['high'], df['low'], df['close'])
+        if stoch is not None:
+            indicators['stoch_k'] = stoch['STOCHk_14_3_3']
+            indicators['stoch_d'] = stoch['STOCHd_14_3_3']
+
+        # Average True Range (ATR)
+        indicators['atr'] = ta.atr(df['high'], df['low'], df['close'], length=14)
+
+        # Volume indicators
+        if 'volume' in df.columns:
+            indicators['volume_sma'] = ta.sma(df['volume'], length=20)
+            indicators['volume_ratio'] = df['volume'] / indicators['volume_sma']
+
+    except Exception as e:
+        logger.error(f"Error calculating technical indicators: {e}")
+        return compute_basic_indicators(df)
+
+    return indicators
+
+
+def compute_basic_indicators(df: pd.DataFrame) -> Dict[str, Any]:
+    """Fallback basic indicator calculations"""
+    indicators = {}
+
+    # Simple Moving Averages
+    indicators['sma_20'] = df['close'].rolling(20).mean()
+    indicators['sma_50'] = df['close'].rolling(50).mean()
+
+    # Basic RSI calculation
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    rs = gain / loss
+    indicators['rsi'] = 100 - (100 / (1 + rs))
+
+    # Basic Bollinger Bands
+    bb_middle = df['close'].rolling(20).mean()
+    bb_std = df['close'].rolling(20).std()
+    indicators['bb_upper'] = bb_middle + (bb_std * 2)
+    indicators['bb_middle'] = bb_middle
+    indicators['bb_lower'] = bb_middle - (bb_std * 2)
+
+    # MACD (12, 26, 9)
+    ema_fast = df['close'].ewm(span=12, adjust=False).mean()
+    ema_slow = df['close'].ewm(span=26, adjust=False).mean()
+    indicators['macd'] = ema_fast - ema_slow
+    indicators['macd_signal'] = indicators['macd'].ewm(span=9, adjust=False).mean()
+    indicators['macd_histogram'] = indicators['macd'] - indicators['macd_signal']
+
+    # Stochastic Oscillator (14, 3, 3)
+    lowest_low = df['low'].rolling(14).min()
+    highest_high = df['high'].rolling(14).max()
+    stoch_range = (highest_high - lowest_low).replace(0, np.nan)
+    raw_k = 100 * (df['close'] - lowest_low) / stoch_range
+    indicators['stoch_k'] = raw_k.rolling(3).mean()
+    indicators['stoch_d'] = indicators['stoch_k'].rolling(3).mean()
+
+    # Average True Range (Wilder smoothing)
+    prev_close = df['close'].shift(1)
+    true_range = pd.concat([
+        df['high'] - df['low'],
+        (df['high'] - prev_close).abs(),
+        (df['low'] - prev_close).abs()
+    ], axis=1).max(axis=1)
+    indicators['atr'] = true_range.ewm(alpha=1 / 14, adjust=False).mean()
+
+    # Volume indicators
+    if 'volume' in df.columns:
+        typical_price = (df['high'] + df['low'] + df['close']) / 3
+        indicators['vwap'] = (typical_price * df['volume']).cumsum() / df['volume'].cumsum()
+        indicators['volume_sma'] = df['volume'].rolling(20).mean()
+        indicators['volume_ratio'] = df['volume'] / indicators['volume_sma']
+
+    return indicators
+
+
 @dataclass
 class TradeSignal:
     symbol: str
@@ -122,9 +236,17 @@ class QuantumSafeLoop:
 class AdvancedQuantumTrader:
     def __init__(self):
         self.positions = {}
+        self.ledger = PortfolioLedger()  # columnar mirror of self.positions for P&L marks
         self.trade_history = []
         self.quantum_safe_loop = QuantumSafeLoop()
         
+        # Per-symbol incremental indicator state
+        self.indicator_engines: Dict[str, StreamingIndicatorEngine] = {}
+        
+        # Divergence detection settings
+        self.divergence_lookback = int(os.getenv('DIVERGENCE_LOOKBACK', 20))
+        self.divergence_pivot_width = int(os.getenv('DIVERGENCE_PIVOT_WIDTH', 1))
+        
         # Risk Management Settings
         self.max_daily_loss = float(os.getenv('MAX_DAILY_LOSS', 100.0))
         self.max_position_size = float(os.getenv('MAX_POSITION_SIZE', 0.1))
@@ -181,171 +303,110 @@ class AdvancedQuantumTrader:
             
     def calculate_technical_indicators(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Calculate comprehensive technical indicators using pandas_ta and TA-Lib"""
-        if not HAS_TA_LIBS:
-            # Fallback basic calculations
-            return self._calculate_basic_indicators(df)
-            
-        indicators = {}
-        
-        try:
-            # VWAP (Volume Weighted Average Price)
-            if 'volume' in df.columns:
-                indicators['vwap'] = ta.vwap(df['high'], df['low'], df['close'], df['volume'])
-            
-            # RSI
-            indicators['rsi'] = ta.rsi(df['close'], length=14)
-            
-            # Bollinger Bands
-            bb = ta.bbands(df['close'], length=20, std=2)
-            if bb is not None:
-                indicators['bb_upper'] = bb[f'BBU_20_2.0']
-                indicators['bb_middle'] = bb[f'BBM_20_2.0']
-                indicators['bb_lower'] = bb[f'BBL_20_2.0']
-            
-            # MACD
-            macd = ta.macd(df['close'])
-            if macd is not None:
-                indicators['macd'] = macd['MACD_12_26_9']
-                indicators['macd_signal'] = macd['MACDs_12_26_9']
-                indicators['macd_histogram'] = macd['MACDh_12_26_9']
-            
-            # Stochastic Oscillator
-            stoch = ta.stoch(df['high'], df['low'], df['close'])
-            if stoch is not None:
-                indicators['stoch_k'] = stoch['STOCHk_14_3_3']
-                indicators['stoch_d'] = stoch['STOCHd_14_3_3']
-            
-            # Average True Range (ATR)
-            indicators['atr'] = ta.atr(df['high'], df['low'], df['close'], length=14)
-            
-            # Volume indicators
-            if 'volume' in df.columns:
-                indicators['volume_sma'] = ta.sma(df['volume'], length=20)
-                indicators['volume_ratio'] = df['volume'] / indicators['volume_sma']
-            
-        except Exception as e:
-            self.logger.error(f"Error calculating technical indicators: {e}")
-            return self._calculate_basic_indicators(df)
-            
-        return indicators
-        
+        return compute_technical_indicators(df)
+    
     def _calculate_basic_indicators(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Fallback basic indicator calculations"""
-        indicators = {}
-        
-        # Simple Moving Averages
-        indicators['sma_20'] = df['close'].rolling(20).mean()
-        indicators['sma_50'] = df['close'].rolling(50).mean()
-        
-        # Basic RSI calculation
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        indicators['rsi'] = 100 - (100 / (1 + rs))
-        
-        # Basic Bollinger Bands
-        bb_middle = df['close'].rolling(20).mean()
-        bb_std = df['close'].rolling(20).std()
-        indicators['bb_upper'] = bb_middle + (bb_std * 2)
-        indicators['bb_middle'] = bb_middle
-        indicators['bb_lower'] = bb_middle - (bb_std * 2)
-        
-        return indicators
-        
-    def detect_rsi_divergence(self, df: pd.DataFrame, rsi: pd.Series) -> Dict[str, bool]:
+        return compute_basic_indicators(df)
+    
+    def get_indicator_engine(self, symbol: str) -> StreamingIndicatorEngine:
+        """Get (or create) the incremental indicator engine for a symbol"""
+        engine = self.indicator_engines.get(symbol)
+        if engine is None:
+            engine = StreamingIndicatorEngine()
+            self.indicator_engines[symbol] = engine
+        return engine
+        
+    def detect_rsi_divergence(self, df: pd.DataFrame, rsi: pd.Series,
+                              lookback: Optional[int] = None,
+                              pivot_width: Optional[int] = None) -> Dict[str, bool]:
         """Detect RSI divergence patterns"""
         divergence = {'bullish': False, 'bearish': False}
         
         if len(df) < 50:
             return divergence
             
-        # Look for divergence in last 20 periods
-        recent_data = df.tail(20)
-        recent_rsi = rsi.tail(20)
+        lookback = lookback or self.divergence_lookback
+        pivot_width = pivot_width or self.divergence_pivot_width
         
-        if len(recent_data) < 10:
+        # Align price and RSI on their common trailing bars
+        high, low, rsi_values = align_tail(df['high'].to_numpy(), df['low'].to_numpy(),
+                                           np.asarray(rsi, dtype=float))
+        if high.shape[-1] < 2 * pivot_width + 1:
             return divergence
             
-        # Find price peaks and troughs
-        price_highs = []
-        price_lows = []
-        rsi_highs = []
-        rsi_lows = []
-        
-        for i in range(2, len(recent_data) - 2):
-            # Price peaks
-            if (recent_data.iloc[i]['high'] > recent_data.iloc[i-1]['high'] and 
-                recent_data.iloc[i]['high'] > recent_data.iloc[i+1]['high']):
-                price_highs.append((i, recent_data.iloc[i]['high']))
-                rsi_highs.append((i, recent_rsi.iloc[i]))
-                
-            # Price troughs
-            if (recent_data.iloc[i]['low'] < recent_data.iloc[i-1]['low'] and 
-                recent_data.iloc[i]['low'] < recent_data.iloc[i+1]['low']):
-                price_lows.append((i, recent_data.iloc[i]['low']))
-                rsi_lows.append((i, recent_rsi.iloc[i]))
-                
-        # Check for bearish divergence (price higher highs, RSI lower highs)
-        if len(price_highs) >= 2 and len(rsi_highs) >= 2:
-            if (price_highs[-1][1] > price_highs[-2][1] and 
-                rsi_highs[-1][1] < rsi_highs[-2][1]):
-                divergence['bearish'] = True
-                
-        # Check for bullish divergence (price lower lows, RSI higher lows)
-        if len(price_lows) >= 2 and len(rsi_lows) >= 2:
-            if (price_lows[-1][1] < price_lows[-2][1] and 
-                rsi_lows[-1][1] > rsi_lows[-2][1]):
-                divergence['bullish'] = True
+        latest = latest_divergence(high, low, rsi_values, lookback, pivot_width)
+        divergence['bullish'] = bool(latest['bullish'])
+        divergence['bearish'] = bool(latest['bearish'])
                 
         return divergence
         
-    def generate_trading_signals(self, df: pd.DataFrame) -> List[TradeSignal]:
+    def scan_rsi_divergence(self, df: pd.DataFrame, rsi: pd.Series,
+                            lookback: Optional[int] = None,
+                            pivot_width: Optional[int] = None) -> pd.DataFrame:
+        """Scan the full history for RSI divergences (screening)"""
+        high, low, rsi_values = align_tail(df['high'].to_numpy(), df['low'].to_numpy(),
+                                           np.asarray(rsi, dtype=float))
+        scan = scan_divergence(high, low, rsi_values,
+                               lookback or self.divergence_lookback,
+                               pivot_width or self.divergence_pivot_width)
+        
+        return pd.DataFrame({
+            'bullish': scan['bullish'],
+            'bearish': scan['bearish']
+        }, index=df.index[len(df) - high.shape[-1]:])
+        
+    def generate_trading_signals(self, df: pd.DataFrame, symbol: str = "BTC/USDT") -> List[TradeSignal]:
         """Generate comprehensive trading signals"""
         signals = []
         
         if len(df) < 50:
             return signals
             
-        indicators = self.calculate_technical_indicators(df)
+        # Only bars not yet seen by the symbol's engine are processed
+        engine = self.get_indicator_engine(symbol)
+        engine.sync(df)
+        indicators = engine.snapshot()
         current_price = df['close'].iloc[-1]
+        self.ledger.update_price(symbol, float(current_price))
         
         # Strategy 1: Trend Following
-        trend_signal = self._trend_following_strategy(df, indicators, current_price)
+        trend_signal = self._trend_following_strategy(df, indicators, current_price, symbol)
         if trend_signal:
             signals.append(trend_signal)
             
         # Strategy 2: Mean Reversion
-        mean_reversion_signal = self._mean_reversion_strategy(df, indicators, current_price)
+        mean_reversion_signal = self._mean_reversion_strategy(df, indicators, current_price, symbol)
         if mean_reversion_signal:
             signals.append(mean_reversion_signal)
             
         # Strategy 3: Momentum Strategy
-        momentum_signal = self._momentum_strategy(df, indicators, current_price)
+        momentum_signal = self._momentum_strategy(df, indicators, current_price, symbol)
         if momentum_signal:
             signals.append(momentum_signal)
             
         # Strategy 4: Range Scalping (New)
-        range_signal = self._range_scalping_strategy(df, indicators, current_price)
+        range_signal = self._range_scalping_strategy(df, indicators, current_price, symbol)
         if range_signal:
             signals.append(range_signal)
             
         return signals
         
-    def _trend_following_strategy(self, df: pd.DataFrame, indicators: Dict, current_price: float) -> Optional[TradeSignal]:
+    def _trend_following_strategy(self, df: pd.DataFrame, indicators: Dict[str, float], current_price: float,
+                                  symbol: str = "BTC/USDT") -> Optional[TradeSignal]:
         """Trend following strategy using moving averages and MACD"""
         if 'sma_20' not in indicators or 'sma_50' not in indicators:
             return None
             
-        sma_20 = indicators['sma_20'].iloc[-1]
-        sma_50 = indicators['sma_50'].iloc[-1]
+        sma_20 = indicators['sma_20']
+        sma_50 = indicators['sma_50']
         
         # Long signal: Price above both SMAs and SMA20 > SMA50
         if current_price > sma_20 > sma_50:
-            atr = indicators.get('atr', pd.Series([current_price * 0.02])).iloc[-1]
+            atr = indicators.get('atr', current_price * 0.02)
             
             return TradeSignal(
-                symbol="BTC/USDT",
+                symbol=symbol,
                 direction="LONG",
                 strength=self.quantum_safe_loop.strategy_weights['trend_following'],
                 entry_price=current_price,
@@ -359,10 +420,10 @@ class AdvancedQuantumTrader:
             
         # Short signal: Price below both SMAs and SMA20 < SMA50
         elif current_price < sma_20 < sma_50:
-            atr = indicators.get('atr', pd.Series([current_price * 0.02])).iloc[-1]
+            atr = indicators.get('atr', current_price * 0.02)
             
             return TradeSignal(
-                symbol="BTC/USDT",
+                symbol=symbol,
                 direction="SHORT",
                 strength=self.quantum_safe_loop.strategy_weights['trend_following'],
                 entry_price=current_price,
@@ -376,19 +437,20 @@ class AdvancedQuantumTrader:
             
         return None
         
-    def _mean_reversion_strategy(self, df: pd.DataFrame, indicators: Dict, current_price: float) -> Optional[TradeSignal]:
+    def _mean_reversion_strategy(self, df: pd.DataFrame, indicators: Dict[str, float], current_price: float,
+                                 symbol: str = "BTC/USDT") -> Optional[TradeSignal]:
         """Mean reversion strategy using Bollinger Bands"""
         if 'bb_upper' not in indicators or 'bb_lower' not in indicators:
             return None
             
-        bb_upper = indicators['bb_upper'].iloc[-1]
-        bb_lower = indicators['bb_lower'].iloc[-1]
-        bb_middle = indicators['bb_middle'].iloc[-1]
+        bb_upper = indicators['bb_upper']
+        bb_lower = indicators['bb_lower']
+        bb_middle = indicators['bb_middle']
         
         # Long signal: Price touches lower Bollinger Band
         if current_price <= bb_lower:
             return TradeSignal(
-                symbol="BTC/USDT",
+                symbol=symbol,
                 direction="LONG",
                 strength=self.quantum_safe_loop.strategy_weights['mean_reversion'],
                 entry_price=current_price,
@@ -403,7 +465,7 @@ class AdvancedQuantumTrader:
         # Short signal: Price touches upper Bollinger Band
         elif current_price >= bb_upper:
             return TradeSignal(
-                symbol="BTC/USDT",
+                symbol=symbol,
                 direction="SHORT",
                 strength=self.quantum_safe_loop.strategy_weights['mean_reversion'],
                 entry_price=current_price,
@@ -417,23 +479,24 @@ class AdvancedQuantumTrader:
             
         return None
         
-    def _momentum_strategy(self, df: pd.DataFrame, indicators: Dict, current_price: float) -> Optional[TradeSignal]:
+    def _momentum_strategy(self, df: pd.DataFrame, indicators: Dict[str, float], current_price: float,
+                           symbol: str = "BTC/USDT") -> Optional[TradeSignal]:
         """Momentum strategy using RSI and divergence"""
         if 'rsi' not in indicators:
             return None
             
-        rsi = indicators['rsi']
-        current_rsi = rsi.iloc[-1]
+        current_rsi = indicators['rsi']
         
-        # Check for RSI divergence
+        # Check for RSI divergence against the engine's recent RSI history
+        rsi = self.get_indicator_engine(symbol).rsi_series(len(df))
         divergence = self.detect_rsi_divergence(df, rsi)
         
         # Long signal: RSI oversold + bullish divergence
         if current_rsi < 30 and divergence['bullish']:
-            atr = indicators.get('atr', pd.Series([current_price * 0.02])).iloc[-1]
+            atr = indicators.get('atr', current_price * 0.02)
             
             return TradeSignal(
-                symbol="BTC/USDT",
+                symbol=symbol,
                 direction="LONG",
                 strength=self.quantum_safe_loop.strategy_weights['momentum'],
                 entry_price=current_price,
@@ -447,10 +510,10 @@ class AdvancedQuantumTrader:
             
         # Short signal: RSI overbought + bearish divergence
         elif current_rsi > 70 and divergence['bearish']:
-            atr = indicators.get('atr', pd.Series([current_price * 0.02])).iloc[-1]
+            atr = indicators.get('atr', current_price * 0.02)
             
             return TradeSignal(
-                symbol="BTC/USDT",
+                symbol=symbol,
                 direction="SHORT",
                 strength=self.quantum_safe_loop.strategy_weights['momentum'],
                 entry_price=current_price,
@@ -464,12 +527,13 @@ class AdvancedQuantumTrader:
             
         return None
         
-    def _range_scalping_strategy(self, df: pd.DataFrame, indicators: Dict, current_price: float) -> Optional[TradeSignal]:
+    def _range_scalping_strategy(self, df: pd.DataFrame, indicators: Dict[str, float], current_price: float,
+                                 symbol: str = "BTC/USDT") -> Optional[TradeSignal]:
         """Range scalping strategy using VWAP and volume analysis"""
         if 'vwap' not in indicators:
             return None
             
-        vwap = indicators['vwap'].iloc[-1]
+        vwap = indicators['vwap']
         
         # Check if we're in a sideways market (price oscillating around VWAP)
         recent_prices = df['close'].tail(20)
@@ -480,12 +544,12 @@ class AdvancedQuantumTrader:
             return None
             
         # Volume confirmation
-        volume_ratio = indicators.get('volume_ratio', pd.Series([1.0])).iloc[-1]
+        volume_ratio = indicators.get('volume_ratio', 1.0)
         
         # Long signal: Price below VWAP with volume confirmation
         if current_price < vwap * 0.999 and volume_ratio > 1.2:
             return TradeSignal(
-                symbol="BTC/USDT",
+                symbol=symbol,
                 direction="LONG",
                 strength=self.quantum_safe_loop.strategy_weights['range_scalping'],
                 entry_price=current_price,
@@ -500,7 +564,7 @@ class AdvancedQuantumTrader:
         # Short signal: Price above VWAP with volume confirmation
         elif current_price > vwap * 1.001 and volume_ratio > 1.2:
             return TradeSignal(
-                symbol="BTC/USDT",
+                symbol=symbol,
                 direction="SHORT",
                 strength=self.quantum_safe_loop.strategy_weights['range_scalping'],
                 entry_price=current_price,
@@ -589,7 +653,9 @@ class AdvancedQuantumTrader:
                 timestamp=datetime.now()
             )
             
-            self.positions[f"{signal.symbol}_{signal.direction}"] = position
+            position_key = f"{signal.symbol}_{signal.direction}"
+            self.positions[position_key] = position
+            self.ledger.add(position_key, position.symbol, position.side, position.size, position.entry_price)
             
             # Update agent memory
             self.last_trigger = {
@@ -607,8 +673,9 @@ class AdvancedQuantumTrader:
             
     def generate_live_pnl_data(self) -> Dict[str, Any]:
         """Generate live P&L data for visual charts"""
-        total_unrealized = sum(pos.unrealized_pnl for pos in self.positions.values())
-        total_realized = sum(pos.realized_pnl for pos in self.positions.values())
+        portfolio = self.ledger.mark()  # cached between price/position changes
+        total_unrealized = portfolio['unrealized_pnl']
+        total_realized = portfolio['realized_pnl']
         
         return {
             'timestamp': datetime.now().isoformat(),
@@ -617,6 +684,7 @@ class AdvancedQuantumTrader:
             'realized_pnl': total_realized,
             'total_pnl': self.daily_pnl + total_unrealized,
             'positions_count': len(self.positions),
+            'exposure_by_symbol': portfolio['by_symbol'],
             'win_streak': self.current_win_streak,
             'strategy_weights': self.quantum_safe_loop.strategy_weights.copy(),
             'trading_enabled': self.trading_enabled,
@@ -12,10 +12,14 @@ from typing import Dict, Any, Optional
 import aiohttp
 import json
 
+from .http_transport import HTTPTransport, http_transport
+
 logger = logging.getLogger(__name__)
 
 class AlpacaHeartbeat:
-    def __init__(self):
+    def __init__(self, transport: Optional[HTTPTransport] = None):
+        self.transport = transport or http_transport
+        
         self.api_key = os.getenv('ALPACA_API_KEY')
         self.secret_key = os.getenv('ALPACA_SECRET_KEY')
         self.paper_trading = os.getenv('ALPACA_PAPER', 'true').lower() == 'true'
@@ -76,7 +80,7 @@ class AlpacaHeartbeat:
             
             headers = self.get_headers()
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(
                     f"{self.base_url}/v2/account",
                     headers=headers,
@@ -143,7 +147,7 @@ class AlpacaHeartbeat:
             headers = self.get_headers()
             
             # Test with a simple stock quote
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(
                     f"{self.data_url}/v2/stocks/quotes/latest?symbols=AAPL",
                     headers=headers,
@@ -315,6 +319,8 @@ async def main():
     # Get connection status
     status = alpaca_heartbeat.get_connection_status()
     print(f"Connection status: {json.dumps(status, indent=2)}")
+    
+    await http_transport.close()
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
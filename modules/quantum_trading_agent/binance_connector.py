@@ -15,10 +15,25 @@ from typing import Dict, Any, Optional, List
 import aiohttp
 import json
 
+from .http_transport import HTTPTransport, http_transport
+from .rate_limiter import PRIORITY_ORDER, PRIORITY_ACCOUNT, PRIORITY_HEALTH, get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
+# Request weights (openOrders without a symbol costs 40)
+BINANCE_ENDPOINT_WEIGHTS = {
+    "/fapi/v1/ping": 1,
+    "/fapi/v1/time": 1,
+    "/fapi/v2/account": 5,
+    "/fapi/v1/openOrders": 40,
+    "/fapi/v1/allOpenOrders": 1,
+    "/fapi/v1/order": 1
+}
+
 class BinanceFuturesConnector:
-    def __init__(self):
+    def __init__(self, transport: Optional[HTTPTransport] = None):
+        self.transport = transport or http_transport
+        
         self.api_key = os.getenv('BINANCE_KEY')
         self.api_secret = os.getenv('BINANCE_SECRET')
         self.testnet = os.getenv('BINANCE_TESTNET', 'true').lower() == 'true'
@@ -35,10 +50,15 @@ class BinanceFuturesConnector:
         self.positions = []
         self.orders = []
         
-        # Rate limiting
+        # Rate limiting: shared request-weight budget (2400 weight/min per IP)
         self.rate_limiter = True
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms between requests
+        self.limiter = get_rate_limiter(
+            "binance_futures",
+            rate=float(os.getenv('BINANCE_WEIGHT_PER_MINUTE', '2400')) / 60.0,
+            capacity=float(os.getenv('BINANCE_WEIGHT_BURST', '200')),
+            weights=BINANCE_ENDPOINT_WEIGHTS,
+            window_limit=float(os.getenv('BINANCE_WEIGHT_PER_MINUTE', '2400'))
+        )
         
         # Trading configuration
         self.preview_only = True
@@ -62,17 +82,10 @@ class BinanceFuturesConnector:
             hashlib.sha256
         ).hexdigest()
     
-    async def rate_limit_check(self):
-        """Enforce rate limiting to avoid IP bans"""
+    async def rate_limit_check(self, endpoint: Optional[str] = None, priority: int = PRIORITY_ACCOUNT):
+        """Wait for request weight in the endpoint's priority lane"""
         if self.rate_limiter:
-            current_time = time.time()
-            time_since_last = current_time - self.last_request_time
-            
-            if time_since_last < self.min_request_interval:
-                sleep_time = self.min_request_interval - time_since_last
-                await asyncio.sleep(sleep_time)
-            
-            self.last_request_time = time.time()
+            await self.limiter.acquire(endpoint, priority)
     
     async def check_credentials(self) -> Dict[str, Any]:
         """Check if Binance credentials are configured"""
@@ -93,13 +106,14 @@ class BinanceFuturesConnector:
     async def test_connectivity(self) -> Dict[str, Any]:
         """Test basic connectivity to Binance API"""
         try:
-            await self.rate_limit_check()
+            await self.rate_limit_check("/fapi/v1/ping", PRIORITY_HEALTH)
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(
                     f"{self.base_url}/fapi/v1/ping",
                     timeout=aiohttp.ClientTimeout(total=10)
                 ) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         return {
@@ -123,13 +137,14 @@ class BinanceFuturesConnector:
     async def get_server_time(self) -> Dict[str, Any]:
         """Get Binance server time"""
         try:
-            await self.rate_limit_check()
+            await self.rate_limit_check("/fapi/v1/time", PRIORITY_HEALTH)
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(
                     f"{self.base_url}/fapi/v1/time",
                     timeout=aiohttp.ClientTimeout(total=10)
                 ) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         data = await response.json()
@@ -164,7 +179,7 @@ class BinanceFuturesConnector:
                     "details": credentials_check
                 }
             
-            await self.rate_limit_check()
+            await self.rate_limit_check("/fapi/v2/account", PRIORITY_ACCOUNT)
             
             # Prepare signed request
             timestamp = int(time.time() * 1000)
@@ -174,8 +189,9 @@ class BinanceFuturesConnector:
             url = f"{self.base_url}/fapi/v2/account?{query_string}&signature={signature}"
             headers = self.get_headers()
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         account_data = await response.json()
@@ -247,7 +263,7 @@ class BinanceFuturesConnector:
                     "error": "Missing credentials"
                 }
             
-            await self.rate_limit_check()
+            await self.rate_limit_check("/fapi/v1/openOrders", PRIORITY_ACCOUNT)
             
             timestamp = int(time.time() * 1000)
             query_string = f"timestamp={timestamp}"
@@ -256,8 +272,9 @@ class BinanceFuturesConnector:
             url = f"{self.base_url}/fapi/v1/openOrders?{query_string}&signature={signature}"
             headers = self.get_headers()
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         orders = await response.json()
@@ -299,7 +316,7 @@ class BinanceFuturesConnector:
                     "error": "Missing credentials"
                 }
             
-            await self.rate_limit_check()
+            await self.rate_limit_check("/fapi/v1/allOpenOrders", PRIORITY_ORDER)
             
             timestamp = int(time.time() * 1000)
             
@@ -313,8 +330,9 @@ class BinanceFuturesConnector:
             url = f"{self.base_url}/fapi/v1/allOpenOrders?{query_string}&signature={signature}"
             headers = self.get_headers()
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.delete(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         result = await response.json()
@@ -363,7 +381,7 @@ class BinanceFuturesConnector:
                         "error": f"Missing required field: {field}"
                     }
             
-            await self.rate_limit_check()
+            await self.rate_limit_check("/fapi/v1/order", PRIORITY_ORDER)
             
             timestamp = int(time.time() * 1000)
             
@@ -391,13 +409,14 @@ class BinanceFuturesConnector:
             url = f"{self.base_url}/fapi/v1/order"
             headers = self.get_headers()
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.post(
                     url,
                     headers=headers,
                     data=f"{query_string}&signature={signature}",
                     timeout=aiohttp.ClientTimeout(total=15)
                 ) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         order_result = await response.json()
@@ -492,6 +511,7 @@ class BinanceFuturesConnector:
             "preview_only": self.preview_only,
             "trade_override": self.trade_override,
             "rate_limiter": self.rate_limiter,
+            "rate_limit": self.limiter.get_stats(),
             "base_url": self.base_url
         }
 
@@ -507,6 +527,8 @@ async def main():
     # Get connection status
     status = binance_connector.get_connection_status()
     print(f"Connection status: {json.dumps(status, indent=2)}")
+    
+    await http_transport.close()
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Brain Snapshot Store - Binary, Atomic QuantumMarketBrain Persistence
+NumPy arrays for the matrix and pattern signatures, JSON sidecar for metadata
+"""
+
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Pattern fields stored as typed columns; anything else goes to the sidecar
+NUMERIC_PATTERN_FIELDS = ("accuracy", "occurrences")
+TEXT_PATTERN_FIELDS = ("timestamp", "type", "direction", "last_used_trade")
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def _fsync_directory(path: Path):
+    """Persist directory entries (renames) where the platform supports it"""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_array(path: Path, array: np.ndarray):
+    with open(path, "wb") as f:
+        np.save(f, array, allow_pickle=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _write_json(path: Path, payload: Dict[str, Any]):
+    with open(path, "w") as f:
+        json.dump(payload, f, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class BrainSnapshotStore:
+    """Snapshot directory manager.
+
+    Layout::
+
+        <root>/CURRENT              pointer: {"base": ..., "deltas": [...]}
+        <root>/full-000001/         full snapshot
+        <root>/delta-000002/        changes since the previous snapshot
+
+    Each snapshot directory holds ``entanglement.npy`` (optional for
+    deltas), one set of ``patterns_<dim>_*.npy`` column files per signature
+    length and a ``meta.json`` sidecar. Snapshots are staged in a
+    temporary directory and renamed into place; CURRENT is replaced
+    atomically last, so a crash never exposes a partial snapshot.
+    """
+
+    def __init__(self, root: Path, max_deltas: int = 20):
+        self.root = Path(root)
+        self.max_deltas = max_deltas
+
+    # ------------------------------------------------------------------ #
+    # Pointer handling
+    # ------------------------------------------------------------------ #
+    def _read_pointer(self) -> Optional[Dict[str, Any]]:
+        pointer_path = self.root / "CURRENT"
+        if not pointer_path.exists():
+            return None
+        with open(pointer_path, "r") as f:
+            return json.load(f)
+
+    def _write_pointer(self, pointer: Dict[str, Any]):
+        staging = self.root / "CURRENT.tmp"
+        _write_json(staging, pointer)
+        os.replace(staging, self.root / "CURRENT")
+        _fsync_directory(self.root)
+
+    def exists(self) -> bool:
+        return (self.root / "CURRENT").exists()
+
+    def _next_sequence(self, pointer: Optional[Dict[str, Any]]) -> int:
+        if not pointer:
+            return 1
+        names = [pointer["base"]] + pointer.get("deltas", [])
+        return max(int(name.rsplit("-", 1)[-1]) for name in names) + 1
+
+    # ------------------------------------------------------------------ #
+    # Writing
+    # ------------------------------------------------------------------ #
+    def _write_patterns(self, directory: Path, patterns: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Write patterns grouped by signature length, return sidecar extras"""
+        groups: Dict[int, List[str]] = {}
+        for pattern_id, pattern in patterns.items():
+            groups.setdefault(len(pattern.get("signature", [])), []).append(pattern_id)
+
+        extras = {}
+        known = set(NUMERIC_PATTERN_FIELDS) | set(TEXT_PATTERN_FIELDS) | {"signature"}
+        for dimension, ids in groups.items():
+            prefix = f"patterns_{dimension}"
+            signatures = np.array([patterns[pid].get("signature", []) for pid in ids],
+                                  dtype=np.float64).reshape(len(ids), dimension)
+            _write_array(directory / f"{prefix}_signature.npy", signatures)
+            _write_array(directory / f"{prefix}_id.npy", np.array(ids, dtype=str))
+
+            for field in NUMERIC_PATTERN_FIELDS:
+                column = np.array([patterns[pid].get(field, np.nan) for pid in ids], dtype=np.float64)
+                _write_array(directory / f"{prefix}_{field}.npy", column)
+            for field in TEXT_PATTERN_FIELDS:
+                column = np.array([patterns[pid].get(field) or "" for pid in ids], dtype=str)
+                _write_array(directory / f"{prefix}_{field}.npy", column)
+
+            for pid in ids:
+                extra = {k: v for k, v in patterns[pid].items() if k not in known}
+                if extra:
+                    extras[pid] = extra
+
+        return {"pattern_groups": sorted(groups), "pattern_extras": extras}
+
+    def save(self, meta: Dict[str, Any], patterns: Dict[str, Dict[str, Any]],
+             removed: Iterable[str] = (), entanglement: Optional[np.ndarray] = None,
+             full: bool = False) -> str:
+        """Write a snapshot and atomically make it current.
+
+        With full=False and an existing base, only `patterns` (changed
+        entries), `removed` IDs and, if given, the matrix are written as a
+        delta. A full snapshot is forced when the delta chain reaches
+        max_deltas; the caller must then pass every pattern.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        pointer = self._read_pointer()
+        is_delta = not full and pointer is not None
+
+        sequence = self._next_sequence(pointer)
+        name = f"{'delta' if is_delta else 'full'}-{sequence:06d}"
+        staging = self.root / f".{name}.tmp"
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir()
+
+        try:
+            if entanglement is not None:
+                _write_array(staging / "entanglement.npy", np.ascontiguousarray(entanglement))
+
+            sidecar = dict(meta)
+            sidecar.update(self._write_patterns(staging, patterns))
+            sidecar["removed_patterns"] = sorted(removed) if is_delta else []
+            sidecar["format_version"] = SNAPSHOT_FORMAT_VERSION
+            sidecar["kind"] = "delta" if is_delta else "full"
+            sidecar["written_at"] = datetime.now().isoformat()
+            _write_json(staging / "meta.json", sidecar)
+            _fsync_directory(staging)
+
+            os.replace(staging, self.root / name)
+            _fsync_directory(self.root)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if is_delta:
+            pointer["deltas"] = pointer.get("deltas", []) + [name]
+        else:
+            pointer = {"base": name, "deltas": []}
+        self._write_pointer(pointer)
+        self._prune(pointer)
+        return name
+
+    def needs_full(self) -> bool:
+        """Whether the next save should be a full snapshot"""
+        pointer = self._read_pointer()
+        return pointer is None or len(pointer.get("deltas", [])) >= self.max_deltas
+
+    def _prune(self, pointer: Dict[str, Any]):
+        """Remove snapshot directories no longer referenced by CURRENT"""
+        live = {pointer["base"], *pointer.get("deltas", [])}
+        for entry in self.root.iterdir():
+            if entry.is_dir() and entry.name not in live:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    # ------------------------------------------------------------------ #
+    # Reading
+    # ------------------------------------------------------------------ #
+    def _read_patterns(self, directory: Path, sidecar: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        patterns = {}
+        extras = sidecar.get("pattern_extras", {})
+        for dimension in sidecar.get("pattern_groups", []):
+            prefix = f"patterns_{dimension}"
+            ids = np.load(directory / f"{prefix}_id.npy", allow_pickle=False)
+            signatures = np.load(directory / f"{prefix}_signature.npy", mmap_mode="r", allow_pickle=False)
+            columns = {
+                field: np.load(directory / f"{prefix}_{field}.npy", allow_pickle=False)
+                for field in NUMERIC_PATTERN_FIELDS + TEXT_PATTERN_FIELDS
+            }
+
+            signature_rows = np.asarray(signatures).tolist()
+            numeric = {field: columns[field].tolist() for field in NUMERIC_PATTERN_FIELDS}
+            text = {field: columns[field].tolist() for field in TEXT_PATTERN_FIELDS}
+
+            for row, pattern_id in enumerate(ids.tolist()):
+                pattern = {"signature": signature_rows[row]}
+                for field in NUMERIC_PATTERN_FIELDS:
+                    value = numeric[field][row]
+                    if value == value:  # skip NaN (field was absent)
+                        pattern[field] = int(value) if field == "occurrences" else value
+                for field in TEXT_PATTERN_FIELDS:
+                    if text[field][row]:
+                        pattern[field] = text[field][row]
+                pattern.update(extras.get(pattern_id, {}))
+                patterns[pattern_id] = pattern
+        return patterns
+
+    def load(self, mmap: bool = True) -> Optional[Dict[str, Any]]:
+        """Load the current snapshot chain (base plus deltas).
+
+        The entanglement matrix is memory-mapped copy-on-write when
+        `mmap` is set, so in-place evolution never touches the file.
+        """
+        pointer = self._read_pointer()
+        if pointer is None:
+            return None
+
+        patterns: Dict[str, Dict[str, Any]] = {}
+        entanglement = None
+        meta: Dict[str, Any] = {}
+
+        for name in [pointer["base"]] + pointer.get("deltas", []):
+            directory = self.root / name
+            with open(directory / "meta.json", "r") as f:
+                sidecar = json.load(f)
+
+            for pattern_id in sidecar.get("removed_patterns", []):
+                patterns.pop(pattern_id, None)
+            patterns.update(self._read_patterns(directory, sidecar))
+
+            matrix_path = directory / "entanglement.npy"
+            if matrix_path.exists():
+                entanglement = np.load(matrix_path, mmap_mode="c" if mmap else None, allow_pickle=False)
+
+            meta = sidecar
+
+        return {"meta": meta, "patterns": patterns, "entanglement": entanglement}
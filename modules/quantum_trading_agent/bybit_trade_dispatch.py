@@ -15,10 +15,15 @@ from typing import Dict, Any, Optional, List
 import aiohttp
 import json
 
+from .http_transport import HTTPTransport, http_transport
+from .rate_limiter import PRIORITY_ORDER, PRIORITY_ACCOUNT, PRIORITY_HEALTH, get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 class BybitTradeDispatch:
-    def __init__(self):
+    def __init__(self, transport: Optional[HTTPTransport] = None):
+        self.transport = transport or http_transport
+        
         self.api_key = os.getenv('BYBIT_API_KEY')
         self.api_secret = os.getenv('BYBIT_SECRET')
         self.testnet = os.getenv('BYBIT_TESTNET', 'true').lower() == 'true'
@@ -35,13 +40,15 @@ class BybitTradeDispatch:
         self.positions = []
         self.orders = []
         
-        # Rate limiting
+        # Rate limiting: shared token bucket refilling 120 requests per minute
         self.rate_limiter = True
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms between requests
-        self.request_count = 0
         self.rate_limit_window = 60  # 1 minute window
         self.max_requests_per_window = 120
+        self.limiter = get_rate_limiter(
+            "bybit",
+            rate=self.max_requests_per_window / self.rate_limit_window,
+            capacity=float(os.getenv('BYBIT_RATE_BURST', '20'))
+        )
         
         # Trading configuration
         self.preview_only = True
@@ -59,25 +66,10 @@ class BybitTradeDispatch:
             hashlib.sha256
         ).hexdigest()
     
-    async def rate_limit_check(self):
-        """Enforce rate limiting to avoid IP bans"""
+    async def rate_limit_check(self, endpoint: Optional[str] = None, priority: int = PRIORITY_ACCOUNT):
+        """Wait for a request token in the endpoint's priority lane"""
         if self.rate_limiter:
-            current_time = time.time()
-            
-            # Check request interval
-            time_since_last = current_time - self.last_request_time
-            if time_since_last < self.min_request_interval:
-                sleep_time = self.min_request_interval - time_since_last
-                await asyncio.sleep(sleep_time)
-            
-            # Track requests per window
-            self.request_count += 1
-            if self.request_count >= self.max_requests_per_window:
-                logger.warning("Rate limit approaching, sleeping...")
-                await asyncio.sleep(self.rate_limit_window)
-                self.request_count = 0
-            
-            self.last_request_time = time.time()
+            await self.limiter.acquire(endpoint, priority)
     
     async def check_credentials(self) -> Dict[str, Any]:
         """Check if Bybit credentials are configured"""
@@ -98,13 +90,14 @@ class BybitTradeDispatch:
     async def test_connectivity(self) -> Dict[str, Any]:
         """Test basic connectivity to Bybit API"""
         try:
-            await self.rate_limit_check()
+            await self.rate_limit_check("/v5/market/time", PRIORITY_HEALTH)
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(
                     f"{self.base_url}/v5/market/time",
                     timeout=aiohttp.ClientTimeout(total=10)
                 ) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         data = await response.json()
@@ -138,7 +131,7 @@ class BybitTradeDispatch:
                     "details": credentials_check
                 }
             
-            await self.rate_limit_check()
+            await self.rate_limit_check("/v5/account/wallet-balance", PRIORITY_ACCOUNT)
             
             # Prepare signed request
             timestamp = str(int(time.time() * 1000))
@@ -154,12 +147,13 @@ class BybitTradeDispatch:
                 "Content-Type": "application/json"
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(
                     f"{self.base_url}/v5/account/wallet-balance?accountType=UNIFIED",
                     headers=headers,
                     timeout=aiohttp.ClientTimeout(total=10)
                 ) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         data = await response.json()
@@ -221,7 +215,7 @@ class BybitTradeDispatch:
                     "error": "Missing credentials"
                 }
             
-            await self.rate_limit_check()
+            await self.rate_limit_check("/v5/position/list", PRIORITY_ACCOUNT)
             
             timestamp = str(int(time.time() * 1000))
             params = "category=linear"  # USDT Perpetual
@@ -236,12 +230,13 @@ class BybitTradeDispatch:
                 "Content-Type": "application/json"
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(
                     f"{self.base_url}/v5/position/list?{params}",
                     headers=headers,
                     timeout=aiohttp.ClientTimeout(total=10)
                 ) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         data = await response.json()
@@ -291,7 +286,7 @@ class BybitTradeDispatch:
                     "error": "Missing credentials"
                 }
             
-            await self.rate_limit_check()
+            await self.rate_limit_check("/v5/order/realtime", PRIORITY_ACCOUNT)
             
             timestamp = str(int(time.time() * 1000))
             params = "category=linear"  # USDT Perpetual
@@ -306,12 +301,13 @@ class BybitTradeDispatch:
                 "Content-Type": "application/json"
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.get(
                     f"{self.base_url}/v5/order/realtime?{params}",
                     headers=headers,
                     timeout=aiohttp.ClientTimeout(total=10)
                 ) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         data = await response.json()
@@ -361,7 +357,7 @@ class BybitTradeDispatch:
                     "error": "Missing credentials"
                 }
             
-            await self.rate_limit_check()
+            await self.rate_limit_check("/v5/order/cancel-all", PRIORITY_ORDER)
             
             timestamp = str(int(time.time() * 1000))
             
@@ -384,13 +380,14 @@ class BybitTradeDispatch:
                 "Content-Type": "application/json"
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.post(
                     f"{self.base_url}/v5/order/cancel-all",
                     headers=headers,
                     data=params,
                     timeout=aiohttp.ClientTimeout(total=15)
                 ) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         data = await response.json()
@@ -447,7 +444,7 @@ class BybitTradeDispatch:
                         "error": f"Missing required field: {field}"
                     }
             
-            await self.rate_limit_check()
+            await self.rate_limit_check("/v5/order/create", PRIORITY_ORDER)
             
             timestamp = str(int(time.time() * 1000))
             
@@ -482,13 +479,14 @@ class BybitTradeDispatch:
                 "Content-Type": "application/json"
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.post(
                     f"{self.base_url}/v5/order/create",
                     headers=headers,
                     data=params,
                     timeout=aiohttp.ClientTimeout(total=15)
                 ) as response:
+                    self.limiter.update_from_headers(response.headers, response.status)
                     
                     if response.status == 200:
                         data = await response.json()
@@ -664,7 +662,8 @@ class BybitTradeDispatch:
             "cancel_all_before_entry": self.cancel_all_before_entry,
             "rate_limiter": self.rate_limiter,
             "base_url": self.base_url,
-            "request_count": self.request_count
+            "request_count": self.limiter.granted,
+            "rate_limit": self.limiter.get_stats()
         }
 
 # Global dispatch instance
@@ -679,6 +678,8 @@ async def main():
     # Get connection status
     status = bybit_dispatch.get_connection_status()
     print(f"Connection status: {json.dumps(status, indent=2)}")
+    
+    await http_transport.close()
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -14,6 +14,8 @@ from typing import Dict, Any, Optional, List
 import logging
 from datetime import datetime
 
+from .rate_limiter import PRIORITY_ORDER, PRIORITY_ACCOUNT, get_rate_limiter
+
 class CoinbaseAuthenticator:
     """
     Coinbase Pro/Advanced Trade API authentication and trading interface
@@ -33,8 +35,12 @@ class CoinbaseAuthenticator:
             self.base_url = 'https://api.pro.coinbase.com'
             
         self.session = requests.Session()
-        self.last_request_time = 0
-        self.rate_limit_delay = 0.1  # 100ms between requests
+        self.rate_limit_delay = 0.1  # 100ms between requests on average
+        self.limiter = get_rate_limiter(
+            "coinbase",
+            rate=1.0 / self.rate_limit_delay,
+            capacity=float(os.getenv('COINBASE_RATE_BURST', '15'))
+        )
         
     def _generate_signature(self, timestamp: str, method: str, request_path: str, body: str = '') -> str:
         """
@@ -69,15 +75,15 @@ class CoinbaseAuthenticator:
             'Content-Type': 'application/json'
         }
     
-    def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None) -> Dict[str, Any]:
+    def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None,
+                      priority: Optional[int] = None) -> Dict[str, Any]:
         """
         Make authenticated request to Coinbase API with rate limiting
         """
-        # Rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
+        # Rate limiting: order writes go ahead of polling
+        if priority is None:
+            priority = PRIORITY_ORDER if method.upper() in ('POST', 'DELETE') else PRIORITY_ACCOUNT
+        self.limiter.acquire_blocking(endpoint, priority)
         
         url = f"{self.base_url}{endpoint}"
         body = json.dumps(data) if data else ''
@@ -94,7 +100,7 @@ class CoinbaseAuthenticator:
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
             
-            self.last_request_time = time.time()
+            self.limiter.update_from_headers(response.headers, response.status_code)
             
             if response.status_code == 200:
                 return response.json()
@@ -11,8 +11,13 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 import math
 
+from .performance_stats import PerformanceTracker, RunningStats
+from .state_store import get_state_store, LEGACY_NAMESPACE
+
 logger = logging.getLogger(__name__)
 
+STATE_NAMESPACE = "compound_controller"
+
 class CompoundGainController:
     def __init__(self):
         self.controller_name = "Compound Gain Controller v2.0"
@@ -44,17 +49,27 @@ class CompoundGainController:
         self.current_cycle_start = 100.0
         self.cycle_target = 110.0  # First 10% target
         
+        # Streaming aggregates over trades and completed cycles
+        self.trade_performance = PerformanceTracker({"last_20": {"size": 20}, "24h": {"seconds": 86400}})
+        self.cycle_gains = RunningStats()
+        self.cycle_gain_pcts = RunningStats()
+        
         # Load existing state
+        self.store = get_state_store()
         self.load_compound_state()
         
     def load_compound_state(self):
         """Load compound state from agent memory"""
         try:
-            memory_file = "modules/quantum_trading_agent/agent_memory.json"
-            with open(memory_file, 'r') as f:
-                memory = json.load(f)
-            
-            compound_data = memory.get("compound_controller", {})
+            if not self.store:
+                return
+            # Fall back to the section imported from agent_memory.json on first run
+            compound_data = (self.store.get_namespace(STATE_NAMESPACE)
+                             or self.store.get(LEGACY_NAMESPACE, "compound_controller"))
+            if not compound_data:
+                logger.info("No compound state found, starting fresh")
+                self.save_compound_state()
+                return
             
             self.current_risk_pct = compound_data.get("current_risk_pct", self.base_risk_pct)
             self.consecutive_wins = compound_data.get("consecutive_wins", 0)
@@ -71,26 +86,27 @@ class CompoundGainController:
                 self.daily_trade_count = 0
                 self.last_reset_date = datetime.now().date()
             
+            self.rebuild_cycle_stats()
+            
             logger.info(f"Loaded compound state: Risk {self.current_risk_pct:.1%}, Cycles: {len(self.compound_cycles)}")
             
-        except (FileNotFoundError, json.JSONDecodeError, KeyError):
-            logger.info("No compound state found, starting fresh")
-            self.save_compound_state()
+        except Exception as e:
+            logger.error(f"Error loading compound state: {e}")
+    
+    def rebuild_cycle_stats(self):
+        """Re-seed cycle aggregates from the loaded cycle list"""
+        self.cycle_gains = RunningStats()
+        self.cycle_gain_pcts = RunningStats()
+        for cycle in self.compound_cycles:
+            self.cycle_gains.add(cycle["gain_amount"])
+            self.cycle_gain_pcts.add(cycle["gain_percentage"])
     
     def save_compound_state(self):
-        """Save compound state to agent memory"""
+        """Save compound state to the state store (written by its next flush)"""
+        if not self.store:
+            return
         try:
-            memory_file = "modules/quantum_trading_agent/agent_memory.json"
-            
-            # Load existing memory
-            try:
-                with open(memory_file, 'r') as f:
-                    memory = json.load(f)
-            except FileNotFoundError:
-                memory = {}
-            
-            # Update compound controller data
-            memory["compound_controller"] = {
+            self.store.put_many(STATE_NAMESPACE, {
                 "current_risk_pct": self.current_risk_pct,
                 "consecutive_wins": self.consecutive_wins,
                 "consecutive_losses": self.consecutive_losses,
@@ -101,10 +117,7 @@ class CompoundGainController:
                 "current_cycle_start": self.current_cycle_start,
                 "cycle_target": self.cycle_target,
                 "last_updated": datetime.now().isoformat()
-            }
-            
-            with open(memory_file, 'w') as f:
-                json.dump(memory, f, indent=2)
+            })
                 
         except Exception as e:
             logger.error(f"Error saving compound state: {e}")
@@ -162,6 +175,7 @@ class CompoundGainController:
         try:
             pnl = trade_result.get("pnl", 0.0)
             trade_success = pnl > 0
+            self.trade_performance.record(pnl)
             
             # Update daily counter
             self.daily_trade_count += 1
@@ -240,6 +254,8 @@ class CompoundGainController:
                 }
                 
                 self.compound_cycles.append(completed_cycle)
+                self.cycle_gains.add(cycle_gain)
+                self.cycle_gain_pcts.add(cycle_gain_pct)
                 self.total_compounded += cycle_gain
                 
                 # Start new cycle
@@ -307,9 +323,9 @@ class CompoundGainController:
                 }
             
             # Calculate averages
-            total_gain = sum(c["gain_amount"] for c in self.compound_cycles)
-            avg_cycle_gain = total_gain / total_cycles
-            avg_cycle_gain_pct = sum(c["gain_percentage"] for c in self.compound_cycles) / total_cycles
+            total_gain = self.cycle_gains.total
+            avg_cycle_gain = self.cycle_gains.mean
+            avg_cycle_gain_pct = self.cycle_gain_pcts.mean
             
             # Calculate compound efficiency (actual vs theoretical)
             theoretical_balance = self.initial_capital * (1.05 ** total_cycles)  # 5% per cycle
@@ -352,7 +368,8 @@ class CompoundGainController:
                     "target": self.cycle_target,
                     "progress_pct": 0.0  # Will be calculated by caller
                 },
-                "performance_trend": self.calculate_performance_trend()
+                "performance_trend": self.calculate_performance_trend(),
+                "trade_performance": self.trade_performance.snapshot()
             }
             
         except Exception as e:
@@ -426,6 +443,7 @@ class CompoundGainController:
             "max_daily_trades": self.max_daily_trades,
             "compound_cycles_completed": len(self.compound_cycles),
             "total_compounded": self.total_compounded,
+            "win_rate": self.trade_performance.lifetime.win_rate,
             "current_cycle": {
                 "start": self.current_cycle_start,
                 "target": self.cycle_target,
@@ -7,14 +7,26 @@ Default strategy engine for micro-movements and compound gains
 import asyncio
 import logging
 import json
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
-import numpy as np
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+
+from .indicator_engine import RollingRegression
+from .exit_book import ExitBook
+from .portfolio_ledger import PortfolioLedger
+from .performance_stats import PerformanceTracker
+from .records import PositionRecord, ns_to_iso, iso_to_ns, NS_PER_SECOND
+from .state_store import StateStore, get_state_store, LEGACY_NAMESPACE
 
 logger = logging.getLogger(__name__)
 
+STATE_NAMESPACE = "delta_scalping"
+PERFORMANCE_WINDOWS = {"last_50": {"size": 50}, "1h": {"seconds": 3600}}
+
 class DeltaScalpingEngine:
-    def __init__(self):
+    def __init__(self, persist: bool = True, store: Optional[StateStore] = None,
+                 momentum_windows: Optional[Sequence[int]] = None):
         self.strategy_name = "Delta Scalping v2.0"
         self.phase = "phase_2_trillion"
         
@@ -35,26 +47,49 @@ class DeltaScalpingEngine:
         self.volume_multiplier = 1.5  # Volume confirmation
         self.momentum_window = 10  # 10-tick momentum
         
+        # Rolling regressions per symbol and window; the first window drives the entry score
+        self.momentum_windows = tuple(momentum_windows or (self.momentum_window,))
+        self.momentum_window = self.momentum_windows[0]
+        self.momentum_trackers: Dict[str, Dict[int, RollingRegression]] = {}
+        self.streamed_symbols = set()  # symbols whose prices arrive via on_market_tick
+        
         # Trade tracking
-        self.active_trades = {}
-        self.completed_trades = []
+        self.active_trades: Dict[str, PositionRecord] = {}
+        self.exit_book = ExitBook()  # stop/target/deadline index over active_trades
+        self.ledger = PortfolioLedger()  # columnar copy of active_trades for marking
+        self.completed_trades: List[PositionRecord] = []
+        self.performance = PerformanceTracker(PERFORMANCE_WINDOWS)
         self.daily_pnl = 0.0
         self.session_start = datetime.now()
         
-        # Memory integration
-        self.memory_file = "modules/quantum_trading_agent/agent_memory.json"
+        # Error thresholding
+        self.error_count = 0
+        self.max_errors = 5
+        self.last_error_time = None
+        
+        # Memory integration (persist=False keeps the engine in-memory, e.g. per-symbol actors)
+        self.store = (store or get_state_store()) if persist else None
         self.load_session_memory()
         
     def load_session_memory(self):
         """Load session memory and error thresholding"""
+        if not self.store:
+            return
         try:
-            with open(self.memory_file, 'r') as f:
-                memory = json.load(f)
+            # Fall back to the section imported from agent_memory.json on first run
+            memory = self.store.get_namespace(STATE_NAMESPACE) or self.store.get_namespace(LEGACY_NAMESPACE)
+            if "current_balance" not in memory:
+                logger.info("No session memory found, starting fresh")
+                self.save_session_memory()
+                return
                 
             # Restore session data
             self.current_balance = memory.get("current_balance", 100.0)
             self.daily_pnl = memory.get("daily_pnl", 0.0)
-            self.completed_trades = memory.get("completed_trades", [])
+            self.completed_trades = [self.trade_from_dict(t) for t in memory.get("completed_trades", [])]
+            self.performance = PerformanceTracker(PERFORMANCE_WINDOWS)
+            self.performance.record_many([t.realized_pnl for t in self.completed_trades],
+                                         [t.closed_ns / NS_PER_SECOND for t in self.completed_trades])
             
             # Error thresholding
             self.error_count = memory.get("error_count", 0)
@@ -63,21 +98,20 @@ class DeltaScalpingEngine:
             
             logger.info(f"Loaded session memory: Balance ${self.current_balance}")
             
-        except FileNotFoundError:
-            logger.info("No session memory found, starting fresh")
-            self.save_session_memory()
         except Exception as e:
             logger.error(f"Error loading session memory: {e}")
     
     def save_session_memory(self):
-        """Save session memory and performance data"""
+        """Save session memory and performance data (written by the store's next flush)"""
+        if not self.store:
+            return
         try:
             memory = {
                 "phase": self.phase,
                 "timestamp": datetime.now().isoformat(),
                 "current_balance": self.current_balance,
                 "daily_pnl": self.daily_pnl,
-                "completed_trades": self.completed_trades[-50:],  # Keep last 50 trades
+                "completed_trades": [self.trade_to_dict(t) for t in self.completed_trades[-50:]],  # Keep last 50 trades
                 "error_count": getattr(self, 'error_count', 0),
                 "max_errors": getattr(self, 'max_errors', 5),
                 "last_error_time": getattr(self, 'last_error_time', None),
@@ -89,8 +123,7 @@ class DeltaScalpingEngine:
                 }
             }
             
-            with open(self.memory_file, 'w') as f:
-                json.dump(memory, f, indent=2)
+            self.store.put_many(STATE_NAMESPACE, memory)
                 
         except Exception as e:
             logger.error(f"Error saving session memory: {e}")
@@ -110,6 +143,7 @@ class DeltaScalpingEngine:
             
             # Momentum analysis
             momentum_score = self.calculate_momentum(market_data)
+            momentum_by_window = self.momentum_scores(symbol)
             volume_score = self.calculate_volume_score(volume, market_data.get("avg_volume", volume))
             
             # Delta scalping signals
@@ -119,6 +153,7 @@ class DeltaScalpingEngine:
                 "spread": spread,
                 "price_delta": price_delta,
                 "momentum_score": momentum_score,
+                "momentum_by_window": momentum_by_window,
                 "volume_score": volume_score,
                 "timestamp": datetime.now().isoformat()
             }
@@ -134,28 +169,50 @@ class DeltaScalpingEngine:
             self.record_error(str(e))
             return {"error": str(e)}
     
+    def get_momentum_trackers(self, symbol: str) -> Dict[int, RollingRegression]:
+        trackers = self.momentum_trackers.get(symbol)
+        if trackers is None:
+            trackers = {window: RollingRegression(window) for window in self.momentum_windows}
+            self.momentum_trackers[symbol] = trackers
+        return trackers
+    
+    def record_price(self, symbol: str, price: float):
+        """Push one tick into every momentum window for the symbol"""
+        self.ledger.update_price(symbol, price)
+        for tracker in self.get_momentum_trackers(symbol).values():
+            tracker.push(price)
+    
+    def _observe_market_data(self, market_data: Dict[str, Any]):
+        """Feed the trackers from a market_data dict unless the stream already did"""
+        symbol = market_data.get("symbol", "")
+        if symbol in self.streamed_symbols:
+            return
+        if symbol not in self.momentum_trackers and market_data.get("price_history"):
+            # First sight of a caller that still ships history: seed from it once
+            for price in market_data["price_history"][-max(self.momentum_windows):]:
+                self.record_price(symbol, float(price))
+            return
+        price = market_data.get("price")
+        if price:
+            self.record_price(symbol, float(price))
+    
+    def momentum_scores(self, symbol: str) -> Dict[int, float]:
+        """0-1 momentum score per window (0.5 = neutral or not enough ticks yet)"""
+        scores = {}
+        for window, tracker in self.get_momentum_trackers(symbol).items():
+            if not tracker.ready:
+                scores[window] = 0.5
+                continue
+            mean = tracker.mean()
+            normalized_slope = tracker.slope() / mean if mean != 0 else 0
+            scores[window] = max(0, min(1, 0.5 + normalized_slope * 1000))
+        return scores
+    
     def calculate_momentum(self, market_data: Dict[str, Any]) -> float:
         """Calculate momentum score for delta scalping"""
         try:
-            # Use price history if available
-            price_history = market_data.get("price_history", [])
-            
-            if len(price_history) < self.momentum_window:
-                return 0.5  # Neutral momentum
-            
-            recent_prices = price_history[-self.momentum_window:]
-            
-            # Calculate momentum using linear regression slope
-            x = np.arange(len(recent_prices))
-            y = np.array(recent_prices)
-            
-            slope = np.polyfit(x, y, 1)[0]
-            normalized_slope = slope / np.mean(y) if np.mean(y) != 0 else 0
-            
-            # Convert to 0-1 score
-            momentum_score = max(0, min(1, 0.5 + normalized_slope * 1000))
-            
-            return momentum_score
+            self._observe_market_data(market_data)
+            return self.momentum_scores(market_data.get("symbol", ""))[self.momentum_window]
             
         except Exception as e:
             logger.error(f"Error calculating momentum: {e}")
@@ -245,7 +302,8 @@ class DeltaScalpingEngine:
                 return {"success": False, "reason": "No entry signal"}
             
             # Generate trade ID
-            trade_id = f"DELTA_{int(datetime.now().timestamp())}"
+            now = time.time_ns()
+            trade_id = f"DELTA_{now // NS_PER_SECOND}"
             
             # Trade parameters
             symbol = signal.get("symbol", "BTCUSDT")
@@ -263,24 +321,20 @@ class DeltaScalpingEngine:
                 take_profit = entry_price * (1 - self.take_profit_pct)
             
             # Create trade record
-            trade = {
-                "trade_id": trade_id,
-                "symbol": symbol,
-                "side": side,
-                "entry_price": entry_price,
-                "position_size": position_size,
-                "stop_loss": stop_loss,
-                "take_profit": take_profit,
-                "confidence": confidence,
-                "entry_time": datetime.now().isoformat(),
-                "max_hold_time": (datetime.now() + timedelta(seconds=self.max_position_time)).isoformat(),
-                "status": "ACTIVE",
-                "strategy": "delta_scalping",
-                "phase": self.phase
-            }
+            trade = PositionRecord.open(
+                trade_id, symbol, side, entry_price,
+                notional=position_size,
+                stop_loss=stop_loss,
+                take_profit=take_profit,
+                opened_ns=now,
+                hold_seconds=self.max_position_time,
+                extra={"confidence": confidence}
+            )
             
             # Store active trade
             self.active_trades[trade_id] = trade
+            self.exit_book.add(trade_id, symbol, side, stop_loss, take_profit, trade.deadline)
+            self.ledger.add_record(trade)
             
             # Update memory
             self.save_session_memory()
@@ -289,7 +343,7 @@ class DeltaScalpingEngine:
             
             return {
                 "success": True,
-                "trade": trade,
+                "trade": self.trade_to_dict(trade),
                 "execution_mode": "preview_only"  # Enforced safety
             }
             
@@ -299,24 +353,22 @@ class DeltaScalpingEngine:
             return {"success": False, "error": str(e)}
     
     def monitor_active_trades(self, market_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Monitor active trades for exit conditions"""
+        """Close the trades whose deadline, stop or target this price reaches"""
         try:
             current_price = float(market_data.get("price", 0))
             symbol = market_data.get("symbol", "")
             
-            closed_trades = []
+            self.sync_exit_book()
+            self.ledger.update_price(symbol, current_price)
+            # Time exits first, as in check_exit_conditions; the book only returns
+            # the trades that are due, so untouched trades cost nothing per tick
+            exits = self.exit_book.expired(symbol) + self.exit_book.triggered(symbol, current_price)
             
-            for trade_id, trade in list(self.active_trades.items()):
-                if trade["symbol"] != symbol:
-                    continue
-                
-                # Check exit conditions
-                exit_result = self.check_exit_conditions(trade, current_price)
-                
-                if exit_result["should_exit"]:
-                    closed_trade = self.close_trade(trade_id, current_price, exit_result["reason"])
-                    if closed_trade:
-                        closed_trades.append(closed_trade)
+            closed_trades = []
+            for trade_id, reason in exits:
+                closed_trade = self.close_trade(trade_id, current_price, reason)
+                if closed_trade:
+                    closed_trades.append(closed_trade)
             
             return closed_trades
             
@@ -325,30 +377,42 @@ class DeltaScalpingEngine:
             self.record_error(str(e))
             return []
     
-    def check_exit_conditions(self, trade: Dict[str, Any], current_price: float) -> Dict[str, Any]:
+    def sync_exit_book(self):
+        """Rebuild the exit book if active_trades was changed behind its back"""
+        if len(self.exit_book) == len(self.active_trades):
+            return
+        self.exit_book.clear()
+        self.ledger.clear()
+        for trade_id, trade in self.active_trades.items():
+            self.exit_book.add(trade_id, trade.symbol, trade.side_name, trade.stop_loss,
+                               trade.take_profit, trade.deadline)
+            self.ledger.add_record(trade)
+    
+    def on_market_tick(self, tick: Dict[str, Any], market_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Market stream hook: feed momentum and check exits on every trade tick"""
+        price = market_data.get("price") or tick.get("price")
+        if price:
+            symbol = market_data.get("symbol", tick.get("symbol", ""))
+            self.streamed_symbols.add(symbol)
+            self.record_price(symbol, float(price))
+        if not self.active_trades:
+            return []
+        return self.monitor_active_trades(market_data)
+    
+    def check_exit_conditions(self, trade: PositionRecord, current_price: float) -> Dict[str, Any]:
         """Check if trade should be closed"""
         try:
-            side = trade["side"]
-            entry_price = trade["entry_price"]
-            stop_loss = trade["stop_loss"]
-            take_profit = trade["take_profit"]
-            max_hold_time = datetime.fromisoformat(trade["max_hold_time"])
+            if isinstance(trade, dict):
+                trade = self.trade_from_dict(trade)
             
             # Time-based exit
-            if datetime.now() >= max_hold_time:
+            if trade.expired():
                 return {"should_exit": True, "reason": "MAX_TIME"}
             
             # Profit/Loss exits
-            if side == "LONG":
-                if current_price <= stop_loss:
-                    return {"should_exit": True, "reason": "STOP_LOSS"}
-                elif current_price >= take_profit:
-                    return {"should_exit": True, "reason": "TAKE_PROFIT"}
-            else:  # SHORT
-                if current_price >= stop_loss:
-                    return {"should_exit": True, "reason": "STOP_LOSS"}
-                elif current_price <= take_profit:
-                    return {"should_exit": True, "reason": "TAKE_PROFIT"}
+            reason = trade.exit_reason_at(current_price)
+            if reason:
+                return {"should_exit": True, "reason": reason}
             
             return {"should_exit": False}
             
@@ -359,29 +423,15 @@ class DeltaScalpingEngine:
     def close_trade(self, trade_id: str, exit_price: float, reason: str) -> Optional[Dict[str, Any]]:
         """Close an active trade and calculate P&L"""
         try:
-            if trade_id not in self.active_trades:
+            trade = self.active_trades.pop(trade_id, None)
+            if trade is None:
                 return None
-            
-            trade = self.active_trades[trade_id]
+            self.exit_book.remove(trade_id)
             
             # Calculate P&L
-            entry_price = trade["entry_price"]
-            position_size = trade["position_size"]
-            side = trade["side"]
-            
-            if side == "LONG":
-                pnl = (exit_price - entry_price) / entry_price * position_size
-            else:
-                pnl = (entry_price - exit_price) / entry_price * position_size
-            
-            # Update trade record
-            trade.update({
-                "exit_price": exit_price,
-                "exit_time": datetime.now().isoformat(),
-                "exit_reason": reason,
-                "pnl": pnl,
-                "status": "CLOSED"
-            })
+            pnl = trade.close(exit_price, reason)
+            self.ledger.remove(trade_id, pnl)
+            self.performance.record(pnl, trade.closed_ns / NS_PER_SECOND)
             
             # Update balances
             self.current_balance += pnl
@@ -389,35 +439,70 @@ class DeltaScalpingEngine:
             
             # Move to completed trades
             self.completed_trades.append(trade)
-            del self.active_trades[trade_id]
             
             # Save memory
             self.save_session_memory()
             
             logger.info(f"Closed trade {trade_id}: P&L ${pnl:.2f}, New balance: ${self.current_balance:.2f}")
             
-            return trade
+            return self.trade_to_dict(trade)
             
         except Exception as e:
             logger.error(f"Error closing trade: {e}")
             self.record_error(str(e))
             return None
     
+    def trade_to_dict(self, trade: PositionRecord) -> Dict[str, Any]:
+        """API form of a trade record"""
+        result = {
+            "trade_id": trade.position_id,
+            "symbol": trade.symbol,
+            "side": trade.side_name,
+            "entry_price": trade.entry_price,
+            "position_size": trade.size,
+            "stop_loss": trade.stop_loss,
+            "take_profit": trade.take_profit,
+            "confidence": trade.get("confidence", 0),
+            "entry_time": ns_to_iso(trade.opened_ns),
+            "max_hold_time": ns_to_iso(trade.deadline_ns),
+            "status": "ACTIVE" if trade.is_open else trade.status,
+            "strategy": "delta_scalping",
+            "phase": self.phase
+        }
+        if not trade.is_open:
+            result.update({
+                "exit_price": trade.exit_price,
+                "exit_time": ns_to_iso(trade.closed_ns),
+                "exit_reason": trade.exit_reason,
+                "pnl": trade.realized_pnl
+            })
+        return result
+    
+    def trade_from_dict(self, data: Dict[str, Any]) -> PositionRecord:
+        """Trade record from its API form (e.g. persisted session memory)"""
+        opened_ns = iso_to_ns(data.get("entry_time")) or None
+        trade = PositionRecord.open(
+            data.get("trade_id", ""), data.get("symbol", ""), data.get("side", "LONG"),
+            data.get("entry_price", 0), notional=data.get("position_size", 0),
+            stop_loss=data.get("stop_loss", 0), take_profit=data.get("take_profit", 0),
+            opened_ns=opened_ns, extra={"confidence": data.get("confidence", 0)}
+        )
+        trade.deadline_ns = iso_to_ns(data.get("max_hold_time"))
+        if data.get("exit_time") or data.get("status") == "CLOSED":
+            trade.exit_price = data.get("exit_price", 0)
+            trade.exit_reason = data.get("exit_reason", "")
+            trade.realized_pnl = data.get("pnl", 0)
+            trade.closed_ns = iso_to_ns(data.get("exit_time")) or trade.opened_ns
+            trade.status = data.get("status", "CLOSED")
+        return trade
+    
     def calculate_win_rate(self) -> float:
         """Calculate win rate from completed trades"""
-        if not self.completed_trades:
-            return 0.0
-        
-        winning_trades = len([t for t in self.completed_trades if t.get("pnl", 0) > 0])
-        return (winning_trades / len(self.completed_trades)) * 100
+        return self.performance.lifetime.win_rate * 100
     
     def calculate_avg_profit(self) -> float:
         """Calculate average profit per trade"""
-        if not self.completed_trades:
-            return 0.0
-        
-        total_pnl = sum(t.get("pnl", 0) for t in self.completed_trades)
-        return total_pnl / len(self.completed_trades)
+        return self.performance.lifetime.mean
     
     def record_error(self, error_msg: str):
         """Record error for threshold monitoring"""
@@ -440,41 +525,61 @@ class DeltaScalpingEngine:
             "target_exit": self.target_exit,
             "daily_pnl": self.daily_pnl,
             "active_trades": len(self.active_trades),
+            "unrealized_pnl": self.ledger.mark()["unrealized_pnl"],
             "completed_trades": len(self.completed_trades),
             "win_rate": self.calculate_win_rate(),
             "avg_profit": self.calculate_avg_profit(),
+            "performance": self.performance.snapshot(),
             "error_count": getattr(self, 'error_count', 0),
             "ready_for_phase_final": self.current_balance >= self.target_exit,
             "session_duration": str(datetime.now() - self.session_start)
         }
 
-# Global strategy engine instance
-delta_engine = DeltaScalpingEngine()
+# Global strategy engine, created on first use so that importing this module
+# (e.g. in shard or CPU-pool processes) does not open the state store
+_delta_engine: Optional[DeltaScalpingEngine] = None
+_delta_engine_lock = threading.Lock()
+
+
+def get_delta_engine() -> DeltaScalpingEngine:
+    global _delta_engine
+    with _delta_engine_lock:
+        if _delta_engine is None:
+            _delta_engine = DeltaScalpingEngine()
+        return _delta_engine
 
-async def process_market_signal(market_data: Dict[str, Any]) -> Dict[str, Any]:
+
+async def process_market_signal(market_data: Dict[str, Any],
+                                engine: Optional[DeltaScalpingEngine] = None) -> Dict[str, Any]:
     """Main entry point for processing market signals"""
+    return evaluate_market_signal(market_data, engine)
+
+def evaluate_market_signal(market_data: Dict[str, Any],
+                           engine: Optional[DeltaScalpingEngine] = None) -> Dict[str, Any]:
+    """Synchronous body of process_market_signal, for running on an executor thread"""
+    engine = engine or get_delta_engine()
     try:
         # Analyze delta opportunity
-        signal = delta_engine.analyze_delta_opportunity(market_data)
+        signal = engine.analyze_delta_opportunity(market_data)
         
         if signal.get("should_enter", False):
             # Execute trade
-            trade_result = delta_engine.execute_scalping_trade(signal)
+            trade_result = engine.execute_scalping_trade(signal)
             signal["trade_result"] = trade_result
         
         # Monitor existing trades
-        closed_trades = delta_engine.monitor_active_trades(market_data)
+        closed_trades = engine.monitor_active_trades(market_data)
         if closed_trades:
             signal["closed_trades"] = closed_trades
         
         # Add strategy status
-        signal["strategy_status"] = delta_engine.get_strategy_status()
+        signal["strategy_status"] = engine.get_strategy_status()
         
         return signal
         
     except Exception as e:
         logger.error(f"Error processing market signal: {e}")
-        delta_engine.record_error(str(e))
+        engine.record_error(str(e))
         return {"error": str(e)}
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Divergence Detector - Vectorized Swing Pivot and RSI Divergence Scanning
+Works on a single series or a (symbols x bars) batch in one NumPy pass
+"""
+
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def find_pivots(values: np.ndarray, width: int = 1, mode: str = "high") -> np.ndarray:
+    """Mark swing pivots along the last axis.
+
+    A bar is a pivot high (low) when it is strictly above (below) every bar
+    within `width` bars on both sides. Bars closer than `width` to either
+    edge are never pivots because they are not yet confirmed.
+    """
+    values = np.asarray(values, dtype=float)
+    n = values.shape[-1]
+    pivots = np.zeros(values.shape, dtype=bool)
+    if width < 1 or n < 2 * width + 1:
+        return pivots
+
+    center = values[..., width:n - width]
+    mask = np.ones(center.shape, dtype=bool)
+    for offset in range(1, width + 1):
+        left = values[..., width - offset:n - width - offset]
+        right = values[..., width + offset:n - width + offset]
+        if mode == "high":
+            mask &= (center > left) & (center > right)
+        else:
+            mask &= (center < left) & (center < right)
+
+    pivots[..., width:n - width] = mask
+    return pivots
+
+
+def previous_pivot_index(pivots: np.ndarray) -> np.ndarray:
+    """For every bar, the index of the pivot strictly before it (-1 if none)"""
+    n = pivots.shape[-1]
+    positions = np.where(pivots, np.arange(n), -1)
+    last_upto = np.maximum.accumulate(positions, axis=-1)
+    previous = np.full(pivots.shape, -1, dtype=np.int64)
+    previous[..., 1:] = last_upto[..., :-1]
+    return previous
+
+
+def _pivot_pairs(price: np.ndarray, oscillator: np.ndarray, pivots: np.ndarray, lookback: int):
+    """Compare each pivot with the preceding pivot no more than `lookback` bars back"""
+    n = price.shape[-1]
+    previous = previous_pivot_index(pivots)
+    has_previous = pivots & (previous >= 0) & (np.arange(n) - previous <= lookback)
+
+    safe_previous = np.where(previous >= 0, previous, 0)
+    previous_price = np.take_along_axis(price, safe_previous, axis=-1)
+    previous_osc = np.take_along_axis(oscillator, safe_previous, axis=-1)
+    return has_previous, previous_price, previous_osc, previous
+
+
+def scan_divergence(high: np.ndarray, low: np.ndarray, rsi: np.ndarray,
+                    lookback: int = 20, pivot_width: int = 1) -> Dict[str, np.ndarray]:
+    """Find every RSI divergence over the full history.
+
+    Accepts 1D arrays (one symbol) or 2D arrays shaped (symbols, bars).
+    Returns boolean masks marking the bar of the second pivot of each
+    divergence:
+
+    - bearish: price makes a higher high while RSI makes a lower high
+    - bullish: price makes a lower low while RSI makes a higher low
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    rsi = np.asarray(rsi, dtype=float)
+
+    pivot_highs = find_pivots(high, pivot_width, "high")
+    pivot_lows = find_pivots(low, pivot_width, "low")
+
+    paired, prev_high, prev_rsi, _ = _pivot_pairs(high, rsi, pivot_highs, lookback)
+    bearish = paired & (high > prev_high) & (rsi < prev_rsi)
+
+    paired, prev_low, prev_rsi, _ = _pivot_pairs(low, rsi, pivot_lows, lookback)
+    bullish = paired & (low < prev_low) & (rsi > prev_rsi)
+
+    return {
+        "bearish": bearish,
+        "bullish": bullish,
+        "pivot_highs": pivot_highs,
+        "pivot_lows": pivot_lows
+    }
+
+
+def _latest_flag(price: np.ndarray, rsi: np.ndarray, pivots: np.ndarray,
+                 lookback: int, kind: str) -> np.ndarray:
+    """Whether the two most recent pivots inside the lookback window diverge"""
+    n = price.shape[-1]
+    window_start = n - lookback
+
+    positions = np.where(pivots, np.arange(n), -1)
+    last = positions.max(axis=-1, keepdims=True)
+    safe_last = np.maximum(last, 0)
+    previous = np.take_along_axis(previous_pivot_index(pivots), safe_last, axis=-1)
+    safe_previous = np.maximum(previous, 0)
+
+    in_window = (last >= window_start) & (previous >= window_start) & (previous >= 0)
+
+    last_price = np.take_along_axis(price, safe_last, axis=-1)
+    previous_price = np.take_along_axis(price, safe_previous, axis=-1)
+    last_rsi = np.take_along_axis(rsi, safe_last, axis=-1)
+    previous_rsi = np.take_along_axis(rsi, safe_previous, axis=-1)
+
+    if kind == "bearish":
+        flag = (last_price > previous_price) & (last_rsi < previous_rsi)
+    else:
+        flag = (last_price < previous_price) & (last_rsi > previous_rsi)
+
+    return (in_window & flag)[..., 0]
+
+
+def latest_divergence(high: np.ndarray, low: np.ndarray, rsi: np.ndarray,
+                      lookback: int = 20, pivot_width: int = 1) -> Dict[str, np.ndarray]:
+    """Divergence state at the end of each series (one flag per symbol).
+
+    Compares the last two confirmed pivots that fall inside the final
+    `lookback` bars, mirroring the classic tail-window check.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    rsi = np.asarray(rsi, dtype=float)
+
+    pivot_highs = find_pivots(high, pivot_width, "high")
+    pivot_lows = find_pivots(low, pivot_width, "low")
+
+    return {
+        "bearish": _latest_flag(high, rsi, pivot_highs, lookback, "bearish"),
+        "bullish": _latest_flag(low, rsi, pivot_lows, lookback, "bullish")
+    }
+
+
+def align_tail(*arrays: np.ndarray, length: Optional[int] = None):
+    """Trim 1D/2D arrays to a common trailing length along the bar axis"""
+    common = min(np.shape(a)[-1] for a in arrays)
+    if length is not None:
+        common = min(common, length)
+    return tuple(np.asarray(a, dtype=float)[..., np.shape(a)[-1] - common:] for a in arrays)
@@ -8,11 +8,15 @@ import json
 import asyncio
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import requests
+from typing import Dict, List, Any, Optional, Iterable
+import aiohttp
 import os
 import logging
 
+from .records import PositionRecord, ns_to_iso, NS_PER_SECOND
+from .http_transport import HTTPTransport, http_transport
+from .market_stream import MarketDataFeed, market_feed, MARKET_STREAM_ENABLED
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -21,15 +25,15 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class DWCPhase1TrillionPlusAgent:
-    def __init__(self):
+    def __init__(self, transport: Optional[HTTPTransport] = None):
         self.MAX_RISK = 100.0  # $100 maximum risk
         self.TARGET_ROI = 5.0  # 5x return on investment
         self.POSITION_SIZE = 20.0  # $20 per position (5 positions max)
         self.STOP_LOSS_PCT = 0.02  # 2% stop loss
         self.TAKE_PROFIT_PCT = 0.05  # 5% take profit for scalping
         
-        self.active_positions = []
-        self.trade_history = []
+        self.active_positions: Dict[str, PositionRecord] = {}
+        self.trade_history: List[PositionRecord] = []
         self.total_pnl = 0.0
         self.trades_today = 0
         self.win_streak = 0
@@ -42,6 +46,14 @@ class DWCPhase1TrillionPlusAgent:
         self.mobile_adaptive_scaling = True
         self.success_protocol_ready = False
         
+        # Pooled HTTP session for the Perplexity fallback
+        self.transport = transport or http_transport
+        
+        # Optional streaming feed (market_stream.MarketDataFeed), preferred over
+        # Perplexity; connected by start_market_feed (MARKET_STREAM_ENABLED=true)
+        self.market_feed = None
+        self.market_data_max_age = 5.0
+        
         logger.info("DWC Phase 1 Trillion+ Agent initialized")
         logger.info(f"Max risk: ${self.MAX_RISK}, Target ROI: {self.TARGET_ROI}x")
 
@@ -60,45 +72,60 @@ class DWCPhase1TrillionPlusAgent:
             logger.error(f"Secure auth activation failed: {e}")
             return False
 
+    async def start_market_feed(self, feed: Optional[MarketDataFeed] = None,
+                                symbols: Iterable[str] = ("BTC",)) -> MarketDataFeed:
+        """Stream prices for `symbols` so market data stops polling Perplexity"""
+        feed = feed or market_feed
+        await feed.subscribe_symbols(symbols)
+        await feed.start()
+        self.market_feed = feed
+        logger.info(f"Market stream connected for {', '.join(symbols)}")
+        return feed
+
     async def get_real_market_data(self, symbol: str = "BTC") -> Optional[Dict[str, Any]]:
-        """Get real market data using Perplexity API"""
+        """Get real market data from the stream, falling back to the Perplexity API"""
         try:
+            if self.market_feed is not None:
+                market_data = self.market_feed.get_market_data(symbol, max_age=self.market_data_max_age)
+                if market_data:
+                    return market_data
+            
             if not os.getenv('PERPLEXITY_API_KEY'):
                 return await self.mobile_fallback_data(symbol)
             
-            response = requests.post(
-                'https://api.perplexity.ai/chat/completions',
-                headers={
-                    'Authorization': f"Bearer {os.getenv('PERPLEXITY_API_KEY')}",
-                    'Content-Type': 'application/json',
-                },
-                json={
-                    'model': 'llama-3.1-sonar-small-128k-online',
-                    'messages': [
-                        {
-                            'role': 'system',
-                            'content': f'Return current {symbol} price data in JSON format: {{"price": float, "change_24h": float, "volume": float, "timestamp": "ISO_datetime"}}'
-                        },
-                        {
-                            'role': 'user',
-                            'content': f'What is the current {symbol}/USD price, 24h change, and volume?'
-                        }
-                    ],
-                    'max_tokens': 150,
-                    'temperature': 0.1
-                },
-                timeout=10
-            )
-            
-            if response.ok:
-                data = response.json()
-                market_data = json.loads(data['choices'][0]['message']['content'])
-                market_data['source'] = 'perplexity_api'
-                logger.info(f"Real market data: {symbol} ${market_data.get('price', 0):.2f}")
-                return market_data
-            else:
-                logger.warning(f"Perplexity API error: {response.status_code}")
-                return await self.mobile_fallback_data(symbol)
+            async with self.transport.session() as session:
+                async with session.post(
+                    'https://api.perplexity.ai/chat/completions',
+                    headers={
+                        'Authorization': f"Bearer {os.getenv('PERPLEXITY_API_KEY')}",
+                        'Content-Type': 'application/json',
+                    },
+                    json={
+                        'model': 'llama-3.1-sonar-small-128k-online',
+                        'messages': [
+                            {
+                                'role': 'system',
+                                'content': f'Return current {symbol} price data in JSON format: {{"price": float, "change_24h": float, "volume": float, "timestamp": "ISO_datetime"}}'
+                            },
+                            {
+                                'role': 'user',
+                                'content': f'What is the current {symbol}/USD price, 24h change, and volume?'
+                            }
+                        ],
+                        'max_tokens': 150,
+                        'temperature': 0.1
+                    },
+                    timeout=aiohttp.ClientTimeout(total=10)
+                ) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        market_data = json.loads(data['choices'][0]['message']['content'])
+                        market_data['source'] = 'perplexity_api'
+                        logger.info(f"Real market data: {symbol} ${market_data.get('price', 0):.2f}")
+                        return market_data
+                    else:
+                        logger.warning(f"Perplexity API error: {response.status}")
+                        return await self.mobile_fallback_data(symbol)
                 
         except Exception as e:
             logger.error(f"Market data error: {e}")
@@ -191,29 +218,25 @@ class DWCPhase1TrillionPlusAgent:
             if not self.quantum_logic_filter(signal):
                 return {'executed': False, 'reason': 'Quantum logic filter failed'}
             
-            trade = {
-                'id': f"DWC_TRADE_{int(time.time())}",
-                'symbol': symbol,
-                'direction': signal['direction'],
-                'entry_price': signal['entry_price'],
-                'stop_loss': signal['stop_loss'],
-                'take_profit': signal['take_profit'],
-                'position_size': self.POSITION_SIZE,
-                'timestamp': datetime.now().isoformat(),
-                'status': 'OPEN',
-                'signal_strength': signal['signal_strength'],
-                'source': 'dwc_phase1trillion_plus'
-            }
+            now = time.time_ns()
+            trade = PositionRecord.open(
+                f"DWC_TRADE_{now // NS_PER_SECOND}", symbol, signal['direction'], signal['entry_price'],
+                notional=self.POSITION_SIZE,
+                stop_loss=signal['stop_loss'],
+                take_profit=signal['take_profit'],
+                opened_ns=now,
+                extra={'signal_strength': signal['signal_strength']}
+            )
             
-            self.active_positions.append(trade)
+            self.active_positions[trade.position_id] = trade
             self.trade_history.append(trade)
             self.trades_today += 1
             self.last_trade_time = datetime.now()
             
-            logger.info(f"✓ Trade executed: {trade['direction']} {symbol} @ ${trade['entry_price']:.2f}")
-            logger.info(f"  Stop Loss: ${trade['stop_loss']:.2f}, Take Profit: ${trade['take_profit']:.2f}")
+            logger.info(f"✓ Trade executed: {trade.side_name} {symbol} @ ${trade.entry_price:.2f}")
+            logger.info(f"  Stop Loss: ${trade.stop_loss:.2f}, Take Profit: ${trade.take_profit:.2f}")
             
-            return {'executed': True, 'trade': trade}
+            return {'executed': True, 'trade': self.trade_to_dict(trade)}
         except Exception as e:
             logger.error(f"Trade execution error: {e}")
             return {'executed': False, 'reason': str(e)}
@@ -223,55 +246,29 @@ class DWCPhase1TrillionPlusAgent:
         closed_trades = []
         
         try:
-            for position in self.active_positions[:]:  # Use slice to avoid modification during iteration
-                symbol = position['symbol']
-                current_data = await self.get_real_market_data(symbol)
+            prices = {}  # one quote per symbol per sweep
+            for position in list(self.active_positions.values()):
+                symbol = position.symbol
+                if symbol not in prices:
+                    current_data = await self.get_real_market_data(symbol)
+                    prices[symbol] = current_data['price'] if current_data else None
+                current_price = prices[symbol]
                 
-                if not current_data:
+                if current_price is None:
                     continue
                 
-                current_price = current_data['price']
-                entry_price = position['entry_price']
-                direction = position['direction']
-                
                 # Calculate P&L
-                if direction == 'LONG':
-                    pnl = (current_price - entry_price) / entry_price * position['position_size']
-                else:
-                    pnl = (entry_price - current_price) / entry_price * position['position_size']
-                
-                position['current_price'] = current_price
-                position['unrealized_pnl'] = pnl
+                pnl = position.mark(current_price)
                 
                 # Check stop loss or take profit
-                should_close = False
-                close_reason = ""
+                close_reason = position.exit_reason_at(current_price)
                 
-                if direction == 'LONG':
-                    if current_price <= position['stop_loss']:
-                        should_close = True
-                        close_reason = "STOP_LOSS"
-                    elif current_price >= position['take_profit']:
-                        should_close = True
-                        close_reason = "TAKE_PROFIT"
-                else:
-                    if current_price >= position['stop_loss']:
-                        should_close = True
-                        close_reason = "STOP_LOSS"
-                    elif current_price <= position['take_profit']:
-                        should_close = True
-                        close_reason = "TAKE_PROFIT"
-                
-                if should_close:
-                    position['status'] = 'CLOSED'
-                    position['close_price'] = current_price
-                    position['close_reason'] = close_reason
-                    position['realized_pnl'] = pnl
-                    position['close_timestamp'] = datetime.now().isoformat()
+                if close_reason:
+                    position.close(current_price, close_reason)
                     
                     self.total_pnl += pnl
-                    self.active_positions.remove(position)
-                    closed_trades.append(position)
+                    del self.active_positions[position.position_id]
+                    closed_trades.append(self.trade_to_dict(position))
                     
                     if pnl > 0:
                         self.win_streak += 1
@@ -285,6 +282,33 @@ class DWCPhase1TrillionPlusAgent:
             logger.error(f"Position monitoring error: {e}")
             return []
 
+    def trade_to_dict(self, trade: PositionRecord) -> Dict[str, Any]:
+        """API form of a trade record"""
+        result = {
+            'id': trade.position_id,
+            'symbol': trade.symbol,
+            'direction': trade.side_name,
+            'entry_price': trade.entry_price,
+            'stop_loss': trade.stop_loss,
+            'take_profit': trade.take_profit,
+            'position_size': trade.size,
+            'timestamp': ns_to_iso(trade.opened_ns),
+            'status': trade.status,
+            'signal_strength': trade.get('signal_strength', 0),
+            'source': 'dwc_phase1trillion_plus'
+        }
+        if trade.updated_ns:
+            result['current_price'] = trade.current_price
+            result['unrealized_pnl'] = trade.unrealized_pnl
+        if not trade.is_open:
+            result.update({
+                'close_price': trade.exit_price,
+                'close_reason': trade.exit_reason,
+                'realized_pnl': trade.realized_pnl,
+                'close_timestamp': ns_to_iso(trade.closed_ns)
+            })
+        return result
+
     def check_success_protocol(self) -> bool:
         """Check if Phase SUCCESS protocol should be triggered"""
         try:
@@ -387,6 +411,9 @@ if __name__ == "__main__":
         logger.info("🚀 DWC Phase 1 Trillion+ Quantum Trading Agent - ACTIVATED")
         logger.info("   Max Risk: $100 | Target: 5x ROI | Strategy: Micro-scalping")
         
+        if MARKET_STREAM_ENABLED:
+            await agent.start_market_feed()
+        
         for cycle in range(10):  # Run 10 trading cycles
             logger.info(f"\n--- Trading Cycle {cycle + 1} ---")
             result = await agent.run_trading_cycle()
@@ -406,6 +433,9 @@ if __name__ == "__main__":
         logger.info(f"   Trades: {final_status['trading_stats']['trades_today']}")
         logger.info(f"   Win Streak: {final_status['trading_stats']['win_streak']}")
         
+        if agent.market_feed is not None:
+            await agent.market_feed.stop()
+        await agent.transport.close()
         return final_status
     
     # Run the agent
@@ -39,10 +39,17 @@ class CoherenceReversal:
         return np.diff(waveform).argmin()
 
 class LiveDataFetcher:
-    def __init__(self):
+    def __init__(self, feed=None, max_age=5.0):
         self.alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY', 'demo')
+        # Optional market_stream.MarketDataFeed; REST is only used when it has no fresh price
+        self.feed = feed
+        self.max_age = max_age
         
     def fetch_binance_price(self, symbol="BTCUSDT"):
+        if self.feed is not None:
+            price = self.feed.get_price(symbol, max_age=self.max_age)
+            if price is not None:
+                return price
         try:
             response = requests.get(f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}")
             return float(response.json()['price'])
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Exchange Stand-In Server - Local HTTP Double for Connector Testing
+Serves canned Binance, Bybit, Alpaca and Perplexity responses on localhost
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Any, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+class ExchangeStandInServer:
+    """Minimal aiohttp server answering the endpoints our connectors call.
+
+    Every route returns a well-formed success payload. The server counts
+    requests and distinct client sockets, so callers can check that the
+    shared transport reuses keep-alive connections instead of dialing
+    again for each request. `latency` adds a fixed delay per response.
+
+    Binance and Bybit routes carry the exchanges' rate-limit headers
+    (used weight / remaining requests per minute) so limiter adaptation
+    can be exercised; `minute_limit` sets the advertised budget.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 minute_limit: int = 1200):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.minute_limit = minute_limit
+        self.minute_started = time.time()
+        self.minute_requests = 0
+        self.runner: Optional[web.AppRunner] = None
+        self.request_count = 0
+        self.route_counts: Dict[str, int] = {}
+        self.client_sockets = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._track])
+        routes = [
+            # Binance futures
+            ("GET", "/fapi/v1/ping", lambda r: {}),
+            ("GET", "/fapi/v1/time", lambda r: {"serverTime": int(time.time() * 1000)}),
+            ("GET", "/fapi/v2/account", self._binance_account),
+            ("GET", "/fapi/v1/openOrders", lambda r: []),
+            ("DELETE", "/fapi/v1/allOpenOrders", lambda r: {"code": 200, "msg": "success"}),
+            ("POST", "/fapi/v1/order", self._binance_order),
+            # Bybit v5
+            ("GET", "/v5/market/time", lambda r: self._bybit({"timeNano": str(time.time_ns())})),
+            ("GET", "/v5/account/wallet-balance", self._bybit_wallet),
+            ("GET", "/v5/position/list", lambda r: self._bybit({"list": []})),
+            ("GET", "/v5/order/realtime", lambda r: self._bybit({"list": []})),
+            ("POST", "/v5/order/cancel-all", lambda r: self._bybit({"list": []})),
+            ("POST", "/v5/order/create", lambda r: self._bybit({"orderId": f"standin-{self.request_count}"})),
+            # Alpaca
+            ("GET", "/v2/account", self._alpaca_account),
+            ("GET", "/v2/stocks/quotes/latest", lambda r: {"quotes": {"AAPL": {"ap": 190.0, "bp": 189.9}}}),
+            # Perplexity
+            ("POST", "/chat/completions", self._completion),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, path, self._json_handler(handler))
+        return app
+
+    @web.middleware
+    async def _track(self, request: web.Request, handler):
+        self.request_count += 1
+        self.route_counts[request.path] = self.route_counts.get(request.path, 0) + 1
+        peer = request.transport.get_extra_info("peername") if request.transport else None
+        if peer is not None:
+            self.client_sockets.add(tuple(peer[:2]))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    def _rate_limit_headers(self, path: str) -> Dict[str, str]:
+        now = time.time()
+        if now - self.minute_started >= 60:
+            self.minute_started = now
+            self.minute_requests = 0
+        self.minute_requests += 1
+
+        if path.startswith("/fapi/"):
+            return {"X-MBX-USED-WEIGHT-1M": str(self.minute_requests)}
+        if path.startswith("/v5/"):
+            return {
+                "X-Bapi-Limit": str(self.minute_limit),
+                "X-Bapi-Limit-Status": str(max(0, self.minute_limit - self.minute_requests)),
+                "X-Bapi-Limit-Reset-Timestamp": str(int((self.minute_started + 60) * 1000))
+            }
+        return {}
+
+    def _json_handler(self, build):
+        async def handler(request: web.Request) -> web.Response:
+            return web.json_response(build(request), headers=self._rate_limit_headers(request.path))
+        return handler
+
+    @staticmethod
+    def _bybit(result: Dict[str, Any]) -> Dict[str, Any]:
+        return {"retCode": 0, "retMsg": "OK", "result": result, "time": int(time.time() * 1000)}
+
+    def _bybit_wallet(self, request: web.Request) -> Dict[str, Any]:
+        return self._bybit({"list": [{
+            "accountType": "UNIFIED",
+            "totalWalletBalance": "10000",
+            "totalAvailableBalance": "10000",
+            "totalMarginBalance": "10000",
+            "accountIM": "0",
+            "accountMM": "0",
+            "coin": []
+        }]})
+
+    @staticmethod
+    def _binance_account(request: web.Request) -> Dict[str, Any]:
+        return {
+            "totalWalletBalance": "10000.0",
+            "totalUnrealizedPnL": "0.0",
+            "totalMarginBalance": "10000.0",
+            "availableBalance": "10000.0",
+            "maxWithdrawAmount": "10000.0",
+            "canTrade": True,
+            "canDeposit": True,
+            "canWithdraw": True,
+            "positions": []
+        }
+
+    def _binance_order(self, request: web.Request) -> Dict[str, Any]:
+        return {"orderId": self.request_count, "status": "NEW", "updateTime": int(time.time() * 1000)}
+
+    @staticmethod
+    def _alpaca_account(request: web.Request) -> Dict[str, Any]:
+        return {
+            "status": "ACTIVE",
+            "buying_power": "20000",
+            "cash": "10000",
+            "portfolio_value": "10000",
+            "daytrading_buying_power": "40000",
+            "pattern_day_trader": False,
+            "trading_blocked": False,
+            "transfers_blocked": False,
+            "account_blocked": False,
+            "trade_suspended_by_user": False
+        }
+
+    @staticmethod
+    def _completion(request: web.Request) -> Dict[str, Any]:
+        content = "Current price: 43250.5\n24h change: 2.3%\nVolatility: 28%\nRSI: 56\nMACD: 120"
+        return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+    async def start(self) -> str:
+        self.runner = web.AppRunner(self._build_app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        if self.runner.addresses:
+            self.port = self.runner.addresses[0][1]
+        logger.info(f"Exchange stand-in listening on {self.base_url}")
+        return self.base_url
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def __aenter__(self) -> "ExchangeStandInServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.request_count,
+            "client_connections": len(self.client_sockets),
+            "routes": dict(self.route_counts)
+        }
+
+
+async def main():
+    """Run every connector against the stand-in through one shared transport"""
+    from .http_transport import HTTPTransport
+    from .binance_connector import BinanceFuturesConnector
+    from .bybit_trade_dispatch import BybitTradeDispatch
+    from .alpaca_ping import AlpacaHeartbeat
+    from .quantum_strategy_selector import QuantumStrategySelector
+
+    async with ExchangeStandInServer() as server, HTTPTransport() as transport:
+        binance = BinanceFuturesConnector(transport)
+        bybit = BybitTradeDispatch(transport)
+        alpaca = AlpacaHeartbeat(transport)
+        selector = QuantumStrategySelector(transport)
+
+        binance.base_url = bybit.base_url = server.base_url
+        alpaca.base_url = alpaca.data_url = server.base_url
+        selector.perplexity_url = server.base_url
+        alpaca.api_key = alpaca.secret_key = selector.perplexity_api_key = "standin"
+        for connector in (binance, bybit):
+            connector.rate_limiter = False
+
+        for _ in range(3):
+            await binance.test_connectivity()
+            await binance.get_server_time()
+            await bybit.test_connectivity()
+            await alpaca.ping_market_data()
+            await selector.get_real_market_data("BTC")
+
+        print(f"Server: {json.dumps(server.get_stats(), indent=2)}")
+        print(f"Transport: {json.dumps(transport.get_stats(), indent=2)}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Executor Layer - Thread and Process Pools for Blocking Work
+Keeps the event loop free for heartbeats and order acknowledgements, and reports when it is not
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing as mp
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, Any, Optional, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ExecutorLayer:
+    """Shared pools: threads for blocking I/O, processes for CPU-bound NumPy.
+
+    `run_io` suits requests/file/SQLite calls and NumPy or pandas work that
+    releases the GIL but whose arguments are too large or stateful to ship
+    to another process. `run_cpu` needs a picklable module-level function
+    and picklable arguments; it falls back to the thread pool when
+    processes are disabled (EXECUTOR_CPU_PROCESSES=0). Both pools start
+    lazily on first use.
+    """
+
+    def __init__(self, io_threads: Optional[int] = None, cpu_processes: Optional[int] = None,
+                 start_method: Optional[str] = None):
+        self.io_threads = io_threads or int(os.getenv("EXECUTOR_IO_THREADS", "32"))
+        if cpu_processes is None:
+            cpu_processes = int(os.getenv("EXECUTOR_CPU_PROCESSES", str(max(1, (os.cpu_count() or 2) - 1))))
+        self.cpu_processes = cpu_processes
+        self.start_method = start_method or os.getenv("EXECUTOR_START_METHOD", "spawn")
+
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.io_calls = 0
+        self.cpu_calls = 0
+        self.io_time = 0.0
+        self.cpu_time = 0.0
+
+    @property
+    def io_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._io_pool is None:
+                self._io_pool = ThreadPoolExecutor(max_workers=self.io_threads, thread_name_prefix="io-worker")
+            return self._io_pool
+
+    @property
+    def cpu_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.cpu_processes <= 0:
+            return None
+        with self._lock:
+            if self._cpu_pool is None:
+                self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_processes,
+                                                     mp_context=mp.get_context(self.start_method))
+            return self._cpu_pool
+
+    async def run_io(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking call in the thread pool"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self.io_pool, functools.partial(func, *args, **kwargs))
+        finally:
+            self.io_calls += 1
+            self.io_time += time.perf_counter() - started
+
+    async def run_cpu(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run a picklable CPU-bound function in the process pool"""
+        pool = self.cpu_pool
+        if pool is None:
+            return await self.run_io(func, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+        finally:
+            self.cpu_calls += 1
+            self.cpu_time += time.perf_counter() - started
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._io_pool is not None:
+                self._io_pool.shutdown(wait=wait)
+                self._io_pool = None
+            if self._cpu_pool is not None:
+                self._cpu_pool.shutdown(wait=wait)
+                self._cpu_pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "io_threads": self.io_threads,
+            "cpu_processes": self.cpu_processes,
+            "io_calls": self.io_calls,
+            "cpu_calls": self.cpu_calls,
+            "average_io_time": self.io_time / self.io_calls if self.io_calls else 0.0,
+            "average_cpu_time": self.cpu_time / self.cpu_calls if self.cpu_calls else 0.0
+        }
+
+
+class LoopStallMonitor:
+    """Flags event-loop stalls longer than `threshold` seconds.
+
+    A heartbeat task on the loop stamps the time every `interval`; a
+    watchdog thread notices when the stamp goes stale, and logs the loop
+    thread's stack while the stall is still in progress, which names the
+    blocking call. Lag measured by the heartbeat itself feeds the stats.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, interval: float = 0.05,
+                 on_stall: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.threshold = threshold if threshold is not None else float(os.getenv("LOOP_STALL_THRESHOLD", "0.1"))
+        self.interval = interval
+        self.on_stall = on_stall
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread_id: Optional[int] = None
+        self.heartbeat_task: Optional[asyncio.Task] = None
+        self.watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_beat = time.monotonic()
+
+        # Metrics
+        self.beats = 0
+        self.stalls = 0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.last_stall: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self.heartbeat_task is not None and not self.heartbeat_task.done()
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self._stop.clear()
+        self.heartbeat_task = self.loop.create_task(self._heartbeat())
+        self.watchdog = threading.Thread(target=self._watch, name="loop-stall-watchdog", daemon=True)
+        self.watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+            await asyncio.gather(self.heartbeat_task, return_exceptions=True)
+            self.heartbeat_task = None
+        if self.watchdog is not None:
+            self.watchdog.join(timeout=1.0)
+            self.watchdog = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.last_beat = now
+            self.beats += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self.interval):
+            beat = self.last_beat
+            stalled_for = time.monotonic() - beat - self.interval
+            if stalled_for < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat  # report each stall once
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame, limit=8)) if frame is not None else ""
+            self.stalls += 1
+            self.last_stall = {"stalled_for": stalled_for, "detected_at": time.time(), "stack": stack}
+            logger.warning(f"Event loop stalled for {stalled_for * 1000:.0f}ms; loop thread is in:\n{stack}")
+            if self.on_stall is not None:
+                try:
+                    self.on_stall(self.last_stall)
+                except Exception as e:
+                    logger.error(f"Error in stall callback: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "beats": self.beats,
+            "stalls": self.stalls,
+            "max_lag": self.max_lag,
+            "average_lag": self.total_lag / self.beats if self.beats else 0.0,
+            "last_stall": {k: v for k, v in self.last_stall.items() if k != "stack"} if self.last_stall else None
+        }
+
+
+# Global executor layer
+executors = ExecutorLayer()
+
+
+def get_executor_layer() -> ExecutorLayer:
+    return executors
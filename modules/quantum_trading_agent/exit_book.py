@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Exit Book - Price-Indexed Stop-Loss, Take-Profit and Deadline Triggers
+Finds the positions a new price crosses without scanning every open position
+"""
+
+import bisect
+import heapq
+import itertools
+import logging
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REASON_STOP_LOSS = "STOP_LOSS"
+REASON_TAKE_PROFIT = "TAKE_PROFIT"
+REASON_MAX_TIME = "MAX_TIME"
+
+
+class _SortedLevels:
+    """Trigger levels kept sorted, with the position key alongside each level"""
+    __slots__ = ("levels", "keys")
+
+    def __init__(self):
+        self.levels: List[float] = []
+        self.keys: List[str] = []
+
+    def add(self, level: float, key: str):
+        i = bisect.bisect_right(self.levels, level)
+        self.levels.insert(i, level)
+        self.keys.insert(i, key)
+
+    def remove(self, level: float, key: str):
+        i = bisect.bisect_left(self.levels, level)
+        while i < len(self.levels) and self.levels[i] == level:
+            if self.keys[i] == key:
+                del self.levels[i]
+                del self.keys[i]
+                return
+            i += 1
+
+    def at_or_below(self, price: float) -> List[str]:
+        """Keys whose level <= price"""
+        return self.keys[:bisect.bisect_right(self.levels, price)]
+
+    def at_or_above(self, price: float) -> List[str]:
+        """Keys whose level >= price"""
+        return self.keys[bisect.bisect_left(self.levels, price):]
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+
+class _SymbolBook:
+    __slots__ = ("long_stops", "long_takes", "short_stops", "short_takes", "deadlines")
+
+    def __init__(self):
+        self.long_stops = _SortedLevels()    # trigger when price <= level
+        self.long_takes = _SortedLevels()    # trigger when price >= level
+        self.short_stops = _SortedLevels()   # trigger when price >= level
+        self.short_takes = _SortedLevels()   # trigger when price <= level
+        self.deadlines: List[Tuple[float, int, str]] = []  # heap of (epoch deadline, seq, key)
+
+
+class ExitBook:
+    """Exit triggers for open positions, indexed per symbol.
+
+    Stops and targets sit in sorted arrays per side, so a new price finds
+    every crossed level with two bisects and only those positions are
+    touched. Time exits sit in a per-symbol heap keyed by epoch deadline;
+    removed positions are dropped lazily when they reach the top.
+    """
+
+    def __init__(self):
+        self.books: Dict[str, _SymbolBook] = {}
+        self.entries: Dict[str, Tuple[str, bool, float, float, Optional[float]]] = {}
+        self._sequence = itertools.count()
+
+    def _book(self, symbol: str) -> _SymbolBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = _SymbolBook()
+            self.books[symbol] = book
+        return book
+
+    def add(self, key: str, symbol: str, side: str, stop_loss: float, take_profit: float,
+            deadline: Optional[float] = None):
+        """Track a position; `side` is LONG or SHORT, `deadline` is epoch seconds"""
+        if key in self.entries:
+            self.remove(key)
+        is_long = side.upper() in ("LONG", "BUY")
+        book = self._book(symbol)
+        if is_long:
+            book.long_stops.add(stop_loss, key)
+            book.long_takes.add(take_profit, key)
+        else:
+            book.short_stops.add(stop_loss, key)
+            book.short_takes.add(take_profit, key)
+        if deadline is not None:
+            heapq.heappush(book.deadlines, (deadline, next(self._sequence), key))
+        self.entries[key] = (symbol, is_long, stop_loss, take_profit, deadline)
+
+    def remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        symbol, is_long, stop_loss, take_profit, _ = entry
+        book = self.books[symbol]
+        if is_long:
+            book.long_stops.remove(stop_loss, key)
+            book.long_takes.remove(take_profit, key)
+        else:
+            book.short_stops.remove(stop_loss, key)
+            book.short_takes.remove(take_profit, key)
+
+    def triggered(self, symbol: str, price: float) -> List[Tuple[str, str]]:
+        """(key, reason) for every position whose stop or target `price` reaches"""
+        book = self.books.get(symbol)
+        if book is None:
+            return []
+        hits = []
+        for key in book.long_stops.at_or_above(price):
+            hits.append((key, REASON_STOP_LOSS))
+        for key in book.short_stops.at_or_below(price):
+            hits.append((key, REASON_STOP_LOSS))
+        stopped = {key for key, _ in hits}
+        for key in book.long_takes.at_or_below(price):
+            if key not in stopped:
+                hits.append((key, REASON_TAKE_PROFIT))
+        for key in book.short_takes.at_or_above(price):
+            if key not in stopped:
+                hits.append((key, REASON_TAKE_PROFIT))
+        return hits
+
+    def expired(self, symbol: str, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """(key, MAX_TIME) for positions past their deadline; each is reported once"""
+        book = self.books.get(symbol)
+        if book is None:
+            return []
+        now = time.time() if now is None else now
+        hits = []
+        while book.deadlines and book.deadlines[0][0] <= now:
+            deadline, _, key = heapq.heappop(book.deadlines)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == symbol and entry[4] == deadline:
+                hits.append((key, REASON_MAX_TIME))
+        return hits
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest pending deadline across all symbols (may be a removed entry)"""
+        heads = [book.deadlines[0][0] for book in self.books.values() if book.deadlines]
+        return min(heads) if heads else None
+
+    def symbols(self) -> List[str]:
+        return [symbol for symbol, book in self.books.items()
+                if len(book.long_stops) or len(book.short_stops)]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self):
+        self.books.clear()
+        self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "positions": len(self.entries),
+            "symbols": {
+                symbol: {
+                    "long": len(book.long_stops),
+                    "short": len(book.short_stops),
+                    "deadlines": len(book.deadlines)
+                }
+                for symbol, book in self.books.items()
+            },
+            "next_deadline": self.next_deadline()
+        }
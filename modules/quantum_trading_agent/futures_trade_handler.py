@@ -7,10 +7,16 @@ Phase 1.000000001 - Binance Futures Position Management
 import asyncio
 import logging
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+from .market_stream import stream_symbol
+from .exit_book import ExitBook
+from .portfolio_ledger import PortfolioLedger
+from .records import PositionRecord, ns_to_iso, NS_PER_SECOND
+
 logger = logging.getLogger(__name__)
 
 class FuturesTradeHandler:
@@ -29,12 +35,21 @@ class FuturesTradeHandler:
         # Position simulation (preview mode)
         self.preview_mode = True
         self.simulated_balance = 10000.0  # $10k test balance
-        self.simulated_positions = {}
+        self.simulated_positions: Dict[str, PositionRecord] = {}
         
         # Trade execution settings
         self.cancel_all_before_entry = True
         self.position_timeout = 3600  # 1 hour max position time
         
+        # Latest streamed prices by exchange symbol (see market_stream)
+        self.latest_prices = {}
+        
+        # Stop/target/timeout index over simulated_positions, keyed by stream symbol
+        self.exit_book = ExitBook()
+        
+        # Columnar copy of simulated_positions for whole-book marks (stream symbols)
+        self.ledger = PortfolioLedger()
+        
     def simulate_position(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
         """Simulate position opening in preview mode"""
         try:
@@ -57,29 +72,25 @@ class FuturesTradeHandler:
                 }
             
             # Create position
-            position_id = f"SIM_{symbol}_{int(datetime.now().timestamp())}"
-            
-            position = {
-                "position_id": position_id,
-                "symbol": symbol,
-                "side": side,
-                "quantity": quantity,
-                "entry_price": entry_price,
-                "current_price": entry_price,
-                "margin": margin_required,
-                "leverage": min(position_value / margin_required, self.max_leverage),
-                "unrealized_pnl": 0.0,
-                "timestamp": datetime.now().isoformat(),
-                "status": "OPEN",
-                "stop_loss": entry_price * (1 - self.stop_loss_percentage) if side == "LONG" else entry_price * (1 + self.stop_loss_percentage),
-                "take_profit": entry_price * (1 + self.take_profit_percentage) if side == "LONG" else entry_price * (1 - self.take_profit_percentage)
-            }
+            opened_ns = time.time_ns()
+            position_id = f"SIM_{symbol}_{opened_ns // NS_PER_SECOND}"
+            
+            position = PositionRecord.open(
+                position_id, symbol, side, entry_price,
+                quantity=quantity,
+                margin=margin_required,
+                stop_loss=entry_price * (1 - self.stop_loss_percentage) if side == "LONG" else entry_price * (1 + self.stop_loss_percentage),
+                take_profit=entry_price * (1 + self.take_profit_percentage) if side == "LONG" else entry_price * (1 - self.take_profit_percentage),
+                opened_ns=opened_ns,
+                hold_seconds=self.position_timeout
+            )
             
             self.simulated_positions[position_id] = position
+            self.track_position(position_id, position)
             
             return {
                 "success": True,
-                "position": position,
+                "position": self.position_to_dict(position),
                 "simulation": True
             }
             
@@ -96,46 +107,21 @@ class FuturesTradeHandler:
                 return {"success": False, "error": "Position not found"}
             
             position = self.simulated_positions[position_id]
-            entry_price = position["entry_price"]
-            quantity = position["quantity"]
-            side = position["side"]
-            
-            # Calculate PnL
-            if side == "LONG":
-                pnl = (current_price - entry_price) * quantity
-            else:  # SHORT
-                pnl = (entry_price - current_price) * quantity
             
-            # Update position
-            position["current_price"] = current_price
-            position["unrealized_pnl"] = pnl
-            position["last_updated"] = datetime.now().isoformat()
+            # Calculate PnL and update position
+            pnl = position.mark(current_price)
+            self.ledger.update_price(stream_symbol(position.symbol), current_price)
             
             # Check stop loss / take profit
-            should_close = False
-            close_reason = None
-            
-            if side == "LONG":
-                if current_price <= position["stop_loss"]:
-                    should_close = True
-                    close_reason = "STOP_LOSS"
-                elif current_price >= position["take_profit"]:
-                    should_close = True
-                    close_reason = "TAKE_PROFIT"
-            else:  # SHORT
-                if current_price >= position["stop_loss"]:
-                    should_close = True
-                    close_reason = "STOP_LOSS"
-                elif current_price <= position["take_profit"]:
-                    should_close = True
-                    close_reason = "TAKE_PROFIT"
+            close_reason = position.exit_reason_at(current_price)
+            should_close = close_reason is not None
             
             result = {
                 "success": True,
                 "position_id": position_id,
                 "current_price": current_price,
                 "unrealized_pnl": pnl,
-                "pnl_percentage": (pnl / position["margin"]) * 100,
+                "pnl_percentage": (pnl / position.margin) * 100,
                 "should_close": should_close,
                 "close_reason": close_reason
             }
@@ -155,16 +141,12 @@ class FuturesTradeHandler:
             if position_id not in self.simulated_positions:
                 return {"success": False, "error": "Position not found"}
             
-            position = self.simulated_positions[position_id]
-            entry_price = position["entry_price"]
-            quantity = position["quantity"]
-            side = position["side"]
+            position = self.simulated_positions.pop(position_id)
+            self.exit_book.remove(position_id)
             
             # Calculate final PnL
-            if side == "LONG":
-                realized_pnl = (close_price - entry_price) * quantity
-            else:  # SHORT
-                realized_pnl = (entry_price - close_price) * quantity
+            realized_pnl = position.close(close_price, reason)
+            self.ledger.remove(position_id, realized_pnl)
             
             # Update simulated balance
             self.simulated_balance += realized_pnl
@@ -172,29 +154,20 @@ class FuturesTradeHandler:
             # Create trade record
             trade_record = {
                 "position_id": position_id,
-                "symbol": position["symbol"],
-                "side": side,
-                "quantity": quantity,
-                "entry_price": entry_price,
+                "symbol": position.symbol,
+                "side": position.side_name,
+                "quantity": position.size,
+                "entry_price": position.entry_price,
                 "close_price": close_price,
                 "realized_pnl": realized_pnl,
-                "pnl_percentage": (realized_pnl / position["margin"]) * 100,
-                "hold_time": self.calculate_hold_time(position["timestamp"]),
+                "pnl_percentage": (realized_pnl / position.margin) * 100,
+                "hold_time": (position.closed_ns - position.opened_ns) // NS_PER_SECOND,
                 "close_reason": reason,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": ns_to_iso(position.closed_ns)
             }
             
             self.trade_history.append(trade_record)
             
-            # Update position status
-            position["status"] = "CLOSED"
-            position["close_price"] = close_price
-            position["realized_pnl"] = realized_pnl
-            position["close_reason"] = reason
-            
-            # Remove from active positions
-            del self.simulated_positions[position_id]
-            
             return {
                 "success": True,
                 "trade_record": trade_record,
@@ -213,16 +186,38 @@ class FuturesTradeHandler:
         except:
             return 0
     
+    def position_to_dict(self, position: PositionRecord) -> Dict[str, Any]:
+        """API form of an open simulated position"""
+        result = {
+            "position_id": position.position_id,
+            "symbol": position.symbol,
+            "side": position.side_name,
+            "quantity": position.size,
+            "entry_price": position.entry_price,
+            "current_price": position.current_price,
+            "margin": position.margin,
+            "leverage": min(position.units * position.entry_price / position.margin, self.max_leverage) if position.margin else 0.0,
+            "unrealized_pnl": position.unrealized_pnl,
+            "timestamp": ns_to_iso(position.opened_ns),
+            "status": position.status,
+            "stop_loss": position.stop_loss,
+            "take_profit": position.take_profit
+        }
+        if position.updated_ns:
+            result["last_updated"] = ns_to_iso(position.updated_ns)
+        return result
+    
     def get_position_summary(self) -> Dict[str, Any]:
         """Get summary of all positions"""
         try:
+            portfolio = self.mark_to_market()
             active_positions = list(self.simulated_positions.values())
             
             # Calculate total unrealized PnL
-            total_unrealized_pnl = sum(pos.get("unrealized_pnl", 0) for pos in active_positions)
+            total_unrealized_pnl = portfolio["unrealized_pnl"]
             
             # Calculate total margin used
-            total_margin = sum(pos.get("margin", 0) for pos in active_positions)
+            total_margin = portfolio["margin_used"]
             
             # Get recent trade statistics
             recent_trades = self.trade_history[-10:]  # Last 10 trades
@@ -231,11 +226,12 @@ class FuturesTradeHandler:
             
             return {
                 "active_positions_count": len(active_positions),
-                "active_positions": active_positions,
+                "active_positions": [self.position_to_dict(pos) for pos in active_positions],
                 "total_unrealized_pnl": total_unrealized_pnl,
                 "total_margin_used": total_margin,
                 "available_balance": self.simulated_balance,
                 "margin_utilization": (total_margin / self.simulated_balance) * 100,
+                "exposure_by_symbol": portfolio["by_symbol"],
                 "recent_trades_count": len(recent_trades),
                 "total_realized_pnl": total_realized_pnl,
                 "win_rate": (winning_trades / len(recent_trades)) * 100 if recent_trades else 0,
@@ -343,12 +339,12 @@ class FuturesTradeHandler:
             # Find positions for symbol
             positions_to_close = [
                 pos_id for pos_id, pos in self.simulated_positions.items()
-                if pos["symbol"] == symbol
+                if pos.symbol == symbol
             ]
             
             for position_id in positions_to_close:
                 # Use current price for closing (would get from market data in real implementation)
-                current_price = self.simulated_positions[position_id]["current_price"]
+                current_price = self.simulated_positions[position_id].current_price
                 close_result = self.close_position(position_id, current_price, "SIGNAL_CLOSE")
                 
                 if close_result["success"]:
@@ -363,23 +359,94 @@ class FuturesTradeHandler:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    def track_position(self, position_id: str, position: PositionRecord):
+        """Index a position's stop, target and timeout in the exit book"""
+        self.exit_book.add(position_id, stream_symbol(position.symbol), position.side_name,
+                           position.stop_loss, position.take_profit, position.deadline)
+        self.ledger.add_record(position, stream_symbol(position.symbol))
+    
+    def sync_exit_book(self):
+        """Rebuild the exit book if simulated_positions was changed behind its back"""
+        if len(self.exit_book) == len(self.simulated_positions):
+            return
+        self.exit_book.clear()
+        self.ledger.clear()
+        for position_id, position in self.simulated_positions.items():
+            self.track_position(position_id, position)
+    
+    def process_exit_triggers(self, symbol: str, price: float) -> List[Dict[str, Any]]:
+        """Close only the positions on `symbol` whose timeout, stop or target is reached"""
+        self.sync_exit_book()
+        results = []
+        for position_id, reason in self.exit_book.expired(symbol) + self.exit_book.triggered(symbol, price):
+            if position_id not in self.simulated_positions:
+                continue
+            result = self.update_position_pnl(position_id, price)
+            if not result.get("should_close"):  # timeout: stop and target were not hit
+                result.update({"should_close": True, "close_reason": reason,
+                               "close_result": self.close_position(position_id, price, reason)})
+            logger.info(f"Position {position_id} triggered {result['close_reason']}")
+            results.append(result)
+        return results
+    
+    def mark_to_market(self) -> Dict[str, Any]:
+        """Mark every open position at the latest prices in one ledger pass.
+        
+        Returns the ledger summary (totals and exposure by symbol) and copies
+        each position's mark back onto its record for the position listing.
+        """
+        self.sync_exit_book()
+        portfolio = self.ledger.mark()
+        rows = self.ledger.rows
+        prices = self.ledger.position_price_array
+        pnl = self.ledger.position_pnl_array
+        for position_id, position in self.simulated_positions.items():
+            row = rows[position_id]
+            position.current_price = float(prices[row])
+            position.unrealized_pnl = float(pnl[row])
+        return portfolio
+    
+    def get_portfolio_mark(self) -> Dict[str, Any]:
+        """Cached whole-book mark for dashboards; no per-position work"""
+        self.sync_exit_book()
+        return self.ledger.mark()
+    
+    def on_market_tick(self, tick: Dict[str, Any], market_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Market stream hook: close positions whose exit levels this trade crosses"""
+        symbol = tick["symbol"]
+        price = market_data.get("price") or tick.get("price")
+        if not price:
+            return []
+        self.latest_prices[symbol] = price
+        self.ledger.update_price(symbol, price)
+        return self.process_exit_triggers(symbol, price)
+    
     async def monitor_positions(self):
-        """Monitor positions for stop loss/take profit triggers"""
+        """Monitor positions for stop loss/take profit/timeout triggers"""
         logger.info("Starting position monitoring...")
         
         while True:
             try:
-                for position_id in list(self.simulated_positions.keys()):
-                    position = self.simulated_positions[position_id]
-                    
-                    # Simulate price movement (in real implementation, get from market data)
-                    current_price = self.simulate_price_movement(position)
-                    
-                    # Update position PnL
-                    update_result = self.update_position_pnl(position_id, current_price)
+                self.sync_exit_book()
+                for symbol in self.exit_book.symbols():
+                    current_price = self.latest_prices.get(symbol)
+                    if current_price is not None:
+                        # Streamed symbols: catches timeouts between ticks
+                        self.process_exit_triggers(symbol, current_price)
+                        continue
                     
-                    if update_result.get("should_close"):
-                        logger.info(f"Position {position_id} triggered {update_result['close_reason']}")
+                    # No feed attached: simulate a price walk per position
+                    for position_id, position in list(self.simulated_positions.items()):
+                        if stream_symbol(position.symbol) != symbol:
+                            continue
+                        update_result = self.update_position_pnl(position_id, self.simulate_price_movement(position))
+                        if update_result.get("should_close"):
+                            logger.info(f"Position {position_id} triggered {update_result['close_reason']}")
+                    for position_id, reason in self.exit_book.expired(symbol):
+                        position = self.simulated_positions.get(position_id)
+                        if position is not None:
+                            self.close_position(position_id, position.current_price, reason)
+                            logger.info(f"Position {position_id} triggered {reason}")
                 
                 await asyncio.sleep(10)  # Check every 10 seconds
                 
@@ -387,11 +454,11 @@ class FuturesTradeHandler:
                 logger.error(f"Error in position monitoring: {e}")
                 await asyncio.sleep(30)
     
-    def simulate_price_movement(self, position: Dict[str, Any]) -> float:
+    def simulate_price_movement(self, position: PositionRecord) -> float:
         """Simulate realistic price movement for testing"""
         import random
         
-        current_price = position["current_price"]
+        current_price = position.current_price
         
         # Simulate small price movements (±0.5%)
         change_percentage = random.uniform(-0.005, 0.005)
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 import logging
 
+from .records import PositionRecord, now_ns, ns_to_iso
+
 class GlobalRiskController:
     """
     Global risk management system for all trading operations
@@ -32,7 +34,7 @@ class GlobalRiskController:
             "last_reset": datetime.now().date()
         }
         self.emergency_stop = False
-        self.active_positions = {}
+        self.active_positions: Dict[str, PositionRecord] = {}
         
     def calculate_position_size(self, signal_data: Dict[str, Any], account_balance: float) -> Dict[str, Any]:
         """
@@ -162,15 +164,29 @@ class GlobalRiskController:
                 "blocks": [f"Validation error: {str(e)}"]
             }
     
+    def track_position(self, position_id: str, symbol: str, side: str, size: float, entry_price: float) -> None:
+        """
+        Start risk tracking for an opened position (size in quote currency)
+        """
+        position = PositionRecord.open(position_id, symbol, side, entry_price, notional=size)
+        position.status = "open"
+        self.active_positions[position_id] = position
+    
     def update_position(self, position_id: str, pnl: float, status: str) -> None:
         """
         Update position tracking and risk metrics
         """
         try:
-            if position_id in self.active_positions:
-                self.active_positions[position_id]["pnl"] = pnl
-                self.active_positions[position_id]["status"] = status
-                self.active_positions[position_id]["last_update"] = datetime.now()
+            position = self.active_positions.get(position_id)
+            if position is not None:
+                now = now_ns()
+                position.status = status
+                position.updated_ns = now
+                if status == "closed":
+                    position.realized_pnl = pnl
+                    position.closed_ns = now
+                else:
+                    position.unrealized_pnl = pnl
                 
                 # Update daily stats
                 if status == "closed":
@@ -188,6 +204,24 @@ class GlobalRiskController:
         except Exception as e:
             self.logger.error(f"Error updating position {position_id}: {e}")
     
+    def get_positions(self) -> List[Dict[str, Any]]:
+        """
+        Tracked positions in dict form
+        """
+        return [
+            {
+                "position_id": position.position_id,
+                "symbol": position.symbol,
+                "side": position.side_name,
+                "size": position.size,
+                "entry_price": position.entry_price,
+                "pnl": position.realized_pnl if position.closed_ns else position.unrealized_pnl,
+                "status": position.status,
+                "last_update": ns_to_iso(position.updated_ns or position.opened_ns)
+            }
+            for position in self.active_positions.values()
+        ]
+    
     def get_risk_metrics(self) -> Dict[str, Any]:
         """
         Get current risk metrics and system status
@@ -238,8 +272,8 @@ class GlobalRiskController:
         self.logger.critical(f"EMERGENCY STOP TRIGGERED: {reason}")
         
         # Close all active positions (simulation)
-        for position_id in self.active_positions:
-            self.active_positions[position_id]["status"] = "emergency_closed"
+        for position in self.active_positions.values():
+            position.status = "emergency_closed"
         
     def reset_emergency_stop(self, authorization_code: str) -> bool:
         """
@@ -287,11 +321,11 @@ class GlobalRiskController:
         if not self.active_positions:
             return 0.0
         
-        closed_positions = [p for p in self.active_positions.values() if p["status"] == "closed"]
+        closed_positions = [p for p in self.active_positions.values() if p.status == "closed"]
         if not closed_positions:
             return 0.0
         
-        profitable_trades = len([p for p in closed_positions if p["pnl"] > 0])
+        profitable_trades = len([p for p in closed_positions if p.realized_pnl > 0])
         return (profitable_trades / len(closed_positions)) * 100
 
 # Global instance
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+HTTP Transport - Shared Pooled aiohttp Sessions for Exchange Connectors
+Keep-alive connection pools, DNS caching and one lifecycle for every connector
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPTransport:
+    """One pooled aiohttp session shared by all connectors.
+
+    Connectors receive a transport instead of opening an
+    ``aiohttp.ClientSession`` per call, so DNS lookups, TCP handshakes and
+    TLS sessions are paid once per host and reused by later requests.
+
+    aiohttp sessions are bound to the event loop that created them; when
+    the transport is used from a new loop (e.g. a second ``asyncio.run``)
+    the stale session is dropped and a fresh pool is opened.
+    """
+
+    def __init__(self, limit: Optional[int] = None, limit_per_host: Optional[int] = None,
+                 ttl_dns_cache: Optional[int] = None, keepalive_timeout: Optional[float] = None,
+                 default_timeout: float = 10.0):
+        self.limit = limit if limit is not None else int(os.getenv('HTTP_POOL_LIMIT', '100'))
+        self.limit_per_host = (limit_per_host if limit_per_host is not None
+                               else int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', '20')))
+        self.ttl_dns_cache = (ttl_dns_cache if ttl_dns_cache is not None
+                              else int(os.getenv('HTTP_DNS_CACHE_TTL', '300')))
+        self.keepalive_timeout = (keepalive_timeout if keepalive_timeout is not None
+                                  else float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '30')))
+        self.default_timeout = default_timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Counters
+        self.sessions_opened = 0
+        self.requests_sent = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True
+        )
+        self.sessions_opened += 1
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.default_timeout),
+            trace_configs=[self._trace_config()]
+        )
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self.requests_sent += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session for the running loop, opening it if needed"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._session is not None and not self._session.closed:
+                logger.debug("Event loop changed, discarding pooled HTTP session")
+            self._session = None
+            self._loop = loop
+
+        # Creation is synchronous, so concurrent callers cannot open two pools
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    @asynccontextmanager
+    async def session(self):
+        """Borrow the shared session; unlike ClientSession, leaving does not close it.
+
+        Drop-in for ``async with aiohttp.ClientSession() as session:``.
+        """
+        yield await self.get_session()
+
+    async def warm_up(self, *urls: str):
+        """Open connections ahead of latency-sensitive calls such as order entry.
+
+        Pass cheap GET endpoints (e.g. exchange ping URLs); the responses
+        are discarded and the sockets stay in the keep-alive pool.
+        """
+        session = await self.get_session()
+        for url in urls:
+            try:
+                async with session.get(url) as response:
+                    await response.read()
+            except Exception as e:
+                logger.warning(f"HTTP warm-up failed for {url}: {e}")
+
+    async def close(self):
+        """Close the pool; the next request reopens it"""
+        session = self._session
+        self._session = None
+        if session is not None and not session.closed:
+            if self._loop is asyncio.get_running_loop():
+                await session.close()
+            else:
+                logger.debug("Pooled HTTP session belongs to another loop, dropping it")
+
+    async def __aenter__(self) -> "HTTPTransport":
+        await self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "open": self._session is not None and not self._session.closed,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "ttl_dns_cache": self.ttl_dns_cache,
+            "keepalive_timeout": self.keepalive_timeout,
+            "sessions_opened": self.sessions_opened,
+            "requests_sent": self.requests_sent,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused
+        }
+
+
+# Global shared transport
+http_transport = HTTPTransport()
+
+
+def get_http_transport() -> HTTPTransport:
+    return http_transport
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Streaming Indicator Engine - Incremental Technical Analysis
+O(1) per-bar updates for the AdvancedQuantumTrader strategy stack
+"""
+
+import copy
+import logging
+import math
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+NAN = float("nan")
+
+# Running sums are rebuilt from the window every RESUM_INTERVAL pushes
+RESUM_INTERVAL = 4096
+
+# Engine state saved before a bar is committed, so the bar can be replaced
+_BAR_STATE = ("sma_20", "sma_50", "bb", "gain", "loss", "ema_fast", "ema_slow", "macd_signal",
+              "highest_high", "lowest_low", "stoch_k", "stoch_d", "atr", "volume_sma",
+              "cum_pv", "cum_volume", "prev_close", "latest")
+
+
+def _same_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise equality of bar arrays, with NaN equal to NaN"""
+    return ((a == b) | (np.isnan(a) & np.isnan(b))).all(axis=-1)
+
+
+class RollingWindow:
+    """Fixed-length rolling window with running sums (pandas rolling(n) semantics)"""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.values = deque()
+        self.nan_count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        # Values are accumulated relative to a shift so variance stays stable
+        # for large price levels (shifted-data variance algorithm)
+        self.shift = None
+        self.pushes_since_resum = 0
+
+    def _evicted(self) -> Optional[float]:
+        return self.values[0] if len(self.values) == self.length else None
+
+    def push(self, value: float):
+        evicted = self._evicted()
+        if evicted is not None:
+            self.values.popleft()
+            if math.isnan(evicted):
+                self.nan_count -= 1
+            else:
+                d = evicted - self.shift
+                self.total -= d
+                self.total_sq -= d * d
+
+        self.values.append(value)
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            if self.shift is None:
+                self.shift = value
+            d = value - self.shift
+            self.total += d
+            self.total_sq += d * d
+
+        self.pushes_since_resum += 1
+        if self.pushes_since_resum >= RESUM_INTERVAL:
+            self._resum()
+
+    def _resum(self):
+        """Recompute running sums from the window to bound floating-point drift"""
+        finite = [v for v in self.values if not math.isnan(v)]
+        self.shift = finite[-1] if finite else None
+        self.total = sum(v - self.shift for v in finite)
+        self.total_sq = sum((v - self.shift) ** 2 for v in finite)
+        self.pushes_since_resum = 0
+
+    def _stats(self, extra: Optional[float] = None):
+        """Count, shifted sum and shifted sum of squares, optionally with a peeked value"""
+        count = len(self.values)
+        nan_count = self.nan_count
+        total = self.total
+        total_sq = self.total_sq
+        shift = self.shift
+
+        if extra is not None:
+            evicted = self._evicted()
+            if evicted is not None:
+                count -= 1
+                if math.isnan(evicted):
+                    nan_count -= 1
+                else:
+                    d = evicted - shift
+                    total -= d
+                    total_sq -= d * d
+            count += 1
+            if math.isnan(extra):
+                nan_count += 1
+            else:
+                if shift is None:
+                    shift = extra
+                d = extra - shift
+                total += d
+                total_sq += d * d
+
+        return count, nan_count, total, total_sq, shift
+
+    def mean(self, extra: Optional[float] = None) -> float:
+        count, nan_count, total, _, shift = self._stats(extra)
+        if count < self.length or nan_count:
+            return NAN
+        return shift + total / count
+
+    def std(self, extra: Optional[float] = None) -> float:
+        """Sample standard deviation (ddof=1), matching Series.rolling(n).std()"""
+        count, nan_count, total, total_sq, _ = self._stats(extra)
+        if count < self.length or nan_count or count < 2:
+            return NAN
+        variance = (total_sq - total * total / count) / (count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def last(self) -> float:
+        return self.values[-1] if self.values else NAN
+
+
+class RollingRegression:
+    """Least-squares slope over the last `length` values in O(1) per push
+
+    x is the position inside the window (0 .. n-1), so sum(x) and sum(x^2)
+    follow from the count; sum(y) and sum(x*y) are updated as the window
+    slides. y is accumulated relative to a shift for numerical stability,
+    which leaves the slope unchanged.
+    """
+
+    def __init__(self, length: int):
+        if length < 2:
+            raise ValueError("Regression window needs at least 2 values")
+        self.length = length
+        self.values = deque()
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+        self.shift = None
+        self.pushes_since_resum = 0
+
+    def push(self, value: float):
+        if self.shift is None:
+            self.shift = value
+        y = value - self.shift
+
+        if len(self.values) == self.length:
+            evicted = self.values.popleft() - self.shift
+            # Every remaining point moves one position left
+            self.sum_y -= evicted
+            self.sum_xy -= self.sum_y
+        self.sum_xy += len(self.values) * y
+        self.sum_y += y
+        self.values.append(value)
+
+        self.pushes_since_resum += 1
+        if self.pushes_since_resum >= RESUM_INTERVAL:
+            self._resum()
+
+    def _resum(self):
+        """Recompute running sums from the window to bound floating-point drift"""
+        self.shift = self.values[-1] if self.values else None
+        self.sum_y = sum(v - self.shift for v in self.values)
+        self.sum_xy = sum(i * (v - self.shift) for i, v in enumerate(self.values))
+        self.pushes_since_resum = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.length
+
+    def slope(self) -> float:
+        n = len(self.values)
+        if n < 2:
+            return NAN
+        sum_x = n * (n - 1) / 2.0
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6.0
+        return (n * self.sum_xy - sum_x * self.sum_y) / (n * sum_xx - sum_x * sum_x)
+
+    def mean(self) -> float:
+        n = len(self.values)
+        if n == 0:
+            return NAN
+        return self.shift + self.sum_y / n
+
+    def last(self) -> float:
+        return self.values[-1] if self.values else NAN
+
+
+class RollingExtreme:
+    """Rolling max or min over a fixed window using a monotonic deque"""
+
+    def __init__(self, length: int, mode: str = "max"):
+        self.length = length
+        self.is_max = mode == "max"
+        self.candidates = deque()  # (index, value), monotonic
+        self.count = 0
+
+    def _dominates(self, a: float, b: float) -> bool:
+        return a >= b if self.is_max else a <= b
+
+    def push(self, value: float):
+        while self.candidates and self._dominates(value, self.candidates[-1][1]):
+            self.candidates.pop()
+        self.candidates.append((self.count, value))
+        self.count += 1
+        while self.candidates[0][0] <= self.count - 1 - self.length:
+            self.candidates.popleft()
+
+    def value(self, extra: Optional[float] = None) -> float:
+        count = self.count + (1 if extra is not None else 0)
+        if count < self.length:
+            return NAN
+        if extra is None:
+            return self.candidates[0][1]
+
+        # Peek: the oldest element leaves the window when `extra` arrives
+        oldest_kept = count - self.length
+        best = extra
+        for index, candidate in self.candidates:
+            if index >= oldest_kept:
+                best = candidate if self._dominates(candidate, best) else best
+                break
+        return best
+
+
+class ExponentialAverage:
+    """Recursive EMA matching Series.ewm(alpha=..., adjust=False).mean()"""
+
+    def __init__(self, span: Optional[int] = None, alpha: Optional[float] = None):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1.0)
+        self.current = None
+
+    def push(self, value: float):
+        self.current = self.value(value)
+
+    def value(self, extra: Optional[float] = None) -> float:
+        if extra is None:
+            return NAN if self.current is None else self.current
+        if self.current is None:
+            return extra
+        return (1.0 - self.alpha) * self.current + self.alpha * extra
+
+
+class StreamingIndicatorEngine:
+    """Stateful indicator engine for a single symbol.
+
+    Produces the same values as ``AdvancedQuantumTrader._calculate_basic_indicators``
+    for the latest bar, but each closed bar costs O(1) instead of a full
+    DataFrame recompute. Forming bars can be previewed with ``update_tick``
+    without mutating the committed state.
+
+    VWAP is cumulative since the first bar, or over the last ``vwap_window``
+    bars when set (``sync`` sets it to the frame length, like the pandas path).
+    """
+
+    def __init__(self, rsi_length: int = 14, bb_length: int = 20, bb_std: float = 2.0,
+                 macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                 stoch_length: int = 14, stoch_smooth: int = 3, atr_length: int = 14,
+                 volume_length: int = 20, history_size: int = 500):
+        self.params = {
+            "rsi_length": rsi_length, "bb_length": bb_length, "bb_std": bb_std,
+            "macd_fast": macd_fast, "macd_slow": macd_slow, "macd_signal": macd_signal,
+            "stoch_length": stoch_length, "stoch_smooth": stoch_smooth,
+            "atr_length": atr_length, "volume_length": volume_length,
+            "history_size": history_size
+        }
+        self.bb_std = bb_std
+        self.history_size = history_size
+
+        self.sma_20 = RollingWindow(20)
+        self.sma_50 = RollingWindow(50)
+        self.bb = RollingWindow(bb_length)
+        self.gain = RollingWindow(rsi_length)
+        self.loss = RollingWindow(rsi_length)
+
+        self.ema_fast = ExponentialAverage(span=macd_fast)
+        self.ema_slow = ExponentialAverage(span=macd_slow)
+        self.macd_signal = ExponentialAverage(span=macd_signal)
+
+        self.highest_high = RollingExtreme(stoch_length, "max")
+        self.lowest_low = RollingExtreme(stoch_length, "min")
+        self.stoch_k = RollingWindow(stoch_smooth)
+        self.stoch_d = RollingWindow(stoch_smooth)
+
+        self.atr = ExponentialAverage(alpha=1.0 / atr_length)
+
+        self.volume_sma = RollingWindow(volume_length)
+        self.cum_pv = 0.0
+        self.cum_volume = 0.0
+        self.has_volume = None
+        self.vwap_window: Optional[int] = None
+
+        self.prev_close = None
+        self.bars_seen = 0
+        self.last_label = None
+        self.latest: Dict[str, float] = {}
+
+        # Committed (high, low, close, volume, cum_pv, cum_volume), newest last
+        self.bars = deque(maxlen=history_size + 1)
+        self.rsi_history = deque(maxlen=history_size)
+        self.forming_bar: Optional[Dict[str, float]] = None
+        self._checkpoint: Optional[Dict[str, Any]] = None
+
+    def reset(self):
+        """Drop all state (used when the input history is not a continuation)"""
+        self.__init__(**self.params)
+
+    def _evaluate(self, high: float, low: float, close: float, volume: Optional[float],
+                  commit: bool) -> Dict[str, float]:
+        """Compute indicator values for a bar; commit=False leaves state untouched"""
+        peek = None if commit else close
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if commit:
+            self.sma_20.push(close)
+            self.sma_50.push(close)
+            self.bb.push(close)
+            self.gain.push(gain)
+            self.loss.push(loss)
+            self.ema_fast.push(close)
+            self.ema_slow.push(close)
+
+        values: Dict[str, float] = {}
+        values["sma_20"] = self.sma_20.mean(peek)
+        values["sma_50"] = self.sma_50.mean(peek)
+
+        avg_gain = self.gain.mean(None if commit else gain)
+        avg_loss = self.loss.mean(None if commit else loss)
+        values["rsi"] = self._rsi(avg_gain, avg_loss)
+
+        bb_middle = self.bb.mean(peek)
+        bb_std = self.bb.std(peek)
+        values["bb_upper"] = bb_middle + bb_std * self.bb_std
+        values["bb_middle"] = bb_middle
+        values["bb_lower"] = bb_middle - bb_std * self.bb_std
+
+        macd = self.ema_fast.value(peek) - self.ema_slow.value(peek)
+        if commit:
+            self.macd_signal.push(macd)
+            signal = self.macd_signal.value()
+        else:
+            signal = self.macd_signal.value(macd)
+        values["macd"] = macd
+        values["macd_signal"] = signal
+        values["macd_histogram"] = macd - signal
+
+        if commit:
+            self.highest_high.push(high)
+            self.lowest_low.push(low)
+            hh = self.highest_high.value()
+            ll = self.lowest_low.value()
+        else:
+            hh = self.highest_high.value(high)
+            ll = self.lowest_low.value(low)
+        raw_k = self._stoch_raw(close, hh, ll)
+        if commit:
+            self.stoch_k.push(raw_k)
+            stoch_k = self.stoch_k.mean()
+            self.stoch_d.push(stoch_k)
+            stoch_d = self.stoch_d.mean()
+        else:
+            stoch_k = self.stoch_k.mean(raw_k)
+            stoch_d = self.stoch_d.mean(stoch_k)
+        values["stoch_k"] = stoch_k
+        values["stoch_d"] = stoch_d
+
+        if self.prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        if commit:
+            self.atr.push(true_range)
+            values["atr"] = self.atr.value()
+        else:
+            values["atr"] = self.atr.value(true_range)
+
+        if volume is not None:
+            typical = (high + low + close) / 3.0
+            cum_pv = self.cum_pv + typical * volume
+            cum_volume = self.cum_volume + volume
+            base_pv, base_volume = self._vwap_base()
+            window_volume = cum_volume - base_volume
+            values["vwap"] = (cum_pv - base_pv) / window_volume if window_volume else NAN
+            if commit:
+                self.cum_pv = cum_pv
+                self.cum_volume = cum_volume
+                self.volume_sma.push(volume)
+                volume_sma = self.volume_sma.mean()
+            else:
+                volume_sma = self.volume_sma.mean(volume)
+            values["volume_sma"] = volume_sma
+            values["volume_ratio"] = volume / volume_sma if volume_sma else NAN
+
+        if commit:
+            self.prev_close = close
+            self.bars_seen += 1
+            self.bars.append((high, low, close, NAN if volume is None else volume,
+                              self.cum_pv, self.cum_volume))
+            self.rsi_history.append(values["rsi"])
+            self.latest = values
+
+        return values
+
+    def _vwap_base(self, committed: bool = False) -> Tuple[float, float]:
+        """Cumulative price*volume and volume before the VWAP window ending at
+        the next bar (committed=True: at the last committed bar)"""
+        window = self.vwap_window
+        if window is not None and committed:
+            window += 1
+        if window is None or window > self.bars_seen:
+            return 0.0, 0.0
+        bar = self.bars[-min(window, len(self.bars))]
+        return bar[4], bar[5]
+
+    def _save_state(self) -> Dict[str, Any]:
+        return copy.deepcopy({name: getattr(self, name) for name in _BAR_STATE})
+
+    def _undo_last_bar(self):
+        """Roll back to the checkpoint taken before the last committed bar"""
+        for name, value in self._checkpoint.items():
+            setattr(self, name, value)
+        self.bars.pop()
+        self.rsi_history.pop()
+        self.bars_seen -= 1
+        self._checkpoint = None
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            return NAN
+        if avg_loss == 0:
+            return NAN if avg_gain == 0 else 100.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    @staticmethod
+    def _stoch_raw(close: float, highest: float, lowest: float) -> float:
+        if math.isnan(highest) or math.isnan(lowest):
+            return NAN
+        span = highest - lowest
+        if span == 0:
+            return NAN
+        return 100.0 * (close - lowest) / span
+
+    def update_bar(self, high: float, low: float, close: float,
+                   volume: Optional[float] = None, label: Any = None) -> Dict[str, float]:
+        """Commit a closed bar and return the latest indicator values"""
+        if self.has_volume is None:
+            self.has_volume = volume is not None
+        self.forming_bar = None
+        self._checkpoint = None
+        values = self._evaluate(float(high), float(low), float(close),
+                                float(volume) if self.has_volume and volume is not None else None,
+                                commit=True)
+        self.last_label = label
+        return values
+
+    def update_tick(self, price: float, volume: float = 0.0) -> Dict[str, float]:
+        """Fold a tick into the forming bar and preview its indicator values"""
+        price = float(price)
+        if self.forming_bar is None:
+            self.forming_bar = {"high": price, "low": price, "close": price, "volume": 0.0}
+        bar = self.forming_bar
+        bar["high"] = max(bar["high"], price)
+        bar["low"] = min(bar["low"], price)
+        bar["close"] = price
+        bar["volume"] += float(volume)
+
+        return self._evaluate(bar["high"], bar["low"], bar["close"],
+                              bar["volume"] if self.has_volume else None, commit=False)
+
+    def close_forming_bar(self, label: Any = None) -> Optional[Dict[str, float]]:
+        """Commit the bar accumulated by update_tick"""
+        bar = self.forming_bar
+        if bar is None:
+            return None
+        return self.update_bar(bar["high"], bar["low"], bar["close"],
+                               bar["volume"] if self.has_volume else None, label=label)
+
+    def _find_continuation(self, rows: np.ndarray, replace_last: bool = False) -> Optional[int]:
+        """Position in `rows` of the last committed bar (with replace_last, of
+        the bar before it), checked against every overlapping committed bar"""
+        retained = np.array([bar[:rows.shape[1]] for bar in self.bars], dtype=float)
+        limit = len(rows)
+        if replace_last:
+            # The replaced bar itself must still be in the frame
+            retained = retained[:-1]
+            limit -= 1
+        if not len(retained) or limit <= 0:
+            return None
+
+        candidates = np.flatnonzero(_same_rows(rows[:limit], retained[-1]))
+        for position in candidates[::-1]:
+            overlap = min(len(retained), position + 1)
+            if _same_rows(rows[position + 1 - overlap:position + 1], retained[-overlap:]).all():
+                return int(position)
+        return None
+
+    def sync(self, df: pd.DataFrame) -> Dict[str, float]:
+        """Bring the engine in line with `df`, feeding only what changed.
+
+        The frame is matched against the bars already consumed by content,
+        not by index label: growing frames and sliding windows (even when
+        rebuilt with a fresh index) only feed their new rows, and a last bar
+        whose values changed in place is rolled back and re-applied. Any
+        other history resets the engine and replays the frame once. VWAP
+        covers the frame, as in the pandas path; MACD and ATR keep the full
+        streamed history, which the frame's EWM converges to.
+        """
+        if df.empty:
+            return self.latest
+
+        has_volume = "volume" in df.columns
+        columns = ["high", "low", "close", "volume"] if has_volume else ["high", "low", "close"]
+        rows = df[columns].to_numpy(dtype=float)
+
+        position = None
+        if self.has_volume == has_volume:
+            position = self._find_continuation(rows)
+            if position is None and self._checkpoint is not None:
+                position = self._find_continuation(rows, replace_last=True)
+                if position is not None:
+                    self._undo_last_bar()
+        if position is None and self.bars_seen:
+            self.reset()
+        start = 0 if position is None else position + 1
+
+        self.has_volume = has_volume
+        if len(rows) + 1 > self.bars.maxlen:
+            self.bars = deque(self.bars, maxlen=len(rows) + 1)
+        if self.vwap_window != len(rows):
+            self.vwap_window = len(rows)
+            if has_volume and start >= len(rows):
+                # No new bar, but the frame (and so the VWAP window) changed length
+                base_pv, base_volume = self._vwap_base(committed=True)
+                window_volume = self.cum_volume - base_volume
+                self.latest = {**self.latest,
+                               "vwap": (self.cum_pv - base_pv) / window_volume if window_volume else NAN}
+        if start >= len(rows):
+            return self.latest
+
+        labels = df.index
+        for i in range(start, len(rows)):
+            checkpoint = self._save_state() if i == len(rows) - 1 else None
+            volume = rows[i, 3] if has_volume else None
+            self.update_bar(rows[i, 0], rows[i, 1], rows[i, 2], volume, label=labels[i])
+            self._checkpoint = checkpoint
+
+        return self.latest
+
+    def snapshot(self) -> Dict[str, float]:
+        """Latest committed indicator values"""
+        return dict(self.latest)
+
+    def rsi_series(self, length: Optional[int] = None) -> pd.Series:
+        """Recent RSI values (oldest first) for divergence checks"""
+        history = list(self.rsi_history)
+        if length is not None:
+            history = history[-length:]
+        return pd.Series(history, dtype=float)
@@ -10,25 +10,70 @@ import logging
 import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Optional
 import time
+from collections import deque
+
+from .pattern_index import PatternIndex
+from .brain_snapshot import BrainSnapshotStore
+from .market_features import MarketFeatureSchema
+from .executors import executors
+from .performance_stats import PerformanceTracker
 
 logger = logging.getLogger(__name__)
 
+
+def eigenvalue_magnitudes(matrix: np.ndarray) -> np.ndarray:
+    """|eigenvalues| of the entanglement matrix; module-level so it can run in the process pool"""
+    return np.abs(np.linalg.eigvals(matrix))
+
 class QuantumMarketBrain:
     def __init__(self):
         self.config_path = Path("modules/quantum_trading_agent/thresholds.json")
-        self.brain_state_path = Path("logs/brain_state.json")
+        self.brain_state_path = Path("logs/brain_state.json")  # legacy JSON state
+        self.snapshot_store = BrainSnapshotStore(Path("logs/brain_snapshot"))
         
         # Quantum neural network parameters
         self.quantum_neurons = 512
         self.entanglement_matrix = np.random.uniform(0, 1, (self.quantum_neurons, self.quantum_neurons))
         self.coherence_threshold = 0.75
         
+        # Coherence cache: bumped whenever the entanglement matrix changes
+        self.entanglement_version = 0
+        self.coherence_cache = {}
+        self.fast_coherence_method = "estimate"
+        self.perron_vector = None
+        # Bulk |eigenvalue| mean relative to the Frobenius RMS (2/3 under the
+        # circular law); recalibrated whenever an exact value is available
+        self.bulk_spectrum_factor = 2.0 / 3.0
+        
+        # Fixed feature order for superposition analysis (learned on first use)
+        self.feature_schema: Optional[MarketFeatureSchema] = None
+        
         # Market memory
         self.market_memory = []
         self.pattern_library = {}
         self.confidence_history = []
+        self.performance = PerformanceTracker({"last_100": {"size": 100}})
+        
+        # Pattern similarity index (kept in sync with pattern_library)
+        self.max_patterns = 50000
+        self.pattern_match_threshold = 0.8
+        self.pattern_index = PatternIndex(approximate=True)
+        self.pattern_counter = 0
+        
+        # Snapshot change tracking (delta snapshots)
+        self.dirty_patterns = set()
+        self.removed_patterns = set()
+        self.saved_entanglement_version = None
+        self.snapshot_interval = 30.0  # seconds between periodic delta snapshots
+        self.learning_interval = 300.0  # seconds between learning cycles
+        self.last_snapshot_time = 0.0
+        
+        # Trade -> pattern IDs used for that trade, and queued outcomes
+        self.trade_patterns: Dict[str, set] = {}
+        self.pending_outcomes = deque()
+        self.outcome_batch_size = 64
         
         # Learning parameters
         self.learning_rate = 0.001
@@ -40,7 +85,33 @@ class QuantumMarketBrain:
     def load_brain_state(self):
         """Load previous brain state and learned patterns"""
         try:
-            if self.brain_state_path.exists():
+            if self.snapshot_store.exists():
+                snapshot = self.snapshot_store.load()
+                meta = snapshot["meta"]
+                
+                # Restore insertion (age) order for oldest-first eviction
+                self.pattern_library = dict(sorted(
+                    snapshot["patterns"].items(), key=lambda item: self._pattern_sort_key(item[0])))
+                self.confidence_history = meta.get('confidence_history', [])
+                self.market_memory = meta.get('market_memory', [])[-1000:]
+                if meta.get('feature_schema'):
+                    self.feature_schema = MarketFeatureSchema.from_dict(meta['feature_schema'])
+                
+                if snapshot["entanglement"] is not None:
+                    self.entanglement_matrix = snapshot["entanglement"]
+                    self.quantum_neurons = self.entanglement_matrix.shape[0]
+                    self.invalidate_coherence()
+                    self.saved_entanglement_version = self.entanglement_version
+                
+                self.pattern_index.rebuild(self.pattern_library)
+                self.rebuild_trade_index()
+                self.rebuild_performance()
+                self.pattern_counter = max(meta.get('pattern_counter', 0), self._next_pattern_counter())
+                
+                logger.info(f"Loaded brain snapshot: {len(self.pattern_library)} patterns, "
+                          f"{len(self.market_memory)} memories")
+                
+            elif self.brain_state_path.exists():
                 with open(self.brain_state_path, 'r') as f:
                     state = json.load(f)
                     
@@ -48,7 +119,12 @@ class QuantumMarketBrain:
                 self.confidence_history = state.get('confidence_history', [])
                 self.market_memory = state.get('market_memory', [])[-1000:]  # Keep last 1000
                 
-                logger.info(f"Loaded brain state: {len(self.pattern_library)} patterns, "
+                self.pattern_index.rebuild(self.pattern_library)
+                self.rebuild_trade_index()
+                self.rebuild_performance()
+                self.pattern_counter = self._next_pattern_counter()
+                
+                logger.info(f"Loaded legacy brain state: {len(self.pattern_library)} patterns, "
                           f"{len(self.market_memory)} memories")
             else:
                 logger.info("Initializing new brain state")
@@ -56,78 +132,313 @@ class QuantumMarketBrain:
         except Exception as e:
             logger.error(f"Error loading brain state: {e}")
     
-    def save_brain_state(self):
-        """Save current brain state"""
+    def rebuild_performance(self):
+        """Re-seed streaming performance stats from the loaded confidence history"""
+        self.performance = PerformanceTracker({"last_100": {"size": 100}})
+        for trade in self.confidence_history:
+            self.performance.record(trade.get("profit_loss", 0), win=trade.get("outcome") == "WIN")
+    
+    def rebuild_trade_index(self):
+        """Rebuild the trade -> pattern index from last_used_trade fields"""
+        self.trade_patterns = {}
+        for pattern_id, pattern in self.pattern_library.items():
+            trade_id = pattern.get("last_used_trade")
+            if trade_id:
+                self.trade_patterns.setdefault(trade_id, set()).add(pattern_id)
+    
+    def record_pattern_use(self, pattern_id: str, trade_id: str):
+        """Link a pattern to the trade it informed so outcomes can find it"""
+        pattern = self.pattern_library.get(pattern_id)
+        if pattern is None:
+            return
+        
+        previous = pattern.get("last_used_trade")
+        if previous and previous != trade_id:
+            self._unlink_trade(previous, pattern_id)
+        
+        pattern["last_used_trade"] = trade_id
+        self.trade_patterns.setdefault(trade_id, set()).add(pattern_id)
+        self.mark_pattern_dirty(pattern_id)
+    
+    def _unlink_trade(self, trade_id: str, pattern_id: str):
+        linked = self.trade_patterns.get(trade_id)
+        if linked is not None:
+            linked.discard(pattern_id)
+            if not linked:
+                del self.trade_patterns[trade_id]
+    
+    @staticmethod
+    def _pattern_sort_key(pattern_id: str) -> Tuple[int, str]:
+        suffix = pattern_id.rsplit("_", 1)[-1]
+        return (int(suffix), pattern_id) if suffix.isdigit() else (-1, pattern_id)
+    
+    def _next_pattern_counter(self) -> int:
+        """Next free numeric suffix for pattern IDs"""
+        highest = -1
+        for pattern_id in self.pattern_library:
+            suffix = pattern_id.rsplit("_", 1)[-1]
+            if suffix.isdigit():
+                highest = max(highest, int(suffix))
+        return highest + 1
+    
+    def save_brain_state(self, full: bool = False):
+        """Save current brain state as a binary snapshot
+        
+        Writes a delta with only the patterns changed since the last save
+        (and the matrix if it evolved), or a full snapshot when forced or
+        when the delta chain is long.
+        """
         try:
-            state = {
-                'pattern_library': self.pattern_library,
+            full = full or self.snapshot_store.needs_full()
+            matrix_changed = self.saved_entanglement_version != self.entanglement_version
+            
+            if full:
+                patterns = self.pattern_library
+            else:
+                patterns = {pid: self.pattern_library[pid]
+                            for pid in self.dirty_patterns if pid in self.pattern_library}
+            
+            meta = {
                 'confidence_history': self.confidence_history[-1000:],
                 'market_memory': self.market_memory[-1000:],
+                'pattern_counter': self.pattern_counter,
+                'feature_schema': self.feature_schema.to_dict() if self.feature_schema else None,
                 'last_updated': datetime.now().isoformat(),
-                'quantum_coherence': self.calculate_quantum_coherence()
+                # Cached exact value when current, else the cheap estimate
+                'quantum_coherence': self.calculate_quantum_coherence(self.fast_coherence_method)
             }
             
-            with open(self.brain_state_path, 'w') as f:
-                json.dump(state, f, indent=2)
+            self.snapshot_store.save(
+                meta, patterns,
+                removed=self.removed_patterns,
+                entanglement=self.entanglement_matrix if full or matrix_changed else None,
+                full=full
+            )
+            
+            self.dirty_patterns.clear()
+            self.removed_patterns.clear()
+            self.saved_entanglement_version = self.entanglement_version
+            self.last_snapshot_time = time.time()
                 
         except Exception as e:
             logger.error(f"Error saving brain state: {e}")
     
-    def calculate_quantum_coherence(self) -> float:
-        """Calculate quantum coherence of the neural network"""
+    def mark_pattern_dirty(self, pattern_id: str):
+        """Record a pattern insert/update for the next delta snapshot"""
+        self.dirty_patterns.add(pattern_id)
+        self.removed_patterns.discard(pattern_id)
+    
+    def mark_pattern_removed(self, pattern_id: str):
+        """Record a pattern deletion for the next delta snapshot"""
+        self.dirty_patterns.discard(pattern_id)
+        self.removed_patterns.add(pattern_id)
+    
+    def remove_pattern(self, pattern_id: str):
+        """Delete a pattern from the library and every index"""
+        pattern = self.pattern_library.pop(pattern_id, None)
+        if pattern is None:
+            return
+        self.pattern_index.remove(pattern_id)
+        if pattern.get("last_used_trade"):
+            self._unlink_trade(pattern["last_used_trade"], pattern_id)
+        self.mark_pattern_removed(pattern_id)
+    
+    def invalidate_coherence(self):
+        """Mark cached coherence values as stale after the matrix changes"""
+        self.entanglement_version += 1
+    
+    def calculate_quantum_coherence(self, method: str = "exact") -> float:
+        """Calculate quantum coherence of the neural network
+        
+        Values are cached per entanglement_version. method="exact" uses a full
+        eigen-decomposition; method="estimate" uses warm-started power
+        iteration for the spectral radius and a calibrated Frobenius-norm
+        estimate of the remaining spectrum.
+        """
+        cached = self.coherence_cache.get(method)
+        if cached is not None and cached[0] == self.entanglement_version:
+            return cached[1]
+        
         try:
-            # Simulate quantum coherence based on entanglement matrix
-            eigenvalues = np.linalg.eigvals(self.entanglement_matrix)
-            coherence = np.mean(np.abs(eigenvalues)) / np.max(np.abs(eigenvalues))
-            return min(1.0, max(0.0, coherence))
+            if method == "estimate":
+                exact = self.coherence_cache.get("exact")
+                if exact is not None and exact[0] == self.entanglement_version:
+                    coherence = exact[1]
+                else:
+                    coherence = self._estimate_coherence()
+            else:
+                coherence = self._exact_coherence()
+            coherence = float(min(1.0, max(0.0, coherence)))
         except:
+            coherence = 0.5
+        
+        self.coherence_cache[method] = (self.entanglement_version, coherence)
+        return coherence
+    
+    async def calculate_quantum_coherence_async(self, method: str = "exact") -> float:
+        """calculate_quantum_coherence without blocking the event loop
+        
+        The exact eigen-decomposition runs in the CPU process pool on a copy
+        of the matrix; the result is cached against the version it was
+        computed from, so a concurrent evolve step just makes it stale.
+        """
+        cached = self.coherence_cache.get(method)
+        if cached is not None and cached[0] == self.entanglement_version:
+            return cached[1]
+        if method == "estimate":
+            return self.calculate_quantum_coherence(method)
+        
+        version = self.entanglement_version
+        try:
+            magnitudes = await executors.run_cpu(eigenvalue_magnitudes, self.entanglement_matrix.copy())
+            coherence = float(min(1.0, max(0.0, self._coherence_from_spectrum(magnitudes))))
+        except Exception as e:
+            logger.error(f"Error calculating coherence off-loop: {e}")
+            coherence = 0.5
+        
+        self.coherence_cache["exact"] = (version, coherence)
+        return coherence
+    
+    def _exact_coherence(self) -> float:
+        """Coherence from the full spectrum (O(n^3))"""
+        # Simulate quantum coherence based on entanglement matrix
+        return self._coherence_from_spectrum(eigenvalue_magnitudes(self.entanglement_matrix))
+    
+    def _coherence_from_spectrum(self, magnitudes: np.ndarray) -> float:
+        radius = np.max(magnitudes)
+        
+        # Calibrate the cheap estimator against the exact bulk spectrum
+        n = magnitudes.shape[0]
+        bulk_rms = self._bulk_rms(radius)
+        if n > 1 and bulk_rms > 0:
+            self.bulk_spectrum_factor = (np.sum(magnitudes) - radius) / (n - 1) / bulk_rms
+        
+        return np.mean(magnitudes) / radius
+    
+    def _spectral_radius(self, max_iterations: int = 100, tolerance: float = 1e-6) -> float:
+        """Dominant |eigenvalue| by power iteration, warm-started from the last vector"""
+        matrix = self.entanglement_matrix
+        n = matrix.shape[0]
+        vector = self.perron_vector
+        if vector is None or vector.shape[0] != n:
+            vector = np.full(n, 1.0 / np.sqrt(n))
+        
+        estimate = 0.0
+        for _ in range(max_iterations):
+            product = matrix @ vector
+            norm = np.linalg.norm(product)
+            if norm == 0:
+                return 0.0
+            vector = product / norm
+            if abs(norm - estimate) <= tolerance * norm:
+                estimate = norm
+                break
+            estimate = norm
+        
+        self.perron_vector = vector
+        return estimate
+    
+    def _bulk_rms(self, radius: float) -> float:
+        """RMS magnitude of the non-dominant spectrum implied by the Frobenius norm"""
+        n = self.entanglement_matrix.shape[0]
+        if n < 2:
+            return 0.0
+        frobenius_sq = float(np.einsum("ij,ij->", self.entanglement_matrix, self.entanglement_matrix))
+        return np.sqrt(max(frobenius_sq - radius * radius, 0.0) / (n - 1))
+    
+    def _estimate_coherence(self) -> float:
+        """Coherence estimate in O(n^2 * iterations)"""
+        n = self.entanglement_matrix.shape[0]
+        radius = self._spectral_radius()
+        if radius == 0:
             return 0.5
+        bulk_mean = self.bulk_spectrum_factor * self._bulk_rms(radius)
+        return (radius + (n - 1) * bulk_mean) / n / radius
+    
+    def set_feature_schema(self, features: List[str]):
+        """Pin the ordered feature paths used for superposition analysis"""
+        self.feature_schema = MarketFeatureSchema(features[:self.quantum_neurons])
+    
+    def _ensure_feature_schema(self, samples: List[Dict[str, Any]]) -> Optional[MarketFeatureSchema]:
+        if self.feature_schema is None:
+            schema = MarketFeatureSchema.from_samples(samples, max_features=self.quantum_neurons)
+            if len(schema):
+                self.feature_schema = schema
+                logger.info(f"Learned market feature schema: {len(schema)} features")
+        return self.feature_schema
     
     def quantum_superposition_analysis(self, market_data: Dict[str, Any]) -> Dict[str, float]:
         """Analyze market in quantum superposition states"""
         try:
-            # Extract numerical features
-            features = []
-            for key, value in market_data.items():
-                if isinstance(value, (int, float)):
-                    features.append(value)
-                elif isinstance(value, dict):
-                    for subkey, subvalue in value.items():
-                        if isinstance(subvalue, (int, float)):
-                            features.append(subvalue)
-            
-            if not features:
+            schema = self._ensure_feature_schema([market_data])
+            if schema is None:
                 return {"probability_up": 0.5, "probability_down": 0.5, "uncertainty": 1.0}
             
-            features = np.array(features)
-            
-            # Quantum transformation
-            quantum_state = np.dot(features, self.entanglement_matrix[:len(features), :len(features)])
-            quantum_probs = np.abs(quantum_state) ** 2
-            
-            # Normalize probabilities
-            prob_sum = np.sum(quantum_probs)
-            if prob_sum > 0:
-                quantum_probs /= prob_sum
-            
-            # Calculate market direction probabilities
-            prob_up = np.sum(quantum_probs[quantum_probs > np.median(quantum_probs)])
-            prob_down = 1.0 - prob_up
-            uncertainty = np.std(quantum_probs)
+            result = self.quantum_superposition_batch(schema.vector(market_data)[np.newaxis, :])
             
             return {
-                "probability_up": prob_up,
-                "probability_down": prob_down,
-                "uncertainty": uncertainty,
-                "quantum_coherence": self.calculate_quantum_coherence()
+                "probability_up": float(result["probability_up"][0]),
+                "probability_down": float(result["probability_down"][0]),
+                "uncertainty": float(result["uncertainty"][0]),
+                "quantum_coherence": result["quantum_coherence"]
             }
             
         except Exception as e:
             logger.error(f"Error in quantum superposition analysis: {e}")
             return {"probability_up": 0.5, "probability_down": 0.5, "uncertainty": 1.0}
     
-    def pattern_recognition(self, market_sequence: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Advanced pattern recognition using quantum neural networks"""
+    def quantum_superposition_batch(self, features) -> Dict[str, Any]:
+        """Analyze many snapshots at once
+        
+        `features` is an N x F matrix (rows are symbols or time steps, columns
+        follow the feature schema) or a list of market-data dicts. One matrix
+        multiplication scores every row; results are arrays of length N.
+        """
+        if not isinstance(features, np.ndarray):
+            snapshots = list(features)
+            schema = self._ensure_feature_schema(snapshots)
+            features = schema.matrix(snapshots) if schema is not None else np.zeros((len(snapshots), 0))
+        
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        n_rows, n_features = features.shape
+        n_features = min(n_features, self.entanglement_matrix.shape[0])
+        
+        if n_rows == 0 or n_features == 0:
+            return {
+                "probability_up": np.full(n_rows, 0.5),
+                "probability_down": np.full(n_rows, 0.5),
+                "uncertainty": np.ones(n_rows),
+                "quantum_coherence": self.calculate_quantum_coherence(self.fast_coherence_method)
+            }
+        
+        features = features[:, :n_features]
+        
+        # Quantum transformation
+        quantum_state = features @ self.entanglement_matrix[:n_features, :n_features]
+        quantum_probs = np.abs(quantum_state) ** 2
+        
+        # Normalize probabilities per row
+        prob_sum = quantum_probs.sum(axis=1, keepdims=True)
+        quantum_probs = np.divide(quantum_probs, prob_sum, out=quantum_probs, where=prob_sum > 0)
+        
+        # Calculate market direction probabilities
+        median = np.median(quantum_probs, axis=1, keepdims=True)
+        prob_up = np.where(quantum_probs > median, quantum_probs, 0.0).sum(axis=1)
+        
+        return {
+            "probability_up": prob_up,
+            "probability_down": 1.0 - prob_up,
+            "uncertainty": quantum_probs.std(axis=1),
+            "quantum_coherence": self.calculate_quantum_coherence(self.fast_coherence_method)
+        }
+    
+    def pattern_recognition(self, market_sequence: List[Dict[str, Any]],
+                            trade_id: Optional[str] = None) -> Dict[str, Any]:
+        """Advanced pattern recognition using quantum neural networks
+        
+        When `trade_id` is given, a matched pattern is linked to that trade
+        so learn_from_outcome can update it.
+        """
         if len(market_sequence) < 3:
             return {"pattern_detected": False, "confidence": 0.0}
         
@@ -151,8 +462,12 @@ class QuantumMarketBrain:
             best_match = self.find_best_pattern_match(pattern_signature)
             
             if best_match:
+                if trade_id:
+                    self.record_pattern_use(best_match["pattern_id"], trade_id)
+                
                 return {
                     "pattern_detected": True,
+                    "pattern_id": best_match["pattern_id"],
                     "pattern_type": best_match["type"],
                     "confidence": best_match["confidence"],
                     "predicted_direction": best_match["direction"],
@@ -167,8 +482,15 @@ class QuantumMarketBrain:
                     "accuracy": 0.5  # Initial neutral accuracy
                 }
                 
-                pattern_id = f"pattern_{len(self.pattern_library)}"
+                pattern_id = f"pattern_{self.pattern_counter}"
+                self.pattern_counter += 1
                 self.pattern_library[pattern_id] = new_pattern
+                self.pattern_index.add(pattern_id, pattern_signature)
+                self.mark_pattern_dirty(pattern_id)
+                
+                # Bound the library: evict the oldest stored patterns first
+                while len(self.pattern_library) > self.max_patterns:
+                    self.remove_pattern(next(iter(self.pattern_library)))
                 
                 return {"pattern_detected": False, "confidence": 0.0, "new_pattern_stored": True}
                 
@@ -222,32 +544,39 @@ class QuantumMarketBrain:
             return None
         
         try:
-            best_match = None
-            best_similarity = 0.0
+            matches = self.pattern_index.search(signature, k=1,
+                                                min_similarity=self.pattern_match_threshold)
+            if not matches:
+                return None
             
-            for pattern_id, pattern in self.pattern_library.items():
-                stored_signature = pattern.get("signature", [])
-                
-                if len(stored_signature) == len(signature):
-                    # Calculate cosine similarity
-                    similarity = self.cosine_similarity(signature, stored_signature)
-                    
-                    if similarity > best_similarity and similarity > 0.8:  # Threshold for match
-                        best_match = {
-                            "pattern_id": pattern_id,
-                            "confidence": similarity,
-                            "type": pattern.get("type", "unknown"),
-                            "direction": pattern.get("direction", "neutral"),
-                            "accuracy": pattern.get("accuracy", 0.5)
-                        }
-                        best_similarity = similarity
-            
-            return best_match
+            pattern_id, similarity = matches[0]
+            pattern = self.pattern_library[pattern_id]
+            
+            return {
+                "pattern_id": pattern_id,
+                "confidence": similarity,
+                "type": pattern.get("type", "unknown"),
+                "direction": pattern.get("direction", "neutral"),
+                "accuracy": pattern.get("accuracy", 0.5)
+            }
             
         except Exception as e:
             logger.error(f"Error finding pattern match: {e}")
             return None
     
+    def find_similar_patterns(self, signature: List[float], k: int = 5) -> List[Dict[str, Any]]:
+        """Top-k most similar stored patterns (no similarity threshold)"""
+        try:
+            return [
+                {"pattern_id": pattern_id, "similarity": similarity,
+                 **{key: self.pattern_library[pattern_id].get(key)
+                    for key in ("type", "direction", "accuracy")}}
+                for pattern_id, similarity in self.pattern_index.search(signature, k=k)
+            ]
+        except Exception as e:
+            logger.error(f"Error finding similar patterns: {e}")
+            return []
+    
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors"""
         try:
@@ -276,7 +605,7 @@ class QuantumMarketBrain:
             confidence_risk = 1.0 - confidence
             
             # Quantum coherence risk
-            coherence = self.calculate_quantum_coherence()
+            coherence = self.calculate_quantum_coherence(self.fast_coherence_method)
             coherence_risk = 1.0 - coherence
             
             # Market volatility risk (simulated)
@@ -307,34 +636,64 @@ class QuantumMarketBrain:
             return {"total_risk": 1.0, "risk_level": "HIGH"}
     
     def learn_from_outcome(self, trade_id: str, outcome: str, profit_loss: float):
-        """Learn from trade outcomes to improve future predictions"""
+        """Learn from trade outcomes to improve future predictions
+        
+        Outcomes are queued and applied in batches. Nothing is written here:
+        continuous_learning_loop persists on the snapshot interval.
+        """
         try:
+            self.pending_outcomes.append((trade_id, outcome, profit_loss, datetime.now().isoformat()))
+            
+            if len(self.pending_outcomes) >= self.outcome_batch_size:
+                self.apply_pending_outcomes()
+            
+        except Exception as e:
+            logger.error(f"Error learning from outcome: {e}")
+    
+    def apply_pending_outcomes(self) -> int:
+        """Apply queued trade outcomes to the patterns linked to each trade"""
+        applied = 0
+        while self.pending_outcomes:
+            trade_id, outcome, profit_loss, timestamp = self.pending_outcomes.popleft()
+            outcome_score = 1.0 if outcome == "WIN" else 0.0
+            
             # Update pattern accuracy based on outcome
-            for pattern_id, pattern in self.pattern_library.items():
+            for pattern_id in self.trade_patterns.pop(trade_id, ()):
+                pattern = self.pattern_library.get(pattern_id)
+                if pattern is None:
+                    continue
+                
+                # Update accuracy with learning rate
+                current_accuracy = pattern.get("accuracy", 0.5)
+                new_accuracy = current_accuracy * (1 - self.learning_rate) + outcome_score * self.learning_rate
+                pattern["accuracy"] = new_accuracy
+                pattern["occurrences"] = pattern.get("occurrences", 0) + 1
+                # The trade is resolved; drop the link so a reload cannot re-apply it
                 if pattern.get("last_used_trade") == trade_id:
-                    current_accuracy = pattern.get("accuracy", 0.5)
-                    outcome_score = 1.0 if outcome == "WIN" else 0.0
-                    
-                    # Update accuracy with learning rate
-                    new_accuracy = current_accuracy * (1 - self.learning_rate) + outcome_score * self.learning_rate
-                    pattern["accuracy"] = new_accuracy
-                    pattern["occurrences"] = pattern.get("occurrences", 0) + 1
-                    
-                    logger.info(f"Updated pattern {pattern_id} accuracy: {new_accuracy:.3f}")
+                    del pattern["last_used_trade"]
+                self.mark_pattern_dirty(pattern_id)
+                
+                logger.debug(f"Updated pattern {pattern_id} accuracy: {new_accuracy:.3f}")
             
             # Update confidence history
             self.confidence_history.append({
                 "trade_id": trade_id,
                 "outcome": outcome,
                 "profit_loss": profit_loss,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             })
-            
-            # Save updated state
-            self.save_brain_state()
-            
-        except Exception as e:
-            logger.error(f"Error learning from outcome: {e}")
+            self.performance.record(profit_loss, win=outcome == "WIN")
+            applied += 1
+        
+        return applied
+    
+    def flush(self, force: bool = True):
+        """Apply queued outcomes and persist if the snapshot interval elapsed"""
+        if not force and time.time() - self.last_snapshot_time < self.snapshot_interval:
+            return
+        
+        self.apply_pending_outcomes()
+        self.save_brain_state()
     
     async def continuous_learning_loop(self):
         """Continuous learning and adaptation loop"""
@@ -348,14 +707,18 @@ class QuantumMarketBrain:
                 # Decay old patterns
                 self.decay_old_patterns()
                 
-                # Save state periodically
-                self.save_brain_state()
+                # Refresh the exact coherence off the loop before anything reads it
+                await self.calculate_quantum_coherence_async()
                 
-                # Calculate and log performance metrics
+                # Apply queued outcomes, save state and log performance metrics
+                self.flush()
                 self.log_performance_metrics()
                 
-                # Sleep for learning cycle
-                await asyncio.sleep(300)  # 5 minutes
+                # Until the next cycle, persist queued outcomes on the snapshot interval
+                next_cycle = time.time() + self.learning_interval
+                while time.time() < next_cycle:
+                    await asyncio.sleep(min(self.snapshot_interval, next_cycle - time.time()))
+                    self.flush(force=False)
                 
             except Exception as e:
                 logger.error(f"Error in learning loop: {e}")
@@ -371,6 +734,7 @@ class QuantumMarketBrain:
             
             # Normalize to maintain quantum properties
             self.entanglement_matrix = np.clip(self.entanglement_matrix, -1, 1)
+            self.invalidate_coherence()
             
         except Exception as e:
             logger.error(f"Error evolving quantum network: {e}")
@@ -389,7 +753,7 @@ class QuantumMarketBrain:
                     patterns_to_remove.append(pattern_id)
             
             for pattern_id in patterns_to_remove:
-                del self.pattern_library[pattern_id]
+                self.remove_pattern(pattern_id)
             
             if patterns_to_remove:
                 logger.info(f"Removed {len(patterns_to_remove)} old patterns")
@@ -400,17 +764,16 @@ class QuantumMarketBrain:
     def log_performance_metrics(self):
         """Log current performance metrics"""
         try:
-            if not self.confidence_history:
+            if not self.performance.lifetime.count:
                 return
             
-            recent_trades = self.confidence_history[-100:]  # Last 100 trades
-            win_rate = sum(1 for trade in recent_trades if trade.get("outcome") == "WIN") / len(recent_trades)
-            
-            total_pnl = sum(trade.get("profit_loss", 0) for trade in recent_trades)
-            avg_pnl = total_pnl / len(recent_trades) if recent_trades else 0
+            recent = self.performance.window("last_100")
+            win_rate = recent.win_rate
+            avg_pnl = recent.mean
             
             logger.info(f"Performance Metrics - Win Rate: {win_rate:.1%}, Avg P&L: {avg_pnl:.4f}, "
-                       f"Patterns: {len(self.pattern_library)}, Coherence: {self.calculate_quantum_coherence():.3f}")
+                       f"Sharpe: {recent.sharpe:.2f}, Max DD: {recent.max_drawdown:.4f}, "
+                       f"Patterns: {len(self.pattern_library)}, Coherence: {self.calculate_quantum_coherence(self.fast_coherence_method):.3f}")
             
         except Exception as e:
             logger.error(f"Error logging performance metrics: {e}")
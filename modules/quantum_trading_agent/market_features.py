@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Market Features - Stable Feature Extraction Schema
+Maps nested market-data dicts to fixed-order numeric feature vectors
+"""
+
+import logging
+from typing import Dict, List, Any, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _is_numeric(value: Any) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating))
+
+
+def flatten_numeric(market_data: Dict[str, Any]) -> Dict[str, float]:
+    """Numeric leaves one level deep, keyed as "key" or "key.subkey\""""
+    flat = {}
+    for key, value in market_data.items():
+        if _is_numeric(value):
+            flat[str(key)] = float(value)
+        elif isinstance(value, dict):
+            for subkey, subvalue in value.items():
+                if _is_numeric(subvalue):
+                    flat[f"{key}.{subkey}"] = float(subvalue)
+    return flat
+
+
+class MarketFeatureSchema:
+    """Fixed, ordered list of feature paths.
+
+    Feature order no longer depends on dict insertion order of each
+    snapshot: the schema is either given explicitly or learned once from
+    sample snapshots (paths sorted by name). Missing features are filled
+    with `fill_value`; unknown ones are ignored.
+    """
+
+    def __init__(self, features: Iterable[str], fill_value: float = 0.0):
+        self.features: List[str] = list(features)
+        self.fill_value = fill_value
+        self.positions = {name: i for i, name in enumerate(self.features)}
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[Dict[str, Any]], max_features: Optional[int] = None,
+                     fill_value: float = 0.0) -> "MarketFeatureSchema":
+        names = set()
+        for sample in samples:
+            names.update(flatten_numeric(sample))
+        features = sorted(names)
+        if max_features is not None:
+            features = features[:max_features]
+        return cls(features, fill_value)
+
+    def vector(self, market_data: Dict[str, Any]) -> np.ndarray:
+        row = np.full(len(self.features), self.fill_value, dtype=np.float64)
+        for name, value in flatten_numeric(market_data).items():
+            position = self.positions.get(name)
+            if position is not None:
+                row[position] = value
+        return row
+
+    def matrix(self, snapshots: Iterable[Dict[str, Any]]) -> np.ndarray:
+        """N x F feature matrix for many symbols or time steps"""
+        rows = [self.vector(snapshot) for snapshot in snapshots]
+        if not rows:
+            return np.zeros((0, len(self.features)), dtype=np.float64)
+        return np.vstack(rows)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"features": self.features, "fill_value": self.fill_value}
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "MarketFeatureSchema":
+        return cls(payload.get("features", []), payload.get("fill_value", 0.0))
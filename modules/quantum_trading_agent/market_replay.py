@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Market Replay Server - Local WebSocket Stand-In for Exchange Streams
+Replays recorded or synthetic combined-stream messages to MarketDataFeed
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable
+
+from aiohttp import web, WSMsgType
+
+logger = logging.getLogger(__name__)
+
+
+def synthetic_events(symbols: Iterable[str] = ("BTCUSDT",), count: int = 500, start_price: float = 45000.0,
+                     volatility: float = 0.0005, seed: int = 7) -> List[Dict[str, Any]]:
+    """Random-walk trades with book tickers and 1m klines, in combined-stream format"""
+    rng = random.Random(seed)
+    events = []
+    prices = {symbol: start_price for symbol in symbols}
+    kline_open = dict(prices)
+    kline_volume = {symbol: 0.0 for symbol in symbols}
+    now_ms = int(time.time() * 1000)
+
+    for i in range(count):
+        for symbol in prices:
+            stream = symbol.lower()
+            price = prices[symbol] * (1 + rng.gauss(0, volatility))
+            prices[symbol] = price
+            quantity = round(rng.uniform(0.001, 0.5), 4)
+            kline_volume[symbol] += quantity
+            event_time = now_ms + i * 100
+
+            events.append({"stream": f"{stream}@trade", "data": {
+                "e": "trade", "E": event_time, "T": event_time, "s": symbol,
+                "p": f"{price:.2f}", "q": f"{quantity}", "m": rng.random() < 0.5}})
+            events.append({"stream": f"{stream}@bookTicker", "data": {
+                "u": i, "s": symbol, "b": f"{price - 0.5:.2f}", "B": "1.0", "a": f"{price + 0.5:.2f}", "A": "1.0"}})
+
+            closed = (i + 1) % 50 == 0
+            events.append({"stream": f"{stream}@kline_1m", "data": {
+                "e": "kline", "E": event_time, "s": symbol, "k": {
+                    "t": event_time, "i": "1m", "o": f"{kline_open[symbol]:.2f}",
+                    "h": f"{max(kline_open[symbol], price):.2f}", "l": f"{min(kline_open[symbol], price):.2f}",
+                    "c": f"{price:.2f}", "v": f"{kline_volume[symbol]:.4f}", "x": closed}}})
+            if closed:
+                kline_open[symbol] = price
+                kline_volume[symbol] = 0.0
+    return events
+
+
+def load_events(path: Path) -> List[Dict[str, Any]]:
+    """Load recorded stream messages, one JSON object per line"""
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class MarketReplayServer:
+    """Serves a combined-stream WebSocket at ``/stream``.
+
+    Clients SUBSCRIBE/UNSUBSCRIBE exactly as with the exchange; only
+    messages for subscribed streams are replayed, `interval` seconds apart.
+    `disconnect_after` drops each connection after that many messages so
+    reconnect and resubscribe paths can be exercised. With `loop` set the
+    recording restarts when it runs out.
+    """
+
+    def __init__(self, events: Optional[List[Dict[str, Any]]] = None, host: str = "127.0.0.1",
+                 port: int = 0, interval: float = 0.0, disconnect_after: Optional[int] = None,
+                 loop: bool = False):
+        self.events = events if events is not None else synthetic_events()
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.disconnect_after = disconnect_after
+        self.loop = loop
+        self.runner: Optional[web.AppRunner] = None
+
+        self.connections = 0
+        self.messages_sent = 0
+        self.subscribe_requests: List[List[str]] = []
+        self.position = 0
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/stream"
+
+    async def _stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        subscribed: set = set()
+        sender: Optional[asyncio.Task] = None
+
+        async def send_events():
+            sent = 0
+            skipped = 0
+            while not ws.closed:
+                if self.position >= len(self.events):
+                    if not self.loop:
+                        return
+                    self.position = 0
+                event = self.events[self.position]
+                self.position += 1
+                if event.get("stream") not in subscribed:
+                    skipped += 1
+                    if skipped >= len(self.events):
+                        return  # nothing in the recording matches the subscription
+                    continue
+                skipped = 0
+                await ws.send_str(json.dumps(event))
+                self.messages_sent += 1
+                sent += 1
+                if self.disconnect_after is not None and sent >= self.disconnect_after:
+                    await ws.close()
+                    return
+                await asyncio.sleep(self.interval)
+
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                request_body = json.loads(message.data)
+                params = request_body.get("params", [])
+                if request_body.get("method") == "SUBSCRIBE":
+                    subscribed.update(params)
+                    self.subscribe_requests.append(sorted(params))
+                elif request_body.get("method") == "UNSUBSCRIBE":
+                    subscribed.difference_update(params)
+                await ws.send_str(json.dumps({"result": None, "id": request_body.get("id")}))
+                if sender is None and subscribed:
+                    sender = asyncio.get_running_loop().create_task(send_events())
+        finally:
+            if sender is not None:
+                sender.cancel()
+                await asyncio.gather(sender, return_exceptions=True)
+        return ws
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/stream", self._stream)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        if self.runner.addresses:
+            self.port = self.runner.addresses[0][1]
+        logger.info(f"Market replay server listening on {self.url}")
+        return self.url
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def __aenter__(self) -> "MarketReplayServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "connections": self.connections,
+            "messages_sent": self.messages_sent,
+            "subscribe_requests": len(self.subscribe_requests),
+            "position": self.position,
+            "events": len(self.events)
+        }
+
+
+async def main():
+    """Replay synthetic BTC/ETH data through a MarketDataFeed with forced reconnects"""
+    from .market_stream import MarketDataFeed
+    from .http_transport import HTTPTransport
+
+    events = synthetic_events(("BTCUSDT", "ETHUSDT"), count=300)
+    async with MarketReplayServer(events, disconnect_after=400) as server, HTTPTransport() as transport:
+        feed = MarketDataFeed(server.url, symbols=["BTC", "ETH"], transport=transport)
+        trades = []
+        feed.add_subscriber(lambda tick, market_data: trades.append(tick["price"]), kinds=("trade",),
+                            name="printer")
+        async with feed:
+            while server.position < len(events):
+                await feed.wait_for_update(timeout=1.0)
+            await asyncio.sleep(0.1)
+        print(json.dumps({"server": server.get_stats(), "feed": feed.get_stats(),
+                          "btc": feed.get_market_data("BTC"), "trades_seen": len(trades)},
+                         indent=2, default=str))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Market Stream - Persistent WebSocket Market-Data Feed
+Streams trades, book tickers and klines with reconnect, resubscribe and fan-out
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Iterable
+
+import aiohttp
+
+from .http_transport import HTTPTransport, http_transport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STREAM_URL = "wss://stream.binance.com:9443/stream"
+DEFAULT_CHANNELS = ("trade", "bookTicker", "kline_1m", "miniTicker")
+
+# The agent and orchestrator entry points connect the global feed when enabled
+MARKET_STREAM_ENABLED = os.getenv("MARKET_STREAM_ENABLED", "").lower() == "true"
+MARKET_STREAM_SYMBOLS = [s for s in os.getenv("MARKET_STREAM_SYMBOLS", "BTCUSDT,ETHUSDT").split(",") if s]
+QUOTE_ASSETS = ("USDT", "BUSD", "USDC", "FDUSD", "BTC", "ETH")
+
+
+def stream_symbol(symbol: str) -> str:
+    """Normalize "BTC", "BTC/USD", "btc-usdt" to the exchange symbol "BTCUSDT\""""
+    compact = symbol.replace("/", "").replace("-", "").replace("_", "").upper()
+    if compact.endswith(QUOTE_ASSETS) and compact not in QUOTE_ASSETS:
+        return compact
+    if compact.endswith("USD"):
+        return compact + "T"
+    return compact + "USDT"
+
+
+def parse_stream_message(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Normalize a combined-stream payload into a flat tick dict"""
+    data = message.get("data", message)
+    event = data.get("e")
+    if event is None and "b" in data and "a" in data and "u" in data:
+        event = "bookTicker"  # book ticker payloads carry no event type
+
+    if event == "trade":
+        return {
+            "type": "trade",
+            "symbol": data["s"],
+            "price": float(data["p"]),
+            "quantity": float(data["q"]),
+            "buyer_is_maker": bool(data.get("m", False)),
+            "event_time": data.get("T", data.get("E"))
+        }
+    if event == "bookTicker":
+        return {
+            "type": "book_ticker",
+            "symbol": data["s"],
+            "bid": float(data["b"]),
+            "bid_qty": float(data["B"]),
+            "ask": float(data["a"]),
+            "ask_qty": float(data["A"]),
+            "event_time": data.get("E")
+        }
+    if event == "kline":
+        kline = data["k"]
+        return {
+            "type": "kline",
+            "symbol": data["s"],
+            "interval": kline["i"],
+            "open_time": kline["t"],
+            "open": float(kline["o"]),
+            "high": float(kline["h"]),
+            "low": float(kline["l"]),
+            "close": float(kline["c"]),
+            "volume": float(kline["v"]),
+            "closed": bool(kline["x"]),
+            "event_time": data.get("E")
+        }
+    if event == "24hrMiniTicker":
+        open_price = float(data["o"])
+        close_price = float(data["c"])
+        return {
+            "type": "mini_ticker",
+            "symbol": data["s"],
+            "open": open_price,
+            "close": close_price,
+            "volume": float(data["v"]),
+            "change_24h": (close_price - open_price) / open_price * 100 if open_price else 0.0,
+            "event_time": data.get("E")
+        }
+    return None
+
+
+class SymbolState:
+    """Latest market view for one symbol, built incrementally from ticks"""
+
+    def __init__(self, symbol: str, history_size: int = 100, volume_alpha: float = 0.1):
+        self.symbol = symbol
+        self.price = 0.0
+        self.bid = 0.0
+        self.ask = 0.0
+        self.kline_open = 0.0
+        self.volume = 0.0
+        self.avg_volume = 0.0
+        self.change_24h = 0.0
+        self.volume_24h = 0.0
+        self.price_history = deque(maxlen=history_size)
+        self.volume_alpha = volume_alpha
+        self.updated_at = 0.0
+        self.ticks = 0
+
+    def apply(self, tick: Dict[str, Any]):
+        kind = tick["type"]
+        if kind == "trade":
+            self.price = tick["price"]
+            self.price_history.append(self.price)
+        elif kind == "book_ticker":
+            self.bid = tick["bid"]
+            self.ask = tick["ask"]
+            if not self.price:
+                self.price = (self.bid + self.ask) / 2
+        elif kind == "kline":
+            self.kline_open = tick["open"]
+            self.volume = tick["volume"]
+            if tick["closed"]:
+                if self.avg_volume:
+                    self.avg_volume += self.volume_alpha * (tick["volume"] - self.avg_volume)
+                else:
+                    self.avg_volume = tick["volume"]
+            if not self.price:
+                self.price = tick["close"]
+        elif kind == "mini_ticker":
+            self.change_24h = tick["change_24h"]
+            self.volume_24h = tick["volume"]
+        self.updated_at = time.time()
+        self.ticks += 1
+
+    def market_data(self) -> Dict[str, Any]:
+        """Snapshot in the dict shape the strategy engines consume"""
+        reference = self.kline_open or (self.price_history[0] if self.price_history else 0.0)
+        return {
+            "symbol": self.symbol,
+            "price": self.price,
+            "bid": self.bid or self.price,
+            "ask": self.ask or self.price,
+            "volume": self.volume,
+            "avg_volume": self.avg_volume or self.volume,
+            "price_change_pct": (self.price - reference) / reference if reference else 0.0,
+            "change_24h": self.change_24h,
+            "volume_24h": self.volume_24h,
+            "price_history": list(self.price_history),
+            "timestamp": datetime.fromtimestamp(self.updated_at).isoformat() if self.updated_at else None,
+            "source": "market_stream"
+        }
+
+
+class _Subscriber:
+    """One fan-out target with its own bounded queue and consumer task"""
+
+    def __init__(self, name: str, callback: Callable, symbols: Optional[set], kinds: Optional[set],
+                 queue_size: int):
+        self.name = name
+        self.callback = callback
+        self.symbols = symbols
+        self.kinds = kinds
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def wants(self, tick: Dict[str, Any]) -> bool:
+        return ((self.symbols is None or tick["symbol"] in self.symbols)
+                and (self.kinds is None or tick["type"] in self.kinds))
+
+    def offer(self, item):
+        if self.queue.full():
+            # Keep the freshest data: a slow consumer loses its oldest tick
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+    async def consume(self):
+        while True:
+            tick, market_data = await self.queue.get()
+            try:
+                result = self.callback(tick, market_data)
+                if asyncio.iscoroutine(result):
+                    await result
+                self.delivered += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Market stream subscriber {self.name} failed: {e}")
+
+
+class MarketDataFeed:
+    """Persistent combined-stream WebSocket client.
+
+    Subscriptions are kept as a set of stream names (``btcusdt@trade``) and
+    replayed after every reconnect. Reconnects back off exponentially with
+    jitter. Ticks update a per-symbol `SymbolState` and are fanned out to
+    subscribers through per-subscriber queues, so one slow consumer never
+    stalls the socket reader or the other consumers.
+    """
+
+    def __init__(self, url: Optional[str] = None, symbols: Iterable[str] = (),
+                 channels: Iterable[str] = DEFAULT_CHANNELS, transport: Optional[HTTPTransport] = None,
+                 heartbeat: float = 20.0, max_backoff: float = 30.0, queue_size: int = 1000):
+        self.url = url or os.getenv('MARKET_STREAM_URL', DEFAULT_STREAM_URL)
+        self.transport = transport or http_transport
+        self.channels = tuple(channels)
+        self.heartbeat = heartbeat
+        self.max_backoff = max_backoff
+        self.queue_size = queue_size
+
+        self.streams: set = set()
+        self.states: Dict[str, SymbolState] = {}
+        self.subscribers: List[_Subscriber] = []
+
+        self.running = False
+        self.connected = False
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._task: Optional[asyncio.Task] = None
+        self._request_id = 0
+        self._update_event: Optional[asyncio.Event] = None
+
+        # Metrics
+        self.messages_received = 0
+        self.reconnects = 0
+        self.last_message_time = 0.0
+        self.last_error = None
+
+        for symbol in symbols:
+            self.streams.update(self._streams_for(symbol))
+
+    # ------------------------------------------------------------------ #
+    # Subscriptions
+    # ------------------------------------------------------------------ #
+    def _streams_for(self, symbol: str, channels: Optional[Iterable[str]] = None) -> List[str]:
+        base = stream_symbol(symbol).lower()
+        return [f"{base}@{channel}" for channel in (channels or self.channels)]
+
+    async def _send(self, method: str, streams: List[str]):
+        if self._ws is None or self._ws.closed or not streams:
+            return
+        self._request_id += 1
+        await self._ws.send_json({"method": method, "params": sorted(streams), "id": self._request_id})
+
+    async def subscribe_symbols(self, symbols: Iterable[str], channels: Optional[Iterable[str]] = None):
+        """Add symbols; applied live when connected and replayed on reconnect"""
+        new_streams = [s for symbol in symbols for s in self._streams_for(symbol, channels)
+                       if s not in self.streams]
+        self.streams.update(new_streams)
+        await self._send("SUBSCRIBE", new_streams)
+
+    async def unsubscribe_symbols(self, symbols: Iterable[str]):
+        removed = [s for symbol in symbols for s in self._streams_for(symbol) if s in self.streams]
+        self.streams.difference_update(removed)
+        await self._send("UNSUBSCRIBE", removed)
+
+    def add_subscriber(self, callback: Callable, symbols: Optional[Iterable[str]] = None,
+                       kinds: Optional[Iterable[str]] = None, name: Optional[str] = None) -> str:
+        """Register callback(tick, market_data); sync or async callables both work"""
+        subscriber = _Subscriber(
+            name or getattr(callback, "__qualname__", repr(callback)),
+            callback,
+            {stream_symbol(s) for s in symbols} if symbols else None,
+            set(kinds) if kinds else None,
+            self.queue_size
+        )
+        self.subscribers.append(subscriber)
+        if self.running:
+            subscriber.task = asyncio.get_running_loop().create_task(subscriber.consume())
+        return subscriber.name
+
+    def remove_subscriber(self, name: str):
+        for subscriber in [s for s in self.subscribers if s.name == name]:
+            if subscriber.task is not None:
+                subscriber.task.cancel()
+            self.subscribers.remove(subscriber)
+
+    # ------------------------------------------------------------------ #
+    # State access
+    # ------------------------------------------------------------------ #
+    def get_market_data(self, symbol: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Latest snapshot for a symbol, or None if unknown or older than max_age seconds"""
+        state = self.states.get(stream_symbol(symbol))
+        if state is None or not state.price:
+            return None
+        if max_age is not None and time.time() - state.updated_at > max_age:
+            return None
+        return state.market_data()
+
+    def get_price(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        market_data = self.get_market_data(symbol, max_age)
+        return market_data["price"] if market_data else None
+
+    async def wait_for_update(self, timeout: Optional[float] = None) -> bool:
+        """Block until the next tick arrives (True) or the timeout passes (False)"""
+        if self._update_event is None:
+            self._update_event = asyncio.Event()
+        event = self._update_event
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    # ------------------------------------------------------------------ #
+    # Connection lifecycle
+    # ------------------------------------------------------------------ #
+    async def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._update_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for subscriber in self.subscribers:
+            subscriber.task = loop.create_task(subscriber.consume())
+        self._task = loop.create_task(self._run())
+
+    async def stop(self):
+        self.running = False
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.close()
+        tasks = [self._task] + [s.task for s in self.subscribers]
+        for task in tasks:
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*[t for t in tasks if t is not None], return_exceptions=True)
+        self._task = None
+        self.connected = False
+
+    async def __aenter__(self) -> "MarketDataFeed":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def _run(self):
+        backoff = 0.5
+        while self.running:
+            try:
+                session = await self.transport.get_session()
+                async with session.ws_connect(self.url, heartbeat=self.heartbeat,
+                                              timeout=aiohttp.ClientWSTimeout(ws_close=5.0)) as ws:
+                    self._ws = ws
+                    self.connected = True
+                    await self._send("SUBSCRIBE", list(self.streams))
+                    logger.info(f"Market stream connected to {self.url} ({len(self.streams)} streams)")
+
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            backoff = 0.5  # healthy traffic resets the backoff
+                            self._handle(message.data)
+                        elif message.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"Market stream error: {e}")
+            finally:
+                self.connected = False
+                self._ws = None
+
+            if not self.running:
+                break
+            self.reconnects += 1
+            delay = backoff * (0.5 + random.random())
+            logger.info(f"Market stream reconnecting in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _handle(self, raw: str):
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+        if "result" in message and "id" in message:
+            return  # subscription acknowledgement
+
+        tick = parse_stream_message(message)
+        if tick is None:
+            return
+
+        self.messages_received += 1
+        self.last_message_time = time.time()
+        state = self.states.get(tick["symbol"])
+        if state is None:
+            state = self.states[tick["symbol"]] = SymbolState(tick["symbol"])
+        state.apply(tick)
+
+        market_data = None
+        for subscriber in self.subscribers:
+            if subscriber.wants(tick):
+                if market_data is None:
+                    market_data = state.market_data()
+                subscriber.offer((tick, market_data))
+
+        if self._update_event is not None:
+            # Wake every waiter once, then start a fresh generation
+            self._update_event.set()
+            self._update_event = asyncio.Event()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "connected": self.connected,
+            "streams": len(self.streams),
+            "symbols": sorted(self.states),
+            "messages_received": self.messages_received,
+            "reconnects": self.reconnects,
+            "last_message_age": time.time() - self.last_message_time if self.last_message_time else None,
+            "last_error": self.last_error,
+            "subscribers": {
+                s.name: {"delivered": s.delivered, "dropped": s.dropped, "errors": s.errors,
+                         "queued": s.queue.qsize()}
+                for s in self.subscribers
+            }
+        }
+
+
+def connect_trading_components(feed: MarketDataFeed, delta_engine=None, orchestrator=None,
+                               futures_handler=None, symbols: Optional[Iterable[str]] = None):
+    """Fan the feed out to the strategy, orchestration and position layers.
+
+    - DeltaScalpingEngine sees every trade tick so exits are checked tick by tick
+    - Phase2TrillionOrchestrator runs its pipeline on trades and closed klines
+    - FuturesTradeHandler marks positions to market on every trade
+    """
+    if delta_engine is not None:
+        feed.add_subscriber(delta_engine.on_market_tick, symbols, kinds=("trade",),
+                            name="delta_scalping")
+    if orchestrator is not None:
+        feed.add_subscriber(orchestrator.on_market_tick, symbols, kinds=("trade", "kline"),
+                            name="phase_2_orchestrator")
+    if futures_handler is not None:
+        feed.add_subscriber(futures_handler.on_market_tick, symbols, kinds=("trade",),
+                            name="futures_trade_handler")
+
+
+# Global market data feed
+market_feed = MarketDataFeed()
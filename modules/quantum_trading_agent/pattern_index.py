@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Pattern Index - Matrix-Backed Cosine Nearest-Neighbor Search
+Pattern signatures grouped by length in contiguous, pre-normalized matrices
+"""
+
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class _SignatureGroup:
+    """All signatures of one length stored as rows of a growable matrix"""
+
+    def __init__(self, dimension: int, capacity: int = 64):
+        self.dimension = dimension
+        self.matrix = np.zeros((capacity, dimension), dtype=np.float64)
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.lsh: Optional["_HyperplaneLSH"] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, pattern_id: str, unit_vector: np.ndarray):
+        if pattern_id in self.rows:
+            self.matrix[self.rows[pattern_id]] = unit_vector
+            if self.lsh is not None:
+                self.lsh.remove(pattern_id)
+                self.lsh.add(pattern_id, unit_vector)
+            return
+
+        size = len(self.ids)
+        if size == self.matrix.shape[0]:
+            grown = np.zeros((size * 2, self.dimension), dtype=np.float64)
+            grown[:size] = self.matrix[:size]
+            self.matrix = grown
+
+        self.matrix[size] = unit_vector
+        self.rows[pattern_id] = size
+        self.ids.append(pattern_id)
+        if self.lsh is not None:
+            self.lsh.add(pattern_id, unit_vector)
+
+    def remove(self, pattern_id: str) -> bool:
+        row = self.rows.pop(pattern_id, None)
+        if row is None:
+            return False
+
+        # Swap the last row into the hole to keep the matrix contiguous
+        last = len(self.ids) - 1
+        if row != last:
+            moved_id = self.ids[last]
+            self.matrix[row] = self.matrix[last]
+            self.ids[row] = moved_id
+            self.rows[moved_id] = row
+        self.ids.pop()
+        self.matrix[last] = 0.0
+
+        if self.lsh is not None:
+            self.lsh.remove(pattern_id)
+        return True
+
+    def active(self) -> np.ndarray:
+        return self.matrix[:len(self.ids)]
+
+
+class _HyperplaneLSH:
+    """Random-hyperplane (SimHash) buckets for approximate cosine search"""
+
+    def __init__(self, dimension: int, n_tables: int, n_bits: int, seed: int = 0):
+        rng = np.random.default_rng(seed + dimension)
+        self.planes = rng.normal(size=(n_tables, n_bits, dimension))
+        self.weights = 1 << np.arange(n_bits)
+        self.tables: List[Dict[int, set]] = [{} for _ in range(n_tables)]
+        self.keys: Dict[str, np.ndarray] = {}
+
+    def _hash(self, unit_vector: np.ndarray) -> np.ndarray:
+        bits = (self.planes @ unit_vector) > 0
+        return bits.astype(np.int64) @ self.weights
+
+    def add(self, pattern_id: str, unit_vector: np.ndarray):
+        keys = self._hash(unit_vector)
+        self.keys[pattern_id] = keys
+        for table, key in zip(self.tables, keys):
+            table.setdefault(int(key), set()).add(pattern_id)
+
+    def remove(self, pattern_id: str):
+        keys = self.keys.pop(pattern_id, None)
+        if keys is None:
+            return
+        for table, key in zip(self.tables, keys):
+            bucket = table.get(int(key))
+            if bucket is not None:
+                bucket.discard(pattern_id)
+                if not bucket:
+                    del table[int(key)]
+
+    def candidates(self, unit_vector: np.ndarray) -> set:
+        found = set()
+        for table, key in zip(self.tables, self._hash(unit_vector)):
+            found |= table.get(int(key), set())
+        return found
+
+
+class PatternIndex:
+    """Top-k cosine similarity index over pattern signatures.
+
+    Signatures are L2-normalized on insert so a query against a group is a
+    single matrix-vector product. Groups larger than `ann_threshold` can
+    switch to random-hyperplane LSH candidate generation when
+    `approximate` is enabled.
+    """
+
+    def __init__(self, approximate: bool = False, ann_threshold: int = 20000,
+                 n_tables: int = 8, n_bits: int = 12):
+        self.approximate = approximate
+        self.ann_threshold = ann_threshold
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.groups: Dict[int, _SignatureGroup] = {}
+        self.locations: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def __contains__(self, pattern_id: str) -> bool:
+        return pattern_id in self.locations
+
+    @staticmethod
+    def _normalize(signature) -> Optional[np.ndarray]:
+        vector = np.asarray(signature, dtype=np.float64)
+        norm = np.linalg.norm(vector)
+        if vector.ndim != 1 or norm == 0 or not np.isfinite(norm):
+            return None
+        return vector / norm
+
+    def add(self, pattern_id: str, signature: List[float]) -> bool:
+        """Insert or replace a pattern signature"""
+        unit_vector = self._normalize(signature)
+        if unit_vector is None:
+            # Zero or invalid signatures can never match; keep them out of the index
+            self.remove(pattern_id)
+            return False
+
+        dimension = unit_vector.shape[0]
+        previous = self.locations.get(pattern_id)
+        if previous is not None and previous != dimension:
+            self.groups[previous].remove(pattern_id)
+
+        group = self.groups.get(dimension)
+        if group is None:
+            group = _SignatureGroup(dimension)
+            self.groups[dimension] = group
+
+        group.add(pattern_id, unit_vector)
+        self.locations[pattern_id] = dimension
+        self._maybe_enable_lsh(group)
+        return True
+
+    def remove(self, pattern_id: str) -> bool:
+        """Delete a pattern from the index"""
+        dimension = self.locations.pop(pattern_id, None)
+        if dimension is None:
+            return False
+        return self.groups[dimension].remove(pattern_id)
+
+    def rebuild(self, patterns: Dict[str, Dict[str, Any]]):
+        """Rebuild the index from a pattern library dict"""
+        self.groups = {}
+        self.locations = {}
+        for pattern_id, pattern in patterns.items():
+            self.add(pattern_id, pattern.get("signature", []))
+
+    def _maybe_enable_lsh(self, group: _SignatureGroup):
+        if not self.approximate or group.lsh is not None or len(group) < self.ann_threshold:
+            return
+        group.lsh = _HyperplaneLSH(group.dimension, self.n_tables, self.n_bits)
+        for row, pattern_id in enumerate(group.ids):
+            group.lsh.add(pattern_id, group.matrix[row])
+        logger.info(f"Enabled approximate search for {group.dimension}-d patterns "
+                    f"({len(group)} signatures)")
+
+    def search(self, signature: List[float], k: int = 1,
+               min_similarity: float = -1.0) -> List[Tuple[str, float]]:
+        """Return up to k (pattern_id, similarity) pairs, best first"""
+        unit_vector = self._normalize(signature)
+        if unit_vector is None or k < 1:
+            return []
+
+        group = self.groups.get(unit_vector.shape[0])
+        if group is None or not len(group):
+            return []
+
+        if group.lsh is not None:
+            candidate_ids = group.lsh.candidates(unit_vector)
+            if not candidate_ids:
+                return []
+            rows = np.fromiter((group.rows[pid] for pid in candidate_ids), dtype=np.int64)
+            similarities = group.matrix[rows] @ unit_vector
+        else:
+            rows = None
+            similarities = group.active() @ unit_vector
+
+        keep = np.flatnonzero(similarities > min_similarity)
+        if not keep.size:
+            return []
+
+        if keep.size > k:
+            top = np.argpartition(similarities[keep], -k)[-k:]
+            keep = keep[top]
+        keep = keep[np.argsort(-similarities[keep], kind="stable")]
+
+        if rows is not None:
+            keep_rows = rows[keep]
+        else:
+            keep_rows = keep
+        return [(group.ids[row], float(similarities[i])) for row, i in zip(keep_rows, keep)]
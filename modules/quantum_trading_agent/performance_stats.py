@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Performance Stats - Streaming Trade Performance Aggregates
+Win rate, mean, variance, Sharpe, drawdown and profit factor updated in O(1) per closed trade
+"""
+
+import logging
+import math
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _profit_factor(gross_profit: float, gross_loss: float) -> float:
+    if gross_loss > 0:
+        return gross_profit / gross_loss
+    return float('inf') if gross_profit > 0 else 0.0
+
+
+class RunningStats:
+    """Lifetime aggregates over every recorded PnL.
+
+    Mean and variance use Welford's update; drawdown is tracked on the
+    cumulative-PnL equity curve starting at zero. Sharpe is per trade
+    (mean / standard deviation), not annualized.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.wins = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.equity = 0.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+
+    def add(self, pnl: float, win: Optional[bool] = None):
+        self.count += 1
+        if win is None:
+            win = pnl > 0
+        self.wins += win
+        self.total += pnl
+        delta = pnl - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (pnl - self.mean)
+        if pnl > 0:
+            self.gross_profit += pnl
+        else:
+            self.gross_loss -= pnl
+        self.equity += pnl
+        self.peak = max(self.peak, self.equity)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.equity)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.count if self.count else 0.0
+
+    @property
+    def sharpe(self) -> float:
+        std = math.sqrt(self.variance)
+        return self.mean / std if std > 0 else 0.0
+
+    @property
+    def profit_factor(self) -> float:
+        return _profit_factor(self.gross_profit, self.gross_loss)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "trades": self.count,
+            "wins": self.wins,
+            "losses": self.count - self.wins,
+            "win_rate": self.win_rate,
+            "total_pnl": self.total,
+            "mean": self.mean,
+            "variance": self.variance,
+            "std": math.sqrt(self.variance),
+            "sharpe": self.sharpe,
+            "profit_factor": self.profit_factor,
+            "gross_profit": self.gross_profit,
+            "gross_loss": self.gross_loss,
+            "max_drawdown": self.max_drawdown
+        }
+
+
+class WindowedStats:
+    """The same aggregates over the last `size` trades and/or `seconds`.
+
+    Sums are adjusted as trades enter and leave the window. Squares are
+    accumulated relative to a shift value and re-summed once a window's
+    worth of trades has left, so cancellation error cannot build up.
+    Max drawdown is path dependent, so it is computed from the (bounded)
+    window on read and cached until the window changes.
+    """
+
+    def __init__(self, size: Optional[int] = None, seconds: Optional[float] = None):
+        if size is None and seconds is None:
+            raise ValueError("A window needs a size, a duration or both")
+        self.size = size
+        self.seconds = seconds
+        self.trades: deque = deque()  # (timestamp, pnl, win)
+        self._resum()
+        self._version = 0
+        self._drawdown_version = -1
+        self._drawdown = 0.0
+
+    def _resum(self):
+        self.shift = self.trades[0][1] if self.trades else 0.0
+        self.wins = sum(1 for _, _, win in self.trades if win)
+        self.total = sum(pnl for _, pnl, _ in self.trades)
+        self.sum_d = sum(pnl - self.shift for _, pnl, _ in self.trades)
+        self.sum_d2 = sum((pnl - self.shift) ** 2 for _, pnl, _ in self.trades)
+        self.gross_profit = sum(pnl for _, pnl, _ in self.trades if pnl > 0)
+        self.gross_loss = -sum(pnl for _, pnl, _ in self.trades if pnl <= 0)
+        self.removed = 0
+
+    def add(self, pnl: float, timestamp: Optional[float] = None, win: Optional[bool] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        win = pnl > 0 if win is None else win
+        self.trades.append((timestamp, pnl, win))
+        if len(self.trades) == 1:
+            # An empty window takes its shift from the first trade
+            self._resum()
+        else:
+            self.wins += win
+            self.total += pnl
+            d = pnl - self.shift
+            self.sum_d += d
+            self.sum_d2 += d * d
+            if pnl > 0:
+                self.gross_profit += pnl
+            else:
+                self.gross_loss -= pnl
+        self._version += 1
+        self.expire(timestamp)
+
+    def _pop(self):
+        _, pnl, win = self.trades.popleft()
+        self.wins -= win
+        self.total -= pnl
+        d = pnl - self.shift
+        self.sum_d -= d
+        self.sum_d2 -= d * d
+        if pnl > 0:
+            self.gross_profit -= pnl
+        else:
+            self.gross_loss += pnl
+        self.removed += 1
+        self._version += 1
+
+    def expire(self, now: Optional[float] = None):
+        """Drop trades that fell out of the window"""
+        while self.size is not None and len(self.trades) > self.size:
+            self._pop()
+        if self.seconds is not None:
+            cutoff = (time.time() if now is None else now) - self.seconds
+            while self.trades and self.trades[0][0] < cutoff:
+                self._pop()
+        if self.removed >= max(len(self.trades), 64):
+            self._resum()
+
+    @property
+    def count(self) -> int:
+        return len(self.trades)
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self.trades) if self.trades else 0.0
+
+    @property
+    def variance(self) -> float:
+        n = len(self.trades)
+        if n < 2:
+            return 0.0
+        return max(0.0, (self.sum_d2 - self.sum_d * self.sum_d / n) / (n - 1))
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / len(self.trades) if self.trades else 0.0
+
+    @property
+    def sharpe(self) -> float:
+        std = math.sqrt(self.variance)
+        return self.mean / std if std > 0 else 0.0
+
+    @property
+    def profit_factor(self) -> float:
+        return _profit_factor(self.gross_profit, self.gross_loss)
+
+    @property
+    def max_drawdown(self) -> float:
+        if self._drawdown_version != self._version:
+            equity = np.cumsum([pnl for _, pnl, _ in self.trades]) if self.trades else np.zeros(0)
+            peaks = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:]
+            self._drawdown = float((peaks - equity).max()) if len(equity) else 0.0
+            self._drawdown_version = self._version
+        return self._drawdown
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        if self.seconds is not None:
+            self.expire(now)
+        return {
+            "trades": self.count,
+            "wins": self.wins,
+            "losses": self.count - self.wins,
+            "win_rate": self.win_rate,
+            "total_pnl": self.total,
+            "mean": self.mean,
+            "variance": self.variance,
+            "std": math.sqrt(self.variance),
+            "sharpe": self.sharpe,
+            "profit_factor": self.profit_factor,
+            "gross_profit": self.gross_profit,
+            "gross_loss": self.gross_loss,
+            "max_drawdown": self.max_drawdown
+        }
+
+
+class PerformanceTracker:
+    """Lifetime stats plus named windows, fed one closed trade at a time.
+
+    `windows` maps a name to WindowedStats arguments, e.g.
+    {"last_100": {"size": 100}, "1h": {"seconds": 3600}}.
+    """
+
+    def __init__(self, windows: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.lifetime = RunningStats()
+        self.windows: Dict[str, WindowedStats] = {
+            name: WindowedStats(**spec) for name, spec in (windows or {}).items()
+        }
+
+    def record(self, pnl: float, timestamp: Optional[float] = None, win: Optional[bool] = None):
+        self.lifetime.add(pnl, win)
+        for window in self.windows.values():
+            window.add(pnl, timestamp, win)
+
+    def record_many(self, pnls: Iterable[float], timestamps: Optional[Iterable[float]] = None):
+        """Seed from history (e.g. trades restored from memory), oldest first"""
+        if timestamps is None:
+            for pnl in pnls:
+                self.record(pnl)
+        else:
+            for pnl, timestamp in zip(pnls, timestamps):
+                self.record(pnl, timestamp)
+
+    def window(self, name: str) -> WindowedStats:
+        return self.windows[name]
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "lifetime": self.lifetime.snapshot(),
+            "windows": {name: window.snapshot(now) for name, window in self.windows.items()}
+        }
@@ -1,10 +1,16 @@
 import numpy as np
 import json
 import asyncio
+import argparse
+import os
+import sys
+import threading
 import time
 import random
 import requests
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional
 
 class PerplexityInjector:
     def __init__(self, model, dwc_stream):
@@ -45,7 +51,16 @@ class CoherenceReversal:
         return np.diff(waveform).argmin()
 
 class LiveDataFetcher:
+    def __init__(self, feed=None, max_age=5.0):
+        # Optional market_stream.MarketDataFeed; REST is only used when it has no fresh price
+        self.feed = feed
+        self.max_age = max_age
+
     def fetch_binance_price(self, symbol="BTCUSDT"):
+        if self.feed is not None:
+            price = self.feed.get_price(symbol, max_age=self.max_age)
+            if price is not None:
+                return price
         try:
             response = requests.get(f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}", timeout=5)
             if response.status_code == 200:
@@ -247,8 +262,252 @@ def get_quantum_signal_status():
         "status": "active"
     }
 
-if __name__ == "__main__":
-    # Pipeline Invocation for testing
+class QuantumSignalService:
+    """Operations exposed to the dashboard API (one-shot CLI or worker mode)
+    
+    State (signal streams, last processed signals, paper portfolio) lives
+    for the lifetime of the process, so a long-lived worker keeps it
+    between calls.
+    """
+    
+    def __init__(self, processor: Optional[DWCQuantumSignalProcessor] = None):
+        self.processor = processor or quantum_signal_processor
+        self.last_processed: Optional[Dict[str, Any]] = None
+        # The processor and paper executor are not thread-safe
+        self.state_lock = threading.Lock()
+        self.operations = {
+            "get-market-data": self.get_market_data,
+            "process-signals": self.process_signals,
+            "generate-recommendation": self.generate_recommendation,
+            "get-portfolio": self.get_portfolio,
+            "execute-trade": self.execute_trade,
+            "status": self.status,
+            "ping": self.ping
+        }
+    
+    def get_market_data(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        fetcher = self.processor.live_data_fetcher
+        return {
+            "success": True,
+            "btc_price": fetcher.fetch_binance_price(params.get("btc_symbol", "BTCUSDT")),
+            "eth_price": fetcher.fetch_binance_price(params.get("eth_symbol", "ETHUSDT")),
+            "ibm_price": fetcher.fetch_alpha_vantage(params.get("equity_symbol", "IBM"),
+                                                     os.getenv("ALPHA_VANTAGE_API_KEY", "demo")),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def process_signals(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        market_data = dict(params.get("market_data") or {})
+        market_data.setdefault("timestamp", datetime.now().isoformat())
+        with self.state_lock:
+            processed = self.processor.process_live_market_data(market_data)
+            self.last_processed = processed
+        processed = dict(processed)
+        processed["success"] = "error" not in processed
+        return processed
+    
+    def generate_recommendation(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        processed = params.get("processed_data") or self.last_processed
+        if processed is None:
+            processed = self.process_signals(params)
+        with self.state_lock:
+            recommendation = self.processor.generate_trading_recommendation(processed)
+        recommendation = dict(recommendation)
+        recommendation["success"] = "error" not in recommendation
+        return recommendation
+    
+    def get_portfolio(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        with self.state_lock:
+            executor = self.processor.trade_executor
+            summary = executor.get_portfolio_summary()
+            summary["recent_trades"] = executor.paper_trades[-int(params.get("limit", 10)):]
+        summary["success"] = True
+        return summary
+    
+    def execute_trade(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        symbol = params.get("symbol", "BTCUSDT")
+        action = params.get("action", "BUY")
+        quantity = float(params.get("quantity", 0))
+        price = params.get("price")
+        if price is None:
+            price = self.processor.live_data_fetcher.fetch_binance_price(symbol)
+        with self.state_lock:
+            executor = self.processor.trade_executor
+            executor.real_mode = str(params.get("live_mode", False)).lower() == "true"
+            executed = executor.execute_trade(symbol, action, float(price), quantity)
+        return {"success": bool(executed), "symbol": symbol, "action": action,
+                "price": float(price), "quantity": quantity}
+    
+    def status(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        status = get_quantum_signal_status()
+        status["success"] = True
+        return status
+    
+    def ping(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"success": True, "pid": os.getpid(), "timestamp": time.time()}
+    
+    def call(self, operation: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        handler = self.operations.get(operation)
+        if handler is None:
+            raise KeyError(operation)
+        return handler(params or {})
+
+def _json_default(value):
+    """Serialize NumPy scalars/arrays in responses"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+def _encode(payload: Dict[str, Any]) -> bytes:
+    return (json.dumps(payload, default=_json_default) + "\n").encode()
+
+class QuantumSignalWorker:
+    """Long-lived JSON-RPC 2.0 worker (newline-delimited, stdio or Unix socket)
+    
+    Requests are dispatched concurrently; blocking handlers run on a
+    thread pool so a slow market-data fetch does not stall other calls.
+    Responses carry the request id and may arrive out of order.
+    """
+    
+    def __init__(self, service: Optional[QuantumSignalService] = None, max_workers: int = 8):
+        self.service = service or QuantumSignalService()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quantum-rpc")
+        self.shutdown_event: Optional[asyncio.Event] = None
+    
+    async def handle_message(self, line: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            return {"jsonrpc": "2.0", "id": None,
+                    "error": {"code": -32700, "message": f"Parse error: {e}"}}
+        
+        request_id = request.get("id")
+        method = request.get("method")
+        params = request.get("params") or {}
+        
+        if method == "shutdown":
+            self.shutdown_event.set()
+            return {"jsonrpc": "2.0", "id": request_id, "result": {"success": True}}
+        if method not in self.service.operations:
+            return {"jsonrpc": "2.0", "id": request_id,
+                    "error": {"code": -32601, "message": f"Method not found: {method}"}}
+        
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, self.service.call, method, params)
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except Exception as e:
+            response = {"jsonrpc": "2.0", "id": request_id,
+                        "error": {"code": -32000, "message": str(e)}}
+        
+        # Notifications (no id) get no response
+        return response if request_id is not None else None
+    
+    async def _serve_stream(self, reader: asyncio.StreamReader, write):
+        tasks = set()
+        
+        async def respond(line: bytes):
+            response = await self.handle_message(line)
+            if response is not None:
+                await write(_encode(response))
+        
+        stop = asyncio.ensure_future(self.shutdown_event.wait())
+        while True:
+            read = asyncio.ensure_future(reader.readline())
+            await asyncio.wait({read, stop}, return_when=asyncio.FIRST_COMPLETED)
+            if not read.done():
+                read.cancel()
+                break
+            line = read.result()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(respond(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        
+        stop.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def serve_stdio(self):
+        """Serve requests from stdin, responses on stdout"""
+        self.shutdown_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        
+        # stdout is the protocol channel; route stray prints to stderr
+        protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb", buffering=0)
+        sys.stdout = sys.stderr
+        
+        reader = asyncio.StreamReader(limit=2 ** 24)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        write_lock = asyncio.Lock()
+        
+        async def write(data: bytes):
+            async with write_lock:
+                await loop.run_in_executor(None, protocol_out.write, data)
+        
+        try:
+            await self._serve_stream(reader, write)
+        finally:
+            self.executor.shutdown(wait=False)
+    
+    async def serve_unix(self, socket_path: str):
+        """Serve requests on a Unix domain socket (one stream per client)"""
+        self.shutdown_event = asyncio.Event()
+        sys.stdout = sys.stderr
+        
+        clients = set()
+        
+        async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            clients.add(asyncio.current_task())
+            write_lock = asyncio.Lock()
+            
+            async def write(data: bytes):
+                async with write_lock:
+                    writer.write(data)
+                    await writer.drain()
+            
+            try:
+                await self._serve_stream(reader, write)
+            finally:
+                writer.close()
+                clients.discard(asyncio.current_task())
+        
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = await asyncio.start_unix_server(client, path=socket_path, limit=2 ** 24)
+        try:
+            async with server:
+                await self.shutdown_event.wait()
+                # Let connected clients finish in-flight requests
+                if clients:
+                    await asyncio.gather(*clients, return_exceptions=True)
+        finally:
+            self.executor.shutdown(wait=False)
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="DWC quantum signal processor")
+    parser.add_argument("--serve", action="store_true", help="run as a persistent JSON-RPC worker")
+    parser.add_argument("--socket", help="Unix socket path for --serve (default: stdio)")
+    for operation in ("get-market-data", "process-signals", "generate-recommendation",
+                      "get-portfolio", "execute-trade"):
+        parser.add_argument(f"--{operation}", dest="operation", action="store_const", const=operation)
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--action", default="BUY")
+    parser.add_argument("--quantity", type=float, default=0.0)
+    parser.add_argument("--live-mode", default="false")
+    return parser.parse_args(argv)
+
+def run_demo():
+    """Pipeline invocation for testing"""
     processor = DWCQuantumSignalProcessor()
     
     # Test with sample market data
@@ -268,4 +527,28 @@ if __name__ == "__main__":
     print("Quantum Signal Processing Results:")
     print(json.dumps(processed, indent=2))
     print("\nTrading Recommendation:")
-    print(json.dumps(recommendation, indent=2))
\ No newline at end of file
+    print(json.dumps(recommendation, indent=2))
+
+if __name__ == "__main__":
+    args = _parse_args()
+    
+    if args.serve:
+        worker = QuantumSignalWorker()
+        if args.socket:
+            asyncio.run(worker.serve_unix(args.socket))
+        else:
+            asyncio.run(worker.serve_stdio())
+    elif args.operation:
+        # One-shot mode: a single compact JSON line on stdout
+        service = QuantumSignalService()
+        params = {"symbol": args.symbol, "action": args.action,
+                  "quantity": args.quantity, "live_mode": args.live_mode}
+        real_stdout = sys.stdout
+        sys.stdout = sys.stderr
+        try:
+            result = service.call(args.operation, params)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        real_stdout.write(json.dumps(result, default=_json_default) + "\n")
+    else:
+        run_demo()
@@ -9,17 +9,24 @@ import logging
 import json
 import os
 from datetime import datetime
-from typing import Dict, Any, Optional
-from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable
 
 # Import Phase 2 Trillion components
-from .delta_scalping import delta_engine, process_market_signal
-from .compound_strategy import compound_controller, optimize_compound_strategy
+from .delta_scalping import DeltaScalpingEngine, get_delta_engine, process_market_signal, evaluate_market_signal
+from .compound_strategy import compound_controller
 from .platform_adapter import platform_adapter, initialize_phase_2_trillion_platforms
 from .sentiment_layer import sentiment_layer, enhance_signal_with_sentiment
+from .tick_mailbox import TickMailbox, MERGE_FUNCTIONS, POLICY_CONFLATE
+from .symbol_actors import RiskCoordinator, SymbolActorPool
+from .executors import executors, LoopStallMonitor
+from .market_stream import (MarketDataFeed, market_feed, connect_trading_components,
+                            MARKET_STREAM_ENABLED, MARKET_STREAM_SYMBOLS)
+from .state_store import get_state_store, LEGACY_NAMESPACE
 
 logger = logging.getLogger(__name__)
 
+STATE_NAMESPACE = "orchestrator"
+
 class Phase2TrillionOrchestrator:
     def __init__(self):
         self.orchestrator_name = "Phase 2 Trillion Master Orchestrator"
@@ -33,7 +40,7 @@ class Phase2TrillionOrchestrator:
         
         # Component status
         self.components = {
-            "delta_scalping": {"loaded": False, "ready": False, "instance": delta_engine},
+            "delta_scalping": {"loaded": False, "ready": False, "instance": get_delta_engine()},
             "compound_strategy": {"loaded": False, "ready": False, "instance": compound_controller},
             "platform_adapter": {"loaded": False, "ready": False, "instance": platform_adapter},
             "sentiment_layer": {"loaded": False, "ready": False, "instance": sentiment_layer}
@@ -52,7 +59,45 @@ class Phase2TrillionOrchestrator:
         self.session_start = datetime.now()
         self.total_signals_processed = 0
         self.successful_trades = 0
-        self.current_balance = 100.0
+        
+        # Shared risk and compound accounting for every symbol
+        self.coordinator = RiskCoordinator(compound_controller, starting_balance=100.0,
+                                           budget_cap=self.trading_config["budget_cap"])
+        self.actors: Optional[SymbolActorPool] = None
+        
+        # Input stage: bounded per-symbol mailbox in front of the trade pipeline
+        self.input_config = {
+            "mailbox_depth": int(os.getenv("ORCHESTRATOR_MAILBOX_DEPTH", "1")),
+            "overflow_policy": os.getenv("ORCHESTRATOR_OVERFLOW_POLICY", POLICY_CONFLATE),
+            "merge": os.getenv("ORCHESTRATOR_MERGE", "latest"),
+            "max_tick_age": float(os.getenv("ORCHESTRATOR_MAX_TICK_AGE", "5.0")),
+            "workers": int(os.getenv("ORCHESTRATOR_WORKERS", "1"))
+        }
+        self.mailbox = self.create_mailbox()
+        self.input_workers: List[asyncio.Task] = []
+        self.last_results: Dict[str, Dict[str, Any]] = {}
+        
+        # Event-loop health: stalls delay heartbeats and order acknowledgements
+        self.stall_monitor = LoopStallMonitor()
+        
+        # Streaming market data, connected on initialization when MARKET_STREAM_ENABLED=true
+        self.market_feed: Optional[MarketDataFeed] = None
+    
+    @property
+    def current_balance(self) -> float:
+        return self.coordinator.balance
+    
+    @current_balance.setter
+    def current_balance(self, value: float):
+        self.coordinator.balance = value
+    
+    def create_mailbox(self) -> TickMailbox:
+        return TickMailbox(
+            depth=self.input_config["mailbox_depth"],
+            policy=self.input_config["overflow_policy"],
+            merge=MERGE_FUNCTIONS.get(self.input_config["merge"]),
+            max_age=self.input_config["max_tick_age"] or None
+        )
         
     async def initialize_system(self) -> Dict[str, Any]:
         """Initialize the complete Phase 2 Trillion system"""
@@ -80,6 +125,12 @@ class Phase2TrillionOrchestrator:
                 # Set environment flag
                 os.environ["PHASE_2_TRILLION_READY"] = "TRUE"
                 
+                if not self.stall_monitor.running:
+                    self.stall_monitor.start()
+                
+                if MARKET_STREAM_ENABLED and self.market_feed is None:
+                    await self.connect_market_feed()
+                
                 logger.info("Phase 2 Trillion system initialized successfully")
                 
                 return {
@@ -105,14 +156,16 @@ class Phase2TrillionOrchestrator:
     async def load_agent_memory(self) -> Dict[str, Any]:
         """Load configuration from agent memory"""
         try:
-            memory_file = Path("modules/quantum_trading_agent/agent_memory.json")
-            
-            if not memory_file.exists():
-                logger.warning("Agent memory file not found, using defaults")
+            store = get_state_store()
+            if not store:
+                logger.warning("State store unavailable, using defaults")
                 return {"success": True, "source": "defaults"}
             
-            with open(memory_file, 'r') as f:
-                memory_data = json.load(f)
+            # Own section first, then keys imported from agent_memory.json
+            memory_data = {**store.get_namespace(LEGACY_NAMESPACE), **store.get_namespace(STATE_NAMESPACE)}
+            if not memory_data:
+                logger.warning("Agent memory not found, using defaults")
+                return {"success": True, "source": "defaults"}
             
             # Update trading configuration from memory
             trading_constraints = memory_data.get("trading_constraints", {})
@@ -199,29 +252,47 @@ class Phase2TrillionOrchestrator:
             logger.error(f"Error verifying system readiness: {e}")
             return {"ready": False, "error": str(e)}
     
-    async def process_trade_loop(self, market_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process_trade_loop(self, market_data: Dict[str, Any],
+                                 engine: Optional[DeltaScalpingEngine] = None) -> Dict[str, Any]:
         """Main trade processing loop with full Phase 2 Trillion integration"""
         try:
             if not self.ready:
                 return {"success": False, "error": "System not ready"}
             
             self.total_signals_processed += 1
+            symbol = market_data.get("symbol", "BTC")
             
-            # Step 1: Delta Scalping Analysis
-            delta_result = await process_market_signal(market_data)
+            # Step 1: Delta Scalping Analysis. An actor's engine is only touched by
+            # that actor, so its analysis can run on an executor thread; the
+            # shared engine stays on the loop
+            if engine is not None:
+                delta_result = await executors.run_io(evaluate_market_signal, market_data, engine)
+            else:
+                delta_result = await process_market_signal(market_data)
             
             if "error" in delta_result:
                 return {"success": False, "stage": "delta_scalping", "error": delta_result["error"]}
             
+            return await self.process_delta_result(symbol, delta_result)
+            
+        except Exception as e:
+            logger.error(f"Error in trade loop: {e}")
+            return {"success": False, "error": str(e)}
+    
+    async def process_delta_result(self, symbol: str, delta_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Steps 2-5 of the pipeline: sentiment, compound sizing, execution and settlement"""
+        try:
+            if delta_result.get("closed_trades"):
+                self.coordinator.record_closed_trades(symbol, delta_result["closed_trades"])
+            
             # Step 2: Sentiment Enhancement
             if delta_result.get("should_enter", False):
-                symbol = market_data.get("symbol", "BTC")
                 sentiment_enhanced = await enhance_signal_with_sentiment(delta_result, symbol)
             else:
                 sentiment_enhanced = delta_result
             
-            # Step 3: Compound Strategy Optimization
-            compound_result = await optimize_compound_strategy(sentiment_enhanced, self.current_balance)
+            # Step 3: Compound Strategy Optimization, sized against the shared balance
+            compound_result = await self.coordinator.authorize(symbol, sentiment_enhanced)
             
             if compound_result.get("action") == "pause_trading":
                 return {
@@ -235,17 +306,13 @@ class Phase2TrillionOrchestrator:
             if compound_result.get("action") == "execute_trade":
                 execution_result = await self.execute_trade(compound_result["optimized_signal"])
                 
-                # Step 5: Update compound controller with trade result
+                # Step 5: Hold the reservation until the opened position closes
+                # and update the compound controller
+                trade_result = delta_result.get("trade_result") or {}
+                await self.coordinator.settle(symbol, compound_result, execution_result,
+                                              trade_result.get("trade") if trade_result.get("success") else None)
                 if execution_result.get("success"):
                     self.successful_trades += 1
-                    trade_update = compound_controller.process_trade_result(
-                        execution_result, 
-                        self.current_balance
-                    )
-                    
-                    # Update balance
-                    if "new_balance" in trade_update:
-                        self.current_balance = trade_update["new_balance"]
                 
                 return {
                     "success": True,
@@ -266,9 +333,102 @@ class Phase2TrillionOrchestrator:
             }
             
         except Exception as e:
-            logger.error(f"Error in trade loop: {e}")
+            logger.error(f"Error processing delta result for {symbol}: {e}")
             return {"success": False, "error": str(e)}
     
+    async def on_shard_signal(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """ShardedSymbolPool hook: size and execute signals produced in worker processes"""
+        if not self.ready:
+            return None
+        symbol = event["symbol"]
+        if event["type"] == "closed_trades":
+            self.coordinator.record_closed_trades(symbol, event["closed_trades"])
+            return None
+        self.total_signals_processed += 1
+        result = await self.process_delta_result(symbol, event["signal"])
+        self.last_results[symbol] = result
+        return result
+    
+    def submit_market_data(self, market_data: Dict[str, Any]) -> bool:
+        """Queue market data for the pipeline without waiting; False if the tick was dropped"""
+        if not self.ready:
+            return False
+        if self.actors is not None:
+            return self.actors.submit(market_data)
+        if not self.input_workers:
+            self.start_input_stage()
+        return self.mailbox.put(market_data.get("symbol", "BTC"), market_data)
+    
+    def enable_symbol_actors(self, groups: Optional[Dict[str, Iterable[str]]] = None) -> SymbolActorPool:
+        """Process each symbol (or group) concurrently in its own actor and engine.
+
+        Actors share this orchestrator's coordinator for sizing and compound
+        accounting; each gets a mailbox built from `input_config`.
+        """
+        if self.actors is None:
+            self.actors = SymbolActorPool(
+                lambda market_data, engine: self.process_trade_loop(market_data, engine),
+                groups=groups,
+                mailbox_factory=self.create_mailbox
+            )
+        return self.actors
+    
+    def start_input_stage(self):
+        """Start the workers that drain the mailbox through process_trade_loop"""
+        loop = asyncio.get_running_loop()
+        self.input_workers = [task for task in self.input_workers if not task.done()]
+        while len(self.input_workers) < self.input_config["workers"]:
+            self.input_workers.append(loop.create_task(self._input_worker()))
+    
+    async def stop_input_stage(self, drain: bool = False):
+        """Stop the pipeline workers, optionally discarding queued ticks"""
+        for task in self.input_workers:
+            task.cancel()
+        await asyncio.gather(*self.input_workers, return_exceptions=True)
+        self.input_workers = []
+        if self.actors is not None:
+            await self.actors.stop(drain=drain)
+        if drain:
+            self.mailbox.clear()
+    
+    async def _input_worker(self):
+        while True:
+            symbol, market_data = await self.mailbox.get()
+            try:
+                self.last_results[symbol] = await self.process_trade_loop(market_data)
+            except Exception as e:
+                logger.error(f"Error processing queued tick for {symbol}: {e}")
+            finally:
+                self.mailbox.task_done(symbol)
+    
+    async def connect_market_feed(self, feed: Optional[MarketDataFeed] = None,
+                                  symbols: Optional[Iterable[str]] = None) -> MarketDataFeed:
+        """Feed streamed trades and closed klines into the pipeline, and trade
+        ticks into the delta engine for tick-level exits"""
+        feed = feed or market_feed
+        symbols = list(symbols or MARKET_STREAM_SYMBOLS)
+        feed.add_subscriber(self.on_delta_tick, symbols, kinds=("trade",), name="delta_scalping")
+        connect_trading_components(feed, orchestrator=self, symbols=symbols)
+        await feed.subscribe_symbols(symbols)
+        await feed.start()
+        self.market_feed = feed
+        logger.info(f"Market stream connected for {', '.join(symbols)}")
+        return feed
+    
+    def on_delta_tick(self, tick: Dict[str, Any], market_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Market stream hook: tick-level exits on the shared delta engine,
+        with the closed positions' capital released in the coordinator"""
+        closed_trades = self.components["delta_scalping"]["instance"].on_market_tick(tick, market_data)
+        if closed_trades:
+            self.coordinator.record_closed_trades(market_data.get("symbol", tick.get("symbol", "")), closed_trades)
+        return closed_trades
+    
+    async def on_market_tick(self, tick: Dict[str, Any], market_data: Dict[str, Any]) -> bool:
+        """Market stream hook: queue trades and closed klines for the trade pipeline"""
+        if tick.get("type") == "kline" and not tick.get("closed"):
+            return False
+        return self.submit_market_data(market_data)
+    
     async def execute_trade(self, optimized_signal: Dict[str, Any]) -> Dict[str, Any]:
         """Execute trade with Phase 2 Trillion safeguards"""
         try:
@@ -352,6 +512,15 @@ class Phase2TrillionOrchestrator:
                 "target_balance": self.trading_config["target_exit"],
                 "progress_percentage": (self.current_balance / self.trading_config["target_exit"]) * 100
             },
+            "input_stage": {
+                "workers": len([task for task in self.input_workers if not task.done()]),
+                **self.mailbox.get_stats()
+            },
+            "risk_coordinator": self.coordinator.get_status(),
+            "event_loop": self.stall_monitor.get_stats(),
+            "market_feed": self.market_feed.get_stats() if self.market_feed is not None else None,
+            "executors": executors.get_stats(),
+            "symbol_actors": self.actors.get_stats() if self.actors is not None else None,
             "phase_flags": {
                 "PHASE_2_TRILLION_READY": os.getenv("PHASE_2_TRILLION_READY") == "TRUE",
                 "withdrawal_prevention": self.trading_config["withdrawal_prevention"],
@@ -366,6 +535,10 @@ class Phase2TrillionOrchestrator:
             
             # Stop all trading activity
             self.active = False
+            if self.market_feed is not None:
+                await self.market_feed.stop()
+            await self.stop_input_stage(drain=True)
+            await self.stall_monitor.stop()
             
             # Save current state
             await self.save_system_state()
@@ -388,17 +561,12 @@ class Phase2TrillionOrchestrator:
     async def save_system_state(self) -> Dict[str, Any]:
         """Save current system state to agent memory"""
         try:
-            memory_file = Path("modules/quantum_trading_agent/agent_memory.json")
-            
-            # Load existing memory
-            if memory_file.exists():
-                with open(memory_file, 'r') as f:
-                    memory_data = json.load(f)
-            else:
-                memory_data = {}
+            store = get_state_store()
+            if not store:
+                return {"success": False, "error": "State store unavailable"}
             
-            # Update with current state
-            memory_data.update({
+            # Only this component's keys are written; other sections are untouched
+            store.put_many(STATE_NAMESPACE, {
                 "last_updated": datetime.now().isoformat(),
                 "current_balance": self.current_balance,
                 "phase_2_trillion_status": self.get_system_status(),
@@ -409,12 +577,9 @@ class Phase2TrillionOrchestrator:
                     "session_end": datetime.now().isoformat()
                 }
             })
+            store.flush()
             
-            # Save updated memory
-            with open(memory_file, 'w') as f:
-                json.dump(memory_data, f, indent=2)
-            
-            return {"success": True, "saved_to": str(memory_file)}
+            return {"success": True, "saved_to": store.path}
             
         except Exception as e:
             logger.error(f"Error saving system state: {e}")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Portfolio Ledger - Columnar Open-Position Book
+Marks every open position against the latest price vector in one NumPy pass
+"""
+
+import logging
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from .records import PositionRecord, symbols, side_code
+
+logger = logging.getLogger(__name__)
+
+
+class PortfolioLedger:
+    """Open positions as parallel arrays, one row per position.
+
+    Rows hold symbol ID, side (+1/-1), base units, entry price and margin;
+    closed rows are zeroed and reused, so they drop out of every sum. The
+    latest price per symbol sits in a vector indexed by symbol ID (see
+    records.symbols), and `mark()` computes per-position PnL, totals and
+    per-symbol exposure with a gather and a few bincounts. The result is
+    cached until a position or price changes, so dashboards can poll it.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.symbol_ids = np.zeros(capacity, dtype=np.int64)
+        self.sides = np.zeros(capacity)
+        self.units = np.zeros(capacity)
+        self.entry_prices = np.zeros(capacity)
+        self.margins = np.zeros(capacity)
+
+        self.rows: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = [None] * capacity
+        self.free: List[int] = []
+        self.used = 0  # high-water mark of rows ever filled
+
+        self.prices = np.full(max(16, len(symbols)), np.nan)
+        self.realized_pnl = 0.0
+
+        # Mark cache
+        self.version = 0
+        self._marked_version = -1
+        self._summary: Optional[Dict[str, Any]] = None
+        self.position_pnl_array = np.zeros(0)
+        self.position_price_array = np.zeros(0)
+
+        # Metrics
+        self.marks = 0
+        self.cache_hits = 0
+
+    # ------------------------------------------------------------------ #
+    # Positions
+    # ------------------------------------------------------------------ #
+    def _grow(self):
+        extra = self.capacity
+        self.symbol_ids = np.concatenate([self.symbol_ids, np.zeros(extra, dtype=np.int64)])
+        for name in ("sides", "units", "entry_prices", "margins"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra)]))
+        self.ids.extend([None] * extra)
+        self.capacity += extra
+
+    def add(self, position_id: str, symbol: str, side: str, units: float, entry_price: float,
+            margin: float = 0.0):
+        """Open (or replace) a position of `units` base quantity"""
+        if position_id in self.rows:
+            self.remove(position_id)
+        if self.free:
+            row = self.free.pop()
+        else:
+            if self.used == self.capacity:
+                self._grow()
+            row = self.used
+            self.used += 1
+        self.symbol_ids[row] = symbols.intern(symbol)
+        self.sides[row] = side_code(side)
+        self.units[row] = units
+        self.entry_prices[row] = entry_price
+        self.margins[row] = margin
+        self.ids[row] = position_id
+        self.rows[position_id] = row
+        self.version += 1
+
+    def add_record(self, record: PositionRecord, symbol: Optional[str] = None):
+        """Open a position from a PositionRecord; `symbol` overrides the record's (e.g. stream form)"""
+        self.add(record.position_id, symbol or record.symbol, record.side_name, record.units,
+                 record.entry_price, record.margin)
+
+    def remove(self, position_id: str, realized_pnl: float = 0.0):
+        """Drop a closed position, booking its realized PnL"""
+        row = self.rows.pop(position_id, None)
+        if row is None:
+            return
+        self.sides[row] = 0.0
+        self.units[row] = 0.0
+        self.entry_prices[row] = 0.0
+        self.margins[row] = 0.0
+        self.ids[row] = None
+        self.free.append(row)
+        self.realized_pnl += realized_pnl
+        self.version += 1
+
+    def clear(self):
+        for position_id in list(self.rows):
+            self.remove(position_id)
+
+    def __contains__(self, position_id: str) -> bool:
+        return position_id in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    # ------------------------------------------------------------------ #
+    # Prices
+    # ------------------------------------------------------------------ #
+    def _reserve_prices(self, count: int):
+        """Room in the price vector for the first `count` symbol IDs"""
+        if count > len(self.prices):
+            grown = np.full(max(2 * len(self.prices), count), np.nan)
+            grown[:len(self.prices)] = self.prices
+            self.prices = grown
+
+    def update_price(self, symbol: str, price: float):
+        symbol_id = symbols.intern(symbol)
+        self._reserve_prices(symbol_id + 1)
+        if self.prices[symbol_id] != price:
+            self.prices[symbol_id] = price
+            self.version += 1
+
+    def update_prices(self, prices: Dict[str, float]):
+        for symbol, price in prices.items():
+            self.update_price(symbol, price)
+
+    # ------------------------------------------------------------------ #
+    # Mark to market
+    # ------------------------------------------------------------------ #
+    def mark(self, prices: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Aggregate unrealized PnL, margin and exposure at the latest prices.
+
+        Positions whose symbol has no price yet are carried at entry.
+        Per-position PnL and mark price are left in `position_pnl_array`
+        and `position_price_array` (row order).
+        """
+        if prices:
+            self.update_prices(prices)
+        if self._marked_version == self.version and self._summary is not None:
+            self.cache_hits += 1
+            return self._summary
+
+        n = self.used
+        self._reserve_prices(len(symbols))
+        symbol_ids = self.symbol_ids[:n]
+        entry = self.entry_prices[:n]
+        px = self.prices[symbol_ids] if n else np.zeros(0)
+        px = np.where(np.isnan(px), entry, px)
+        signed_units = self.sides[:n] * self.units[:n]
+
+        pnl = signed_units * (px - entry)
+        net = signed_units * px
+        gross = np.abs(net)
+
+        n_symbols = len(symbols)
+        by_symbol_pnl = np.bincount(symbol_ids, weights=pnl, minlength=n_symbols)
+        by_symbol_net = np.bincount(symbol_ids, weights=net, minlength=n_symbols)
+        by_symbol_gross = np.bincount(symbol_ids, weights=gross, minlength=n_symbols)
+        by_symbol_count = np.bincount(symbol_ids, weights=self.sides[:n] != 0, minlength=n_symbols)
+
+        self.position_pnl_array = pnl
+        self.position_price_array = px
+        self._summary = {
+            "positions": len(self.rows),
+            "unrealized_pnl": float(pnl.sum()),
+            "realized_pnl": self.realized_pnl,
+            "margin_used": float(self.margins[:n].sum()),
+            "gross_exposure": float(gross.sum()),
+            "net_exposure": float(net.sum()),
+            "by_symbol": {
+                symbols.name(i): {
+                    "positions": int(by_symbol_count[i]),
+                    "unrealized_pnl": float(by_symbol_pnl[i]),
+                    "net_exposure": float(by_symbol_net[i]),
+                    "gross_exposure": float(by_symbol_gross[i])
+                }
+                for i in np.flatnonzero(by_symbol_count)
+            }
+        }
+        self._marked_version = self.version
+        self.marks += 1
+        return self._summary
+
+    def position_mark(self, position_id: str) -> Optional[tuple]:
+        """(mark price, unrealized PnL) of one position at the latest prices"""
+        self.mark()
+        row = self.rows.get(position_id)
+        if row is None:
+            return None
+        return float(self.position_price_array[row]), float(self.position_pnl_array[row])
+
+    def position_pnl(self) -> Dict[str, float]:
+        """Per-position unrealized PnL keyed by position ID"""
+        self.mark()
+        pnl = self.position_pnl_array
+        return {position_id: float(pnl[row]) for position_id, row in self.rows.items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "positions": len(self.rows),
+            "capacity": self.capacity,
+            "free_rows": len(self.free),
+            "marks": self.marks,
+            "cache_hits": self.cache_hits
+        }
@@ -5,7 +5,6 @@ Categorizes opportunities by strategy type with confidence ratings and risk anal
 """
 
 import asyncio
-import aiohttp
 import json
 import logging
 import os
@@ -13,13 +12,18 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 import numpy as np
 
+from .http_transport import HTTPTransport, http_transport
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class QuantumStrategySelector:
-    def __init__(self):
+    def __init__(self, transport: Optional[HTTPTransport] = None):
+        self.transport = transport or http_transport
+        
         self.perplexity_api_key = os.getenv('PERPLEXITY_API_KEY')
+        self.perplexity_url = os.getenv('PERPLEXITY_API_URL', 'https://api.perplexity.ai')
         self.max_risk = 100.0
         self.strategy_categories = {
             'delta_divergence': {'min_confidence': 75, 'volatility_range': (15, 45)},
@@ -60,9 +64,9 @@ class QuantumStrategySelector:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self.transport.session() as session:
                 async with session.post(
-                    'https://api.perplexity.ai/chat/completions',
+                    f"{self.perplexity_url}/chat/completions",
                     headers=headers,
                     json=payload
                 ) as response:
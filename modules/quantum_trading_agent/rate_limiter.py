@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter - Weighted Token Buckets with Priority Lanes
+Shared per-exchange request budgets that adapt to server rate-limit headers
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, Mapping
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, lower value is served first
+PRIORITY_ORDER = 0      # order placement and cancellation
+PRIORITY_ACCOUNT = 1    # account, position and order polling
+PRIORITY_HEALTH = 2     # pings, server time, heartbeat checks
+
+LANE_NAMES = {PRIORITY_ORDER: "order", PRIORITY_ACCOUNT: "account", PRIORITY_HEALTH: "health"}
+
+
+def _lower_headers(headers: Optional[Mapping[str, Any]]) -> Dict[str, str]:
+    if not headers:
+        return {}
+    return {str(key).lower(): str(value) for key, value in headers.items()}
+
+
+def _header_float(headers: Dict[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class WeightedRateLimiter:
+    """Token bucket holding request weight, with strict priority lanes.
+
+    The bucket refills at `rate` weight per second up to `capacity`, which
+    is the burst allowance. Each request takes its endpoint weight. Waiters
+    are served lowest priority value first, FIFO within a lane, and
+    non-order lanes may not spend the last `reserve_fraction` of the
+    bucket, so a burst of health checks cannot starve an order.
+
+    Server feedback tightens the local budget: remaining-quota headers clamp
+    the tokens, and Retry-After or an exhausted quota pauses every lane until
+    the server's reset time.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float,
+                 weights: Optional[Dict[str, float]] = None, default_weight: float = 1.0,
+                 reserve_fraction: float = 0.2, window_limit: Optional[float] = None,
+                 window_seconds: float = 60.0):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self.reserve = self.capacity * reserve_fraction
+        self.window_limit = window_limit
+        self.window_seconds = window_seconds
+
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.consecutive_throttles = 0
+
+        self._lock = threading.Lock()
+        self._waiters = []  # heap of (priority, sequence, weight, future)
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.granted = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.server_throttles = 0
+        self.lane_grants = {lane: 0 for lane in LANE_NAMES}
+
+    # ------------------------------------------------------------------ #
+    # Bucket arithmetic (call with the lock held)
+    # ------------------------------------------------------------------ #
+    def weight_for(self, endpoint: Optional[str]) -> float:
+        if endpoint is None:
+            return self.default_weight
+        return self.weights.get(endpoint, self.default_weight)
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def _floor(self, weight: float, priority: int) -> float:
+        """Tokens a lane must leave behind; never so many the request can't fit"""
+        if priority <= PRIORITY_ORDER:
+            return 0.0
+        return min(self.reserve, self.capacity - weight)
+
+    def _delay(self, weight: float, priority: int, now: float) -> float:
+        """Seconds until `weight` can be granted in `priority`'s lane (0 = now)"""
+        if now < self.paused_until:
+            return self.paused_until - now
+        shortfall = weight + self._floor(weight, priority) - self.tokens
+        if shortfall <= 0:
+            return 0.0
+        return shortfall / self.rate
+
+    def _grant(self, weight: float, priority: int):
+        self.tokens -= weight
+        self.granted += 1
+        self.lane_grants[priority] = self.lane_grants.get(priority, 0) + 1
+
+    def _blocked_by_waiters(self, priority: int) -> bool:
+        """Whether a queued request in this or a more urgent lane is ahead of us"""
+        if not self._waiters:
+            return False
+        head_priority, _, _, head_future = self._waiters[0]
+        return not head_future.done() and head_priority <= priority
+
+    # ------------------------------------------------------------------ #
+    # Acquisition
+    # ------------------------------------------------------------------ #
+    async def acquire(self, endpoint: Optional[str] = None, priority: int = PRIORITY_ACCOUNT,
+                      weight: Optional[float] = None) -> float:
+        """Wait for budget; returns the seconds spent waiting"""
+        weight = min(self.weight_for(endpoint) if weight is None else weight, self.capacity)
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if not self._blocked_by_waiters(priority) and self._delay(weight, priority, now) == 0:
+                self._grant(weight, priority)
+                return 0.0
+
+            future = loop.create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), weight, future))
+            new_head = self._waiters[0][3] is future
+
+        dispatcher = self._dispatcher
+        if dispatcher is None or dispatcher.done() or dispatcher.get_loop() is not loop:
+            self._dispatcher = loop.create_task(self._dispatch())
+        elif new_head:
+            # The dispatcher may be sleeping for a slower lane; restart it for the new head
+            dispatcher.cancel()
+            self._dispatcher = loop.create_task(self._dispatch())
+
+        started = time.monotonic()
+        await future
+        waited = time.monotonic() - started
+        self.delayed += 1
+        self.total_wait += waited
+        return waited
+
+    async def _dispatch(self):
+        """Grant queued requests in priority order as tokens refill"""
+        while True:
+            with self._lock:
+                while self._waiters and self._waiters[0][3].done():
+                    heapq.heappop(self._waiters)  # cancelled waiter
+                if not self._waiters:
+                    return
+
+                now = time.monotonic()
+                self._refill(now)
+                priority, _, weight, future = self._waiters[0]
+                delay = self._delay(weight, priority, now)
+                if delay == 0:
+                    heapq.heappop(self._waiters)
+                    self._grant(weight, priority)
+                    future.set_result(None)
+                    continue
+
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self, endpoint: Optional[str] = None, priority: int = PRIORITY_ACCOUNT,
+                         weight: Optional[float] = None) -> float:
+        """Thread-blocking acquire for synchronous clients sharing the same budget"""
+        weight = min(self.weight_for(endpoint) if weight is None else weight, self.capacity)
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._delay(weight, priority, now)
+                if delay == 0 and not self._blocked_by_waiters(priority):
+                    self._grant(weight, priority)
+                    break
+            time.sleep(max(delay, 0.001))
+
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            self.delayed += 1
+            self.total_wait += waited
+        return waited
+
+    # ------------------------------------------------------------------ #
+    # Server feedback
+    # ------------------------------------------------------------------ #
+    def _pause(self, seconds: float, reason: str):
+        with self._lock:
+            until = time.monotonic() + max(0.0, seconds)
+            if until > self.paused_until:
+                self.paused_until = until
+                self.tokens = min(self.tokens, 0.0)
+        self.server_throttles += 1
+        logger.warning(f"{self.name} rate limit: pausing {seconds:.2f}s ({reason})")
+
+    def _clamp(self, remaining: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, max(remaining, 0.0))
+
+    def update_from_headers(self, headers: Optional[Mapping[str, Any]], status: Optional[int] = None):
+        """Adapt to rate-limit headers (Binance, Bybit, Alpaca/generic, Retry-After)"""
+        headers = _lower_headers(headers)
+        now_wall = time.time()
+
+        retry_after = _header_float(headers, "retry-after")
+        if retry_after is not None:
+            self._pause(retry_after, "Retry-After")
+        elif status in (418, 429):
+            self.consecutive_throttles += 1
+            self._pause(min(60.0, 2.0 ** (self.consecutive_throttles - 1)), f"HTTP {status}")
+        else:
+            self.consecutive_throttles = 0
+
+        # Binance: weight used in the current one-minute window
+        used = _header_float(headers, "x-mbx-used-weight-1m")
+        if used is not None and self.window_limit:
+            remaining = self.window_limit - used
+            if remaining <= 0:
+                self._pause(self.window_seconds - (now_wall % self.window_seconds), "weight window exhausted")
+            else:
+                self._clamp(remaining)
+
+        # Bybit: remaining requests and reset timestamp (ms)
+        remaining = _header_float(headers, "x-bapi-limit-status")
+        reset_ms = _header_float(headers, "x-bapi-limit-reset-timestamp")
+        if remaining is not None:
+            if remaining <= 0 and reset_ms is not None:
+                self._pause(reset_ms / 1000.0 - now_wall, "request quota exhausted")
+            else:
+                self._clamp(remaining)
+
+        # Alpaca and other X-RateLimit-* style APIs (reset in epoch seconds)
+        remaining = _header_float(headers, "x-ratelimit-remaining")
+        reset = _header_float(headers, "x-ratelimit-reset")
+        if remaining is not None:
+            if remaining <= 0 and reset is not None:
+                self._pause(reset - now_wall, "request quota exhausted")
+            else:
+                self._clamp(remaining)
+
+    # ------------------------------------------------------------------ #
+    # Reporting
+    # ------------------------------------------------------------------ #
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(time.monotonic())
+            waiting = {name: 0 for name in LANE_NAMES.values()}
+            for priority, _, _, future in self._waiters:
+                if not future.done():
+                    waiting[LANE_NAMES.get(priority, str(priority))] += 1
+            return {
+                "name": self.name,
+                "tokens": round(self.tokens, 3),
+                "capacity": self.capacity,
+                "rate": self.rate,
+                "reserve": self.reserve,
+                "paused_for": max(0.0, self.paused_until - time.monotonic()),
+                "granted": self.granted,
+                "delayed": self.delayed,
+                "average_wait": self.total_wait / self.delayed if self.delayed else 0.0,
+                "server_throttles": self.server_throttles,
+                "lane_grants": {LANE_NAMES.get(k, str(k)): v for k, v in self.lane_grants.items()},
+                "waiting": waiting
+            }
+
+
+# Shared limiters, one per exchange budget
+rate_limiters: Dict[str, WeightedRateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, **config) -> WeightedRateLimiter:
+    """Return the shared limiter for `name`, creating it from `config` on first use"""
+    with _registry_lock:
+        limiter = rate_limiters.get(name)
+        if limiter is None:
+            limiter = WeightedRateLimiter(name, **config)
+            rate_limiters[name] = limiter
+        return limiter
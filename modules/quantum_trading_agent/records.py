@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Position Records - Compact Slotted Position and Trade State
+Epoch-nanosecond timestamps and interned symbols; dicts only at API edges
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SIDE_LONG = 1
+SIDE_SHORT = -1
+
+STATUS_OPEN = "OPEN"
+STATUS_CLOSED = "CLOSED"
+
+REASON_STOP_LOSS = "STOP_LOSS"
+REASON_TAKE_PROFIT = "TAKE_PROFIT"
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class SymbolTable:
+    """Interns symbol strings to small ints.
+
+    IDs are local to the process; records cross process or API boundaries
+    as dicts carrying the symbol name, never the ID. Lookups of known
+    symbols take no lock; new symbols are added under one, since engines
+    intern from executor threads.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._lock = threading.Lock()
+
+    def intern(self, symbol: str) -> int:
+        symbol_id = self.ids.get(symbol)
+        if symbol_id is None:
+            with self._lock:
+                symbol_id = self.ids.get(symbol)
+                if symbol_id is None:
+                    symbol_id = len(self.names)
+                    # Name first, so any published ID resolves
+                    self.names.append(symbol)
+                    self.ids[symbol] = symbol_id
+        return symbol_id
+
+    def name(self, symbol_id: int) -> str:
+        return self.names[symbol_id]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def side_code(side: str) -> int:
+    return SIDE_LONG if side.upper() in ("LONG", "BUY") else SIDE_SHORT
+
+
+def side_name(code: int) -> str:
+    return "LONG" if code == SIDE_LONG else "SHORT"
+
+
+def now_ns() -> int:
+    return time.time_ns()
+
+
+def ns_to_iso(ns: int) -> Optional[str]:
+    """Local-time ISO string, matching the datetime.now().isoformat() fields it replaces"""
+    if not ns:
+        return None
+    return datetime.fromtimestamp(ns / NS_PER_SECOND).isoformat()
+
+
+def iso_to_ns(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    return int(datetime.fromisoformat(text).timestamp() * NS_PER_SECOND)
+
+
+@dataclass(slots=True)
+class PositionRecord:
+    """One open or closed position.
+
+    `size` is what the caller sized the trade in (quote notional or base
+    quantity); `units` is the base quantity PnL is computed from, so both
+    sizing conventions share one PnL formula. Rarely read fields (strategy,
+    confidence, ...) live in `extra`.
+    """
+    position_id: str
+    symbol_id: int
+    side: int
+    size: float
+    units: float
+    entry_price: float
+    margin: float = 0.0
+    stop_loss: float = 0.0
+    take_profit: float = 0.0
+    opened_ns: int = 0
+    deadline_ns: int = 0  # 0: no time exit
+    current_price: float = 0.0
+    unrealized_pnl: float = 0.0
+    updated_ns: int = 0
+    closed_ns: int = 0
+    exit_price: float = 0.0
+    realized_pnl: float = 0.0
+    exit_reason: str = ""
+    status: str = STATUS_OPEN
+    extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def open(cls, position_id: str, symbol: str, side: str, entry_price: float,
+             quantity: Optional[float] = None, notional: Optional[float] = None, margin: float = 0.0,
+             stop_loss: float = 0.0, take_profit: float = 0.0, opened_ns: Optional[int] = None,
+             hold_seconds: Optional[float] = None, extra: Optional[Dict[str, Any]] = None) -> "PositionRecord":
+        """New open position sized by base `quantity` or by quote `notional`"""
+        opened_ns = opened_ns or now_ns()
+        if quantity is not None:
+            size = units = float(quantity)
+        else:
+            size = float(notional or 0.0)
+            units = size / entry_price if entry_price else 0.0
+        return cls(
+            position_id=position_id,
+            symbol_id=symbols.intern(symbol),
+            side=side_code(side),
+            size=size,
+            units=units,
+            entry_price=float(entry_price),
+            margin=float(margin),
+            stop_loss=float(stop_loss),
+            take_profit=float(take_profit),
+            opened_ns=opened_ns,
+            deadline_ns=opened_ns + int(hold_seconds * NS_PER_SECOND) if hold_seconds is not None else 0,
+            current_price=float(entry_price),
+            extra=extra
+        )
+
+    @property
+    def symbol(self) -> str:
+        return symbols.name(self.symbol_id)
+
+    @property
+    def side_name(self) -> str:
+        return side_name(self.side)
+
+    @property
+    def is_open(self) -> bool:
+        return not self.closed_ns
+
+    @property
+    def deadline(self) -> Optional[float]:
+        """Time exit as epoch seconds, for the exit book"""
+        return self.deadline_ns / NS_PER_SECOND if self.deadline_ns else None
+
+    def pnl_at(self, price: float) -> float:
+        return self.side * (price - self.entry_price) * self.units
+
+    def exit_reason_at(self, price: float) -> Optional[str]:
+        """STOP_LOSS or TAKE_PROFIT if `price` reaches either level"""
+        if self.side == SIDE_LONG:
+            if price <= self.stop_loss:
+                return REASON_STOP_LOSS
+            if price >= self.take_profit:
+                return REASON_TAKE_PROFIT
+        else:
+            if price >= self.stop_loss:
+                return REASON_STOP_LOSS
+            if price <= self.take_profit:
+                return REASON_TAKE_PROFIT
+        return None
+
+    def expired(self, ns: Optional[int] = None) -> bool:
+        return bool(self.deadline_ns) and (ns or now_ns()) >= self.deadline_ns
+
+    def mark(self, price: float, ns: Optional[int] = None) -> float:
+        self.current_price = price
+        self.unrealized_pnl = self.pnl_at(price)
+        self.updated_ns = ns or now_ns()
+        return self.unrealized_pnl
+
+    def close(self, price: float, reason: str, ns: Optional[int] = None,
+              status: str = STATUS_CLOSED) -> float:
+        self.exit_price = price
+        self.realized_pnl = self.pnl_at(price)
+        self.exit_reason = reason
+        self.closed_ns = ns or now_ns()
+        self.status = status
+        return self.realized_pnl
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Read an `extra` field"""
+        return self.extra.get(key, default) if self.extra else default
+
+
+# Process-wide symbol table shared by all records
+symbols = SymbolTable()
+
+
+def intern_symbol(symbol: str) -> int:
+    return symbols.intern(symbol)
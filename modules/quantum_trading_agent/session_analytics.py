@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Session Analytics - Vectorized Stats over Exported Trading Sessions
+Per-strategy, per-symbol and per-session trade performance computed in bulk from columnar files
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable
+
+import numpy as np
+
+from .session_export import EXPORT_DIR, HAS_PYARROW
+
+if HAS_PYARROW:
+    import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+
+def _read_file(path: Path, columns: Optional[List[str]]) -> Dict[str, np.ndarray]:
+    """Only the requested columns are decompressed"""
+    if path.suffix == ".parquet":
+        table = pq.read_table(path, columns=[c for c in columns if c in pq.read_schema(path).names]
+                              if columns else None)
+        return {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+    with np.load(path, allow_pickle=False) as data:
+        names = [c for c in columns if c in data.files] if columns else data.files
+        return {name: data[name] for name in names}
+
+
+def load_table(table: str, export_dir: str = EXPORT_DIR, session_ids: Optional[Iterable[str]] = None,
+               columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """Concatenate a table's exported sessions into one array per column.
+
+    A column is numeric only if it is numeric in every session that has
+    it; gaps are filled with NaN, or '' for text columns.
+    """
+    directory = Path(export_dir) / table
+    wanted = set(session_ids) if session_ids is not None else None
+    parts = []
+    for path in sorted(directory.glob("*.npz")) + sorted(directory.glob("*.parquet")):
+        if wanted is not None and path.stem not in wanted:
+            continue
+        try:
+            part = _read_file(path, columns)
+            if part:
+                parts.append(part)
+        except Exception as e:
+            logger.error(f"Error reading {path}: {e}")
+    if not parts:
+        return {name: np.zeros(0) for name in columns or []}
+
+    names = list(dict.fromkeys(columns or [name for part in parts for name in part]))
+    merged = {}
+    for name in names:
+        present = [part[name] for part in parts if name in part]
+        numeric = bool(present) and all(column.dtype.kind == 'f' for column in present)
+        pieces = []
+        for part in parts:
+            length = len(next(iter(part.values())))
+            if name in part and (numeric or part[name].dtype.kind != 'f'):
+                pieces.append(part[name])
+            elif name in part:
+                column = part[name]
+                pieces.append(np.where(np.isnan(column), "", column.astype(np.str_)))
+            else:
+                pieces.append(np.full(length, np.nan) if numeric else np.full(length, "", dtype=np.str_))
+        merged[name] = np.concatenate(pieces)
+    return merged
+
+
+def group_stats(keys: np.ndarray, pnl: np.ndarray, wins: Optional[np.ndarray] = None,
+                losses: Optional[np.ndarray] = None, order: Optional[np.ndarray] = None) -> Dict[str, Dict[str, Any]]:
+    """Trade stats per distinct key.
+
+    `wins`/`losses` are boolean masks (default pnl > 0 / pnl <= 0) and
+    `order` (e.g. timestamps) sequences each group's equity curve for max
+    drawdown. Sharpe is per trade, as in performance_stats.
+    """
+    if not len(keys):
+        return {}
+    pnl = np.nan_to_num(np.asarray(pnl, dtype=np.float64))
+    wins = pnl > 0 if wins is None else np.asarray(wins, dtype=bool)
+    losses = ~wins if losses is None else np.asarray(losses, dtype=bool)
+
+    groups, inverse = np.unique(keys, return_inverse=True)
+    count = np.bincount(inverse)
+    total = np.bincount(inverse, weights=pnl)
+    mean = total / count
+    deviation = pnl - mean[inverse]
+    variance = np.bincount(inverse, weights=deviation * deviation) / np.maximum(count - 1, 1)
+    variance[count < 2] = 0.0
+    std = np.sqrt(variance)
+    gross_profit = np.bincount(inverse, weights=np.where(pnl > 0, pnl, 0.0))
+    gross_loss = -np.bincount(inverse, weights=np.where(pnl > 0, 0.0, pnl))
+    win_count = np.bincount(inverse, weights=wins)
+    loss_count = np.bincount(inverse, weights=losses)
+
+    # Equity curves: sort by group then time, cumulative PnL restarted per group
+    sequence = np.lexsort((order, inverse)) if order is not None else np.argsort(inverse, kind="stable")
+    equity = np.cumsum(pnl[sequence])
+    ends = np.cumsum(count)
+    starts = ends - count
+    max_drawdown = np.zeros(len(groups))
+    for g in range(len(groups)):
+        curve = equity[starts[g]:ends[g]] - (equity[starts[g] - 1] if starts[g] else 0.0)
+        peaks = np.maximum(np.maximum.accumulate(curve), 0.0)
+        max_drawdown[g] = (peaks - curve).max()
+
+    decided = win_count + loss_count
+    stats = {}
+    for g, key in enumerate(groups):
+        stats[str(key)] = {
+            "trades": int(count[g]),
+            "wins": int(win_count[g]),
+            "losses": int(loss_count[g]),
+            "win_rate": float(win_count[g] / decided[g]) if decided[g] else 0.0,
+            "total_pnl": float(total[g]),
+            "mean": float(mean[g]),
+            "std": float(std[g]),
+            "sharpe": float(mean[g] / std[g]) if std[g] > 0 else 0.0,
+            "profit_factor": float(gross_profit[g] / gross_loss[g]) if gross_loss[g] > 0 else (
+                float('inf') if gross_profit[g] > 0 else 0.0),
+            "gross_profit": float(gross_profit[g]),
+            "gross_loss": float(gross_loss[g]),
+            "max_drawdown": float(max_drawdown[g])
+        }
+    return stats
+
+
+class SessionAnalytics:
+    """Bulk queries over the files written by SessionExporter.
+
+    Closed trades follow the recorder's rule (TRADE_CLOSE with an
+    outcome); wins and losses come from the outcome. Loaded columns are
+    cached per session selection, so several breakdowns share one read.
+    """
+
+    TRADE_COLUMNS = ["session_id", "ts", "event_type", "symbol", "strategy", "outcome", "pnl", "confidence"]
+
+    def __init__(self, export_dir: str = EXPORT_DIR):
+        self.export_dir = export_dir
+        self._cache: Dict[Any, Dict[str, np.ndarray]] = {}
+
+    def closed_trades(self, session_ids: Optional[Iterable[str]] = None,
+                      columns: Iterable[str] = ()) -> Dict[str, np.ndarray]:
+        """Closed-trade columns (TRADE_COLUMNS plus any extra `columns`)"""
+        session_ids = sorted(session_ids) if session_ids is not None else None
+        names = list(dict.fromkeys(self.TRADE_COLUMNS + list(columns)))
+        cache_key = (tuple(session_ids) if session_ids is not None else None, tuple(names))
+        if cache_key not in self._cache:
+            events = load_table("trade_events", self.export_dir, session_ids, names)
+            if len(events["event_type"]):
+                mask = (events["event_type"] == "TRADE_CLOSE") & (events["outcome"] != "")
+                events = {name: column[mask] for name, column in events.items()}
+            self._cache[cache_key] = events
+        return self._cache[cache_key]
+
+    def stats_by(self, column: str, session_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Trade stats grouped by any exported trade_events column"""
+        trades = self.closed_trades(session_ids, [column])
+        if not len(trades["pnl"]):
+            return {}
+        return group_stats(trades[column], trades["pnl"],
+                           wins=trades["outcome"] == "WIN", losses=trades["outcome"] == "LOSS",
+                           order=trades["ts"])
+
+    def by_symbol(self, session_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        return self.stats_by("symbol", session_ids)
+
+    def by_strategy(self, session_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        return self.stats_by("strategy", session_ids)
+
+    def by_session(self, session_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        return self.stats_by("session_id", session_ids)
+
+    def analysis_by_symbol(self, session_ids: Optional[Iterable[str]] = None,
+                           fields: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Market-analysis counts, mean confidence, recommendation mix and the
+        mean of any flattened numeric `fields` (e.g. "analysis_data.rsi") per symbol"""
+        fields = fields or []
+        analysis = load_table("market_analysis", self.export_dir, session_ids,
+                              ["symbol", "confidence", "recommendation"] + fields)
+        if not len(analysis["symbol"]):
+            return {}
+        symbols, inverse = np.unique(analysis["symbol"], return_inverse=True)
+        count = np.bincount(inverse)
+        confidence = np.bincount(inverse, weights=np.nan_to_num(analysis["confidence"])) / count
+        recommendations, rec_inverse = np.unique(analysis["recommendation"], return_inverse=True)
+        mix = np.zeros((len(symbols), len(recommendations)), dtype=np.int64)
+        np.add.at(mix, (inverse, rec_inverse), 1)
+
+        field_means = {}
+        for field in fields:
+            values = analysis[field]
+            if values.dtype.kind != 'f':
+                continue
+            present = ~np.isnan(values)
+            sums = np.bincount(inverse[present], weights=values[present], minlength=len(symbols))
+            counts = np.bincount(inverse[present], minlength=len(symbols))
+            field_means[field] = np.divide(sums, counts, out=np.full(len(symbols), np.nan), where=counts > 0)
+
+        return {
+            str(symbol): {
+                "analyses": int(count[i]),
+                "avg_confidence": float(confidence[i]),
+                "recommendations": {str(rec): int(mix[i, j]) for j, rec in enumerate(recommendations) if mix[i, j]},
+                **{f"avg_{field}": float(means[i]) for field, means in field_means.items()}
+            }
+            for i, symbol in enumerate(symbols)
+        }
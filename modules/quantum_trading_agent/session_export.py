@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Session Export - Columnar Snapshots of Recorded Trading Sessions
+Writes trade_events and market_analysis per session as typed columns with the JSON fields flattened
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable
+import sqlite3
+
+import numpy as np
+
+# Parquet output when pyarrow is installed; compressed .npz otherwise
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.getenv("SESSION_EXPORT_DIR", "logs/session_export")
+SESSION_DB = "logs/trading_sessions.db"
+
+FORMAT_NPZ = "npz"
+FORMAT_PARQUET = "parquet"
+
+EXPORT_CHUNK_ROWS = 50000
+
+# Always exported as text, even for a session where every value is NULL
+TEXT_COLUMNS = {"session_id", "timestamp", "event_type", "symbol", "action", "outcome",
+                "notes", "recommendation", "strategy"}
+
+# Per table: plain columns, then the JSON text columns to flatten
+EXPORT_TABLES = {
+    "trade_events": (
+        ("event_id", "session_id", "timestamp", "event_type", "symbol", "action",
+         "quantity", "price", "confidence", "outcome", "pnl", "notes"),
+        ("quantum_params",)
+    ),
+    "market_analysis": (
+        ("analysis_id", "session_id", "timestamp", "symbol", "confidence", "recommendation"),
+        ("analysis_data", "quantum_state")
+    ),
+}
+
+
+def flatten_json(value: Any, prefix: str, out: Dict[str, Any]):
+    """Nested dicts become `prefix.key.subkey` entries; lists stay JSON text"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flatten_json(item, f"{prefix}.{key}", out)
+    elif isinstance(value, (list, tuple)):
+        out[prefix] = json.dumps(value)
+    else:
+        out[prefix] = value
+
+
+def to_column(values: List[Any], text: bool = False) -> np.ndarray:
+    """Typed array for one column: float64 (NaN for missing) when every
+    present value is numeric or boolean, otherwise unicode ('' for missing)"""
+    present = [v for v in values if v is not None]
+    if not text and all(isinstance(v, (int, float, bool)) for v in present):
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+    return np.array(["" if v is None else str(v) for v in values], dtype=np.str_)
+
+
+class SessionExporter:
+    """Exports the session database one (table, session) file at a time.
+
+    Files land in `<export_dir>/<table>/<session_id>.npz` (one compressed
+    array per column, loadable column by column) or `.parquet`. Each JSON
+    blob is parsed once here and flattened into typed columns such as
+    `quantum_params.coherence`, so analysis never decodes JSON again.
+    Timestamps become epoch seconds in a `ts` column, and trade events get
+    a `strategy` column from quantum_params or, failing that, the session
+    config passed to start_session. Completed sessions already on disk
+    are skipped; active ones are re-exported each run.
+    """
+
+    def __init__(self, db_path: str = SESSION_DB, export_dir: str = EXPORT_DIR,
+                 file_format: Optional[str] = None):
+        self.db_path = Path(db_path)
+        self.export_dir = Path(export_dir)
+        self.file_format = file_format or (FORMAT_PARQUET if HAS_PYARROW else FORMAT_NPZ)
+        if self.file_format == FORMAT_PARQUET and not HAS_PYARROW:
+            raise ValueError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def path_for(self, table: str, session_id: str) -> Path:
+        return self.export_dir / table / f"{session_id}.{self.file_format}"
+
+    def export(self, session_ids: Optional[Iterable[str]] = None, force: bool = False) -> Dict[str, Any]:
+        """Export the given (default: all) sessions; returns rows written per table"""
+        written = {table: 0 for table in EXPORT_TABLES}
+        exported = []
+        try:
+            with self._connect() as conn:
+                sessions = conn.execute("SELECT session_id, status, session_notes FROM sessions").fetchall()
+                wanted = set(session_ids) if session_ids is not None else None
+                for session_id, status, notes in sessions:
+                    if wanted is not None and session_id not in wanted:
+                        continue
+                    done = status == "COMPLETED" and all(
+                        self.path_for(table, session_id).exists() for table in EXPORT_TABLES)
+                    if done and not force:
+                        continue
+                    try:
+                        session_strategy = json.loads(notes or "{}").get("strategy", "")
+                    except (ValueError, AttributeError):
+                        session_strategy = ""
+                    for table in EXPORT_TABLES:
+                        written[table] += self._export_table(conn, table, session_id, session_strategy)
+                    exported.append(session_id)
+            logger.info(f"Exported {len(exported)} sessions to {self.export_dir}")
+            return {"success": True, "sessions": exported, "rows": written, "format": self.file_format}
+
+        except Exception as e:
+            logger.error(f"Error exporting sessions: {e}")
+            return {"success": False, "error": str(e), "sessions": exported, "rows": written}
+
+    def _export_table(self, conn: sqlite3.Connection, table: str, session_id: str,
+                      session_strategy: str) -> int:
+        plain, json_columns = EXPORT_TABLES[table]
+        cursor = conn.execute(
+            f"SELECT {', '.join(plain + json_columns)} FROM {table} WHERE session_id = ? ORDER BY 1",
+            (session_id,))
+
+        records: List[Dict[str, Any]] = []
+        while True:
+            rows = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+            if not rows:
+                break
+            for row in rows:
+                record = dict(zip(plain, row))
+                for name, text in zip(json_columns, row[len(plain):]):
+                    try:
+                        flatten_json(json.loads(text) if text else {}, name, record)
+                    except ValueError:
+                        record[name] = text
+                record["ts"] = datetime.fromisoformat(record["timestamp"]).timestamp()
+                if table == "trade_events":
+                    record["strategy"] = record.get("quantum_params.strategy") or session_strategy
+                records.append(record)
+
+        names = list(dict.fromkeys(key for record in records for key in record))
+        columns = {name: to_column([record.get(name) for record in records], name in TEXT_COLUMNS)
+                   for name in names}
+        self._write(self.path_for(table, session_id), columns)
+        return len(records)
+
+    def _write(self, path: Path, columns: Dict[str, np.ndarray]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + ".tmp")
+        if self.file_format == FORMAT_PARQUET:
+            pq.write_table(pa.table(columns), partial, compression="zstd")
+        else:
+            with open(partial, 'wb') as f:
+                np.savez_compressed(f, **columns)
+        os.replace(partial, path)
+
+
+def export_sessions(session_ids: Optional[Iterable[str]] = None, db_path: str = SESSION_DB,
+                    export_dir: str = EXPORT_DIR) -> Dict[str, Any]:
+    """Export recorded sessions with the default exporter settings"""
+    return SessionExporter(db_path, export_dir).export(session_ids)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(export_sessions(), indent=2))
@@ -5,27 +5,489 @@ Phase 1 Trillion Autonomous Quantum Trading Agent
 """
 
 import asyncio
+import atexit
 import json
 import logging
+import queue
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import sqlite3
 import threading
 
+from .executors import executors
+
 logger = logging.getLogger(__name__)
 
-class TradingSessionRecorder:
+WRITER_BATCH_SIZE = 500      # rows per transaction at most
+WRITER_MAX_LATENCY = 0.05    # seconds a queued row may wait for its batch
+WRITER_SYNC_TIMEOUT = 1.0    # seconds a read waits for earlier rows to commit
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA busy_timeout=5000",
+)
+
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_trade_events_session_type ON trade_events (session_id, event_type)",
+    "CREATE INDEX IF NOT EXISTS idx_trade_events_session_symbol ON trade_events (session_id, symbol)",
+    "CREATE INDEX IF NOT EXISTS idx_trade_events_timestamp ON trade_events (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_market_analysis_session_time ON market_analysis (session_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_market_analysis_symbol_time ON market_analysis (symbol, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_sessions_start_time ON sessions (start_time)",
+)
+
+_INSERT_TRADE_EVENT = '''
+INSERT INTO trade_events (
+    session_id, timestamp, event_type, symbol, action,
+    quantity, price, confidence, quantum_params, outcome, pnl, notes
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_INSERT_MARKET_ANALYSIS = '''
+INSERT INTO market_analysis (
+    session_id, timestamp, symbol, analysis_data,
+    confidence, recommendation, quantum_state
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+_STOP = object()
+
+
+class _Marker:
+    """Queue item set by the writer once every statement queued before it is committed"""
+
+    __slots__ = ("event",)
+
     def __init__(self):
-        self.db_path = Path("logs/trading_sessions.db")
+        self.event = threading.Event()
+
+EQUITY_RESOLUTIONS = (60, 3600, 86400)  # equity bucket widths in seconds, finest first
+
+_ROLLUP_SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS session_rollups (
+        session_id TEXT PRIMARY KEY,
+        events INTEGER NOT NULL DEFAULT 0,
+        closed_trades INTEGER NOT NULL DEFAULT 0,
+        wins INTEGER NOT NULL DEFAULT 0,
+        losses INTEGER NOT NULL DEFAULT 0,
+        total_pnl REAL NOT NULL DEFAULT 0.0,
+        gross_profit REAL NOT NULL DEFAULT 0.0,
+        gross_loss REAL NOT NULL DEFAULT 0.0,
+        close_confidence_sum REAL NOT NULL DEFAULT 0.0,
+        close_confidence_count INTEGER NOT NULL DEFAULT 0,
+        equity REAL NOT NULL DEFAULT 0.0,
+        peak_equity REAL NOT NULL DEFAULT 0.0,
+        max_drawdown REAL NOT NULL DEFAULT 0.0,
+        first_ts REAL,
+        last_ts REAL
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS symbol_rollups (
+        session_id TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        events INTEGER NOT NULL DEFAULT 0,
+        closed_trades INTEGER NOT NULL DEFAULT 0,
+        wins INTEGER NOT NULL DEFAULT 0,
+        losses INTEGER NOT NULL DEFAULT 0,
+        total_pnl REAL NOT NULL DEFAULT 0.0,
+        last_ts REAL,
+        PRIMARY KEY (session_id, symbol)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS equity_buckets (
+        session_id TEXT NOT NULL,
+        resolution INTEGER NOT NULL,
+        bucket_start INTEGER NOT NULL,
+        trades INTEGER NOT NULL,
+        wins INTEGER NOT NULL,
+        losses INTEGER NOT NULL,
+        pnl REAL NOT NULL,
+        equity_close REAL NOT NULL,
+        equity_high REAL NOT NULL,
+        equity_low REAL NOT NULL,
+        max_drawdown REAL NOT NULL,
+        PRIMARY KEY (session_id, resolution, bucket_start)
+    ) WITHOUT ROWID
+    ''',
+)
+
+_UPSERT_SESSION_ROLLUP = '''
+INSERT INTO session_rollups (
+    session_id, events, closed_trades, wins, losses, total_pnl, gross_profit, gross_loss,
+    close_confidence_sum, close_confidence_count, equity, peak_equity, max_drawdown, first_ts, last_ts
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (session_id) DO UPDATE SET
+    events = events + excluded.events,
+    closed_trades = closed_trades + excluded.closed_trades,
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses,
+    total_pnl = total_pnl + excluded.total_pnl,
+    gross_profit = gross_profit + excluded.gross_profit,
+    gross_loss = gross_loss + excluded.gross_loss,
+    close_confidence_sum = close_confidence_sum + excluded.close_confidence_sum,
+    close_confidence_count = close_confidence_count + excluded.close_confidence_count,
+    equity = excluded.equity,
+    peak_equity = excluded.peak_equity,
+    max_drawdown = excluded.max_drawdown,
+    first_ts = MIN(first_ts, excluded.first_ts),
+    last_ts = MAX(last_ts, excluded.last_ts)
+'''
+
+_UPSERT_SYMBOL_ROLLUP = '''
+INSERT INTO symbol_rollups (session_id, symbol, events, closed_trades, wins, losses, total_pnl, last_ts)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (session_id, symbol) DO UPDATE SET
+    events = events + excluded.events,
+    closed_trades = closed_trades + excluded.closed_trades,
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses,
+    total_pnl = total_pnl + excluded.total_pnl,
+    last_ts = MAX(last_ts, excluded.last_ts)
+'''
+
+_UPSERT_EQUITY_BUCKET = '''
+INSERT INTO equity_buckets (
+    session_id, resolution, bucket_start, trades, wins, losses, pnl,
+    equity_close, equity_high, equity_low, max_drawdown
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (session_id, resolution, bucket_start) DO UPDATE SET
+    trades = trades + excluded.trades,
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses,
+    pnl = pnl + excluded.pnl,
+    equity_close = excluded.equity_close,
+    equity_high = MAX(equity_high, excluded.equity_high),
+    equity_low = MIN(equity_low, excluded.equity_low),
+    max_drawdown = MAX(max_drawdown, excluded.max_drawdown)
+'''
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class BatchedWriter:
+    """Background thread that owns the write connection.
+
+    `submit` queues one (sql, params) statement and returns immediately.
+    The thread groups queued statements into one transaction of up to
+    `batch_size` rows, waiting at most `max_latency` after the first one,
+    and runs consecutive statements with the same SQL as one executemany.
+    Statements apply in submission order. If a batch fails it is replayed
+    statement by statement so one bad row does not drop the rest.
+
+    Reads call `sync`, which waits only for the statements queued before
+    the call, never for rows producers keep adding afterwards.
+
+    An optional `listener` (see SessionRollups) sees every committed batch
+    inside the same transaction: `apply(conn, statements)` before COMMIT,
+    then `commit()` after it or `rollback()` if the transaction failed.
+    """
+
+    def __init__(self, db_path: Path, batch_size: int = WRITER_BATCH_SIZE,
+                 max_latency: float = WRITER_MAX_LATENCY, listener: Optional[Any] = None):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.listener = listener
+        self.queue: "queue.Queue" = queue.Queue()
+        self.conn = _connect(db_path)
+
+        # Metrics
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_batch = 0
+
+        self.thread = threading.Thread(target=self._run, name="session-recorder-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, sql: str, params: Tuple = ()):
+        self.submitted += 1
+        self.queue.put_nowait((sql, params))
+
+    def flush(self):
+        """Block until the queue is empty (shutdown and tests; reads use sync)"""
+        if self.thread.is_alive():
+            self.queue.join()
+
+    def sync(self, timeout: Optional[float] = WRITER_SYNC_TIMEOUT) -> bool:
+        """Wait until the statements submitted before this call are committed.
+
+        Returns False if that takes longer than `timeout`; the caller then
+        reads whatever is committed.
+        """
+        if not self.thread.is_alive():
+            return True
+        marker = _Marker()
+        self.queue.put_nowait(marker)
+        if marker.event.wait(timeout):
+            return True
+        logger.warning(f"Session writer did not reach the read marker within {timeout}s")
+        return False
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put_nowait(_STOP)
+            self.thread.join()
+        self.conn.close()
+
+    def _collect(self, first) -> list:
+        """Gather a batch; a marker or _STOP ends it early so waiters are not held up"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.batch_size and not (batch[-1] is _STOP or isinstance(batch[-1], _Marker)):
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = self._collect(self.queue.get())
+            statements = [item for item in batch if item is not _STOP and not isinstance(item, _Marker)]
+            stopping = batch[-1] is _STOP
+            try:
+                if statements:
+                    self._write(statements)
+            finally:
+                for item in batch:
+                    if isinstance(item, _Marker):
+                        item.event.set()
+                    self.queue.task_done()
+
+    def _write(self, statements: list):
+        try:
+            self.conn.execute("BEGIN")
+            i = 0
+            while i < len(statements):
+                sql = statements[i][0]
+                j = i
+                while j < len(statements) and statements[j][0] == sql:
+                    j += 1
+                self.conn.executemany(sql, [params for _, params in statements[i:j]])
+                i = j
+            if self.listener:
+                self.listener.apply(self.conn, statements)
+            self.conn.execute("COMMIT")
+            if self.listener:
+                self.listener.commit()
+            self.written += len(statements)
+        except Exception as e:
+            self.conn.execute("ROLLBACK")
+            if self.listener:
+                self.listener.rollback()
+            logger.error(f"Error writing session batch of {len(statements)}, retrying per row: {e}")
+            self._write_rows(statements)
+        self.batches += 1
+        self.max_batch = max(self.max_batch, len(statements))
+
+    def _write_rows(self, statements: list):
+        """Replay a failed batch one statement at a time, then apply the survivors"""
+        written = []
+        for sql, params in statements:
+            try:
+                self.conn.execute(sql, params)
+                written.append((sql, params))
+                self.written += 1
+            except Exception as row_error:
+                self.failed += 1
+                logger.error(f"Error writing session row: {row_error}")
+        if self.listener and written:
+            try:
+                self.conn.execute("BEGIN")
+                self.listener.apply(self.conn, written)
+                self.conn.execute("COMMIT")
+                self.listener.commit()
+            except Exception as e:
+                self.conn.execute("ROLLBACK")
+                self.listener.rollback()
+                logger.error(f"Error updating session rollups: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "submitted": self.submitted,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch": self.written / self.batches if self.batches else 0.0,
+            "max_batch": self.max_batch
+        }
+
+
+class SessionRollups:
+    """Writer listener that keeps the rollup tables in step with trade_events.
+
+    Each batch of trade-event inserts is folded into per-session and
+    per-symbol counters and into equity buckets at every resolution in
+    EQUITY_RESOLUTIONS, then upserted in the batch's own transaction, so
+    the rollups are never ahead of or behind the rows they summarize.
+    A trade counts as closed under the same rule as
+    update_performance_metrics: a TRADE_CLOSE event with an outcome. The
+    running equity, peak and drawdown per session are cached here, since
+    the writer is the only thing that changes them.
+    """
+
+    def __init__(self):
+        self.equity: Dict[str, Tuple[float, float, float]] = {}  # session -> (equity, peak, max drawdown)
+        self._staged: Dict[str, Tuple[float, float, float]] = {}
+
+    def _equity_state(self, conn: sqlite3.Connection, session_id: str) -> Tuple[float, float, float]:
+        state = self._staged.get(session_id) or self.equity.get(session_id)
+        if state is None:
+            row = conn.execute("SELECT equity, peak_equity, max_drawdown FROM session_rollups WHERE session_id = ?",
+                               (session_id,)).fetchone()
+            state = tuple(row) if row else (0.0, 0.0, 0.0)
+        return state
+
+    def apply(self, conn: sqlite3.Connection, statements: list):
+        sessions: Dict[str, list] = {}
+        symbols: Dict[Tuple[str, str], list] = {}
+        buckets: Dict[Tuple[str, int, int], list] = {}
+
+        for sql, params in statements:
+            if sql is not _INSERT_TRADE_EVENT:
+                continue
+            session_id, timestamp, event_type, symbol, _, _, _, confidence, _, outcome, pnl, _ = params
+            ts = datetime.fromisoformat(timestamp).timestamp()
+            closed = event_type == "TRADE_CLOSE" and bool(outcome)
+            pnl = (pnl or 0.0) if closed else 0.0
+            win = int(closed and outcome == "WIN")
+            loss = int(closed and outcome == "LOSS")
+
+            totals = sessions.get(session_id)
+            if totals is None:
+                totals = sessions[session_id] = [0, 0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0, ts, ts]
+            totals[0] += 1
+            if event_type == "TRADE_CLOSE" and confidence is not None:
+                totals[7] += confidence
+                totals[8] += 1
+            totals[9] = min(totals[9], ts)
+            totals[10] = max(totals[10], ts)
+
+            if symbol:
+                per_symbol = symbols.get((session_id, symbol))
+                if per_symbol is None:
+                    per_symbol = symbols[(session_id, symbol)] = [0, 0, 0, 0, 0.0, ts]
+                per_symbol[0] += 1
+                per_symbol[5] = max(per_symbol[5], ts)
+
+            if not closed:
+                continue
+            totals[1] += 1
+            totals[2] += win
+            totals[3] += loss
+            totals[4] += pnl
+            if pnl > 0:
+                totals[5] += pnl
+            else:
+                totals[6] -= pnl
+            if symbol:
+                per_symbol[1] += 1
+                per_symbol[2] += win
+                per_symbol[3] += loss
+                per_symbol[4] += pnl
+
+            equity, peak, max_drawdown = self._equity_state(conn, session_id)
+            equity += pnl
+            peak = max(peak, equity)
+            drawdown = peak - equity
+            max_drawdown = max(max_drawdown, drawdown)
+            self._staged[session_id] = (equity, peak, max_drawdown)
+
+            for resolution in EQUITY_RESOLUTIONS:
+                key = (session_id, resolution, int(ts // resolution) * resolution)
+                bucket = buckets.get(key)
+                if bucket is None:
+                    buckets[key] = [1, win, loss, pnl, equity, equity, equity, drawdown]
+                else:
+                    bucket[0] += 1
+                    bucket[1] += win
+                    bucket[2] += loss
+                    bucket[3] += pnl
+                    bucket[4] = equity
+                    bucket[5] = max(bucket[5], equity)
+                    bucket[6] = min(bucket[6], equity)
+                    bucket[7] = max(bucket[7], drawdown)
+
+        if not sessions:
+            return
+        session_rows = []
+        for session_id, totals in sessions.items():
+            equity, peak, max_drawdown = self._equity_state(conn, session_id)
+            session_rows.append((session_id, *totals[:9], equity, peak, max_drawdown, totals[9], totals[10]))
+        conn.executemany(_UPSERT_SESSION_ROLLUP, session_rows)
+        conn.executemany(_UPSERT_SYMBOL_ROLLUP, [key + tuple(values) for key, values in symbols.items()])
+        conn.executemany(_UPSERT_EQUITY_BUCKET, [key + tuple(values) for key, values in buckets.items()])
+
+    def commit(self):
+        self.equity.update(self._staged)
+        self._staged = {}
+
+    def rollback(self):
+        self._staged = {}
+
+    def rebuild(self, conn: sqlite3.Connection, chunk_size: int = 5000):
+        """Recompute every rollup from trade_events (one-time backfill)"""
+        self.equity = {}
+        self._staged = {}
+        conn.execute("BEGIN")
+        try:
+            for table in ("session_rollups", "symbol_rollups", "equity_buckets"):
+                conn.execute(f"DELETE FROM {table}")
+            cursor = conn.execute('''
+            SELECT session_id, timestamp, event_type, symbol, action, quantity, price,
+                   confidence, quantum_params, outcome, pnl, notes
+            FROM trade_events ORDER BY event_id
+            ''')
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                self.apply(conn, [(_INSERT_TRADE_EVENT, row) for row in rows])
+            conn.execute("COMMIT")
+            self.commit()
+        except Exception:
+            conn.execute("ROLLBACK")
+            self.rollback()
+            raise
+
+
+class TradingSessionRecorder:
+    def __init__(self, db_path: Optional[Path] = None, batch_size: int = WRITER_BATCH_SIZE,
+                 max_latency: float = WRITER_MAX_LATENCY):
+        self.db_path = Path(db_path or "logs/trading_sessions.db")
         self.json_log_path = Path("logs/session_records.json")
         self.current_session_id = None
         self.session_start_time = None
         self.session_data = {}
         
-        # Initialize database
+        # Initialize database; writes go through the batched writer thread,
+        # which keeps the rollup tables current, and reads use a separate
+        # connection (WAL lets them run side by side)
+        self.rollups = SessionRollups()
         self.init_database()
+        self.writer = BatchedWriter(self.db_path, batch_size, max_latency, listener=self.rollups)
+        self.read_conn = _connect(self.db_path)
+        self._read_lock = threading.Lock()
+        atexit.register(self.close)
         
         # Recording state
         self.recording_active = False
@@ -37,7 +499,8 @@ class TradingSessionRecorder:
         try:
             self.db_path.parent.mkdir(exist_ok=True)
             
-            with sqlite3.connect(self.db_path) as conn:
+            conn = _connect(self.db_path)
+            try:
                 cursor = conn.cursor()
                 
                 # Sessions table
@@ -94,8 +557,19 @@ class TradingSessionRecorder:
                 )
                 ''')
                 
-                conn.commit()
+                for index in _INDEXES:
+                    cursor.execute(index)
+                
+                # Rollup tables; backfill them once for databases that predate them
+                for table in _ROLLUP_SCHEMA:
+                    cursor.execute(table)
+                if (not cursor.execute("SELECT 1 FROM session_rollups LIMIT 1").fetchone()
+                        and cursor.execute("SELECT 1 FROM trade_events LIMIT 1").fetchone()):
+                    self.rollups.rebuild(conn)
+                    logger.info("Session rollups rebuilt from trade_events")
                 logger.info("Database initialized successfully")
+            finally:
+                conn.close()
                 
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
@@ -118,17 +592,14 @@ class TradingSessionRecorder:
             }
             
             # Store session in database
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                INSERT INTO sessions (session_id, start_time, session_notes)
-                VALUES (?, ?, ?)
-                ''', (
-                    self.current_session_id,
-                    self.session_start_time.isoformat(),
-                    json.dumps(session_config or {})
-                ))
-                conn.commit()
+            self.writer.submit('''
+            INSERT INTO sessions (session_id, start_time, session_notes)
+            VALUES (?, ?, ?)
+            ''', (
+                self.current_session_id,
+                self.session_start_time.isoformat(),
+                json.dumps(session_config or {})
+            ))
             
             logger.info(f"Started trading session: {self.current_session_id}")
             return self.current_session_id
@@ -138,7 +609,7 @@ class TradingSessionRecorder:
             return None
     
     def record_trade_event(self, event_data: Dict[str, Any]):
-        """Record a trade event"""
+        """Record a trade event (queued for the writer thread; never blocks)"""
         if not self.recording_active or not self.current_session_id:
             return
         
@@ -159,20 +630,12 @@ class TradingSessionRecorder:
             }
             
             # Store in database
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                INSERT INTO trade_events (
-                    session_id, timestamp, event_type, symbol, action,
-                    quantity, price, confidence, quantum_params, outcome, pnl, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    event["session_id"], event["timestamp"], event["event_type"],
-                    event["symbol"], event["action"], event["quantity"],
-                    event["price"], event["confidence"], event["quantum_params"],
-                    event["outcome"], event["pnl"], event["notes"]
-                ))
-                conn.commit()
+            self.writer.submit(_INSERT_TRADE_EVENT, (
+                event["session_id"], event["timestamp"], event["event_type"],
+                event["symbol"], event["action"], event["quantity"],
+                event["price"], event["confidence"], event["quantum_params"],
+                event["outcome"], event["pnl"], event["notes"]
+            ))
             
             # Update performance metrics
             self.update_performance_metrics(event)
@@ -186,7 +649,7 @@ class TradingSessionRecorder:
             logger.error(f"Error recording trade event: {e}")
     
     def record_market_analysis(self, analysis_data: Dict[str, Any]):
-        """Record market analysis results"""
+        """Record market analysis results (queued for the writer thread; never blocks)"""
         if not self.recording_active or not self.current_session_id:
             return
         
@@ -201,19 +664,11 @@ class TradingSessionRecorder:
                 "quantum_state": json.dumps(analysis_data.get("quantum_state", {}))
             }
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                INSERT INTO market_analysis (
-                    session_id, timestamp, symbol, analysis_data,
-                    confidence, recommendation, quantum_state
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    analysis["session_id"], analysis["timestamp"], analysis["symbol"],
-                    analysis["analysis_data"], analysis["confidence"],
-                    analysis["recommendation"], analysis["quantum_state"]
-                ))
-                conn.commit()
+            self.writer.submit(_INSERT_MARKET_ANALYSIS, (
+                analysis["session_id"], analysis["timestamp"], analysis["symbol"],
+                analysis["analysis_data"], analysis["confidence"],
+                analysis["recommendation"], analysis["quantum_state"]
+            ))
                 
         except Exception as e:
             logger.error(f"Error recording market analysis: {e}")
@@ -268,31 +723,29 @@ class TradingSessionRecorder:
                 if session_duration.total_seconds() > 0 else 0
             )
             
-            # Update session in database
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                UPDATE sessions SET
-                    end_time = ?,
-                    total_trades = ?,
-                    winning_trades = ?,
-                    losing_trades = ?,
-                    total_pnl = ?,
-                    max_drawdown = ?,
-                    win_rate = ?,
-                    status = 'COMPLETED'
-                WHERE session_id = ?
-                ''', (
-                    end_time.isoformat(),
-                    final_metrics["total_trades"],
-                    final_metrics["winning_trades"],
-                    final_metrics["losing_trades"],
-                    final_metrics["total_pnl"],
-                    final_metrics["max_drawdown"],
-                    final_metrics["win_rate"],
-                    self.current_session_id
-                ))
-                conn.commit()
+            # Update session in database (after every queued event of the session)
+            self.writer.submit('''
+            UPDATE sessions SET
+                end_time = ?,
+                total_trades = ?,
+                winning_trades = ?,
+                losing_trades = ?,
+                total_pnl = ?,
+                max_drawdown = ?,
+                win_rate = ?,
+                status = 'COMPLETED'
+            WHERE session_id = ?
+            ''', (
+                end_time.isoformat(),
+                final_metrics["total_trades"],
+                final_metrics["winning_trades"],
+                final_metrics["losing_trades"],
+                final_metrics["total_pnl"],
+                final_metrics["max_drawdown"],
+                final_metrics["win_rate"],
+                self.current_session_id
+            ))
+            self.writer.sync()
             
             # Generate session report
             session_report = {
@@ -349,8 +802,9 @@ class TradingSessionRecorder:
             return {}
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            self.writer.sync()
+            with self._read_lock:
+                cursor = self.read_conn.cursor()
                 
                 # Get session data
                 cursor.execute('''
@@ -361,21 +815,17 @@ class TradingSessionRecorder:
                 if not session_row:
                     return {}
                 
-                # Get trade events
+                # Live totals from the rollups (the sessions row is only filled in by end_session)
                 cursor.execute('''
-                SELECT COUNT(*) as total_events,
-                       SUM(CASE WHEN outcome = 'WIN' THEN 1 ELSE 0 END) as wins,
-                       SUM(CASE WHEN outcome = 'LOSS' THEN 1 ELSE 0 END) as losses,
-                       AVG(confidence) as avg_confidence
-                FROM trade_events 
-                WHERE session_id = ? AND event_type = 'TRADE_CLOSE'
+                SELECT events, closed_trades, wins, losses, total_pnl, max_drawdown,
+                       close_confidence_sum, close_confidence_count, equity, gross_profit, gross_loss
+                FROM session_rollups WHERE session_id = ?
                 ''', (target_session,))
-                events_stats = cursor.fetchone()
+                rollup = cursor.fetchone()
                 
-                # Get unique symbols traded
+                # Symbols traded, from the per-symbol rollup
                 cursor.execute('''
-                SELECT DISTINCT symbol FROM trade_events 
-                WHERE session_id = ? AND symbol IS NOT NULL
+                SELECT symbol FROM symbol_rollups WHERE session_id = ?
                 ''', (target_session,))
                 symbols = [row[0] for row in cursor.fetchall()]
                 
@@ -383,7 +833,7 @@ class TradingSessionRecorder:
                     "session_id": target_session,
                     "start_time": session_row[1],
                     "end_time": session_row[2],
-                    "status": session_row[13],
+                    "status": session_row[12],
                     "total_trades": session_row[3],
                     "winning_trades": session_row[4],
                     "losing_trades": session_row[5],
@@ -391,9 +841,25 @@ class TradingSessionRecorder:
                     "max_drawdown": session_row[7],
                     "win_rate": session_row[8],
                     "symbols_traded": symbols,
-                    "avg_confidence": events_stats[3] if events_stats[3] else 0.0,
+                    "avg_confidence": 0.0,
+                    "total_events": 0,
                     "is_current_session": target_session == self.current_session_id
                 }
+                if rollup:
+                    (events, closed, wins, losses, total_pnl, max_drawdown,
+                     conf_sum, conf_count, equity, gross_profit, gross_loss) = rollup
+                    summary.update({
+                        "total_trades": closed,
+                        "winning_trades": wins,
+                        "losing_trades": losses,
+                        "total_pnl": total_pnl,
+                        "max_drawdown": max_drawdown,
+                        "win_rate": wins / (wins + losses) if wins + losses else 0.0,
+                        "avg_confidence": conf_sum / conf_count if conf_count else 0.0,
+                        "total_events": events,
+                        "equity": equity,
+                        "profit_factor": gross_profit / gross_loss if gross_loss > 0 else None
+                    })
                 
                 return summary
                 
@@ -404,8 +870,9 @@ class TradingSessionRecorder:
     def get_recent_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent trading sessions"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            self.writer.sync()
+            with self._read_lock:
+                cursor = self.read_conn.cursor()
                 cursor.execute('''
                 SELECT session_id, start_time, end_time, total_trades, 
                        win_rate, total_pnl, status
@@ -432,6 +899,106 @@ class TradingSessionRecorder:
             logger.error(f"Error getting recent sessions: {e}")
             return []
     
+    def get_symbol_summary(self, session_id: str = None) -> List[Dict[str, Any]]:
+        """Per-symbol event and closed-trade totals for the current or specified session"""
+        target_session = session_id or self.current_session_id
+        if not target_session:
+            return []
+        
+        try:
+            self.writer.sync()
+            with self._read_lock:
+                cursor = self.read_conn.cursor()
+                cursor.execute('''
+                SELECT symbol, events, closed_trades, wins, losses, total_pnl, last_ts
+                FROM symbol_rollups WHERE session_id = ?
+                ORDER BY total_pnl DESC
+                ''', (target_session,))
+                
+                return [{
+                    "symbol": row[0],
+                    "events": row[1],
+                    "total_trades": row[2],
+                    "winning_trades": row[3],
+                    "losing_trades": row[4],
+                    "total_pnl": row[5],
+                    "win_rate": row[3] / (row[3] + row[4]) if row[3] + row[4] else 0.0,
+                    "last_event": datetime.fromtimestamp(row[6]).isoformat() if row[6] else None
+                } for row in cursor.fetchall()]
+                
+        except Exception as e:
+            logger.error(f"Error getting symbol summary: {e}")
+            return []
+    
+    def get_equity_curve(self, session_id: str = None, start: Optional[float] = None,
+                         end: Optional[float] = None, points: int = 200) -> Dict[str, Any]:
+        """Equity, drawdown and trade-count series downsampled to at most `points`.
+        
+        `start` and `end` are epoch seconds and default to the session's
+        first and last event. Reads the coarsest bucket resolution that
+        still gives `points` buckets, so the rows read depend on `points`,
+        not on how many events the range holds.
+        """
+        target_session = session_id or self.current_session_id
+        if not target_session:
+            return {}
+        
+        try:
+            self.writer.sync()
+            with self._read_lock:
+                cursor = self.read_conn.cursor()
+                cursor.execute('''
+                SELECT first_ts, last_ts FROM session_rollups WHERE session_id = ?
+                ''', (target_session,))
+                bounds = cursor.fetchone()
+                if not bounds:
+                    return {}
+                
+                start = bounds[0] if start is None else start
+                end = bounds[1] if end is None else end
+                span = max(end - start, 0.0)
+                resolution = EQUITY_RESOLUTIONS[0]
+                for candidate in EQUITY_RESOLUTIONS:
+                    if span / candidate >= points:
+                        resolution = candidate
+                
+                cursor.execute('''
+                SELECT bucket_start, trades, wins, losses, pnl,
+                       equity_close, equity_high, equity_low, max_drawdown
+                FROM equity_buckets
+                WHERE session_id = ? AND resolution = ? AND bucket_start BETWEEN ? AND ?
+                ORDER BY bucket_start
+                ''', (target_session, resolution, int(start // resolution) * resolution, end))
+                rows = cursor.fetchall()
+            
+            # Merge runs of consecutive buckets down to `points`
+            step = max(1, -(-len(rows) // points))
+            series = {"timestamps": [], "trades": [], "wins": [], "losses": [], "pnl": [],
+                      "equity": [], "equity_high": [], "equity_low": [], "drawdown": []}
+            for i in range(0, len(rows), step):
+                group = rows[i:i + step]
+                series["timestamps"].append(datetime.fromtimestamp(group[0][0]).isoformat())
+                series["trades"].append(sum(row[1] for row in group))
+                series["wins"].append(sum(row[2] for row in group))
+                series["losses"].append(sum(row[3] for row in group))
+                series["pnl"].append(sum(row[4] for row in group))
+                series["equity"].append(group[-1][5])
+                series["equity_high"].append(max(row[6] for row in group))
+                series["equity_low"].append(min(row[7] for row in group))
+                series["drawdown"].append(max(row[8] for row in group))
+            
+            return {
+                "session_id": target_session,
+                "resolution_seconds": resolution * step,
+                "start": datetime.fromtimestamp(start).isoformat(),
+                "end": datetime.fromtimestamp(end).isoformat(),
+                **series
+            }
+            
+        except Exception as e:
+            logger.error(f"Error getting equity curve: {e}")
+            return {}
+    
     async def continuous_recording_loop(self):
         """Continuous recording and monitoring loop"""
         logger.info("Starting session recording loop...")
@@ -439,8 +1006,8 @@ class TradingSessionRecorder:
         while True:
             try:
                 if self.recording_active:
-                    # Update session metrics periodically
-                    current_summary = self.get_session_summary()
+                    # Update session metrics periodically (off the event loop: it waits for the writer)
+                    current_summary = await executors.run_io(self.get_session_summary)
                     if current_summary:
                         logger.info(f"Session {self.current_session_id}: "
                                   f"{current_summary['total_trades']} trades, "
@@ -452,6 +1019,22 @@ class TradingSessionRecorder:
                 logger.error(f"Error in recording loop: {e}")
                 await asyncio.sleep(60)
 
+    def flush(self):
+        """Block until every queued row is committed"""
+        self.writer.flush()
+    
+    def close(self):
+        """Drain the writer and close both connections"""
+        try:
+            self.writer.close()
+            with self._read_lock:
+                self.read_conn.close()
+        except Exception as e:
+            logger.error(f"Error closing session recorder: {e}")
+    
+    def get_writer_stats(self) -> Dict[str, Any]:
+        return self.writer.get_stats()
+
 # Standalone execution for testing
 async def main():
     recorder = TradingSessionRecorder()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Shared Ring Buffer - Cross-Process Market Data Without Copies
+Per-symbol fixed-size rings in multiprocessing shared memory, one writer many readers
+"""
+
+import logging
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TICK_FIELDS = ("timestamp", "price", "bid", "ask", "quantity")
+BAR_FIELDS = ("open_time", "open", "high", "low", "close", "volume")
+
+
+class SharedRingBuffer:
+    """Fixed-capacity float64 ring per symbol, backed by one shared memory block.
+
+    Layout: an int64 write counter per symbol followed by a
+    (symbols, capacity, fields) float64 array. A single process writes
+    (the market feed owner); workers attach by name with a read-only view.
+    Readers copy a window and re-check the counter afterwards, retrying if
+    the writer lapped the rows they copied, so no lock crosses processes.
+    """
+
+    def __init__(self, symbols: Sequence[str], fields: Sequence[str] = TICK_FIELDS,
+                 capacity: int = 1024, name: Optional[str] = None, create: bool = True):
+        self.symbols = list(symbols)
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.field_index = {field: i for i, field in enumerate(self.fields)}
+        self.owner = create
+
+        header_bytes = 8 * len(self.symbols)
+        data_bytes = 8 * len(self.symbols) * capacity * len(self.fields)
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=header_bytes + data_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.heads = np.ndarray((len(self.symbols),), dtype=np.int64, buffer=self.shm.buf)
+        self.data = np.ndarray((len(self.symbols), capacity, len(self.fields)), dtype=np.float64,
+                               buffer=self.shm.buf, offset=header_bytes)
+        if create:
+            self.heads[:] = 0
+            self.data[:] = np.nan
+        else:
+            # Workers only read; a stray write raises instead of corrupting the feed
+            self.heads.flags.writeable = False
+            self.data.flags.writeable = False
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def spec(self) -> Dict[str, Any]:
+        """Everything another process needs to attach"""
+        return {"name": self.name, "symbols": self.symbols, "fields": self.fields, "capacity": self.capacity}
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> "SharedRingBuffer":
+        return cls(spec["symbols"], spec["fields"], spec["capacity"], name=spec["name"], create=False)
+
+    # ------------------------------------------------------------------ #
+    # Writer side
+    # ------------------------------------------------------------------ #
+    def write(self, symbol: str, values: Sequence[float]) -> int:
+        """Append one row for `symbol`; returns its sequence number"""
+        i = self.index[symbol]
+        head = int(self.heads[i])
+        self.data[i, head % self.capacity, :] = values
+        self.heads[i] = head + 1  # publish only after the row is complete
+        return head
+
+    def replace_last(self, symbol: str, values: Sequence[float]):
+        """Overwrite the newest row in place (e.g. an open bar that is still updating)"""
+        i = self.index[symbol]
+        head = int(self.heads[i])
+        if head == 0:
+            self.write(symbol, values)
+        else:
+            self.data[i, (head - 1) % self.capacity, :] = values
+
+    # ------------------------------------------------------------------ #
+    # Reader side
+    # ------------------------------------------------------------------ #
+    def head(self, symbol: str) -> int:
+        return int(self.heads[self.index[symbol]])
+
+    def latest(self, symbol: str, count: int = 1, retries: int = 5) -> np.ndarray:
+        """Copy of the newest `count` rows, oldest first (fewer if not yet written).
+
+        At most capacity - 1 rows are returned: the slot after the newest
+        row is the one the writer fills next, so it is never read.
+        """
+        i = self.index[symbol]
+        for _ in range(retries):
+            head = int(self.heads[i])
+            n = min(count, head, self.capacity - 1)
+            if n == 0:
+                return np.empty((0, len(self.fields)))
+            slots = np.arange(head - n, head) % self.capacity
+            window = self.data[i, slots, :].copy()
+            if int(self.heads[i]) - (head - n) < self.capacity:
+                return window
+            time.sleep(0)  # the writer lapped us mid-copy; try again
+        logger.warning(f"Ring read for {symbol} kept racing the writer; returning latest row only")
+        head = int(self.heads[i])
+        return self.data[i, [(head - 1) % self.capacity], :].copy()
+
+    def column(self, rows: np.ndarray, field: str) -> np.ndarray:
+        return rows[:, self.field_index[field]]
+
+    def close(self):
+        # Drop numpy views first so the mmap can be released
+        self.heads = None
+        self.data = None
+        self.shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "fields": list(self.fields),
+            "capacity": self.capacity,
+            "bytes": self.shm.size,
+            "writes": {symbol: int(self.heads[i]) for symbol, i in self.index.items()}
+        }
+
+
+def rows_to_dicts(ring: SharedRingBuffer, rows: np.ndarray) -> List[Dict[str, float]]:
+    """Field-named dicts for logging and debugging"""
+    return [dict(zip(ring.fields, row.tolist())) for row in rows]
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+State Store - Transactional Component State in SQLite
+Namespaced keys, coalesced writes and WAL crash safety in place of agent_memory.json rewrites
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Next to this module, whatever the working directory
+MODULE_DIR = Path(__file__).resolve().parent
+STATE_DB = os.getenv("AGENT_STATE_DB", str(MODULE_DIR / "agent_state.db"))
+LEGACY_MEMORY_FILE = str(MODULE_DIR / "agent_memory.json")
+LEGACY_NAMESPACE = "legacy"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID
+"""
+
+_UPSERT = """
+INSERT INTO state (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+"""
+
+
+class StateStore:
+    """Key/value state per component namespace, one row per key.
+
+    `put` serializes the value and parks it in a pending map; repeated puts
+    to the same key between flushes collapse into one row write. A daemon
+    thread flushes every `flush_interval` seconds (0 flushes on every put)
+    in a single transaction, and the store flushes again at exit. SQLite in
+    WAL mode keeps the file consistent across crashes: at most the last
+    unflushed interval is lost, never a half-written file. Components update
+    only their own rows, so concurrent writers no longer clobber each other.
+
+    On first open, the top-level keys of the legacy agent_memory.json are
+    imported into the "legacy" namespace for components to migrate from.
+    """
+
+    def __init__(self, path: str = STATE_DB, flush_interval: Optional[float] = None,
+                 legacy_file: Optional[str] = LEGACY_MEMORY_FILE):
+        self.path = path
+        self.flush_interval = flush_interval if flush_interval is not None else float(
+            os.getenv("STATE_FLUSH_INTERVAL", "1.0"))
+
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.execute(_SCHEMA)
+
+        self.pending: Dict[Tuple[str, str], Optional[str]] = {}
+        self._lock = threading.Lock()       # guards pending
+        self._db_lock = threading.Lock()    # serializes use of the connection
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+
+        # Metrics
+        self.puts = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self.last_flush_time = 0.0
+
+        if legacy_file:
+            self._import_legacy(legacy_file)
+        atexit.register(self.close)
+
+    def _import_legacy(self, legacy_file: str):
+        if not Path(legacy_file).exists():
+            return
+        with self._db_lock:
+            if self.conn.execute("SELECT 1 FROM state WHERE namespace = ? LIMIT 1",
+                                 (LEGACY_NAMESPACE,)).fetchone():
+                return
+        try:
+            with open(legacy_file, 'r') as f:
+                memory = json.load(f)
+            self.put_many(LEGACY_NAMESPACE, memory)
+            self.flush()
+            logger.info(f"Imported {len(memory)} keys from {legacy_file} into the state store")
+        except Exception as e:
+            logger.error(f"Error importing legacy agent memory: {e}")
+
+    # ------------------------------------------------------------------ #
+    # Reads
+    # ------------------------------------------------------------------ #
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if (namespace, key) in self.pending:
+                value = self.pending[(namespace, key)]
+                return default if value is None else json.loads(value)
+        with self._db_lock:
+            row = self.conn.execute("SELECT value FROM state WHERE namespace = ? AND key = ?",
+                                    (namespace, key)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def get_namespace(self, namespace: str) -> Dict[str, Any]:
+        """Every key of a namespace, including unflushed writes"""
+        with self._db_lock:
+            rows = self.conn.execute("SELECT key, value FROM state WHERE namespace = ?",
+                                     (namespace,)).fetchall()
+        values = {key: value for key, value in rows}
+        with self._lock:
+            for (ns, key), value in self.pending.items():
+                if ns != namespace:
+                    continue
+                if value is None:
+                    values.pop(key, None)
+                else:
+                    values[key] = value
+        return {key: json.loads(value) for key, value in values.items()}
+
+    # ------------------------------------------------------------------ #
+    # Writes
+    # ------------------------------------------------------------------ #
+    def put(self, namespace: str, key: str, value: Any):
+        self.put_many(namespace, {key: value})
+
+    def put_many(self, namespace: str, values: Dict[str, Any]):
+        encoded = {key: json.dumps(value, default=str) for key, value in values.items()}
+        with self._lock:
+            for key, value in encoded.items():
+                self.pending[(namespace, key)] = value
+            self.puts += len(encoded)
+        self._schedule()
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self.pending[(namespace, key)] = None
+        self._schedule()
+
+    def _schedule(self):
+        if self.flush_interval <= 0:
+            self.flush()
+        elif self._flusher is None and not self._closed:
+            self._flusher = threading.Thread(target=self._flush_loop, name="state-store-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing state store: {e}")
+
+    def flush(self) -> int:
+        """Write all pending keys in one transaction; returns rows written"""
+        with self._lock:
+            if not self.pending:
+                return 0
+            pending, self.pending = self.pending, {}
+
+        now = time.time()
+        upserts = [(ns, key, value, now) for (ns, key), value in pending.items() if value is not None]
+        deletes = [(ns, key) for (ns, key), value in pending.items() if value is None]
+        with self._db_lock:
+            try:
+                self.conn.execute("BEGIN IMMEDIATE")
+                self.conn.executemany(_UPSERT, upserts)
+                self.conn.executemany("DELETE FROM state WHERE namespace = ? AND key = ?", deletes)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                with self._lock:
+                    # Keep newer puts that arrived meanwhile
+                    self.pending = {**pending, **self.pending}
+                raise
+
+        self.rows_written += len(pending)
+        self.flushes += 1
+        self.last_flush_time = now
+        return len(pending)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing state store on close: {e}")
+        if self._flusher is not None:
+            self._flusher.join(timeout=1.0)
+        with self._db_lock:
+            self.conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "flush_interval": self.flush_interval,
+            "pending": len(self.pending),
+            "puts": self.puts,
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "coalesced": self.puts - self.rows_written - len(self.pending),
+            "last_flush_time": self.last_flush_time
+        }
+
+
+# Global state store, opened on first use
+_state_store: Optional[StateStore] = None
+_state_store_lock = threading.Lock()
+
+
+def get_state_store() -> Optional[StateStore]:
+    """Shared store for this process, or None if the database cannot be opened"""
+    global _state_store
+    with _state_store_lock:
+        if _state_store is None:
+            try:
+                _state_store = StateStore()
+            except Exception as e:
+                logger.error(f"Error opening state store {STATE_DB}: {e}")
+                return None
+        return _state_store
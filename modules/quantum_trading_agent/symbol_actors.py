@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Symbol Actors - Concurrent Per-Symbol Pipeline Workers
+Independent delta scalping state per symbol with shared risk and compound accounting
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Iterable, Tuple
+
+from .compound_strategy import CompoundGainController, compound_controller, optimize_compound_strategy
+from .delta_scalping import DeltaScalpingEngine
+from .tick_mailbox import TickMailbox, POLICY_CONFLATE
+
+logger = logging.getLogger(__name__)
+
+Pipeline = Callable[[Dict[str, Any], DeltaScalpingEngine], Awaitable[Dict[str, Any]]]
+
+
+class RiskCoordinator:
+    """Single owner of the shared balance, budget and compound controller.
+
+    Actors run their strategies concurrently but every sizing decision and
+    every trade result is applied here under one lock, so two symbols can
+    never size against the same dollars. Capital committed to an approved
+    trade stays reserved while the position it opened is open: `settle`
+    keeps it under the position's trade id and `record_closed_trades`
+    releases it when the position closes (a failed execution releases it
+    at once). New approvals are capped so reserved capital never exceeds
+    `budget_cap`.
+    """
+
+    def __init__(self, controller: Optional[CompoundGainController] = None,
+                 starting_balance: float = 100.0, budget_cap: float = 100.0):
+        self.controller = controller or compound_controller
+        self.balance = starting_balance
+        self.budget_cap = budget_cap
+        self._lock = asyncio.Lock()
+
+        self.reserved: Dict[str, float] = {}
+        # (position symbol, trade id) -> (reserving symbol, capital held)
+        self.open_positions: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self.realized_pnl: Dict[str, float] = {}
+        self.approved = 0
+        self.rejected = 0
+        self.settled = 0
+
+    @property
+    def total_reserved(self) -> float:
+        return sum(self.reserved.values())
+
+    async def authorize(self, symbol: str, signal: Dict[str, Any]) -> Dict[str, Any]:
+        """Compound-size a signal against the shared balance and reserve its capital"""
+        async with self._lock:
+            result = await optimize_compound_strategy(signal, self.balance)
+            if result.get("action") != "execute_trade":
+                return result
+
+            size = result["optimized_signal"].get("optimized_position_size", 0.0)
+            available = self.budget_cap - self.total_reserved
+            if size > available:
+                self.rejected += 1
+                return {
+                    "action": "skip_trade",
+                    "reason": "budget_cap_reserved",
+                    "requested": size,
+                    "available": max(available, 0.0)
+                }
+
+            self.reserved[symbol] = self.reserved.get(symbol, 0.0) + size
+            self.approved += 1
+            result["reserved"] = size
+            return result
+
+    def _release(self, symbol: str, amount: float):
+        remaining = self.reserved.get(symbol, 0.0) - amount
+        if remaining > 1e-9:
+            self.reserved[symbol] = remaining
+        else:
+            self.reserved.pop(symbol, None)
+
+    async def settle(self, symbol: str, authorization: Dict[str, Any], execution_result: Dict[str, Any],
+                     position: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Hand the reservation to the opened `position` (a trade dict with
+        trade_id and symbol) and feed a successful execution to the compound
+        controller. Without a position, or if execution failed, the
+        reservation is released now."""
+        async with self._lock:
+            amount = authorization.get("reserved", 0.0)
+            if execution_result.get("success") and position and position.get("trade_id"):
+                key = (position.get("symbol", symbol), position["trade_id"])
+                held = self.open_positions.get(key, (symbol, 0.0))[1]
+                self.open_positions[key] = (symbol, held + amount)
+            else:
+                self._release(symbol, amount)
+
+            if not execution_result.get("success"):
+                return {}
+
+            self.settled += 1
+            trade_update = self.controller.process_trade_result(execution_result, self.balance)
+            if "new_balance" in trade_update:
+                self.balance = trade_update["new_balance"]
+            return trade_update
+
+    def record_closed_trades(self, symbol: str, closed_trades: List[Dict[str, Any]]):
+        """Track realized P&L reported by an engine and release the capital
+        held by the closed positions"""
+        for trade in closed_trades:
+            self.realized_pnl[symbol] = self.realized_pnl.get(symbol, 0.0) + trade.get("pnl", 0.0)
+            held = self.open_positions.pop((trade.get("symbol", symbol), trade.get("trade_id")), None)
+            if held is not None:
+                self._release(*held)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "balance": self.balance,
+            "budget_cap": self.budget_cap,
+            "reserved": dict(self.reserved),
+            "total_reserved": self.total_reserved,
+            "open_positions": len(self.open_positions),
+            "approved": self.approved,
+            "rejected": self.rejected,
+            "settled": self.settled,
+            "realized_pnl": dict(self.realized_pnl),
+            "total_realized_pnl": sum(self.realized_pnl.values()),
+            "compound_status": self.controller.get_compound_status()
+        }
+
+
+class SymbolActor:
+    """One symbol (or symbol group) with its own engine, mailbox and worker task"""
+
+    def __init__(self, name: str, pipeline: Pipeline, engine: Optional[DeltaScalpingEngine] = None,
+                 mailbox: Optional[TickMailbox] = None):
+        self.name = name
+        self.pipeline = pipeline
+        self.engine = engine or DeltaScalpingEngine(persist=False)
+        self.mailbox = mailbox or TickMailbox()
+        self.task: Optional[asyncio.Task] = None
+
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.last_results: Dict[str, Dict[str, Any]] = {}
+
+    def submit(self, symbol: str, market_data: Dict[str, Any]) -> bool:
+        if self.task is None or self.task.done():
+            self.start()
+        return self.mailbox.put(symbol, market_data)
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            symbol, market_data = await self.mailbox.get()
+            started = loop.time()
+            try:
+                self.last_results[symbol] = await self.pipeline(market_data, self.engine)
+                self.processed += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Actor {self.name} failed on {symbol}: {e}")
+            finally:
+                self.busy_time += loop.time() - started
+                self.mailbox.task_done(symbol)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self.task is not None and not self.task.done(),
+            "processed": self.processed,
+            "errors": self.errors,
+            "busy_time": self.busy_time,
+            "strategy": self.engine.get_strategy_status(),
+            "mailbox": {k: v for k, v in self.mailbox.get_stats().items() if k != "symbols"}
+        }
+
+
+class SymbolActorPool:
+    """Routes market data to per-symbol actors, creating them on first sight.
+
+    `groups` maps an actor name to the symbols it owns, for symbols that
+    should share one engine; any other symbol gets an actor of its own.
+    """
+
+    def __init__(self, pipeline: Pipeline, groups: Optional[Dict[str, Iterable[str]]] = None,
+                 mailbox_factory: Optional[Callable[[], TickMailbox]] = None,
+                 engine_factory: Optional[Callable[[], DeltaScalpingEngine]] = None):
+        self.pipeline = pipeline
+        self.mailbox_factory = mailbox_factory or (lambda: TickMailbox(policy=POLICY_CONFLATE))
+        self.engine_factory = engine_factory or (lambda: DeltaScalpingEngine(persist=False))
+        self.actors: Dict[str, SymbolActor] = {}
+        self.routes: Dict[str, str] = {}
+        self.created_at = datetime.now()
+
+        for name, symbols in (groups or {}).items():
+            for symbol in symbols:
+                self.routes[symbol] = name
+
+    def actor_for(self, symbol: str) -> SymbolActor:
+        name = self.routes.setdefault(symbol, symbol)
+        actor = self.actors.get(name)
+        if actor is None:
+            actor = SymbolActor(name, self.pipeline, self.engine_factory(), self.mailbox_factory())
+            self.actors[name] = actor
+            logger.info(f"Started symbol actor {name}")
+        return actor
+
+    def submit(self, market_data: Dict[str, Any]) -> bool:
+        symbol = market_data.get("symbol", "BTC")
+        return self.actor_for(symbol).submit(symbol, market_data)
+
+    async def stop(self, drain: bool = False):
+        await asyncio.gather(*(actor.stop() for actor in self.actors.values()))
+        if drain:
+            for actor in self.actors.values():
+                actor.mailbox.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        actors = {name: actor.get_status() for name, actor in self.actors.items()}
+        return {
+            "actors": len(actors),
+            "processed": sum(a["processed"] for a in actors.values()),
+            "errors": sum(a["errors"] for a in actors.values()),
+            "queue_depth": sum(a["mailbox"]["queue_depth"] for a in actors.values()),
+            "dropped": sum(a["mailbox"]["dropped"] for a in actors.values()),
+            "merged": sum(a["mailbox"]["merged"] for a in actors.values()),
+            "per_actor": actors
+        }
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Symbol Shards - Multi-Process Strategy Workers over Shared Market Data
+Spreads symbols across worker processes; only signals and orders cross process boundaries
+"""
+
+import asyncio
+import inspect
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Any, Optional, Callable, Iterable, Sequence
+
+import numpy as np
+
+from .shared_ring import SharedRingBuffer, TICK_FIELDS, BAR_FIELDS
+from .market_stream import stream_symbol
+
+logger = logging.getLogger(__name__)
+
+# Rows a worker reads per evaluation
+TICK_WINDOW = 100
+BAR_WINDOW = 20
+
+
+def shard_symbols(symbols: Sequence[str], shards: int) -> List[List[str]]:
+    """Round-robin symbols over shards so busy and quiet symbols spread out"""
+    groups = [[] for _ in range(max(1, min(shards, len(symbols))))]
+    for i, symbol in enumerate(symbols):
+        groups[i % len(groups)].append(symbol)
+    return groups
+
+
+def _market_data_from_rings(symbol: str, ticks: SharedRingBuffer, bars: SharedRingBuffer) -> Optional[Dict[str, Any]]:
+    """Rebuild the market_data dict the strategy engines expect from ring windows"""
+    tick_rows = ticks.latest(symbol, TICK_WINDOW)
+    if len(tick_rows) == 0:
+        return None
+    prices = ticks.column(tick_rows, "price")
+    last = tick_rows[-1]
+    bar_rows = bars.latest(symbol, BAR_WINDOW)
+    bar_volumes = bars.column(bar_rows, "volume") if len(bar_rows) else np.empty(0)
+
+    bar_open = bars.column(bar_rows, "open")[-1] if len(bar_rows) else prices[0]
+    price = float(last[ticks.field_index["price"]])
+    return {
+        "symbol": symbol,
+        "price": price,
+        "bid": float(last[ticks.field_index["bid"]]),
+        "ask": float(last[ticks.field_index["ask"]]),
+        "volume": float(bar_volumes[-1]) if len(bar_volumes) else float(ticks.column(tick_rows, "quantity").sum()),
+        "avg_volume": float(bar_volumes[:-1].mean()) if len(bar_volumes) > 1 else 0.0,
+        "price_change_pct": (price - bar_open) / bar_open if bar_open else 0.0,
+        "price_history": prices.tolist(),
+        "timestamp": float(last[ticks.field_index["timestamp"]]),
+        "source": "shared_ring"
+    }
+
+
+def _shard_worker(shard_id: int, symbols: List[str], tick_spec: Dict[str, Any], bar_spec: Dict[str, Any],
+                  wake: Any, stop: Any, out_queue: Any, stats_interval: float):
+    """Worker process: evaluate owned symbols whenever their rings advance"""
+    from .delta_scalping import DeltaScalpingEngine
+
+    ticks = SharedRingBuffer.attach(tick_spec)
+    bars = SharedRingBuffer.attach(bar_spec)
+    engines = {symbol: DeltaScalpingEngine(persist=False) for symbol in symbols}
+    for symbol, engine in engines.items():
+        engine.streamed_symbols.add(symbol)  # prices are pushed from the ring below
+    seen = {symbol: 0 for symbol in symbols}
+    evaluations = 0
+    busy = 0.0
+    last_stats = time.monotonic()
+
+    try:
+        while not stop.is_set():
+            if wake.wait(0.1):
+                wake.clear()
+
+            for symbol in symbols:
+                head = ticks.head(symbol)
+                if head == seen[symbol]:
+                    continue
+                new_ticks = head - seen[symbol]
+                seen[symbol] = head  # conflate: only the newest window is evaluated
+
+                started = time.monotonic()
+                market_data = _market_data_from_rings(symbol, ticks, bars)
+                if market_data is None:
+                    continue
+                engine = engines[symbol]
+                # Momentum still sees every tick written since the last evaluation
+                for price in market_data["price_history"][-new_ticks:]:
+                    engine.record_price(symbol, price)
+                signal = engine.analyze_delta_opportunity(market_data)
+                if signal.get("should_enter", False):
+                    signal["trade_result"] = engine.execute_scalping_trade(signal)
+                    out_queue.put({"type": "signal", "shard": shard_id, "symbol": symbol,
+                                   "market_data": market_data, "signal": signal})
+                closed_trades = engine.monitor_active_trades(market_data)
+                if closed_trades:
+                    out_queue.put({"type": "closed_trades", "shard": shard_id, "symbol": symbol,
+                                   "closed_trades": closed_trades})
+                evaluations += 1
+                busy += time.monotonic() - started
+
+            now = time.monotonic()
+            if now - last_stats >= stats_interval:
+                out_queue.put({"type": "stats", "shard": shard_id, "pid": os.getpid(), "symbols": symbols,
+                               "evaluations": evaluations, "busy_seconds": busy,
+                               "active_trades": sum(len(e.active_trades) for e in engines.values())})
+                last_stats = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ticks.close()
+        bars.close()
+
+
+class ShardedSymbolPool:
+    """Process-pool deployment mode for the strategy layer.
+
+    The parent process owns the market feed and writes ticks and bars into
+    shared ring buffers; each worker process maps the rings read-only and
+    runs its own DeltaScalpingEngine per owned symbol. Workers send back
+    signals and closed trades only, which are delivered to `on_signal` on
+    the parent's event loop (e.g. the orchestrator's sizing and execution).
+    """
+
+    def __init__(self, symbols: Iterable[str], processes: Optional[int] = None,
+                 on_signal: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 tick_capacity: int = 4096, bar_capacity: int = 512,
+                 start_method: Optional[str] = None, stats_interval: float = 1.0):
+        self.symbols = [stream_symbol(s) for s in symbols]
+        self.processes = processes or int(os.getenv("SHARD_PROCESSES", "0")) or max(1, (os.cpu_count() or 2) - 1)
+        self.on_signal = on_signal
+        self.tick_capacity = tick_capacity
+        self.bar_capacity = bar_capacity
+        self.stats_interval = stats_interval
+        self.context = mp.get_context(start_method or os.getenv("SHARD_START_METHOD", "spawn"))
+
+        self.ticks: Optional[SharedRingBuffer] = None
+        self.bars: Optional[SharedRingBuffer] = None
+        self.shards = shard_symbols(self.symbols, self.processes)
+        self.owner = {symbol: i for i, group in enumerate(self.shards) for symbol in group}
+        self.workers: List[Any] = []
+        self.wake_events: List[Any] = []
+        self.stop_event = None
+        self.out_queue = None
+        self.collector: Optional[threading.Thread] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Latest top of book, folded into each trade row
+        self.book: Dict[str, tuple] = {}
+
+        # Metrics
+        self.ticks_written = 0
+        self.bars_written = 0
+        self.signals_received = 0
+        self.closed_trades_received = 0
+        self.worker_stats: Dict[int, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.ticks = SharedRingBuffer(self.symbols, TICK_FIELDS, self.tick_capacity)
+        self.bars = SharedRingBuffer(self.symbols, BAR_FIELDS, self.bar_capacity)
+        self.stop_event = self.context.Event()
+        self.out_queue = self.context.Queue()
+
+        for shard_id, group in enumerate(self.shards):
+            wake = self.context.Event()
+            worker = self.context.Process(
+                target=_shard_worker,
+                args=(shard_id, group, self.ticks.spec(), self.bars.spec(), wake, self.stop_event,
+                      self.out_queue, self.stats_interval),
+                name=f"symbol-shard-{shard_id}",
+                daemon=True
+            )
+            worker.start()
+            self.wake_events.append(wake)
+            self.workers.append(worker)
+
+        self.collector = threading.Thread(target=self._collect, name="symbol-shard-collector", daemon=True)
+        self.collector.start()
+        logger.info(f"Started {len(self.workers)} symbol shards for {len(self.symbols)} symbols")
+
+    async def stop(self, timeout: float = 5.0):
+        if self.stop_event is None:
+            return
+        self.stop_event.set()
+        for wake in self.wake_events:
+            wake.set()
+        loop = asyncio.get_running_loop()
+        for worker in self.workers:
+            await loop.run_in_executor(None, worker.join, timeout)
+            if worker.is_alive():
+                worker.terminate()
+        self.out_queue.put(None)  # release the collector
+        await loop.run_in_executor(None, self.collector.join, timeout)
+
+        for ring in (self.ticks, self.bars):
+            ring.close()
+            ring.unlink()
+        self.workers = []
+        self.wake_events = []
+        self.stop_event = None
+        logger.info("Symbol shards stopped")
+
+    async def __aenter__(self) -> "ShardedSymbolPool":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    # ------------------------------------------------------------------ #
+    # Parent side: market data in
+    # ------------------------------------------------------------------ #
+    def on_market_tick(self, tick: Dict[str, Any], market_data: Optional[Dict[str, Any]] = None):
+        """MarketDataFeed subscriber: copy ticks and bars into the shared rings"""
+        symbol = tick["symbol"]
+        if symbol not in self.owner or self.ticks is None:
+            return
+        kind = tick.get("type")
+        if kind == "book_ticker":
+            self.book[symbol] = (tick["bid"], tick["ask"])
+            return
+        if kind == "trade":
+            bid, ask = self.book.get(symbol, (tick["price"], tick["price"]))
+            self.ticks.write(symbol, (time.time(), tick["price"], bid, ask, tick.get("quantity", 0.0)))
+            self.ticks_written += 1
+            self.wake_events[self.owner[symbol]].set()
+        elif kind == "kline":
+            row = (tick["open_time"], tick["open"], tick["high"], tick["low"], tick["close"], tick["volume"])
+            if self.bars.head(symbol) and self.bars.latest(symbol, 1)[0][0] == tick["open_time"]:
+                self.bars.replace_last(symbol, row)
+            else:
+                self.bars.write(symbol, row)
+                self.bars_written += 1
+
+    def attach_feed(self, feed) -> str:
+        """Subscribe to a MarketDataFeed for the sharded symbols"""
+        return feed.add_subscriber(self.on_market_tick, self.symbols, kinds=("trade", "book_ticker", "kline"),
+                                   name="symbol_shards")
+
+    # ------------------------------------------------------------------ #
+    # Parent side: signals out
+    # ------------------------------------------------------------------ #
+    def _collect(self):
+        while True:
+            try:
+                event = self.out_queue.get(timeout=0.5)
+            except queue.Empty:
+                if self.stop_event is None or self.stop_event.is_set():
+                    break
+                continue
+            except (EOFError, OSError):
+                break
+            if event is None:
+                break
+            self.loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: Dict[str, Any]):
+        if event["type"] == "stats":
+            self.worker_stats[event["shard"]] = event
+            return
+        if event["type"] == "signal":
+            self.signals_received += 1
+        elif event["type"] == "closed_trades":
+            self.closed_trades_received += len(event["closed_trades"])
+        if self.on_signal is None:
+            return
+        try:
+            result = self.on_signal(event)
+            if inspect.isawaitable(result):
+                self.loop.create_task(result)
+        except Exception as e:
+            logger.error(f"Error handling shard event for {event.get('symbol')}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "processes": len(self.workers),
+            "alive": sum(1 for worker in self.workers if worker.is_alive()),
+            "shards": self.shards,
+            "ticks_written": self.ticks_written,
+            "bars_written": self.bars_written,
+            "signals_received": self.signals_received,
+            "closed_trades_received": self.closed_trades_received,
+            "ring_bytes": (self.ticks.shm.size + self.bars.shm.size) if self.ticks is not None else 0,
+            "workers": {
+                shard: {k: stats[k] for k in ("pid", "symbols", "evaluations", "busy_seconds", "active_trades")}
+                for shard, stats in self.worker_stats.items()
+            }
+        }
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Tick Mailbox - Bounded Per-Symbol Input Stage with Conflation
+Keeps the trade pipeline on the freshest tick when the market outruns it
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Overflow policies, applied when a symbol's slot already holds `depth` ticks
+POLICY_CONFLATE = "conflate"        # merge the incoming tick into the newest queued one
+POLICY_DROP_OLDEST = "drop_oldest"  # evict the oldest queued tick
+POLICY_DROP_NEWEST = "drop_newest"  # reject the incoming tick
+
+OVERFLOW_POLICIES = (POLICY_CONFLATE, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST)
+
+
+def merge_latest(queued: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, Any]:
+    """Latest snapshot wins; counts how many ticks it stands in for"""
+    merged = dict(incoming)
+    merged["conflated_ticks"] = queued.get("conflated_ticks", 1) + 1
+    return merged
+
+
+def merge_price_range(queued: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, Any]:
+    """Latest snapshot wins, keeping the high/low price seen across the merged ticks"""
+    merged = merge_latest(queued, incoming)
+    prices = [p for p in (queued.get("window_high", queued.get("price")),
+                          queued.get("window_low", queued.get("price")),
+                          incoming.get("price")) if p is not None]
+    if prices:
+        merged["window_high"] = max(prices)
+        merged["window_low"] = min(prices)
+    return merged
+
+
+MERGE_FUNCTIONS = {
+    "latest": merge_latest,
+    "price_range": merge_price_range
+}
+
+
+class _Slot:
+    """Queued ticks and counters for one symbol"""
+    __slots__ = ("items", "in_flight", "enqueued", "delivered", "dropped", "merged", "expired")
+
+    def __init__(self):
+        self.items = deque()  # (first_enqueued_at, last_updated_at, market_data)
+        self.in_flight = False
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.merged = 0
+        self.expired = 0
+
+
+class TickMailbox:
+    """Bounded per-symbol mailbox feeding a pool of pipeline workers.
+
+    Each symbol holds at most `depth` ticks; on overflow the configured
+    policy conflates, evicts the oldest or rejects the newest tick, so a
+    burst costs bounded memory and the consumer always sees recent data.
+    Symbols are served round-robin and a symbol is not handed out again
+    until the worker calls `task_done`, which keeps per-symbol ordering
+    with several workers. Ticks older than `max_age` seconds when dequeued
+    are discarded rather than traded on.
+    """
+
+    def __init__(self, depth: int = 1, policy: str = POLICY_CONFLATE,
+                 merge: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]] = None,
+                 max_age: Optional[float] = None):
+        if depth < 1:
+            raise ValueError("Mailbox depth must be at least 1")
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.depth = depth
+        self.policy = policy
+        self.merge = merge or merge_latest
+        self.max_age = max_age
+
+        self.slots: Dict[str, _Slot] = {}
+        self._ready = deque()
+        self._scheduled = set()
+        self._waiters = deque()
+
+        # Metrics
+        self.high_water = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _slot(self, symbol: str) -> _Slot:
+        slot = self.slots.get(symbol)
+        if slot is None:
+            slot = _Slot()
+            self.slots[symbol] = slot
+        return slot
+
+    def _schedule(self, symbol: str):
+        slot = self.slots[symbol]
+        if slot.in_flight or not slot.items or symbol in self._scheduled:
+            return
+        self._ready.append(symbol)
+        self._scheduled.add(symbol)
+        self._wake()
+
+    def _wake(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def put(self, symbol: str, market_data: Dict[str, Any]) -> bool:
+        """Enqueue without blocking; False if the tick was rejected"""
+        slot = self._slot(symbol)
+        now = time.monotonic()
+        slot.enqueued += 1
+
+        if len(slot.items) >= self.depth:
+            if self.policy == POLICY_DROP_NEWEST:
+                slot.dropped += 1
+                return False
+            if self.policy == POLICY_DROP_OLDEST:
+                slot.items.popleft()
+                slot.dropped += 1
+                slot.items.append((now, now, market_data))
+            else:
+                first_at, _, queued = slot.items[-1]
+                slot.items[-1] = (first_at, now, self.merge(queued, market_data))
+                slot.merged += 1
+        else:
+            slot.items.append((now, now, market_data))
+
+        self.high_water = max(self.high_water, len(slot.items))
+        self._schedule(symbol)
+        return True
+
+    async def get(self) -> Tuple[str, Dict[str, Any]]:
+        """Next (symbol, market_data) to process; call `task_done(symbol)` afterwards"""
+        while True:
+            while not self._ready:
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+                try:
+                    await waiter
+                except asyncio.CancelledError:
+                    if waiter.done() and not waiter.cancelled():
+                        self._wake()  # hand a wake-up we can no longer use to the next worker
+                    raise
+
+            symbol = self._ready.popleft()
+            self._scheduled.discard(symbol)
+            slot = self.slots[symbol]
+            if slot.in_flight or not slot.items:
+                continue
+
+            first_at, last_at, market_data = slot.items.popleft()
+            now = time.monotonic()
+            if self.max_age is not None and now - last_at > self.max_age:
+                slot.expired += 1
+                self._schedule(symbol)
+                continue
+
+            slot.in_flight = True
+            slot.delivered += 1
+            waited = now - first_at
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if self._ready:
+                # More symbols are ready; pass the wake-up on to another worker
+                self._wake()
+            return symbol, market_data
+
+    def task_done(self, symbol: str):
+        """Release a symbol after its tick has been processed"""
+        slot = self.slots.get(symbol)
+        if slot is None:
+            return
+        slot.in_flight = False
+        self._schedule(symbol)
+
+    def depth_of(self, symbol: str) -> int:
+        slot = self.slots.get(symbol)
+        return len(slot.items) if slot else 0
+
+    def clear(self):
+        """Drop every queued tick (e.g. on shutdown or after an emergency stop)"""
+        for slot in self.slots.values():
+            slot.dropped += len(slot.items)
+            slot.items.clear()
+        self._ready.clear()
+        self._scheduled.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        delivered = sum(slot.delivered for slot in self.slots.values())
+        return {
+            "policy": self.policy,
+            "depth_limit": self.depth,
+            "max_age": self.max_age,
+            "queue_depth": sum(len(slot.items) for slot in self.slots.values()),
+            "high_water": self.high_water,
+            "in_flight": sum(1 for slot in self.slots.values() if slot.in_flight),
+            "enqueued": sum(slot.enqueued for slot in self.slots.values()),
+            "delivered": delivered,
+            "dropped": sum(slot.dropped for slot in self.slots.values()),
+            "merged": sum(slot.merged for slot in self.slots.values()),
+            "expired": sum(slot.expired for slot in self.slots.values()),
+            "average_wait": self.total_wait / delivered if delivered else 0.0,
+            "max_wait": self.max_wait,
+            "symbols": {
+                symbol: {
+                    "depth": len(slot.items),
+                    "enqueued": slot.enqueued,
+                    "delivered": slot.delivered,
+                    "dropped": slot.dropped,
+                    "merged": slot.merged,
+                    "expired": slot.expired
+                }
+                for symbol, slot in self.slots.items()
+            }
+        }
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Trade Journal - Append-Only Rotating JSON Lines Trade Log
+O(1) appends, size/time segment rotation, gzip of sealed segments and an indexed reader
+"""
+
+import bisect
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+from .executors import executors
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = os.getenv("TRADE_JOURNAL_DIR", "logs/trades")
+SEGMENT_MAX_BYTES = int(float(os.getenv("TRADE_JOURNAL_SEGMENT_MB", "64")) * 1024 * 1024)
+SEGMENT_MAX_SECONDS = float(os.getenv("TRADE_JOURNAL_SEGMENT_HOURS", "24")) * 3600
+COMPRESS_SEGMENTS = os.getenv("TRADE_JOURNAL_COMPRESS", "1") == "1"
+
+INDEX_FILE = "index.jsonl"
+INDEX_STRIDE = 256  # entries between seek checkpoints
+_SEGMENT_PATTERN = re.compile(r"^trades-(\d{6})\.jsonl(\.gz)?$")
+
+
+class _SegmentSummary:
+    """What the reader needs to skip a segment or seek into it.
+
+    `checkpoints` holds (max ts of all earlier entries, byte offset) every
+    INDEX_STRIDE entries, so a range query can seek past every entry that
+    is certainly older than its start even if clocks stepped backwards.
+    """
+    __slots__ = ("name", "count", "first_ts", "last_ts", "min_ts", "max_ts", "symbols",
+                 "checkpoints", "bytes", "opened_at")
+
+    def __init__(self, name: str, opened_at: float):
+        self.name = name
+        self.count = 0
+        self.first_ts = None
+        self.last_ts = None
+        self.min_ts = float('inf')
+        self.max_ts = float('-inf')
+        self.symbols: Dict[str, int] = {}
+        self.checkpoints: List[Tuple[float, int]] = []
+        self.bytes = 0
+        self.opened_at = opened_at
+
+    def add(self, ts: float, symbol: Optional[str], offset: int, length: int):
+        if self.count % INDEX_STRIDE == 0:
+            self.checkpoints.append((self.max_ts, offset))
+        self.count += 1
+        if self.first_ts is None:
+            self.first_ts = ts
+        self.last_ts = ts
+        self.min_ts = min(self.min_ts, ts)
+        self.max_ts = max(self.max_ts, ts)
+        if symbol:
+            self.symbols[symbol] = self.symbols.get(symbol, 0) + 1
+        self.bytes = offset + length
+
+    def overlaps(self, start: Optional[float], end: Optional[float], symbol: Optional[str]) -> bool:
+        if not self.count:
+            return False
+        if symbol is not None and symbol not in self.symbols:
+            return False
+        if start is not None and self.max_ts < start:
+            return False
+        if end is not None and self.min_ts > end:
+            return False
+        return True
+
+    def seek_offset(self, start: Optional[float]) -> int:
+        """Byte offset before which every entry is older than `start`"""
+        if start is None or not self.checkpoints:
+            return 0
+        bounds = [bound for bound, _ in self.checkpoints]
+        i = bisect.bisect_left(bounds, start) - 1
+        return self.checkpoints[i][1] if i >= 0 else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "segment": self.name,
+            "count": self.count,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "min_ts": self.min_ts,
+            "max_ts": self.max_ts,
+            "symbols": self.symbols,
+            "checkpoints": self.checkpoints,
+            "bytes": self.bytes,
+            "opened_at": self.opened_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_SegmentSummary":
+        summary = cls(data["segment"], data.get("opened_at", 0.0))
+        summary.count = data["count"]
+        summary.first_ts = data["first_ts"]
+        summary.last_ts = data["last_ts"]
+        summary.min_ts = data["min_ts"]
+        summary.max_ts = data["max_ts"]
+        summary.symbols = data["symbols"]
+        summary.checkpoints = [tuple(c) for c in data["checkpoints"]]
+        summary.bytes = data["bytes"]
+        return summary
+
+
+class TradeJournal:
+    """Append-only trade log split into numbered JSON Lines segments.
+
+    Each entry is one line carrying `ts` (epoch seconds) and `symbol` next
+    to the logged fields, written with a single append to the open
+    segment. When the segment passes `max_bytes` or `max_seconds` it is
+    sealed: its summary (time range, per-symbol counts, seek checkpoints)
+    is appended to index.jsonl and, with `compress`, the file is gzipped
+    on the shared I/O pool. Nothing is ever truncated or rewritten.
+
+    `tail` and `query` use the summaries to skip segments outside the
+    requested time range or without the requested symbol, and the
+    checkpoints to seek past older entries inside a segment.
+    """
+
+    def __init__(self, directory: str = JOURNAL_DIR, max_bytes: int = SEGMENT_MAX_BYTES,
+                 max_seconds: float = SEGMENT_MAX_SECONDS, compress: bool = COMPRESS_SEGMENTS):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.compress = compress
+
+        self._lock = threading.Lock()
+        self.sealed: List[_SegmentSummary] = []
+        self.active: Optional[_SegmentSummary] = None
+        self._file = None
+        self._next_number = 0
+
+        # Metrics
+        self.appends = 0
+        self.rotations = 0
+        self.compressed = 0
+
+        self._recover()
+
+    # ------------------------------------------------------------------ #
+    # Segment files
+    # ------------------------------------------------------------------ #
+    def _segment_path(self, name: str) -> Path:
+        """Compressed copy if one exists, otherwise the plain segment"""
+        compressed = self.directory / f"{name}.gz"
+        return compressed if compressed.exists() else self.directory / name
+
+    def _open_segment(self, name: str):
+        path = self._segment_path(name)
+        try:
+            return gzip.open(path, 'rb') if path.suffix == ".gz" else open(path, 'rb')
+        except FileNotFoundError:
+            # Compressed and removed between the check and the open
+            return gzip.open(self.directory / f"{name}.gz", 'rb')
+
+    def _recover(self):
+        """Load sealed summaries and reopen (or rebuild) the last segment"""
+        index_path = self.directory / INDEX_FILE
+        summaries: Dict[str, _SegmentSummary] = {}
+        if index_path.exists():
+            with open(index_path, 'r') as f:
+                for line in f:
+                    try:
+                        summary = _SegmentSummary.from_dict(json.loads(line))
+                        summaries[summary.name] = summary
+                    except (ValueError, KeyError):
+                        continue  # torn last line after a crash
+
+        names = set()
+        for path in self.directory.iterdir():
+            match = _SEGMENT_PATTERN.match(path.name)
+            if not match:
+                continue
+            name = f"trades-{match.group(1)}.jsonl"
+            plain = self.directory / name
+            if match.group(2) and plain.exists():
+                plain.unlink()  # compression finished but the original was not removed
+            names.add(name)
+        ordered = sorted(names)
+        self._next_number = int(ordered[-1][7:13]) + 1 if ordered else 0
+
+        for name in ordered[:-1]:
+            if name in summaries:
+                self.sealed.append(summaries[name])
+            else:
+                self.sealed.append(self._scan(name))
+                self._write_index(self.sealed[-1])
+            if self.compress and not (self.directory / f"{name}.gz").exists():
+                executors.io_pool.submit(self._compress, name)
+
+        if ordered:
+            last = ordered[-1]
+            if last in summaries:
+                self.sealed.append(summaries[last])
+            elif (self.directory / f"{last}.gz").exists():
+                self.sealed.append(self._scan(last))
+                self._write_index(self.sealed[-1])
+            else:
+                self.active = self._scan(last, repair=True)
+                self._file = open(self.directory / last, 'ab')
+
+    def _scan(self, name: str, repair: bool = False) -> _SegmentSummary:
+        """Rebuild a segment summary from its lines; `repair` drops a torn tail"""
+        path = self._segment_path(name)
+        summary = _SegmentSummary(name, path.stat().st_mtime)
+        offset = 0
+        with self._open_segment(name) as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                    summary.add(entry.get("ts", 0.0), entry.get("symbol"), offset, len(line))
+                    if summary.count == 1:
+                        summary.opened_at = entry.get("ts", summary.opened_at)
+                except ValueError:
+                    pass
+                offset += len(line)
+        if repair and offset < path.stat().st_size:
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+            logger.warning(f"Trade journal: dropped torn entry at end of {name}")
+        return summary
+
+    def _write_index(self, summary: _SegmentSummary):
+        with open(self.directory / INDEX_FILE, 'a') as f:
+            f.write(json.dumps(summary.to_dict()) + "\n")
+
+    def _new_segment(self, now: float):
+        name = f"trades-{self._next_number:06d}.jsonl"
+        self._next_number += 1
+        self.active = _SegmentSummary(name, now)
+        self._file = open(self.directory / name, 'ab')
+
+    def _rotate(self):
+        """Seal the active segment and queue it for compression"""
+        self._file.close()
+        self._file = None
+        sealed = self.active
+        self.active = None
+        self._write_index(sealed)
+        self.sealed.append(sealed)
+        self.rotations += 1
+        if self.compress:
+            executors.io_pool.submit(self._compress, sealed.name)
+
+    def _compress(self, name: str):
+        plain = self.directory / name
+        target = self.directory / f"{name}.gz"
+        partial = self.directory / f"{name}.gz.tmp"
+        try:
+            with open(plain, 'rb') as src, gzip.open(partial, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(partial, target)
+            plain.unlink()
+            self.compressed += 1
+        except Exception as e:
+            logger.error(f"Error compressing trade journal segment {name}: {e}")
+
+    # ------------------------------------------------------------------ #
+    # Writing
+    # ------------------------------------------------------------------ #
+    def append(self, entry: Dict[str, Any], symbol: Optional[str] = None,
+               timestamp: Optional[float] = None):
+        """Write one entry; `ts` and `symbol` are added for the reader"""
+        ts = time.time() if timestamp is None else timestamp
+        line = json.dumps({"ts": ts, "symbol": symbol, **entry}, default=str).encode() + b"\n"
+        with self._lock:
+            if self.active is not None and (
+                    self.active.bytes + len(line) > self.max_bytes and self.active.count
+                    or ts - self.active.opened_at >= self.max_seconds):
+                self._rotate()
+            if self.active is None:
+                self._new_segment(ts)
+            offset = self.active.bytes
+            self._file.write(line)
+            self._file.flush()
+            self.active.add(ts, symbol, offset, len(line))
+            self.appends += 1
+
+    def import_legacy(self, path: Path):
+        """One-time import of a JSON-array trade log, if the journal is still empty"""
+        if self.appends or self.sealed or (self.active and self.active.count) or not path.exists():
+            return
+        try:
+            with open(path, 'r') as f:
+                entries = json.load(f)
+            for entry in entries:
+                stamp = entry.get("timestamp")
+                ts = datetime.fromisoformat(stamp).timestamp() if stamp else None
+                symbol = (entry.get("trade_data") or {}).get("symbol")
+                self.append(entry, symbol, ts)
+            logger.info(f"Imported {len(entries)} trade log entries from {path}")
+        except Exception as e:
+            logger.error(f"Error importing trade log {path}: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ------------------------------------------------------------------ #
+    # Reading
+    # ------------------------------------------------------------------ #
+    def _segments(self) -> List[_SegmentSummary]:
+        with self._lock:
+            return self.sealed + ([self.active] if self.active and self.active.count else [])
+
+    def _read(self, summary: _SegmentSummary, start: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        with self._open_segment(summary.name) as f:
+            f.seek(summary.seek_offset(start))
+            remaining = summary.bytes - f.tell()  # ignore anything appended after the snapshot
+            for line in f:
+                remaining -= len(line)
+                if remaining < 0:
+                    break
+                yield json.loads(line)
+
+    def query(self, start: Optional[float] = None, end: Optional[float] = None,
+              symbol: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entries with start <= ts <= end (epoch seconds) for `symbol`, oldest first"""
+        results = []
+        for summary in self._segments():
+            if not summary.overlaps(start, end, symbol):
+                continue
+            for entry in self._read(summary, start):
+                ts = entry["ts"]
+                if start is not None and ts < start or end is not None and ts > end:
+                    continue
+                if symbol is not None and entry.get("symbol") != symbol:
+                    continue
+                results.append(entry)
+                if limit is not None and len(results) >= limit:
+                    return results
+        return results
+
+    def tail(self, n: int = 100, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Last `n` entries (optionally for one symbol), oldest first"""
+        collected: List[Dict[str, Any]] = []
+        for summary in reversed(self._segments()):
+            if not summary.overlaps(None, None, symbol):
+                continue
+            window = deque(maxlen=n - len(collected))
+            for entry in self._read(summary):
+                if symbol is None or entry.get("symbol") == symbol:
+                    window.append(entry)
+            collected = list(window) + collected
+            if len(collected) >= n:
+                break
+        return collected
+
+    def get_stats(self) -> Dict[str, Any]:
+        segments = self._segments()
+        return {
+            "directory": str(self.directory),
+            "segments": len(segments),
+            "entries": sum(s.count for s in segments),
+            "active_segment": self.active.name if self.active else None,
+            "active_bytes": self.active.bytes if self.active else 0,
+            "appends": self.appends,
+            "rotations": self.rotations,
+            "compressed": self.compressed,
+            "symbols": sorted({symbol for s in segments for symbol in s.symbols})
+        }
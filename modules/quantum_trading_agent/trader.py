@@ -13,6 +13,10 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 import numpy as np
 
+from .executors import LoopStallMonitor
+from .market_stream import market_feed, MARKET_STREAM_ENABLED
+from .trade_journal import TradeJournal
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,7 +31,7 @@ logger = logging.getLogger(__name__)
 class QuantumTradingAgent:
     def __init__(self):
         self.config_path = Path("modules/quantum_trading_agent/thresholds.json")
-        self.logs_path = Path("logs/trades.json")
+        self.logs_path = Path("logs/trades.json")  # legacy log, imported into the journal once
         self.ui_path = Path("modules/quantum_trading_agent/UI_toggle.html")
         
         # Safety protocols
@@ -40,6 +44,10 @@ class QuantumTradingAgent:
         self.logs_path.parent.mkdir(exist_ok=True)
         self.config_path.parent.mkdir(exist_ok=True)
         
+        # Append-only trade journal (logs/trades/*.jsonl)
+        self.trade_journal = TradeJournal()
+        self.trade_journal.import_legacy(self.logs_path)
+        
         # Load configuration
         self.config = self.load_config()
         
@@ -49,6 +57,13 @@ class QuantumTradingAgent:
         self.trades_executed = []
         self.pending_trades = []
         
+        # Optional streaming feed (market_stream.MarketDataFeed) used for live
+        # prices; analysis still runs every loop_interval. start_headless
+        # connects the global feed when MARKET_STREAM_ENABLED=true.
+        self.market_feed = market_feed if MARKET_STREAM_ENABLED else None
+        self.loop_interval = 60
+        self.stall_monitor = LoopStallMonitor()
+        
     def load_config(self) -> Dict[str, Any]:
         """Load trading configuration and safety thresholds"""
         default_config = {
@@ -124,6 +139,7 @@ class QuantumTradingAgent:
             analysis = {
                 "symbol": symbol,
                 "timestamp": datetime.now().isoformat(),
+                "price": self.market_feed.get_price(symbol) if self.market_feed else None,
                 "quantum_state": quantum_state,
                 "technical_analysis": technical_analysis,
                 "confidence": confidence,
@@ -168,24 +184,14 @@ class QuantumTradingAgent:
             return None
     
     async def log_trade_activity(self, trade_data: Dict[str, Any]):
-        """Log trade activity to JSON file"""
+        """Append trade activity to the trade journal"""
         try:
-            trades_log = []
-            if self.logs_path.exists():
-                with open(self.logs_path, 'r') as f:
-                    trades_log = json.load(f)
-            
-            trades_log.append({
+            self.trade_journal.append({
                 "timestamp": datetime.now().isoformat(),
                 "trade_data": trade_data,
                 "session_id": self.session_start,
                 "mode": "PREVIEW" if self.preview_mode else "LIVE"
-            })
-            
-            trades_log = trades_log[-1000:]
-            
-            with open(self.logs_path, 'w') as f:
-                json.dump(trades_log, f, indent=2)
+            }, symbol=trade_data.get("symbol"))
                 
             logger.info(f"Trade activity logged: {trade_data.get('signal_id', 'Unknown')}")
             
@@ -341,7 +347,7 @@ class QuantumTradingAgent:
                     if datetime.fromisoformat(trade['timestamp']) > cutoff_time
                 ]
                 
-                await asyncio.sleep(60)
+                await asyncio.sleep(self.loop_interval)
                 
         except Exception as e:
             logger.error(f"Error in trading loop: {e}")
@@ -356,7 +362,16 @@ class QuantumTradingAgent:
         logger.info(f"Deposits Disabled: {not self.deposit_enabled}")
         logger.info(f"Withdrawals Disabled: {not self.withdraw_enabled}")
         
-        await self.trading_loop()
+        self.stall_monitor.start()
+        if self.market_feed is not None:
+            await self.market_feed.subscribe_symbols(self.config["market_analysis"]["pairs"])
+            await self.market_feed.start()
+        try:
+            await self.trading_loop()
+        finally:
+            if self.market_feed is not None:
+                await self.market_feed.stop()
+            await self.stall_monitor.stop()
 
 async def main():
     agent = QuantumTradingAgent()
@@ -1,7 +1,124 @@
-import { spawn } from 'child_process';
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
 import path from 'path';
+import readline from 'readline';
 import { Request, Response } from 'express';
 
+interface PendingCall {
+  resolve: (value: any) => void;
+  reject: (reason: Error) => void;
+  timer: NodeJS.Timeout;
+  worker: ChildProcessWithoutNullStreams;
+}
+
+// The worker failed to start or its stdio transport died, so the call never
+// reached (or never came back from) a running worker. Timeouts and JSON-RPC
+// errors are reported as plain Errors: the worker may still complete those.
+class WorkerTransportError extends Error {}
+
+// Operations that are safe to run a second time in a one-shot process.
+// Anything else (execute-trade) is never retried.
+const IDEMPOTENT_OPERATIONS = new Set([
+  'get-market-data',
+  'process-signals',
+  'generate-recommendation',
+  'get-portfolio',
+]);
+
+// Long-lived `perplexity_injector.py --serve` process speaking newline-delimited
+// JSON-RPC 2.0 over stdio. Keeps interpreter, NumPy and processor state warm
+// between calls; requests are multiplexed by id so they can run concurrently.
+class PythonWorkerClient {
+  private worker: ChildProcessWithoutNullStreams | null = null;
+  private pending = new Map<number, PendingCall>();
+  private nextId = 1;
+
+  constructor(private scriptName: string, private timeoutMs = 15000) {}
+
+  private start(): ChildProcessWithoutNullStreams {
+    const scriptPath = path.join(process.cwd(), 'modules', 'quantum_trading_agent', this.scriptName);
+    const worker = spawn('python3', [scriptPath, '--serve']);
+
+    readline.createInterface({ input: worker.stdout }).on('line', (line) => {
+      let message: any;
+      try {
+        message = JSON.parse(line);
+      } catch (e) {
+        return;
+      }
+      const call = this.pending.get(message.id);
+      if (!call) return;
+      this.pending.delete(message.id);
+      clearTimeout(call.timer);
+      if (message.error) {
+        call.reject(Object.assign(new Error(message.error.message), { code: message.error.code }));
+      } else {
+        call.resolve(message.result);
+      }
+    });
+
+    worker.stderr.on('data', (data) => {
+      console.error(`[quantum-worker] ${data.toString().trim()}`);
+    });
+
+    const fail = (reason: string) => {
+      if (this.worker === worker) {
+        this.worker = null;
+      }
+      this.pending.forEach((call, id) => {
+        if (call.worker !== worker) return;
+        clearTimeout(call.timer);
+        this.pending.delete(id);
+        call.reject(new WorkerTransportError(reason));
+      });
+    };
+
+    worker.on('exit', () => fail('Python worker exited'));
+
+    worker.on('error', (error) => {
+      console.error('Python worker error:', error);
+      fail(`Python worker failed: ${error.message}`);
+    });
+
+    // EPIPE after a failed spawn or a dead worker must not crash the process
+    worker.stdin.on('error', (error) => {
+      console.error('Python worker stdin error:', error);
+      fail(`Python worker stdin failed: ${error.message}`);
+    });
+
+    this.worker = worker;
+    return worker;
+  }
+
+  call(method: string, params: Record<string, any> = {}): Promise<any> {
+    const worker = this.worker ?? this.start();
+    const id = this.nextId++;
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`Python worker call timed out: ${method}`));
+      }, this.timeoutMs);
+
+      this.pending.set(id, { resolve, reject, timer, worker });
+      try {
+        worker.stdin.write(JSON.stringify({ jsonrpc: '2.0', id, method, params }) + '\n');
+      } catch (error) {
+        clearTimeout(timer);
+        this.pending.delete(id);
+        reject(new WorkerTransportError(`Python worker write failed: ${(error as Error).message}`));
+      }
+    });
+  }
+
+  stop(): void {
+    if (this.worker) {
+      this.worker.stdin.write(JSON.stringify({ jsonrpc: '2.0', id: null, method: 'shutdown' }) + '\n');
+      this.worker.stdin.end();
+      this.worker = null;
+    }
+  }
+}
+
 interface QuantumTradingState {
   isLiveMode: boolean;
   marketData: any;
@@ -23,6 +140,27 @@ class QuantumTradingAPI {
 
   private isProcessing = false;
 
+  private signalWorker = new PythonWorkerClient('perplexity_injector.py');
+
+  // Prefer the persistent worker. Only idempotent operations fall back to a
+  // one-shot process, and only when the worker could not be reached: after a
+  // timeout or an RPC error the worker may still complete the call.
+  async callQuantumOperation(operation: string, params: Record<string, any> = {}): Promise<any> {
+    try {
+      return await this.signalWorker.call(operation, params);
+    } catch (error) {
+      if (!(error instanceof WorkerTransportError) || !IDEMPOTENT_OPERATIONS.has(operation)) {
+        throw error;
+      }
+      console.error(`Quantum worker unavailable (${operation}), using one-shot process:`, error);
+      const args = [`--${operation}`];
+      Object.entries(params).forEach(([key, value]) => {
+        args.push(`--${key.replace(/_/g, '-')}`, String(value));
+      });
+      return this.callPythonScript('perplexity_injector.py', args);
+    }
+  }
+
   async callPythonScript(scriptName: string, args: string[] = []): Promise<any> {
     return new Promise((resolve, reject) => {
       const pythonPath = path.join(process.cwd(), 'modules', 'quantum_trading_agent', scriptName);
@@ -66,7 +204,7 @@ class QuantumTradingAPI {
 
     try {
       // Try to fetch live data first
-      const result = await this.callPythonScript('perplexity_injector.py', ['--get-market-data']);
+      const result = await this.callQuantumOperation('get-market-data');
       
       if (result.success && result.btc_price > 0) {
         this.state.marketData = {
@@ -115,7 +253,7 @@ class QuantumTradingAPI {
   async updateQuantumSignals(): Promise<void> {
     try {
       // Call the quantum signal processing
-      const result = await this.callPythonScript('perplexity_injector.py', ['--process-signals']);
+      const result = await this.callQuantumOperation('process-signals');
       
       if (result.success) {
         this.state.quantumSignals = {
@@ -154,7 +292,7 @@ class QuantumTradingAPI {
   async updateTradingRecommendation(): Promise<void> {
     try {
       // Generate trading recommendation based on quantum signals
-      const result = await this.callPythonScript('perplexity_injector.py', ['--generate-recommendation']);
+      const result = await this.callQuantumOperation('generate-recommendation');
       
       if (result.success) {
         this.state.recommendation = {
@@ -187,7 +325,7 @@ class QuantumTradingAPI {
   async updatePortfolioStatus(): Promise<void> {
     try {
       // Get portfolio status from trading system
-      const result = await this.callPythonScript('perplexity_injector.py', ['--get-portfolio']);
+      const result = await this.callQuantumOperation('get-portfolio');
       
       if (result.success) {
         this.state.portfolio = {
@@ -222,13 +360,12 @@ class QuantumTradingAPI {
   async executeTrade(symbol: string, action: string, quantity: number): Promise<any> {
     try {
       // Execute trade through the trading system
-      const result = await this.callPythonScript('perplexity_injector.py', [
-        '--execute-trade',
-        '--symbol', symbol,
-        '--action', action,
-        '--quantity', quantity.toString(),
-        '--live-mode', this.state.isLiveMode.toString()
-      ]);
+      const result = await this.callQuantumOperation('execute-trade', {
+        symbol,
+        action,
+        quantity,
+        live_mode: this.state.isLiveMode
+      });
 
       // Update portfolio after trade execution
       await this.updatePortfolioStatus();
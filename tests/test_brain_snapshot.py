@@ -0,0 +1,92 @@
+"""Brain snapshots: round trips, delta chains and atomic replacement"""
+
+import numpy as np
+import pytest
+
+from modules.quantum_trading_agent import brain_snapshot
+from modules.quantum_trading_agent.brain_snapshot import BrainSnapshotStore
+
+
+def make_patterns(count, seed=0):
+    rng = np.random.default_rng(seed)
+    patterns = {}
+    for i in range(count):
+        pattern = {"signature": list(rng.normal(size=int(rng.choice([4, 6])))),
+                   "accuracy": float(rng.random()), "occurrences": int(rng.integers(1, 50)),
+                   "timestamp": "2026-01-01T00:00:00", "type": "breakout"}
+        if i % 3 == 0:
+            pattern["direction"] = "UP"
+            pattern["outcomes"] = [1, 0, 1]
+        if i % 5 == 0:
+            del pattern["accuracy"]
+        patterns[f"P{i}"] = pattern
+    return patterns
+
+
+def test_full_snapshot_round_trips(tmp_path):
+    store = BrainSnapshotStore(tmp_path / "brain")
+    patterns = make_patterns(40)
+    matrix = np.random.default_rng(1).normal(size=(8, 8))
+    store.save({"learning_rate": 0.01}, patterns, entanglement=matrix, full=True)
+
+    loaded = store.load()
+    assert loaded["patterns"] == patterns
+    assert loaded["meta"]["learning_rate"] == 0.01
+    np.testing.assert_array_equal(loaded["entanglement"], matrix)
+
+    # The matrix is mapped copy-on-write: evolving it leaves the file alone
+    loaded["entanglement"][0, 0] += 1.0
+    np.testing.assert_array_equal(store.load()["entanglement"], matrix)
+
+
+def test_delta_chain_replays_changes_and_removals(tmp_path):
+    store = BrainSnapshotStore(tmp_path / "brain", max_deltas=3)
+    patterns = make_patterns(20)
+    matrix = np.eye(4)
+    store.save({"version": 1}, patterns, entanglement=matrix, full=True)
+
+    changed = {"P1": dict(patterns["P1"], accuracy=0.99), "NEW": {"signature": [1.0, 2.0]}}
+    patterns.update(changed)
+    del patterns["P2"]
+    store.save({"version": 2}, changed, removed=["P2"])
+    matrix = matrix * 2
+    store.save({"version": 3}, {}, entanglement=matrix)
+
+    loaded = store.load()
+    assert loaded["patterns"] == patterns
+    assert loaded["meta"]["version"] == 3
+    np.testing.assert_array_equal(loaded["entanglement"], matrix)
+
+    assert not store.needs_full()
+    store.save({"version": 4}, {})
+    assert store.needs_full()
+
+    # A full snapshot restarts the chain and prunes what it replaced
+    name = store.save({"version": 5}, patterns, entanglement=matrix, full=True)
+    assert sorted(entry.name for entry in (tmp_path / "brain").iterdir() if entry.is_dir()) == [name]
+    assert store.load()["patterns"] == patterns
+
+
+def test_a_failed_save_leaves_the_current_snapshot(tmp_path, monkeypatch):
+    store = BrainSnapshotStore(tmp_path / "brain")
+    patterns = make_patterns(5)
+    store.save({"version": 1}, patterns, full=True)
+
+    def fail(path, payload):
+        raise OSError("disk full")
+    monkeypatch.setattr(brain_snapshot, "_write_json", fail)
+    with pytest.raises(OSError):
+        store.save({"version": 2}, {}, removed=list(patterns))
+    monkeypatch.undo()
+
+    loaded = store.load()
+    assert loaded["meta"]["version"] == 1
+    assert loaded["patterns"] == patterns
+    assert not [entry for entry in (tmp_path / "brain").iterdir() if entry.name.endswith(".tmp")]
+
+
+def test_empty_store(tmp_path):
+    store = BrainSnapshotStore(tmp_path / "brain")
+    assert not store.exists()
+    assert store.load() is None
+    assert store.needs_full()
@@ -0,0 +1,90 @@
+"""Vectorized pivots and RSI divergence against a bar-by-bar loop"""
+
+import numpy as np
+
+from modules.quantum_trading_agent.divergence_detector import (find_pivots, latest_divergence,
+                                                               scan_divergence)
+
+
+def make_series(symbols: int, bars: int, seed: int = 2):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, (symbols, bars)), axis=-1)
+    spread = rng.uniform(0.1, 1.0, (symbols, bars))
+    rsi = np.clip(50 + np.cumsum(rng.normal(0, 4, (symbols, bars)), axis=-1), 0, 100)
+    return np.round(close + spread, 1), np.round(close - spread, 1), rsi
+
+
+def loop_pivots(values, width, mode):
+    pivots = []
+    for i in range(width, len(values) - width):
+        neighbours = [values[i + k] for k in range(-width, width + 1) if k]
+        if mode == "high" and all(values[i] > v for v in neighbours):
+            pivots.append(i)
+        if mode == "low" and all(values[i] < v for v in neighbours):
+            pivots.append(i)
+    return pivots
+
+
+def loop_scan(price, rsi, width, lookback, mode):
+    pivots = loop_pivots(price, width, mode)
+    hits = []
+    for previous, current in zip(pivots, pivots[1:]):
+        if current - previous > lookback:
+            continue
+        if mode == "high" and price[current] > price[previous] and rsi[current] < rsi[previous]:
+            hits.append(current)
+        if mode == "low" and price[current] < price[previous] and rsi[current] > rsi[previous]:
+            hits.append(current)
+    return hits
+
+
+def loop_latest(price, rsi, width, lookback, mode):
+    pivots = [i for i in loop_pivots(price, width, mode) if i >= len(price) - lookback]
+    if len(pivots) < 2:
+        return False
+    previous, current = pivots[-2:]
+    if mode == "high":
+        return bool(price[current] > price[previous] and rsi[current] < rsi[previous])
+    return bool(price[current] < price[previous] and rsi[current] > rsi[previous])
+
+
+def test_pivots_match_the_loop_including_ties():
+    high, low, _ = make_series(4, 300)
+    for width in (1, 2, 3):
+        batch = find_pivots(high, width, "high")
+        for row in range(len(high)):
+            assert list(np.flatnonzero(batch[row])) == loop_pivots(high[row], width, "high")
+            assert list(np.flatnonzero(find_pivots(low[row], width, "low"))) == loop_pivots(low[row], width, "low")
+    assert not find_pivots(np.array([1.0, 3.0]), 1).any()
+
+
+def test_scan_matches_the_loop_for_every_symbol():
+    high, low, rsi = make_series(6, 400)
+    for width, lookback in ((1, 20), (2, 12)):
+        result = scan_divergence(high, low, rsi, lookback=lookback, pivot_width=width)
+        for row in range(len(high)):
+            assert list(np.flatnonzero(result["bearish"][row])) == loop_scan(high[row], rsi[row], width, lookback, "high")
+            assert list(np.flatnonzero(result["bullish"][row])) == loop_scan(low[row], rsi[row], width, lookback, "low")
+
+        # A single series gives the same answer as its row in the batch
+        single = scan_divergence(high[3], low[3], rsi[3], lookback=lookback, pivot_width=width)
+        assert (single["bearish"] == result["bearish"][3]).all()
+
+
+def test_latest_matches_the_tail_window_loop():
+    high, low, rsi = make_series(200, 60, seed=5)
+    flags = latest_divergence(high, low, rsi, lookback=20)
+    expected_bearish = [loop_latest(high[row], rsi[row], 1, 20, "high") for row in range(len(high))]
+    expected_bullish = [loop_latest(low[row], rsi[row], 1, 20, "low") for row in range(len(high))]
+    assert list(flags["bearish"]) == expected_bearish
+    assert list(flags["bullish"]) == expected_bullish
+    assert any(expected_bearish) and any(expected_bullish)
+
+
+def test_textbook_bearish_divergence():
+    high = np.array([1, 2, 5, 2, 1, 2, 6, 2, 1], dtype=float)
+    low = high - 0.5
+    rsi = np.array([50, 60, 80, 60, 50, 60, 70, 60, 50], dtype=float)
+    flags = latest_divergence(high, low, rsi, lookback=9)
+    assert bool(flags["bearish"]) and not bool(flags["bullish"])
+    assert list(np.flatnonzero(scan_divergence(high, low, rsi)["bearish"])) == [6]
@@ -0,0 +1,46 @@
+"""Executor pools and the event-loop stall monitor"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from modules.quantum_trading_agent.executors import ExecutorLayer, LoopStallMonitor
+
+
+def test_a_blocked_loop_is_reported_as_a_stall():
+    async def run():
+        monitor = LoopStallMonitor(threshold=0.1)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        time.sleep(0.3)  # the blocking call the monitor should catch
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(run())
+    assert monitor.stalls == 1
+    assert monitor.last_stall["stalled_for"] >= monitor.threshold
+    assert "time.sleep(0.3)" in monitor.last_stall["stack"]
+    assert monitor.get_stats()["max_lag"] >= 0.2
+    assert not monitor.running
+
+
+def test_cpu_work_round_trips_through_the_spawn_pool():
+    layer = ExecutorLayer(io_threads=2, cpu_processes=1, start_method="spawn")
+
+    async def run():
+        return await layer.run_cpu(os.getpid), await layer.run_cpu(pow, 3, 4), await layer.run_io(pow, 2, 10)
+
+    worker_pid, power, io_power = asyncio.run(run())
+    assert worker_pid != os.getpid()
+    assert (power, io_power) == (81, 1024)
+    stats = layer.get_stats()
+    assert (stats["cpu_calls"], stats["io_calls"]) == (2, 1)
+
+    pool = layer.cpu_pool
+    layer.shutdown()
+    assert layer._cpu_pool is None and layer._io_pool is None
+    with pytest.raises(RuntimeError):
+        pool.submit(pow, 1, 1)
@@ -0,0 +1,99 @@
+"""Exit book triggers against a scan of every open position"""
+
+import random
+
+import pytest
+
+from modules.quantum_trading_agent.exit_book import (ExitBook, REASON_MAX_TIME, REASON_STOP_LOSS,
+                                                     REASON_TAKE_PROFIT)
+from modules.quantum_trading_agent.records import PositionRecord
+
+
+def make_positions(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    positions = {}
+    for i in range(count):
+        side = rng.choice(["LONG", "SHORT"])
+        entry = rng.uniform(95, 105)
+        stop_gap, take_gap = rng.uniform(0.2, 4), rng.uniform(0.2, 4)
+        if side == "LONG":
+            stop_loss, take_profit = entry - stop_gap, entry + take_gap
+        else:
+            stop_loss, take_profit = entry + stop_gap, entry - take_gap
+        symbol = rng.choice(["BTCUSDT", "ETHUSDT"])
+        positions[f"P{i}"] = PositionRecord.open(f"P{i}", symbol, side, entry, quantity=1.0,
+                                                 stop_loss=stop_loss, take_profit=take_profit)
+    return positions
+
+
+def scan(positions, symbol, price):
+    return {key: position.exit_reason_at(price) for key, position in positions.items()
+            if position.symbol == symbol and position.exit_reason_at(price)}
+
+
+def test_triggered_matches_a_full_scan():
+    positions = make_positions(300)
+    book = ExitBook()
+    for key, position in positions.items():
+        book.add(key, position.symbol, position.side_name, position.stop_loss, position.take_profit)
+
+    rng = random.Random(11)
+    for _ in range(200):
+        symbol = rng.choice(["BTCUSDT", "ETHUSDT"])
+        price = rng.uniform(90, 110)
+        hits = book.triggered(symbol, price)
+        assert len(hits) == len({key for key, _ in hits})
+        assert dict(hits) == scan(positions, symbol, price)
+
+        # Close what triggered, as the engines do, so later prices see the rest
+        for key, _ in hits[:5]:
+            book.remove(key)
+            del positions[key]
+    assert len(book) == len(positions)
+
+
+def test_levels_are_inclusive_and_the_stop_wins():
+    book = ExitBook()
+    book.add("L", "BTCUSDT", "BUY", 95.0, 105.0)
+    book.add("S", "BTCUSDT", "SELL", 105.0, 95.0)
+    assert book.triggered("BTCUSDT", 100.0) == []
+    assert dict(book.triggered("BTCUSDT", 95.0)) == {"L": REASON_STOP_LOSS, "S": REASON_TAKE_PROFIT}
+    assert dict(book.triggered("BTCUSDT", 105.0)) == {"L": REASON_TAKE_PROFIT, "S": REASON_STOP_LOSS}
+    assert book.triggered("ETHUSDT", 95.0) == []
+
+    # A stop at or above the target (a gap) reports the stop once
+    book.add("G", "ETHUSDT", "LONG", 101.0, 100.0)
+    assert book.triggered("ETHUSDT", 100.5) == [("G", REASON_STOP_LOSS)]
+
+
+def test_deadlines_fire_once_and_follow_re_adds():
+    book = ExitBook()
+    book.add("A", "BTCUSDT", "LONG", 90.0, 110.0, deadline=10.0)
+    book.add("B", "BTCUSDT", "SHORT", 110.0, 90.0, deadline=20.0)
+    book.add("C", "BTCUSDT", "LONG", 90.0, 110.0, deadline=15.0)
+    assert book.next_deadline() == 10.0
+
+    assert book.expired("BTCUSDT", now=9.0) == []
+    book.remove("C")
+    # Re-adding moves the deadline; the stale heap entry is dropped
+    book.add("A", "BTCUSDT", "LONG", 90.0, 110.0, deadline=30.0)
+    assert book.expired("BTCUSDT", now=20.0) == [("B", REASON_MAX_TIME)]
+    assert book.expired("BTCUSDT", now=20.0) == []
+    assert book.expired("BTCUSDT", now=30.0) == [("A", REASON_MAX_TIME)]
+
+    # Expiry reports a position; the owner removes it when it closes
+    assert "A" in book
+    book.remove("A")
+    book.remove("B")
+    assert len(book) == 0
+    assert book.symbols() == []
+    assert book.get_stats()["positions"] == 0
+
+
+@pytest.mark.parametrize("side", ["LONG", "SHORT"])
+def test_removed_positions_never_trigger(side):
+    book = ExitBook()
+    for i in range(3):
+        book.add(f"P{i}", "BTCUSDT", side, 100.0, 100.0)
+    book.remove("P1")
+    assert sorted(key for key, _ in book.triggered("BTCUSDT", 100.0)) == ["P0", "P2"]
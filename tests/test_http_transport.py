@@ -0,0 +1,63 @@
+"""Pooled HTTP transport: connection reuse across connectors and event-loop changes"""
+
+import asyncio
+
+import pytest
+
+from modules.quantum_trading_agent.binance_connector import BinanceFuturesConnector
+from modules.quantum_trading_agent.bybit_trade_dispatch import BybitTradeDispatch
+from modules.quantum_trading_agent.exchange_standin import ExchangeStandInServer
+from modules.quantum_trading_agent.http_transport import HTTPTransport
+
+
+def test_connectors_share_one_keep_alive_connection():
+    async def run():
+        async with ExchangeStandInServer() as server, HTTPTransport() as transport:
+            binance = BinanceFuturesConnector(transport)
+            bybit = BybitTradeDispatch(transport)
+            binance.base_url = bybit.base_url = server.base_url
+            binance.rate_limiter = bybit.rate_limiter = False
+
+            results = []
+            for _ in range(3):
+                results.append(await binance.test_connectivity())
+                results.append(await binance.get_server_time())
+                results.append(await bybit.test_connectivity())
+            return results, server.get_stats(), transport.get_stats()
+
+    results, server, transport = asyncio.run(run())
+    assert all(result["success"] for result in results)
+    assert server["requests"] == 9
+    assert server["client_connections"] == 1
+    assert transport["sessions_opened"] == 1
+    assert transport["connections_created"] == 1
+    assert transport["connections_reused"] == 8
+
+
+# The first loop's pool is dropped unclosed: its loop is gone, so it cannot be awaited
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnraisableExceptionWarning")
+def test_a_new_event_loop_gets_a_new_session_and_close_releases_it():
+    transport = HTTPTransport()
+
+    async def ping():
+        async with ExchangeStandInServer() as server:
+            session = await transport.get_session()
+            async with session.get(f"{server.base_url}/fapi/v1/ping") as response:
+                assert response.status == 200
+            assert await transport.get_session() is session
+            return session
+
+    first = asyncio.run(ping())
+
+    async def ping_and_close():
+        session = await ping()
+        await transport.close()
+        return session
+
+    second = asyncio.run(ping_and_close())
+    assert second is not first
+    assert second.closed
+    stats = transport.get_stats()
+    assert stats["sessions_opened"] == 2
+    assert not stats["open"]
+    assert stats["requests_sent"] == 2
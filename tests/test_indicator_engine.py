@@ -0,0 +1,118 @@
+"""Streaming indicator engine against the pandas indicator path"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.quantum_trading_agent.advanced_quantum_trader import compute_basic_indicators
+from modules.quantum_trading_agent.indicator_engine import RESUM_INTERVAL, RollingRegression, StreamingIndicatorEngine
+
+# Rolling-window indicators match the frame exactly
+WINDOW_KEYS = ["sma_20", "sma_50", "rsi", "bb_upper", "bb_middle", "bb_lower",
+               "stoch_k", "stoch_d", "vwap", "volume_sma", "volume_ratio"]
+# EMA-based values carry the streamed history; the frame's EWM converges to them
+EMA_KEYS = ["macd", "macd_signal", "atr"]
+
+
+def make_bars(count: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    spread = rng.uniform(0.1, 1.5, count)
+    return pd.DataFrame({
+        "open": close + rng.normal(0, 0.3, count),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.uniform(100, 1000, count)
+    })
+
+
+def assert_matches_pandas(values, df, ema_tolerance=1e-9):
+    expected = compute_basic_indicators(df)
+    for key in WINDOW_KEYS:
+        assert values[key] == pytest.approx(float(expected[key].iloc[-1]), rel=1e-9, nan_ok=True), key
+    for key in EMA_KEYS:
+        assert values[key] == pytest.approx(float(expected[key].iloc[-1]), rel=ema_tolerance, abs=1e-6), key
+
+
+def test_growing_frame_matches_pandas():
+    bars = make_bars(300)
+    engine = StreamingIndicatorEngine()
+    for end in range(60, 301, 17):
+        assert_matches_pandas(engine.sync(bars.iloc[:end]), bars.iloc[:end])
+
+
+def test_sliding_window_with_fresh_index_matches_pandas():
+    bars = make_bars(800)
+    window = 300
+    engine = StreamingIndicatorEngine()
+    for end in range(window, 801, 4):
+        frame = bars.iloc[end - window:end].reset_index(drop=True)
+        # The EWM of a 300-bar frame is within ~1e-6 of the streamed EMA
+        assert_matches_pandas(engine.sync(frame), frame, ema_tolerance=1e-4)
+    assert engine.bars_seen == 800
+
+
+def test_forming_candle_updated_in_place_matches_pandas():
+    bars = make_bars(200)
+    engine = StreamingIndicatorEngine()
+    frame = bars.iloc[:150].copy()
+    engine.sync(frame)
+
+    for step in range(5):
+        frame.iloc[-1, frame.columns.get_loc("close")] += 0.8
+        frame.iloc[-1, frame.columns.get_loc("high")] = max(frame["high"].iloc[-1], frame["close"].iloc[-1])
+        frame.iloc[-1, frame.columns.get_loc("volume")] += 50
+        assert_matches_pandas(engine.sync(frame), frame)
+    assert engine.bars_seen == 150
+
+    # The candle closes and a new one opens under the next label
+    frame = pd.concat([frame, bars.iloc[150:151]])
+    assert_matches_pandas(engine.sync(frame), frame)
+    assert engine.bars_seen == 151
+
+
+def test_unrelated_history_resets():
+    engine = StreamingIndicatorEngine()
+    engine.sync(make_bars(120, seed=1))
+    other = make_bars(120, seed=2)
+    assert_matches_pandas(engine.sync(other), other)
+    assert engine.bars_seen == 120
+
+
+def test_update_tick_previews_without_committing():
+    bars = make_bars(120)
+    engine = StreamingIndicatorEngine()
+    engine.sync(bars.iloc[:119])
+    committed = engine.snapshot()
+
+    last = bars.iloc[119]
+    engine.update_tick(last["low"], 0.0)
+    engine.update_tick(last["high"], 0.0)
+    preview = engine.update_tick(last["close"], last["volume"])
+    assert engine.snapshot() == committed
+
+    committed = engine.close_forming_bar()
+    assert preview == pytest.approx(committed, nan_ok=True)
+    # The next sync sees the closed bar as already consumed
+    assert_matches_pandas(engine.sync(bars), bars)
+    assert engine.bars_seen == 120
+
+
+def test_shrinking_frame_keeps_vwap_on_the_frame():
+    bars = make_bars(200)
+    engine = StreamingIndicatorEngine()
+    engine.sync(bars)
+    assert_matches_pandas(engine.sync(bars.iloc[50:]), bars.iloc[50:], ema_tolerance=1e-2)
+
+
+def test_rolling_regression_matches_polyfit_past_a_resum():
+    prices = 60000 + np.cumsum(np.random.default_rng(3).normal(0, 5, RESUM_INTERVAL + 1500))
+    regression = RollingRegression(50)
+    for i, price in enumerate(prices):
+        regression.push(float(price))
+        if i >= 49 and (i % 250 == 0 or i == len(prices) - 1):
+            window = prices[i - 49:i + 1]
+            assert regression.ready
+            assert regression.slope() == pytest.approx(np.polyfit(np.arange(50), window, 1)[0], rel=1e-7, abs=1e-9)
+            assert regression.mean() == pytest.approx(window.mean(), rel=1e-12)
@@ -0,0 +1,123 @@
+"""QuantumMarketBrain coherence cache, outcome routing and snapshot reloads"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from modules.quantum_trading_agent.market_brain import QuantumMarketBrain
+
+
+@pytest.fixture
+def brain(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # snapshots live under ./logs
+    return QuantumMarketBrain()
+
+
+def test_coherence_is_cached_per_matrix_version(brain, monkeypatch):
+    calls = []
+    exact = brain._exact_coherence
+    monkeypatch.setattr(brain, "_exact_coherence", lambda: calls.append(1) or exact())
+
+    first = brain.calculate_quantum_coherence()
+    assert brain.calculate_quantum_coherence() == first
+    assert len(calls) == 1
+    # The estimate reuses an exact value for the same version
+    assert brain.calculate_quantum_coherence("estimate") == first
+
+    brain.evolve_quantum_network()
+    brain.calculate_quantum_coherence()
+    assert len(calls) == 2
+
+
+def test_estimate_tracks_the_exact_value(brain):
+    rng = np.random.default_rng(0)
+    brain.calculate_quantum_coherence()  # calibrates the bulk-spectrum factor
+    for _ in range(3):
+        brain.entanglement_matrix = np.clip(brain.entanglement_matrix + rng.normal(0, 0.01, (512, 512)), -1, 1)
+        brain.invalidate_coherence()
+        estimate = brain.calculate_quantum_coherence("estimate")
+        assert estimate == pytest.approx(brain._exact_coherence(), rel=0.02)
+
+
+def test_async_exact_matches_and_fills_the_cache(brain):
+    expected = brain._exact_coherence()
+    assert asyncio.run(brain.calculate_quantum_coherence_async()) == pytest.approx(expected)
+    assert brain.coherence_cache["exact"][0] == brain.entanglement_version
+
+
+def store_patterns(brain, count):
+    for i in range(count):
+        brain.pattern_library[f"pattern_{i}"] = {"signature": [1.0, float(i)], "accuracy": 0.5,
+                                                 "occurrences": 1, "timestamp": "2026-01-01T00:00:00"}
+        brain.pattern_index.add(f"pattern_{i}", [1.0, float(i)])
+        brain.mark_pattern_dirty(f"pattern_{i}")
+    brain.pattern_counter = count
+
+
+def test_outcomes_reach_only_the_patterns_linked_to_the_trade(brain):
+    store_patterns(brain, 4)
+    brain.record_pattern_use("pattern_0", "T1")
+    brain.record_pattern_use("pattern_1", "T1")
+    brain.record_pattern_use("pattern_2", "T2")
+    # Re-used for a later trade: the earlier trade no longer owns it
+    brain.record_pattern_use("pattern_1", "T3")
+    assert brain.trade_patterns == {"T1": {"pattern_0"}, "T2": {"pattern_2"}, "T3": {"pattern_1"}}
+
+    brain.learn_from_outcome("T1", "WIN", 1.0)
+    brain.learn_from_outcome("T1", "WIN", 1.0)  # a duplicate report finds nothing left to update
+    assert brain.apply_pending_outcomes() == 2
+    library = brain.pattern_library
+    assert library["pattern_0"]["accuracy"] == pytest.approx(0.5 * (1 - brain.learning_rate) + brain.learning_rate)
+    assert library["pattern_0"]["occurrences"] == 2
+    assert "last_used_trade" not in library["pattern_0"]
+    assert [library[f"pattern_{i}"]["accuracy"] for i in (1, 2, 3)] == [0.5, 0.5, 0.5]
+    assert brain.performance.lifetime.count == 2
+
+    brain.remove_pattern("pattern_2")
+    assert "T2" not in brain.trade_patterns
+
+
+def test_snapshots_reload_the_library_and_open_links(brain):
+    store_patterns(brain, 5)
+    brain.record_pattern_use("pattern_3", "T9")
+    brain.save_brain_state(full=True)
+
+    brain.remove_pattern("pattern_0")
+    brain.learn_from_outcome("T9", "LOSS", -2.0)
+    brain.record_pattern_use("pattern_4", "T10")
+    brain.flush()
+
+    reloaded = QuantumMarketBrain()
+    assert reloaded.pattern_library == brain.pattern_library
+    assert reloaded.trade_patterns == {"T10": {"pattern_4"}}
+    assert reloaded.pattern_counter == 5
+    np.testing.assert_array_equal(reloaded.entanglement_matrix, brain.entanglement_matrix)
+    assert reloaded.performance.lifetime.total == pytest.approx(-2.0)
+    assert reloaded.pattern_index.search([1.0, 4.0])[0][0] == "pattern_4"
+
+
+def test_batched_superposition_matches_one_snapshot_at_a_time(brain):
+    rng = np.random.default_rng(9)
+    snapshots = []
+    for _ in range(40):
+        snapshot = {"price": float(rng.uniform(90, 110)), "volume": float(rng.uniform(1, 5)),
+                    "indicators": {"rsi": float(rng.uniform(0, 100)), "macd": float(rng.normal())}}
+        if rng.random() < 0.3:
+            del snapshot["volume"]  # missing features are filled, not shifted
+        snapshots.append(dict(reversed(list(snapshot.items()))) if rng.random() < 0.5 else snapshot)
+    brain.set_feature_schema(["indicators.macd", "indicators.rsi", "price", "volume"])
+
+    batch = brain.quantum_superposition_batch(snapshots)
+    for row, snapshot in enumerate(snapshots):
+        single = brain.quantum_superposition_analysis(snapshot)
+        assert batch["probability_up"][row] == pytest.approx(single["probability_up"])
+        assert batch["uncertainty"][row] == pytest.approx(single["uncertainty"])
+
+        # The per-snapshot formula, written out
+        vector = np.array([snapshot["indicators"]["macd"], snapshot["indicators"]["rsi"], snapshot["price"],
+                           snapshot.get("volume", 0.0)])
+        probs = np.abs(vector @ brain.entanglement_matrix[:4, :4]) ** 2
+        probs /= probs.sum()
+        assert single["probability_up"] == pytest.approx(probs[probs > np.median(probs)].sum())
+    assert batch["probability_down"] == pytest.approx(1.0 - batch["probability_up"])
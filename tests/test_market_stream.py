@@ -0,0 +1,118 @@
+"""Market data feed against the replay server: fan-out, reconnects and slow subscribers"""
+
+import asyncio
+import logging
+import re
+import socket
+import time
+
+from modules.quantum_trading_agent.http_transport import HTTPTransport
+from modules.quantum_trading_agent.market_replay import MarketReplayServer, synthetic_events
+from modules.quantum_trading_agent.market_stream import MarketDataFeed, parse_stream_message
+
+EVENTS = synthetic_events(("BTCUSDT", "ETHUSDT"), count=40)
+
+
+def replayed(kinds, symbols=None):
+    ticks = [parse_stream_message(event) for event in EVENTS]
+    return [tick for tick in ticks if tick["type"] in kinds and (symbols is None or tick["symbol"] in symbols)]
+
+
+async def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_two_subscribers_see_the_replay_in_order():
+    async def run():
+        everything, eth_trades = [], []
+        async with MarketReplayServer(EVENTS) as server, HTTPTransport() as transport:
+            feed = MarketDataFeed(server.url, symbols=["BTC", "ETH"], transport=transport)
+            feed.add_subscriber(lambda tick, market_data: everything.append(tick), kinds=("trade", "kline"),
+                                name="everything")
+            feed.add_subscriber(lambda tick, market_data: eth_trades.append(tick), symbols=["ETH"],
+                                kinds=("trade",), name="eth_trades")
+            async with feed:
+                await wait_until(lambda: len(everything) == len(replayed(("trade", "kline")))
+                                 and len(eth_trades) == len(replayed(("trade",), {"ETHUSDT"})))
+                assert server.connections == 1
+                return everything, eth_trades, feed.get_price("btc/usd")
+
+    everything, eth_trades, btc_price = asyncio.run(run())
+    assert everything == replayed(("trade", "kline"))
+    assert eth_trades == replayed(("trade",), {"ETHUSDT"})
+    assert btc_price == replayed(("trade",), {"BTCUSDT"})[-1]["price"]
+
+
+def test_a_dropped_connection_reconnects_and_resubscribes():
+    async def run():
+        trades = []
+        async with MarketReplayServer(EVENTS, disconnect_after=100) as server, HTTPTransport() as transport:
+            feed = MarketDataFeed(server.url, symbols=["BTC", "ETH"], transport=transport)
+            feed.add_subscriber(lambda tick, market_data: trades.append(tick), kinds=("trade",))
+            async with feed:
+                await wait_until(lambda: len(trades) == len(replayed(("trade",))))
+                return trades, server.connections, server.subscribe_requests, sorted(feed.streams), feed.reconnects
+
+    trades, connections, subscribe_requests, streams, reconnects = asyncio.run(run())
+    # 240 messages, 100 per connection: the server hangs up twice
+    assert connections == 3 and reconnects == 2
+    assert subscribe_requests == [streams] * 3
+    # Nothing is lost or repeated across the reconnects
+    assert trades == replayed(("trade",))
+
+
+def test_reconnect_delays_back_off_to_the_cap(monkeypatch, caplog):
+    monkeypatch.setattr("modules.quantum_trading_agent.market_stream.random.random", lambda: 0.5)
+    caplog.set_level(logging.INFO, logger="modules.quantum_trading_agent.market_stream")
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]  # nothing listens here once the probe closes
+
+    async def run():
+        async with HTTPTransport() as transport:
+            feed = MarketDataFeed(f"ws://127.0.0.1:{port}/stream", symbols=["BTC"], transport=transport,
+                                  max_backoff=0.75)
+            async with feed:
+                await wait_until(lambda: feed.reconnects >= 3)
+                assert not feed.connected and feed.last_error
+
+    asyncio.run(run())
+    delays = [float(d) for d in re.findall(r"reconnecting in ([\d.]+)s", caplog.text)]
+    assert delays[:3] == [0.5, 0.75, 0.75]
+
+
+def test_a_slow_subscriber_drops_its_oldest_ticks():
+    async def run():
+        fast, slow = [], []
+        release = asyncio.Event()
+
+        async def stalled(tick, market_data):
+            await release.wait()
+            slow.append(tick)
+
+        async with MarketReplayServer(EVENTS) as server, HTTPTransport() as transport:
+            feed = MarketDataFeed(server.url, symbols=["BTC", "ETH"], transport=transport, queue_size=5)
+            feed.add_subscriber(lambda tick, market_data: fast.append(tick), kinds=("trade",), name="fast")
+            feed.add_subscriber(stalled, kinds=("trade",), name="slow")
+            async with feed:
+                await wait_until(lambda: len(fast) == len(replayed(("trade",))))
+                stats = feed.get_stats()["subscribers"]
+                release.set()
+                await wait_until(lambda: feed.get_stats()["subscribers"]["slow"]["queued"] == 0 and len(slow) > 5)
+                await asyncio.sleep(0.05)
+                return fast, slow, stats, feed.get_stats()["subscribers"]
+
+    fast, slow, stalled_stats, final_stats = asyncio.run(run())
+    trades = replayed(("trade",))
+    assert fast == trades
+    assert stalled_stats["fast"]["dropped"] == 0
+    # The stalled consumer holds one tick and a full queue; everything else overflowed
+    assert stalled_stats["slow"]["queued"] == 5
+    assert stalled_stats["slow"]["dropped"] == len(trades) - 1 - 5 - stalled_stats["slow"]["delivered"]
+    assert final_stats["slow"]["dropped"] == stalled_stats["slow"]["dropped"] > 0
+    assert final_stats["slow"]["delivered"] + final_stats["slow"]["dropped"] == len(trades)
+    # The freshest ticks survive the overflow
+    assert slow[-5:] == trades[-5:]
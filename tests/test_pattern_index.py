@@ -0,0 +1,90 @@
+"""Pattern index search against a brute-force cosine scan"""
+
+import numpy as np
+import pytest
+
+from modules.quantum_trading_agent.pattern_index import PatternIndex
+
+
+def brute_force(patterns, query, k, min_similarity=-1.0):
+    query = np.asarray(query, dtype=float)
+    scores = []
+    for pattern_id, signature in patterns.items():
+        signature = np.asarray(signature, dtype=float)
+        if signature.shape != query.shape:
+            continue
+        similarity = float(signature @ query / (np.linalg.norm(signature) * np.linalg.norm(query)))
+        if similarity > min_similarity:
+            scores.append((pattern_id, similarity))
+    return sorted(scores, key=lambda item: -item[1])[:k]
+
+
+def make_patterns(count, seed=6):
+    rng = np.random.default_rng(seed)
+    return {f"P{i}": list(rng.normal(size=int(rng.choice([8, 12])))) for i in range(count)}
+
+
+def assert_same_results(found, expected):
+    assert [pattern_id for pattern_id, _ in found] == [pattern_id for pattern_id, _ in expected]
+    assert [similarity for _, similarity in found] == pytest.approx([similarity for _, similarity in expected])
+
+
+def test_exact_search_matches_brute_force_through_edits():
+    patterns = make_patterns(500)
+    index = PatternIndex()
+    index.rebuild({pattern_id: {"signature": signature} for pattern_id, signature in patterns.items()})
+    rng = np.random.default_rng(1)
+
+    for step in range(60):
+        query = rng.normal(size=int(rng.choice([8, 12])))
+        assert_same_results(index.search(query, k=5), brute_force(patterns, query, 5))
+        assert_same_results(index.search(query, k=3, min_similarity=0.5), brute_force(patterns, query, 3, 0.5))
+
+        # Replace, resize and remove patterns between queries
+        victim = f"P{rng.integers(500)}"
+        if step % 3 == 0:
+            patterns.pop(victim, None)
+            index.remove(victim)
+        else:
+            patterns[victim] = list(rng.normal(size=int(rng.choice([8, 12]))))
+            index.add(victim, patterns[victim])
+        assert len(index) == len(patterns)
+
+
+def test_unusable_signatures_are_kept_out():
+    index = PatternIndex()
+    assert index.add("A", [1.0, 0.0])
+    assert not index.add("A", [0.0, 0.0])
+    assert "A" not in index
+    assert not index.add("B", [float("nan"), 1.0])
+    assert index.search([1.0, 0.0]) == []
+    assert index.search([0.0, 0.0]) == []
+    assert index.search([1.0, 0.0, 0.0]) == []
+
+
+def test_approximate_search_returns_true_similarities():
+    patterns = make_patterns(3000, seed=2)
+    index = PatternIndex(approximate=True, ann_threshold=1000)
+    for pattern_id, signature in patterns.items():
+        index.add(pattern_id, signature)
+    assert all(group.lsh is not None for group in index.groups.values())
+
+    rng = np.random.default_rng(3)
+    hits = 0
+    for _ in range(100):
+        # Queries near a stored pattern, as the brain's lookups are
+        target = patterns[f"P{rng.integers(3000)}"]
+        query = np.asarray(target) + rng.normal(scale=0.05, size=len(target))
+        found = index.search(query, k=1)
+        expected = brute_force(patterns, query, 1)
+        if found:
+            exact = dict(brute_force(patterns, query, len(patterns)))
+            assert found[0][1] == pytest.approx(exact[found[0][0]])
+            hits += found[0][0] == expected[0][0]
+    assert hits >= 90
+
+    # Removed patterns leave the LSH buckets too
+    for pattern_id in list(patterns)[:10]:
+        index.remove(pattern_id)
+        assert all(pattern_id not in bucket for group in index.groups.values() if group.lsh
+                   for table in group.lsh.tables for bucket in table.values())
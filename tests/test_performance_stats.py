@@ -0,0 +1,86 @@
+"""Streaming performance aggregates against a full recompute"""
+
+import numpy as np
+import pytest
+
+from modules.quantum_trading_agent.performance_stats import (PerformanceTracker, RunningStats,
+                                                             WindowedStats)
+
+
+def recompute(pnls):
+    pnls = np.asarray(pnls, dtype=float)
+    if len(pnls) == 0:
+        return {"trades": 0, "win_rate": 0.0, "total_pnl": 0.0, "mean": 0.0, "variance": 0.0,
+                "profit_factor": 0.0, "max_drawdown": 0.0}
+    equity = np.cumsum(pnls)
+    peaks = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:]
+    gross_profit = pnls[pnls > 0].sum()
+    gross_loss = -pnls[pnls <= 0].sum()
+    return {
+        "trades": len(pnls),
+        "win_rate": float((pnls > 0).mean()),
+        "total_pnl": float(pnls.sum()),
+        "mean": float(pnls.mean()),
+        "variance": float(pnls.var(ddof=1)) if len(pnls) > 1 else 0.0,
+        "profit_factor": float(gross_profit / gross_loss) if gross_loss > 0 else
+        (float("inf") if gross_profit > 0 else 0.0),
+        "max_drawdown": float((peaks - equity).max())
+    }
+
+
+def assert_matches(snapshot, pnls):
+    expected = recompute(pnls)
+    for key, value in expected.items():
+        assert snapshot[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+    std = np.sqrt(expected["variance"])
+    assert snapshot["sharpe"] == pytest.approx(expected["mean"] / std if std > 0 else 0.0, rel=1e-9)
+
+
+def test_lifetime_matches_full_recompute():
+    pnls = np.random.default_rng(5).normal(0.1, 2.0, 500)
+    stats = RunningStats()
+    for i, pnl in enumerate(pnls):
+        stats.add(float(pnl))
+        if i % 50 == 0:
+            assert_matches(stats.snapshot(), pnls[:i + 1])
+    assert_matches(stats.snapshot(), pnls)
+
+
+@pytest.mark.parametrize("offset", [0.0, 1e6])
+def test_count_window_matches_full_recompute(offset):
+    # A large common offset would expose cancellation in the running squares
+    pnls = offset + np.random.default_rng(9).normal(0.0, 1.0, 2000)
+    window = WindowedStats(size=100)
+    for i, pnl in enumerate(pnls):
+        window.add(float(pnl), timestamp=float(i))
+        if i % 97 == 0 or i == len(pnls) - 1:
+            assert_matches(window.snapshot(), pnls[max(0, i - 99):i + 1])
+
+
+def test_time_window_expires_on_read():
+    window = WindowedStats(seconds=10.0)
+    timestamps = np.arange(0.0, 50.0, 0.5)
+    pnls = np.sin(timestamps)
+    for timestamp, pnl in zip(timestamps, pnls):
+        window.add(float(pnl), timestamp=float(timestamp))
+    assert_matches(window.snapshot(now=49.5), pnls[timestamps >= 39.5])
+
+    # Nothing new arrives; the window still drains as time passes
+    assert_matches(window.snapshot(now=55.0), pnls[timestamps >= 45.0])
+    assert window.snapshot(now=100.0)["trades"] == 0
+
+
+def test_tracker_feeds_lifetime_and_windows():
+    tracker = PerformanceTracker({"last_3": {"size": 3}, "1m": {"seconds": 60}})
+    pnls = [1.0, -2.0, 0.5, 3.0, -1.0]
+    tracker.record_many(pnls, timestamps=[0.0, 10.0, 20.0, 70.0, 80.0])
+
+    snapshot = tracker.snapshot(now=80.0)
+    assert_matches(snapshot["lifetime"], pnls)
+    assert_matches(snapshot["windows"]["last_3"], pnls[-3:])
+    assert_matches(snapshot["windows"]["1m"], pnls[2:])
+
+
+def test_a_window_needs_a_bound():
+    with pytest.raises(ValueError):
+        WindowedStats()
@@ -0,0 +1,79 @@
+"""Columnar mark-to-market against per-position records"""
+
+import numpy as np
+import pytest
+
+from modules.quantum_trading_agent.portfolio_ledger import PortfolioLedger
+from modules.quantum_trading_agent.records import PositionRecord
+
+SYMBOLS = ["LEDGERAUSDT", "LEDGERBUSDT", "LEDGERCUSDT"]
+
+
+def loop_mark(records, prices):
+    summary = {"unrealized_pnl": 0.0, "gross_exposure": 0.0, "net_exposure": 0.0, "margin_used": 0.0,
+               "by_symbol": {}}
+    for record in records.values():
+        price = prices.get(record.symbol, record.entry_price)
+        signed_units = record.units if record.side_name == "LONG" else -record.units
+        pnl = record.pnl_at(price)
+        summary["unrealized_pnl"] += pnl
+        summary["net_exposure"] += signed_units * price
+        summary["gross_exposure"] += abs(signed_units * price)
+        summary["margin_used"] += record.margin
+        per_symbol = summary["by_symbol"].setdefault(record.symbol, {"positions": 0, "unrealized_pnl": 0.0})
+        per_symbol["positions"] += 1
+        per_symbol["unrealized_pnl"] += pnl
+    return summary
+
+
+def test_mark_matches_the_records_through_opens_and_closes():
+    rng = np.random.default_rng(12)
+    ledger = PortfolioLedger(capacity=4)
+    records = {}
+    prices = {}
+    for step in range(300):
+        action = rng.random()
+        if action < 0.5 or not records:
+            position_id = f"L{step}"
+            records[position_id] = PositionRecord.open(
+                position_id, str(rng.choice(SYMBOLS)), str(rng.choice(["LONG", "SHORT"])),
+                float(rng.uniform(90, 110)), quantity=float(rng.uniform(0.1, 2)), margin=float(rng.uniform(1, 5)))
+            ledger.add_record(records[position_id])
+        elif action < 0.7:
+            position_id = str(rng.choice(sorted(records)))
+            ledger.remove(position_id, realized_pnl=1.0)
+            del records[position_id]
+        else:
+            # Symbols without a price yet are carried at entry
+            prices[str(rng.choice(SYMBOLS))] = float(rng.uniform(90, 110))
+
+        summary = ledger.mark(prices)
+        expected = loop_mark(records, prices)
+        for key in ("unrealized_pnl", "gross_exposure", "net_exposure", "margin_used"):
+            assert summary[key] == pytest.approx(expected[key], abs=1e-9), key
+        assert summary["positions"] == len(records)
+        by_symbol = {symbol: row for symbol, row in summary["by_symbol"].items() if symbol in SYMBOLS}
+        assert set(by_symbol) == set(expected["by_symbol"])
+        for symbol, row in expected["by_symbol"].items():
+            assert by_symbol[symbol]["positions"] == row["positions"]
+            assert by_symbol[symbol]["unrealized_pnl"] == pytest.approx(row["unrealized_pnl"], abs=1e-9)
+
+    assert ledger.capacity >= ledger.used
+    for position_id, pnl in ledger.position_pnl().items():
+        assert pnl == pytest.approx(records[position_id].pnl_at(prices.get(records[position_id].symbol,
+                                                                             records[position_id].entry_price)))
+
+
+def test_marks_are_cached_until_something_changes():
+    ledger = PortfolioLedger()
+    ledger.add("A", SYMBOLS[0], "LONG", 2.0, 100.0)
+    first = ledger.mark({SYMBOLS[0]: 101.0})
+    assert ledger.mark({SYMBOLS[0]: 101.0}) is first
+    assert ledger.cache_hits == 1
+    assert ledger.position_mark("A") == pytest.approx((101.0, 2.0))
+
+    ledger.update_price(SYMBOLS[0], 99.0)
+    assert ledger.mark()["unrealized_pnl"] == pytest.approx(-2.0)
+    ledger.remove("A", realized_pnl=-2.0)
+    assert ledger.mark()["realized_pnl"] == pytest.approx(-2.0)
+    assert ledger.position_mark("A") is None
@@ -0,0 +1,97 @@
+"""Weighted token buckets: throughput, priority lanes and server feedback"""
+
+import asyncio
+import time
+
+import pytest
+
+from modules.quantum_trading_agent.rate_limiter import (WeightedRateLimiter, get_rate_limiter, PRIORITY_ACCOUNT,
+                                                        PRIORITY_HEALTH, PRIORITY_ORDER)
+
+
+def test_burst_then_refill_rate():
+    limiter = WeightedRateLimiter("test", rate=50.0, capacity=5.0, weights={"heavy": 5.0})
+
+    async def run():
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.acquire(priority=PRIORITY_ORDER) for _ in range(30)))
+        await limiter.acquire("heavy", priority=PRIORITY_ORDER)
+        return time.monotonic() - started
+
+    # 5 burst tokens, then 25 + 5 weight at 50 per second
+    elapsed = asyncio.run(run())
+    assert 0.55 <= elapsed < 1.5
+    assert limiter.granted == 31
+
+
+def test_lanes_are_served_by_priority_and_keep_a_reserve():
+    limiter = WeightedRateLimiter("test", rate=20.0, capacity=10.0, reserve_fraction=0.2)
+
+    async def run():
+        # Account traffic may not spend the last 20% of the bucket
+        for _ in range(8):
+            assert await limiter.acquire(priority=PRIORITY_ACCOUNT) == 0.0
+        assert await limiter.acquire(priority=PRIORITY_ORDER) == 0.0
+
+        served = []
+
+        async def request(lane, priority):
+            await limiter.acquire(priority=priority)
+            served.append(lane)
+
+        tasks = [asyncio.create_task(request("health", PRIORITY_HEALTH)),
+                 asyncio.create_task(request("account", PRIORITY_ACCOUNT))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("order", PRIORITY_ORDER)))
+        await asyncio.gather(*tasks)
+        return served
+
+    assert asyncio.run(run()) == ["order", "account", "health"]
+    assert limiter.get_stats()["lane_grants"] == {"order": 2, "account": 9, "health": 1}
+
+
+def test_a_cancelled_waiter_gives_up_its_place():
+    limiter = WeightedRateLimiter("test", rate=10.0, capacity=1.0)
+
+    async def run():
+        await limiter.acquire(priority=PRIORITY_ORDER)
+        abandoned = asyncio.create_task(limiter.acquire(priority=PRIORITY_ORDER))
+        await asyncio.sleep(0)
+        abandoned.cancel()
+        waited = await limiter.acquire(priority=PRIORITY_ORDER)
+        return waited
+
+    assert asyncio.run(run()) < 0.2
+    assert limiter.granted == 2
+
+
+def test_server_headers_pause_and_clamp():
+    limiter = WeightedRateLimiter("test", rate=1000.0, capacity=100.0, window_limit=1200)
+
+    limiter.update_from_headers({"X-RateLimit-Remaining": "3"})
+    assert limiter.get_stats()["tokens"] <= 3.5
+
+    limiter.update_from_headers({"Retry-After": "0.3"})
+    assert limiter.acquire_blocking(priority=PRIORITY_ORDER) >= 0.25
+
+    limiter.update_from_headers({}, status=429)
+    limiter.update_from_headers({}, status=429)
+    assert limiter.consecutive_throttles == 2
+    assert limiter.get_stats()["paused_for"] == pytest.approx(2.0, abs=0.1)
+    limiter.update_from_headers({}, status=200)
+    assert limiter.consecutive_throttles == 0
+    assert limiter.server_throttles == 3
+
+
+def test_blocking_callers_share_the_bucket():
+    limiter = WeightedRateLimiter("test", rate=100.0, capacity=2.0)
+    started = time.monotonic()
+    for _ in range(12):
+        limiter.acquire_blocking(priority=PRIORITY_ORDER)
+    assert time.monotonic() - started >= 0.09
+
+
+def test_registry_returns_one_limiter_per_name():
+    first = get_rate_limiter("test-registry", rate=1.0, capacity=1.0)
+    assert get_rate_limiter("test-registry", rate=99.0, capacity=99.0) is first
+    assert first.rate == 1.0
@@ -0,0 +1,52 @@
+"""Position records and the symbol table"""
+
+import threading
+
+import pytest
+
+from modules.quantum_trading_agent.records import (PositionRecord, SymbolTable, NS_PER_SECOND,
+                                                   REASON_STOP_LOSS, REASON_TAKE_PROFIT)
+
+
+def test_intern_is_consistent_across_threads():
+    table = SymbolTable()
+    names = [f"SYM{i}USDT" for i in range(200)]
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append([table.intern(name) for name in names])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(table) == len(names)
+    assert sorted(table.ids.values()) == list(range(len(names)))
+    for ids in results:
+        assert [table.name(symbol_id) for symbol_id in ids] == names
+
+
+def test_notional_and_quantity_sizing_share_the_pnl_formula():
+    by_notional = PositionRecord.open("A", "BTCUSDT", "LONG", 100.0, notional=50.0)
+    by_quantity = PositionRecord.open("B", "BTCUSDT", "BUY", 100.0, quantity=0.5)
+    assert by_notional.units == pytest.approx(0.5)
+    assert by_notional.pnl_at(110.0) == pytest.approx(by_quantity.pnl_at(110.0)) == pytest.approx(5.0)
+    assert by_notional.symbol == "BTCUSDT"
+
+
+def test_short_exit_levels_and_close():
+    record = PositionRecord.open("S", "ETHUSDT", "SHORT", 100.0, quantity=2.0,
+                                 stop_loss=102.0, take_profit=95.0, opened_ns=NS_PER_SECOND,
+                                 hold_seconds=60)
+    assert record.exit_reason_at(101.0) is None
+    assert record.exit_reason_at(102.0) == REASON_STOP_LOSS
+    assert record.exit_reason_at(95.0) == REASON_TAKE_PROFIT
+    assert not record.expired(60 * NS_PER_SECOND)
+    assert record.expired(61 * NS_PER_SECOND)
+
+    assert record.close(95.0, REASON_TAKE_PROFIT) == pytest.approx(10.0)
+    assert not record.is_open
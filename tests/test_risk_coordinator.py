@@ -0,0 +1,75 @@
+"""RiskCoordinator reservations follow positions until they close"""
+
+import asyncio
+
+import pytest
+
+from modules.quantum_trading_agent import symbol_actors
+from modules.quantum_trading_agent.symbol_actors import RiskCoordinator
+
+
+class RecordingController:
+    def __init__(self):
+        self.results = []
+
+    def process_trade_result(self, result, balance):
+        self.results.append(result)
+        return {"new_balance": balance + result.get("simulated_pnl", 0.0)}
+
+    def get_compound_status(self):
+        return {}
+
+
+@pytest.fixture
+def coordinator(monkeypatch):
+    async def fixed_size(signal, balance):
+        return {"action": "execute_trade",
+                "optimized_signal": {"optimized_position_size": signal["size"]}}
+    monkeypatch.setattr(symbol_actors, "optimize_compound_strategy", fixed_size)
+    return RiskCoordinator(RecordingController(), starting_balance=100.0, budget_cap=100.0)
+
+
+def open_position(coordinator, symbol, trade_id, size, success=True):
+    async def run():
+        authorization = await coordinator.authorize(symbol, {"size": size})
+        if authorization.get("action") != "execute_trade":
+            return authorization
+        await coordinator.settle(symbol, authorization, {"success": success},
+                                 {"trade_id": trade_id, "symbol": symbol})
+        return authorization
+    return asyncio.run(run())
+
+
+def test_open_positions_keep_their_reservation(coordinator):
+    assert open_position(coordinator, "BTCUSDT", "T1", 60.0)["action"] == "execute_trade"
+    assert coordinator.total_reserved == pytest.approx(60.0)
+
+    # A second position cannot take the capital the first one still holds
+    rejected = open_position(coordinator, "ETHUSDT", "T2", 60.0)
+    assert rejected["reason"] == "budget_cap_reserved"
+    assert rejected["available"] == pytest.approx(40.0)
+
+
+def test_closing_a_position_releases_its_reservation(coordinator):
+    open_position(coordinator, "BTCUSDT", "T1", 60.0)
+    open_position(coordinator, "BTCUSDT", "T2", 30.0)
+
+    coordinator.record_closed_trades("BTCUSDT", [{"trade_id": "T1", "symbol": "BTCUSDT", "pnl": 1.5}])
+    assert coordinator.total_reserved == pytest.approx(30.0)
+    assert coordinator.realized_pnl["BTCUSDT"] == pytest.approx(1.5)
+
+    # Unknown or repeated closes release nothing
+    coordinator.record_closed_trades("BTCUSDT", [{"trade_id": "T1", "symbol": "BTCUSDT", "pnl": 0.0}])
+    assert coordinator.total_reserved == pytest.approx(30.0)
+
+    coordinator.record_closed_trades("BTCUSDT", [{"trade_id": "T2", "symbol": "BTCUSDT", "pnl": -0.5}])
+    assert coordinator.total_reserved == 0.0
+    assert coordinator.reserved == {}
+    assert open_position(coordinator, "ETHUSDT", "T3", 100.0)["action"] == "execute_trade"
+
+
+def test_failed_execution_releases_at_once(coordinator):
+    open_position(coordinator, "BTCUSDT", "T1", 60.0, success=False)
+    assert coordinator.total_reserved == 0.0
+    assert coordinator.open_positions == {}
+    assert coordinator.controller.results == []
@@ -0,0 +1,122 @@
+"""Columnar session export and the analytics read back from it"""
+
+import json
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.quantum_trading_agent.session_analytics import SessionAnalytics, group_stats, load_table
+from modules.quantum_trading_agent.session_export import FORMAT_NPZ, SessionExporter
+from modules.quantum_trading_agent.session_recorder import TradingSessionRecorder
+
+
+@pytest.fixture
+def recorded(tmp_path, monkeypatch):
+    """A completed session and an active one, recorded through TradingSessionRecorder"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "logs").mkdir()
+    db_path = tmp_path / "sessions.db"
+    recorder = TradingSessionRecorder(db_path)
+    rng = np.random.default_rng(8)
+
+    def record(count):
+        for _ in range(count):
+            symbol = str(rng.choice(["BTCUSDT", "ETHUSDT"]))
+            params = {"strategy": str(rng.choice(["delta", "quantum", ""])),
+                      "state": {"coherence": float(rng.random())}, "path": [1, 2]}
+            recorder.record_trade_event({"event_type": str(rng.choice(["TRADE_CLOSE", "TRADE_SIGNAL"])),
+                                         "symbol": symbol, "outcome": str(rng.choice(["WIN", "LOSS", ""])),
+                                         "pnl": float(rng.normal(0, 2)), "confidence": float(rng.random()),
+                                         "quantum_params": params})
+            recorder.record_market_analysis({"symbol": symbol, "confidence": float(rng.random()),
+                                             "recommendation": str(rng.choice(["BUY", "HOLD"])),
+                                             "technical_analysis": {"rsi": float(rng.uniform(0, 100))}})
+
+    completed = recorder.start_session({"strategy": "fallback"})
+    record(150)
+    recorder.end_session()
+    later = time.time() + 1  # session ids have one-second resolution
+    monkeypatch.setattr(time, "time", lambda: later)
+    active = recorder.start_session({"strategy": "fallback"})
+    record(50)
+    recorder.flush()
+    recorder.close()
+    return db_path, completed, active
+
+
+def raw_closed_trades(db_path):
+    with sqlite3.connect(db_path) as conn:
+        events = pd.read_sql("SELECT * FROM trade_events ORDER BY event_id", conn)
+        notes = dict(conn.execute("SELECT session_id, session_notes FROM sessions").fetchall())
+    closed = events[(events["event_type"] == "TRADE_CLOSE") & events["outcome"].fillna("").astype(bool)].copy()
+    strategies = closed["quantum_params"].map(lambda text: json.loads(text)["strategy"])
+    fallback = closed["session_id"].map(lambda session_id: json.loads(notes[session_id])["strategy"])
+    closed["strategy"] = strategies.where(strategies != "", fallback)
+    return closed
+
+
+def test_export_flattens_json_into_typed_columns(recorded, tmp_path):
+    db_path, completed, active = recorded
+    exporter = SessionExporter(str(db_path), str(tmp_path / "export"), file_format=FORMAT_NPZ)
+    result = exporter.export()
+    assert result["success"]
+    assert sorted(result["sessions"]) == sorted([completed, active])
+
+    events = load_table("trade_events", str(tmp_path / "export"), [completed])
+    with sqlite3.connect(db_path) as conn:
+        raw = pd.read_sql("SELECT * FROM trade_events WHERE session_id = ? ORDER BY event_id", conn,
+                          params=(completed,))
+    assert list(events["event_id"]) == list(raw["event_id"])
+    assert events["pnl"].dtype == np.float64
+    np.testing.assert_allclose(events["pnl"], raw["pnl"])
+    coherence = [json.loads(text)["state"]["coherence"] for text in raw["quantum_params"]]
+    np.testing.assert_allclose(events["quantum_params.state.coherence"], coherence)
+    assert set(events["quantum_params.path"]) == {"[1, 2]"}
+    assert set(events["strategy"]) <= {"delta", "quantum", "fallback"}
+
+    analysis = load_table("market_analysis", str(tmp_path / "export"), columns=["analysis_data.rsi", "symbol"])
+    assert analysis["analysis_data.rsi"].dtype == np.float64
+    assert len(analysis["symbol"]) == 200
+
+    # Completed sessions on disk are skipped; the active one is refreshed
+    assert exporter.export()["sessions"] == [active]
+    assert sorted(exporter.export(force=True)["sessions"]) == sorted([completed, active])
+
+
+def test_breakdowns_match_the_raw_closed_trades(recorded, tmp_path):
+    db_path, completed, active = recorded
+    SessionExporter(str(db_path), str(tmp_path / "export"), file_format=FORMAT_NPZ).export()
+    analytics = SessionAnalytics(str(tmp_path / "export"))
+    closed = raw_closed_trades(db_path)
+
+    for column, stats in (("symbol", analytics.by_symbol()), ("strategy", analytics.by_strategy()),
+                          ("session_id", analytics.by_session())):
+        assert set(stats) == set(closed[column])
+        for key, group in closed.groupby(column):
+            equity = group["pnl"].cumsum()
+            drawdown = (equity.cummax().clip(lower=0.0) - equity).max()
+            assert stats[key]["trades"] == len(group), (column, key)
+            assert stats[key]["wins"] == (group["outcome"] == "WIN").sum()
+            assert stats[key]["losses"] == (group["outcome"] == "LOSS").sum()
+            assert stats[key]["total_pnl"] == pytest.approx(group["pnl"].sum())
+            assert stats[key]["std"] == pytest.approx(group["pnl"].std() if len(group) > 1 else 0.0)
+            assert stats[key]["max_drawdown"] == pytest.approx(drawdown)
+
+    only_completed = analytics.by_symbol([completed])
+    assert sum(row["trades"] for row in only_completed.values()) == (closed["session_id"] == completed).sum()
+
+
+def test_group_stats_orders_each_equity_curve():
+    keys = np.array(["a", "b", "a", "b", "a"])
+    pnl = np.array([-1.0, 2.0, 3.0, -4.0, -5.0])
+    # Out of time order: a's trades happen as 3, -5, -1
+    order = np.array([3.0, 1.0, 1.0, 2.0, 2.0])
+    stats = group_stats(keys, pnl, order=order)
+    assert stats["a"]["max_drawdown"] == pytest.approx(6.0)
+    assert stats["b"]["max_drawdown"] == pytest.approx(4.0)
+    assert stats["a"]["profit_factor"] == pytest.approx(3.0 / 6.0)
+    assert stats["b"]["win_rate"] == pytest.approx(0.5)
+    assert group_stats(np.array([]), np.array([])) == {}
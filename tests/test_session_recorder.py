@@ -0,0 +1,158 @@
+"""Session recorder: batched writes, reads and rollups"""
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.quantum_trading_agent.session_recorder import (TradingSessionRecorder, SessionRollups,
+                                                            EQUITY_RESOLUTIONS, _INSERT_TRADE_EVENT)
+
+
+@pytest.fixture
+def recorder(tmp_path, caplog):
+    caplog.set_level(logging.WARNING)
+    recorder = TradingSessionRecorder(tmp_path / "sessions.db")
+    recorder.start_session({"strategy": "test"})
+    yield recorder
+    recorder.close()
+
+
+def close_event(symbol, outcome, pnl, confidence=0.8):
+    return {"event_type": "TRADE_CLOSE", "symbol": symbol, "outcome": outcome,
+            "pnl": pnl, "confidence": confidence}
+
+
+def test_reads_see_earlier_rows_without_waiting_for_later_ones(recorder):
+    recorder.record_trade_event(close_event("BTCUSDT", "WIN", 2.0))
+
+    stop = threading.Event()
+
+    def produce():
+        while not stop.is_set():
+            recorder.record_trade_event({"event_type": "TRADE_SIGNAL", "symbol": "ETHUSDT"})
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    try:
+        time.sleep(0.1)
+        started = time.monotonic()
+        summary = recorder.get_session_summary()
+        elapsed = time.monotonic() - started
+    finally:
+        stop.set()
+        producer.join()
+
+    assert elapsed < 1.0
+    assert summary["total_trades"] == 1
+    assert summary["total_pnl"] == pytest.approx(2.0)
+
+
+def test_sync_waits_only_for_its_marker(recorder):
+    for _ in range(2000):
+        recorder.record_trade_event({"event_type": "TRADE_SIGNAL", "symbol": "BTCUSDT"})
+    assert recorder.writer.sync(timeout=5.0)
+    assert recorder.get_session_summary()["total_events"] == 2000
+
+
+def submit_event(recorder, session_id, ts, event_type, symbol, outcome=None, pnl=0.0, confidence=0.5):
+    recorder.writer.submit(_INSERT_TRADE_EVENT, (
+        session_id, datetime.fromtimestamp(ts).isoformat(), event_type, symbol, "BUY",
+        1.0, 100.0, confidence, "{}", outcome, pnl, ""))
+
+
+def expected_rollups(db_path):
+    with sqlite3.connect(db_path) as conn:
+        events = pd.read_sql("SELECT * FROM trade_events ORDER BY event_id", conn)
+    events["ts"] = [datetime.fromisoformat(text).timestamp() for text in events["timestamp"]]
+    events["closed"] = (events["event_type"] == "TRADE_CLOSE") & events["outcome"].fillna("").astype(bool)
+    closed = events[events["closed"]].copy()
+    closed["equity"] = closed.groupby("session_id")["pnl"].cumsum()
+    closed["peak"] = closed.groupby("session_id")["equity"].cummax().clip(lower=0.0)
+    closed["drawdown"] = closed["peak"] - closed["equity"]
+    return events, closed
+
+
+def test_rollups_match_the_raw_trade_events(tmp_path, monkeypatch):
+    recorder = TradingSessionRecorder(tmp_path / "sessions.db", batch_size=7)
+    rng = np.random.default_rng(4)
+    first = recorder.start_session({"strategy": "first"})
+    later = time.time() + 1  # session ids have one-second resolution
+    with monkeypatch.context() as patch:
+        patch.setattr(time, "time", lambda: later)
+        second = recorder.start_session({"strategy": "second"})
+    sessions = [first, second]
+    assert first != second
+    for session_id in sessions:
+        ts = 1_700_000_000.0
+        for _ in range(400):
+            ts += float(rng.exponential(40.0))
+            symbol = str(rng.choice(["BTCUSDT", "ETHUSDT", "SOLUSDT"]))
+            if rng.random() < 0.5:
+                pnl = float(rng.normal(0.0, 3.0))
+                outcome = str(rng.choice(["WIN", "LOSS", "BREAKEVEN", ""]))
+                submit_event(recorder, session_id, ts, "TRADE_CLOSE", symbol, outcome, pnl,
+                             confidence=float(rng.random()))
+            else:
+                submit_event(recorder, session_id, ts, "TRADE_SIGNAL", symbol)
+    recorder.flush()
+    events, closed = expected_rollups(tmp_path / "sessions.db")
+
+    for session_id in sessions:
+        session_events = events[events["session_id"] == session_id]
+        session_closed = closed[closed["session_id"] == session_id]
+        summary = recorder.get_session_summary(session_id)
+        assert summary["total_events"] == len(session_events)
+        assert summary["total_trades"] == len(session_closed)
+        assert summary["winning_trades"] == (session_closed["outcome"] == "WIN").sum()
+        assert summary["losing_trades"] == (session_closed["outcome"] == "LOSS").sum()
+        assert summary["total_pnl"] == pytest.approx(session_closed["pnl"].sum())
+        assert summary["max_drawdown"] == pytest.approx(session_closed["drawdown"].max())
+        assert summary["equity"] == pytest.approx(session_closed["equity"].iloc[-1])
+        closes = session_events[session_events["event_type"] == "TRADE_CLOSE"]
+        assert summary["avg_confidence"] == pytest.approx(closes["confidence"].mean())
+
+        by_symbol = {row["symbol"]: row for row in recorder.get_symbol_summary(session_id)}
+        for symbol, group in session_events.groupby("symbol"):
+            symbol_closed = session_closed[session_closed["symbol"] == symbol]
+            assert by_symbol[symbol]["events"] == len(group)
+            assert by_symbol[symbol]["total_trades"] == len(symbol_closed)
+            assert by_symbol[symbol]["total_pnl"] == pytest.approx(symbol_closed["pnl"].sum())
+
+    # Every resolution's buckets add up to the closed trades they cover
+    with sqlite3.connect(tmp_path / "sessions.db") as conn:
+        buckets = pd.read_sql("SELECT * FROM equity_buckets", conn)
+    for resolution in EQUITY_RESOLUTIONS:
+        for session_id in sessions:
+            session_closed = closed[closed["session_id"] == session_id].copy()
+            session_closed["bucket"] = (session_closed["ts"] // resolution).astype(int) * resolution
+            expected = session_closed.groupby("bucket").agg(
+                trades=("pnl", "size"), pnl=("pnl", "sum"), equity_close=("equity", "last"),
+                equity_high=("equity", "max"), equity_low=("equity", "min"), max_drawdown=("drawdown", "max"))
+            actual = buckets[(buckets["session_id"] == session_id) & (buckets["resolution"] == resolution)]
+            actual = actual.set_index("bucket_start").sort_index()
+            assert list(actual.index) == list(expected.index)
+            for column in expected.columns:
+                np.testing.assert_allclose(actual[column], expected[column], rtol=1e-9, atol=1e-9)
+
+    curve = recorder.get_equity_curve(sessions[0], points=20)
+    assert len(curve["equity"]) <= 20
+    assert sum(curve["trades"]) == (closed["session_id"] == sessions[0]).sum()
+    assert curve["equity"][-1] == pytest.approx(closed[closed["session_id"] == sessions[0]]["equity"].iloc[-1])
+
+    # A one-time rebuild from trade_events reproduces what the writer maintained
+    with sqlite3.connect(tmp_path / "sessions.db") as conn:
+        maintained = {table: conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+                      for table in ("session_rollups", "symbol_rollups")}
+        SessionRollups().rebuild(conn)
+        for table, rows in maintained.items():
+            rebuilt = conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+            assert len(rebuilt) == len(rows)
+            for old, new in zip(rows, rebuilt):
+                assert new == pytest.approx(old)
+    recorder.close()
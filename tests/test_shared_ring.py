@@ -0,0 +1,84 @@
+"""Shared-memory rings: wraparound, lapped reads and attaching from a worker process"""
+
+import multiprocessing as mp
+import threading
+
+import numpy as np
+import pytest
+
+from modules.quantum_trading_agent.shared_ring import SharedRingBuffer, rows_to_dicts
+
+
+@pytest.fixture
+def ring():
+    ring = SharedRingBuffer(["BTCUSDT", "ETHUSDT"], capacity=8)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def test_latest_wraps_around_oldest_first(ring):
+    assert ring.latest("BTCUSDT", 3).shape == (0, len(ring.fields))
+    for n in range(20):
+        ring.write("BTCUSDT", [n, 100 + n, 99 + n, 101 + n, 1.0])
+    ring.write("ETHUSDT", [0, 10, 9, 11, 2.0])
+
+    rows = ring.latest("BTCUSDT", 5)
+    assert list(ring.column(rows, "timestamp")) == [15, 16, 17, 18, 19]
+    # The slot the writer fills next is never part of a read
+    assert list(ring.column(ring.latest("BTCUSDT", 50), "timestamp")) == list(range(13, 20))
+    assert rows_to_dicts(ring, ring.latest("ETHUSDT", 5))[0]["price"] == 10
+
+    ring.replace_last("BTCUSDT", [19, 200, 199, 201, 3.0])
+    assert ring.head("BTCUSDT") == 20
+    assert ring.column(ring.latest("BTCUSDT"), "price")[0] == 200
+
+
+def test_readers_never_see_a_lapped_window(ring):
+    stop = threading.Event()
+
+    def writer():
+        n = 0
+        while not stop.is_set():
+            ring.write("BTCUSDT", [n] * len(ring.fields))
+            n += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(2000):
+            rows = ring.latest("BTCUSDT", 6)
+            if len(rows) < 2:
+                continue
+            # Every row is whole and the window is consecutive
+            assert (rows == rows[:, :1]).all()
+            assert (np.diff(rows[:, 0]) == 1).all() or len(rows) == 1
+    finally:
+        stop.set()
+        thread.join()
+
+
+def read_in_worker(spec, results):
+    ring = SharedRingBuffer.attach(spec)
+    prices = ring.column(ring.latest("ETHUSDT", 10), "price").tolist()
+    try:
+        ring.write("ETHUSDT", [0, 0, 0, 0, 0])
+        writable = True
+    except ValueError:
+        writable = False
+    results.put({"prices": prices, "writable": writable})
+    ring.close()
+
+
+def test_a_spawned_worker_attaches_read_only(ring):
+    for n in range(3):
+        ring.write("ETHUSDT", [n, 50 + n, 0, 0, 0])
+    # Started the way SymbolShardPool starts its workers
+    context = mp.get_context("spawn")
+    results = context.Queue()
+    worker = context.Process(target=read_in_worker, args=(ring.spec(), results))
+    worker.start()
+    result = results.get(timeout=30)
+    worker.join(timeout=30)
+    assert result == {"prices": [50.0, 51.0, 52.0], "writable": False}
+    assert ring.head("ETHUSDT") == 3
@@ -0,0 +1,72 @@
+"""JSON-RPC signal worker: errors, concurrent requests and state kept between calls"""
+
+import asyncio
+import json
+
+from modules.quantum_trading_agent.perplexity_injector import (DWCQuantumSignalProcessor, QuantumSignalService,
+                                                               QuantumSignalWorker)
+
+
+def request(method, request_id, params=None):
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}).encode()
+
+
+def make_worker():
+    worker = QuantumSignalWorker(QuantumSignalService(DWCQuantumSignalProcessor()), max_workers=4)
+    worker.shutdown_event = asyncio.Event()
+    return worker
+
+
+def test_protocol_errors():
+    async def run():
+        worker = make_worker()
+        return await worker.handle_message(b"{not json"), await worker.handle_message(request("trade-everything", 4))
+
+    parse_error, unknown = asyncio.run(run())
+    assert parse_error["id"] is None and parse_error["error"]["code"] == -32700
+    assert unknown["id"] == 4 and unknown["error"]["code"] == -32601
+
+
+def test_concurrent_requests_are_matched_by_id():
+    async def run():
+        worker = make_worker()
+        return await asyncio.gather(*(
+            worker.handle_message(request("process-signals", request_id, {
+                "market_data": {"price_data": [100.0 + request_id, 101.0, 99.5], "timestamp": f"T{request_id}"}}))
+            for request_id in (1, 2)))
+
+    for request_id, response in zip((1, 2), asyncio.run(run())):
+        assert response["id"] == request_id
+        assert response["result"]["success"]
+        assert response["result"]["timestamp"] == f"T{request_id}"
+
+
+def test_recommendations_reuse_the_last_processed_signals():
+    async def run():
+        worker = make_worker()
+        processor = worker.service.processor
+        seen = []
+        generate = processor.generate_trading_recommendation
+        processor.generate_trading_recommendation = lambda processed: seen.append(processed) or generate(processed)
+
+        await worker.handle_message(request("process-signals", 1, {"market_data": {"price_data": [1.0, 2.0, 3.0],
+                                                                                    "timestamp": "T1"}}))
+        recommendation = await worker.handle_message(request("generate-recommendation", 2))
+        return worker, seen, recommendation
+
+    worker, seen, recommendation = asyncio.run(run())
+    assert recommendation["id"] == 2 and recommendation["result"]["success"]
+    # No params: the worker answered from the signals it processed in the previous call
+    assert seen == [worker.service.last_processed]
+    assert seen[0]["timestamp"] == "T1"
+
+
+def test_shutdown_sets_the_event():
+    async def run():
+        worker = make_worker()
+        response = await worker.handle_message(request("shutdown", 9))
+        return response, worker.shutdown_event.is_set()
+
+    response, stopped = asyncio.run(run())
+    assert response == {"jsonrpc": "2.0", "id": 9, "result": {"success": True}}
+    assert stopped
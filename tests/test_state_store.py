@@ -0,0 +1,68 @@
+"""State store semantics and when the shared store is opened"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from modules.quantum_trading_agent import state_store
+from modules.quantum_trading_agent.state_store import StateStore, LEGACY_NAMESPACE
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_puts_coalesce_into_one_row_per_key(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"), flush_interval=3600, legacy_file=None)
+    for i in range(10):
+        store.put("engine", "balance", i)
+    store.put("other", "balance", "untouched")
+    assert store.get("engine", "balance") == 9  # pending writes are visible
+
+    assert store.flush() == 2
+    stats = store.get_stats()
+    assert stats["puts"] == 11
+    assert stats["rows_written"] == 2
+    assert stats["coalesced"] == 9
+
+    store.delete("engine", "balance")
+    assert store.get_namespace("engine") == {}
+    store.close()
+
+    reopened = StateStore(str(tmp_path / "state.db"), flush_interval=3600, legacy_file=None)
+    assert reopened.get("engine", "balance", "missing") == "missing"
+    assert reopened.get_namespace("other") == {"balance": "untouched"}
+    reopened.close()
+
+
+def test_legacy_memory_is_imported_once(tmp_path):
+    legacy = tmp_path / "agent_memory.json"
+    legacy.write_text(json.dumps({"delta_scalping": {"current_balance": 120.0}}))
+    store = StateStore(str(tmp_path / "state.db"), flush_interval=3600, legacy_file=str(legacy))
+    assert store.get(LEGACY_NAMESPACE, "delta_scalping") == {"current_balance": 120.0}
+    store.put(LEGACY_NAMESPACE, "delta_scalping", {"current_balance": 0.0})
+    store.close()
+
+    reopened = StateStore(str(tmp_path / "state.db"), flush_interval=3600, legacy_file=str(legacy))
+    assert reopened.get(LEGACY_NAMESPACE, "delta_scalping") == {"current_balance": 0.0}
+    reopened.close()
+
+
+def test_default_paths_do_not_depend_on_the_working_directory():
+    if "AGENT_STATE_DB" not in os.environ:
+        assert Path(state_store.STATE_DB) == Path(state_store.__file__).resolve().parent / "agent_state.db"
+    assert Path(state_store.LEGACY_MEMORY_FILE).is_absolute()
+
+
+def test_importing_the_delta_engine_does_not_open_the_store(tmp_path):
+    db_path = tmp_path / "agent_state.db"
+    env = {**os.environ, "AGENT_STATE_DB": str(db_path), "PYTHONPATH": str(REPO_ROOT)}
+    subprocess.run([sys.executable, "-c", "import modules.quantum_trading_agent.delta_scalping"],
+                   cwd=tmp_path, env=env, check=True)
+    assert not db_path.exists()
+
+    subprocess.run([sys.executable, "-c",
+                    "from modules.quantum_trading_agent.delta_scalping import get_delta_engine; "
+                    "get_delta_engine()"],
+                   cwd=tmp_path, env=env, check=True)
+    assert db_path.exists()
@@ -0,0 +1,115 @@
+"""Per-symbol tick mailbox: overflow policies, ordering and workers"""
+
+import asyncio
+
+import pytest
+
+from modules.quantum_trading_agent.tick_mailbox import (TickMailbox, POLICY_DROP_NEWEST, POLICY_DROP_OLDEST,
+                                                        merge_price_range)
+
+
+def drain(mailbox):
+    async def run():
+        delivered = []
+        while any(slot.items for slot in mailbox.slots.values()):
+            symbol, tick = await mailbox.get()
+            delivered.append((symbol, tick))
+            mailbox.task_done(symbol)
+        return delivered
+    return asyncio.run(run())
+
+
+def test_overflow_policies():
+    conflate = TickMailbox(depth=2)
+    oldest = TickMailbox(depth=2, policy=POLICY_DROP_OLDEST)
+    newest = TickMailbox(depth=2, policy=POLICY_DROP_NEWEST)
+    for mailbox in (conflate, oldest, newest):
+        results = [mailbox.put("BTC", {"price": price}) for price in (1, 2, 3, 4)]
+        assert mailbox.depth_of("BTC") == 2
+        if mailbox is newest:
+            assert results == [True, True, False, False]
+
+    assert [tick["price"] for _, tick in drain(conflate)] == [1, 4]
+    assert [tick["price"] for _, tick in drain(oldest)] == [3, 4]
+    assert [tick["price"] for _, tick in drain(newest)] == [1, 2]
+    assert conflate.get_stats()["merged"] == 2
+    assert oldest.get_stats()["dropped"] == newest.get_stats()["dropped"] == 2
+
+
+def test_price_range_merge_keeps_the_window_extremes():
+    mailbox = TickMailbox(merge=merge_price_range)
+    for price in (100, 104, 97, 101):
+        mailbox.put("BTC", {"price": price})
+    (_, tick), = drain(mailbox)
+    assert tick["price"] == 101
+    assert (tick["window_high"], tick["window_low"]) == (104, 97)
+    assert tick["conflated_ticks"] == 4
+
+
+def test_workers_never_share_a_symbol_and_keep_its_order():
+    async def run():
+        mailbox = TickMailbox(depth=1000)
+        busy = set()
+        shared = []
+        seen = {}
+
+        async def worker():
+            while True:
+                symbol, tick = await mailbox.get()
+                if symbol in busy:
+                    shared.append(symbol)
+                busy.add(symbol)
+                await asyncio.sleep(0)
+                seen.setdefault(symbol, []).append(tick["n"])
+                busy.discard(symbol)
+                mailbox.task_done(symbol)
+
+        workers = [asyncio.create_task(worker()) for _ in range(4)]
+        for n in range(200):
+            mailbox.put(f"S{n % 5}", {"n": n})
+            if n % 7 == 0:
+                await asyncio.sleep(0)
+        while sum(len(ticks) for ticks in seen.values()) < 200:
+            await asyncio.sleep(0)
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        return seen, shared
+
+    seen, shared = asyncio.run(run())
+    assert shared == []
+    assert seen == {f"S{k}": list(range(k, 200, 5)) for k in range(5)}
+
+
+def test_stale_ticks_expire(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("modules.quantum_trading_agent.tick_mailbox.time.monotonic", lambda: clock[0])
+    mailbox = TickMailbox(depth=3, policy=POLICY_DROP_OLDEST, max_age=1.0)
+    mailbox.put("BTC", {"n": 1})
+    clock[0] = 0.5
+    mailbox.put("BTC", {"n": 2})
+    clock[0] = 1.2
+    assert [tick["n"] for _, tick in drain(mailbox)] == [2]
+    assert mailbox.get_stats()["expired"] == 1
+
+
+def test_a_cancelled_worker_passes_its_wake_up_on():
+    async def run():
+        mailbox = TickMailbox()
+        first = asyncio.create_task(mailbox.get())
+        second = asyncio.create_task(mailbox.get())
+        await asyncio.sleep(0)
+        mailbox.put("BTC", {"n": 1})  # wakes the first waiter...
+        first.cancel()                # ...which is cancelled before it runs
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await asyncio.wait_for(second, 1.0)
+
+    assert asyncio.run(run()) == ("BTC", {"n": 1})
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        TickMailbox(depth=0)
+    with pytest.raises(ValueError):
+        TickMailbox(policy="block")
@@ -0,0 +1,87 @@
+"""Trade journal rotation, indexed reads and crash recovery"""
+
+import time
+
+import numpy as np
+
+from modules.quantum_trading_agent.trade_journal import TradeJournal
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+
+
+def fill(journal, count, seed=0):
+    """Append entries whose clock mostly advances but sometimes steps back"""
+    rng = np.random.default_rng(seed)
+    written = []
+    ts = 1_700_000_000.0
+    for i in range(count):
+        ts += float(rng.exponential(5.0)) if rng.random() > 0.05 else -30.0
+        symbol = str(rng.choice(SYMBOLS))
+        journal.append({"event": "TRADE", "n": i}, symbol, ts)
+        written.append({"ts": ts, "symbol": symbol, "event": "TRADE", "n": i})
+    return written
+
+
+def expected(written, start=None, end=None, symbol=None):
+    return [entry for entry in written
+            if (start is None or entry["ts"] >= start) and (end is None or entry["ts"] <= end)
+            and (symbol is None or entry["symbol"] == symbol)]
+
+
+def wait_for_compression(journal, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while journal.compressed < journal.rotations and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert journal.compressed == journal.rotations
+
+
+def test_queries_match_a_filter_over_everything_written(tmp_path):
+    journal = TradeJournal(str(tmp_path), max_bytes=20_000, max_seconds=1e9, compress=True)
+    written = fill(journal, 3000)
+    assert journal.rotations > 5
+    wait_for_compression(journal)
+    assert list(tmp_path.glob("*.jsonl.gz"))
+
+    rng = np.random.default_rng(1)
+    lo, hi = written[0]["ts"], written[-1]["ts"]
+    for _ in range(30):
+        start, end = sorted(rng.uniform(lo, hi, 2))
+        symbol = str(rng.choice(SYMBOLS + [None]))
+        symbol = None if symbol == "None" else symbol
+        assert journal.query(start, end, symbol) == expected(written, start, end, symbol)
+    assert journal.query(symbol="XRPUSDT") == []
+    assert journal.query(limit=7) == written[:7]
+
+    assert journal.tail(50) == written[-50:]
+    assert journal.tail(400, "ETHUSDT") == expected(written, symbol="ETHUSDT")[-400:]
+    assert journal.get_stats()["entries"] == len(written)
+
+
+def test_reopening_recovers_the_index_and_the_active_segment(tmp_path):
+    journal = TradeJournal(str(tmp_path), max_bytes=10_000, max_seconds=1e9, compress=False)
+    written = fill(journal, 500)
+    journal.close()
+
+    # A crash mid-append leaves a torn line at the end of the active segment
+    active = sorted(tmp_path.glob("trades-*.jsonl"))[-1]
+    with open(active, "ab") as f:
+        f.write(b'{"ts": 1, "symbol": "BTC')
+    # and a lost index forces the sealed summaries to be rebuilt from the files
+    (tmp_path / "index.jsonl").unlink()
+
+    reopened = TradeJournal(str(tmp_path), max_bytes=10_000, max_seconds=1e9, compress=False)
+    assert reopened.query() == written
+    reopened.append({"event": "TRADE", "n": 500}, "BTCUSDT", written[-1]["ts"] + 1)
+    assert reopened.tail(2) == written[-1:] + [
+        {"ts": written[-1]["ts"] + 1, "symbol": "BTCUSDT", "event": "TRADE", "n": 500}]
+    reopened.close()
+
+
+def test_segments_rotate_on_age(tmp_path):
+    journal = TradeJournal(str(tmp_path), max_bytes=10**9, max_seconds=60.0, compress=False)
+    for i in range(10):
+        journal.append({"n": i}, "BTCUSDT", 1000.0 + 25.0 * i)
+    # Segments open at 1000, 1075, 1150, 1225
+    assert journal.rotations == 3
+    assert [entry["n"] for entry in journal.query(1040.0, 1160.0)] == [2, 3, 4, 5, 6]
+    journal.close()